@@ -40,7 +40,11 @@ from .mcp_tool_usage import (
     get_specific_user_tool_usage,
     get_mcp_hourly_daily_stats,
     get_mcp_user_tool_detail,
-    get_all_tool_usage_logs
+    get_all_tool_usage_logs,
+    iter_tool_usage_logs,
+    count_tool_usage_logs,
+    get_tool_usage_detail,
+    log_tool_usage_batch
 )
 
 from .mcp_tool_limit import (
@@ -57,7 +61,9 @@ from .custom_tool import (
     get_tool_by_id,
     create_tool,
     update_tool,
-    delete_tool
+    delete_tool,
+    get_active_tools_with_params,
+    get_tool_registry_version
 )
 
 from .custom_tool_param import (
@@ -83,13 +89,16 @@ from .openapi import (
 
 from .openapi_usage import (
     log_openapi_usage,
+    log_openapi_usage_batch,
     get_openapi_usage_logs,
     get_openapi_stats,
     get_user_openapi_daily_usage,
     get_user_openapi_tool_usage,
     get_openapi_hourly_daily_stats,
     get_openapi_user_tool_detail,
-    get_all_openapi_usage_logs
+    get_all_openapi_usage_logs,
+    iter_openapi_usage_logs,
+    count_openapi_usage_logs
 )
 
 from .openapi_limit import (
@@ -164,12 +173,18 @@ __all__ = [
     'get_mcp_hourly_daily_stats',
     'get_mcp_user_tool_detail',
     'get_all_tool_usage_logs',
+    'iter_tool_usage_logs',
+    'count_tool_usage_logs',
+    'get_tool_usage_detail',
+    'log_tool_usage_batch',
     'get_user_limit',
     'get_admin_usage_stats',
     'get_limit_list',
     'upsert_limit',
     'delete_limit',
     'get_active_tools',
+    'get_active_tools_with_params',
+    'get_tool_registry_version',
     'get_all_tools',
     'get_tool_by_id',
     'create_tool',
@@ -202,6 +217,7 @@ __all__ = [
     'upsert_openapi',
     'delete_openapi',
     'log_openapi_usage',
+    'log_openapi_usage_batch',
     'get_openapi_usage_logs',
     'get_openapi_stats',
     'get_user_openapi_daily_usage',
@@ -209,6 +225,8 @@ __all__ = [
     'get_openapi_hourly_daily_stats',
     'get_openapi_user_tool_detail',
     'get_all_openapi_usage_logs',
+    'iter_openapi_usage_logs',
+    'count_openapi_usage_logs',
     'get_openapi_limit',
     'get_openapi_limit_list',
     'upsert_openapi_limit',
@@ -0,0 +1,78 @@
+import argparse
+import sys
+import os
+
+# 프로젝트 루트 (agent_mcp)를 path에 추가하여 src 패키지를 찾을 수 있게 함
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", "..", ".."))
+
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# src 패키지 자체를 path에 추가
+src_dir = os.path.join(project_root, "src")
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+try:
+    from db.migrations import plan_migrations, apply_migrations, get_migration_history
+except ImportError as e:
+        print(f"[FATAL] Import failed: {e}")
+        sys.exit(1)
+
+"""
+    스키마 Migration 실행 도구
+    - python src/db/check/db_migrate.py --plan          : 적용 계획만 출력 (dry-run, DB 변경 없음)
+    - python src/db/check/db_migrate.py                 : 최신 버전까지 적용
+    - python src/db/check/db_migrate.py --target 2      : 지정한 버전까지만 적용
+    - python src/db/check/db_migrate.py --history       : 적용 이력 출력
+"""
+
+def print_plan(target: int = None):
+    plan = plan_migrations(target)
+    print(f"Current version: {plan['current_version']} / Latest version: {plan['latest_version']}")
+    if not plan['pending']:
+        print("[INFO] Schema is up to date. Nothing to apply.")
+        return
+
+    for migration in plan['pending']:
+        mode = "transactional" if migration['transactional'] else "online (per statement)"
+        print(f"--- v{migration['version']}: {migration['name']} [{mode}] ---")
+        for sql in migration['sql']:
+            print(f"    {sql}")
+    print()
+
+def print_history():
+    print(f"{'Version':<8} | {'Name':<30} | {'Applied':<19} | {'ms':<6}")
+    print("-" * 72)
+    for row in get_migration_history():
+        print(f"{row['version']:<8} | {row['name']:<30} | {row['applied_dt']:<19} | {row['duration_ms'] or 0:<6}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Database schema migration tool")
+    parser.add_argument("--plan", action="store_true", help="적용 계획만 출력 (dry-run)")
+    parser.add_argument("--target", type=int, default=None, help="이 버전까지만 적용")
+    parser.add_argument("--history", action="store_true", help="적용 이력 출력")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Database Migration Tool")
+    print("=" * 60)
+
+    if args.history:
+        print_history()
+        return
+
+    print_plan(args.target)
+    if args.plan:
+        return
+
+    try:
+        applied = apply_migrations(args.target)
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        sys.exit(1)
+    print(f"[SUCCESS] Applied: {[m['version'] for m in applied]}")
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,10 @@ def reset_and_seed():
                 print(f" - Dropped: {table}")
             cursor.execute("PRAGMA foreign_keys = ON;")
             conn.commit()
+
+        # 스키마 버전 초기화 (버전이 남아 있으면 init_db 가 DDL 을 건너뜀)
+        cursor.execute("PRAGMA user_version = 0;")
+        conn.commit()
         
         # 2. 스키마 초기화 (init_manager 호출)
         print("[2/3] Recreating schema...")
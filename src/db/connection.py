@@ -9,10 +9,12 @@ import os
 # src/db/connection.py 위치 기준 -> src/db -> src -> project_root
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
-DB_PATH = os.path.join(PROJECT_ROOT, "agent_mcp.db")
+# - AGENT_MCP_DB_PATH 가 있으면 그 경로 사용 (테스트 서브 프로세스 등)
+DB_PATH = os.getenv("AGENT_MCP_DB_PATH") or os.path.join(PROJECT_ROOT, "agent_mcp.db")
 
 # db 연결
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+# - check_same_thread=False: 스트리밍 응답처럼 하나의 커서를 여러 스레드가 "순차적으로" 이어 읽는 경우에만 사용
+def get_db_connection(check_same_thread: bool = True):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
@@ -10,6 +10,8 @@ from .connection import get_db_connection
     - [4] update_tool: Tool 정보 수정
     - [5] delete_tool: Tool 삭제
     - [6] get_tool_by_id: 특정 Tool 상세 조회
+    - [7] get_active_tools_with_params: 활성화된 모든 Tool + 파라미터 조회 (2회 쿼리, 도구 목록 캐시 로드용)
+    - [8] get_tool_registry_version: 도구 레지스트리 버전 조회 (도구/파라미터 변경 시 트리거로 증가)
 """
 
 # [1] get_active_tools: 활성화된 모든 tool 목록 조회
@@ -114,4 +116,37 @@ def delete_tool(tool_id: int):
     # 파라미터는 FOREIGN KEY CASCADE로 함께 삭제됨 (init_manager.py 참조)
     conn.execute("DELETE FROM h_custom_tool WHERE id=?", (tool_id,))
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+# [7] get_active_tools_with_params: 활성화된 모든 tool + 파라미터 조회
+# -> 도구마다 get_tool_params 를 호출(N+1)하지 않고 파라미터를 한 번에 조회
+def get_active_tools_with_params() -> list[dict]:
+    """활성화된 모든 Tool 조회 (각 Tool 의 'params' 에 파라미터 목록 포함)."""
+    conn = get_db_connection()
+    try:
+        tools = [dict(row) for row in conn.execute("SELECT * FROM h_custom_tool WHERE is_active='Y' ORDER BY id").fetchall()]
+        params_by_tool = {}
+        rows = conn.execute("""
+            SELECT p.* FROM h_custom_tool_param p
+            JOIN h_custom_tool t ON t.id = p.tool_id
+            WHERE t.is_active='Y'
+            ORDER BY p.tool_id, p.id
+        """).fetchall()
+        for row in rows:
+            params_by_tool.setdefault(row['tool_id'], []).append(dict(row))
+    finally:
+        conn.close()
+
+    for tool in tools:
+        tool['params'] = params_by_tool.get(tool['id'], [])
+    return tools
+
+# [8] get_tool_registry_version: 도구 레지스트리 버전 조회
+# -> registry_nm: 'custom_tool' (h_custom_tool, h_custom_tool_param) | 'openapi' (h_openapi)
+def get_tool_registry_version(registry_nm: str = "custom_tool") -> int:
+    """도구 레지스트리 버전 조회 (관련 테이블이 변경될 때마다 트리거로 1씩 증가)."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT version FROM h_tool_registry WHERE registry_nm = ?", (registry_nm,)).fetchone()
+        return row['version'] if row else 0
+    finally:
+        conn.close()
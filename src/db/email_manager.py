@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 try:
     from .connection import get_db_connection
 except ImportError:
@@ -11,6 +11,14 @@ except ImportError:
     - [3] get_email_logs: 이메일 발송 이력을 조회합니다. (페이징 적용)
     - [4] cancel_email_log: 예약된 이메일 발송을 취소합니다.
     - [5] get_pending_scheduled_emails: 발송 대기 중인 예약 이메일을 조회합니다.
+    - [6] claim_scheduled_emails: 발송 시각이 된 예약 이메일을 선점(PENDING -> SENDING)하고 반환합니다.
+    - [7] claim_email: 특정 이메일을 선점합니다.
+    - [8] release_stale_email_claims: 선점 후 오래 발송되지 않은 이메일을 다시 PENDING 으로 되돌립니다.
+    - [9] get_scheduled_email_times: 발송 대기 중인 예약 이메일의 (ID, 예약 시각) 목록을 조회합니다.
+    - [10] normalize_scheduled_dt: 예약 시각을 'YYYY-MM-DD HH:MM:SS' 로 맞춥니다.
+
+    * 여러 워커가 같은 예약 이메일을 동시에 발송하지 않도록, 발송 전에 반드시 선점(claim)하고 선점에 성공한 건만 발송
+    * scheduled_dt 는 claim 시 문자열로 비교하므로 저장 시 'YYYY-MM-DD HH:MM:SS' 로 맞춤 ('T' 구분자 / 초 생략 형식 보정)
 """
 
 # [1] log_email: 이메일 발송 이력을 DB에 기록합니다.
@@ -24,6 +32,7 @@ def log_email(user_uid: int, recipient: str, subject: str, content: str, is_sche
     
     # is_scheduled가 True이면 1, False이면 0으로 저장
     scheduled_val = 1 if is_scheduled else 0
+    scheduled_dt = normalize_scheduled_dt(scheduled_dt)
     
     cursor.execute("""
         INSERT INTO h_email_log (user_uid, recipient, subject, content, is_scheduled, scheduled_dt, status, reg_dt)
@@ -162,4 +171,122 @@ def get_pending_scheduled_emails():
     rows = cursor.fetchall()
     conn.close()
     
-    return [dict(row) for row in rows]
\ No newline at end of file
+    return [dict(row) for row in rows]
+
+
+# [6] claim_scheduled_emails: 발송 시각이 된 예약 이메일 선점
+def claim_scheduled_emails(limit: int = 100) -> list:
+    """
+    발송 시각이 된 PENDING 예약 이메일을 SENDING 으로 바꾸고, 선점한 이메일 목록을 반환합니다.
+    BEGIN IMMEDIATE 로 쓰기 잠금을 잡은 상태에서 조회/변경하므로 다른 워커와 같은 건을 선점하지 않습니다.
+    """
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            SELECT *
+            FROM h_email_log
+            WHERE status = 'PENDING'
+              AND is_scheduled = 1
+              AND scheduled_dt <= ?
+            ORDER BY scheduled_dt, id
+            LIMIT ?
+        """, (now_str, limit))
+        rows = [dict(row) for row in cursor.fetchall()]
+        if rows:
+            cursor.executemany(
+                "UPDATE h_email_log SET status = 'SENDING', claim_dt = ? WHERE id = ?",
+                [(now_str, row['id']) for row in rows]
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for row in rows:
+        row['status'] = 'SENDING'
+        row['claim_dt'] = now_str
+    return rows
+
+# [7] claim_email: 특정 이메일 선점
+def claim_email(log_id: int):
+    """
+    PENDING 상태인 이메일을 SENDING 으로 바꾸고 해당 이메일을 반환합니다.
+    이미 다른 워커가 선점했거나 PENDING 이 아니면 None 을 반환합니다.
+    """
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "UPDATE h_email_log SET status = 'SENDING', claim_dt = ? WHERE id = ? AND status = 'PENDING'",
+            (now_str, log_id)
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return None
+        row = cursor.execute("SELECT * FROM h_email_log WHERE id = ?", (log_id,)).fetchone()
+        conn.commit()
+        return dict(row)
+    finally:
+        conn.close()
+
+# [8] release_stale_email_claims: 오래된 선점 해제
+def release_stale_email_claims(timeout_sec: int = 600) -> int:
+    """
+    SENDING 으로 선점한 뒤 timeout_sec 동안 결과가 기록되지 않은 이메일(발송 중 워커 종료 등)을 PENDING 으로 되돌립니다.
+    Returns: 되돌린 건수
+    """
+    threshold = (datetime.now() - timedelta(seconds=timeout_sec)).strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE h_email_log SET status = 'PENDING', claim_dt = NULL WHERE status = 'SENDING' AND claim_dt < ?",
+        (threshold,)
+    )
+    count = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return count
+
+# [9] get_scheduled_email_times: 발송 대기 중인 예약 이메일의 (ID, 예약 시각) 목록
+def get_scheduled_email_times() -> list:
+    """
+    PENDING 상태인 예약 이메일의 (id, scheduled_dt) 목록을 예약 시각 순으로 조회합니다.
+    (idx_email_log_status_scheduled 인덱스 사용)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, scheduled_dt
+        FROM h_email_log
+        WHERE status = 'PENDING'
+          AND is_scheduled = 1
+          AND scheduled_dt IS NOT NULL
+        ORDER BY scheduled_dt
+    """)
+    rows = cursor.fetchall()
+    conn.close()
+    return [(row['id'], row['scheduled_dt']) for row in rows]
+
+
+# [10] normalize_scheduled_dt: 예약 시각 형식 보정
+def normalize_scheduled_dt(value: str):
+    """
+    'YYYY-MM-DD HH:MM', 'YYYY-MM-DDTHH:MM[:SS]' 등을 'YYYY-MM-DD HH:MM:SS' 로 바꿉니다.
+    - 시간대가 있는 ISO 형식은 서버 로컬 시각으로 변환
+    - 해석할 수 없는 값은 그대로 반환
+    """
+    if not value:
+        return value
+    try:
+        dt = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return value
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,125 @@
+import json
+from datetime import datetime
+try:
+    from .connection import get_db_connection
+except ImportError:
+    from connection import get_db_connection
+
+"""
+    h_export_job 관련 def
+    - [1] create_export_job: 내보내기 작업 생성 (PENDING)
+    - [2] start_export_job: 작업 시작 처리 (RUNNING, 전체 건수 기록)
+    - [3] update_export_job_progress: 처리 건수 갱신
+    - [4] complete_export_job: 작업 완료 처리 (DONE, 생성 파일 file_id 기록)
+    - [5] fail_export_job: 작업 실패 처리 (FAIL, 에러 메시지 기록)
+    - [6] get_export_job: 작업 단건 조회
+    - [7] get_export_jobs: 사용자의 작업 목록 조회 (최신순)
+    - [8] fail_unfinished_export_jobs: 지정한 워커(owner)의 미완료 작업 실패 처리
+    - [9] get_unfinished_export_job_owners: 미완료 작업이 남아 있는 워커(owner) 목록 조회
+
+    * owner 는 작업을 실행하는 워커 id (shared_state.WORKER_ID) - 워커가 여러 개여도 살아 있는 워커의 작업은 건드리지 않음
+"""
+
+# [1] create_export_job: 내보내기 작업 생성 (PENDING)
+def create_export_job(job_id: str, export_tp: str, format: str, filters: dict, user_uid: int, reg_uid: str,
+                      owner: str = None):
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            INSERT INTO h_export_job (job_id, export_tp, format, filters, status, user_uid, reg_uid, reg_dt, owner)
+            VALUES (?, ?, ?, ?, 'PENDING', ?, ?, ?, ?)
+        ''', (job_id, export_tp, format, json.dumps(filters or {}, ensure_ascii=False), user_uid, reg_uid,
+              datetime.now().strftime("%Y-%m-%d %H:%M:%S"), owner))
+        conn.commit()
+    finally:
+        conn.close()
+
+# [2] start_export_job: 작업 시작 처리 (RUNNING, 전체 건수 기록)
+def start_export_job(job_id: str, total_cnt: int):
+    conn = get_db_connection()
+    try:
+        conn.execute("UPDATE h_export_job SET status = 'RUNNING', total_cnt = ?, processed_cnt = 0 WHERE job_id = ?",
+                     (total_cnt, job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+# [3] update_export_job_progress: 처리 건수 갱신
+def update_export_job_progress(job_id: str, processed_cnt: int):
+    conn = get_db_connection()
+    try:
+        conn.execute("UPDATE h_export_job SET processed_cnt = ? WHERE job_id = ?", (processed_cnt, job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+# [4] complete_export_job: 작업 완료 처리 (DONE, 생성 파일 file_id 기록)
+def complete_export_job(job_id: str, file_id: str, processed_cnt: int):
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            UPDATE h_export_job
+            SET status = 'DONE', file_id = ?, processed_cnt = ?, end_dt = ?
+            WHERE job_id = ?
+        ''', (file_id, processed_cnt, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+# [5] fail_export_job: 작업 실패 처리 (FAIL, 에러 메시지 기록)
+def fail_export_job(job_id: str, error_msg: str):
+    conn = get_db_connection()
+    try:
+        conn.execute("UPDATE h_export_job SET status = 'FAIL', error_msg = ?, end_dt = ? WHERE job_id = ?",
+                     (error_msg, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+# [6] get_export_job: 작업 단건 조회
+def get_export_job(job_id: str):
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT * FROM h_export_job WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+# [7] get_export_jobs: 사용자의 작업 목록 조회 (최신순)
+def get_export_jobs(reg_uid: str, limit: int = 20):
+    conn = get_db_connection()
+    try:
+        rows = conn.execute('''
+            SELECT * FROM h_export_job
+            WHERE reg_uid = ?
+            ORDER BY reg_dt DESC
+            LIMIT ?
+        ''', (reg_uid, limit)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+# [8] fail_unfinished_export_jobs: 지정한 워커(owner)의 미완료 작업 실패 처리 (owner=None 이면 owner 가 기록되지 않은 작업)
+def fail_unfinished_export_jobs(owner: str = None, error_msg: str = 'Interrupted by server restart'):
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute('''
+            UPDATE h_export_job
+            SET status = 'FAIL', error_msg = ?, end_dt = ?
+            WHERE status IN ('PENDING', 'RUNNING') AND owner IS ?
+        ''', (error_msg, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), owner))
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+# [9] get_unfinished_export_job_owners: 미완료 작업이 남아 있는 워커(owner) 목록 조회
+def get_unfinished_export_job_owners() -> list:
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT DISTINCT owner FROM h_export_job WHERE status IN ('PENDING', 'RUNNING')"
+        ).fetchall()
+        return [row[0] for row in rows]
+    finally:
+        conn.close()
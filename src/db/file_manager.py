@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 try:
     from .connection import get_db_connection
@@ -12,9 +13,45 @@ except ImportError:
     - [4] get_file_logs: 파일 이력 조회
     - [5] get_all_files: 전체 파일 목록 조회
     - [6] increase_download_count: 다운로드 횟수 증가
+    - [7] delete_file_metadata: 파일 메타데이터 삭제
+    - [8] get_files_by_batch: 배치 ID로 파일 목록 조회
+    - [9] save_file_metadata_bulk: 여러 파일 메타데이터를 한 트랜잭션으로 저장 (다중 업로드)
+    - [10] get_file_blobs: SHA-256 목록으로 내용 주소 blob 조회 (h_file_blob)
+    - [11] collect_unreferenced_blobs: 참조가 없는 blob 정리 (GC)
+    - [12] record_file_downloads: 다운로드 이력 일괄 저장 + 다운로드 횟수 증가 (src/utils/download_log.py 가 모아서 호출)
+    - [13] release_file_blobs: 참조 등록에 실패한 blob 을 참조 0 으로 등록 (GC 대상)
+
+    * storage_tp = 'CAS' 파일은 같은 내용이면 blob(물리 파일) 1개를 공유, 참조 수(ref_cnt)는 h_file 트리거가 유지 (migration v13)
+    * storage_tp = 'EXPORT' 파일(관리자 사용 이력 내보내기)은 목록 조회에서 제외 (작업을 등록한 관리자만 내보내기 작업으로 다운로드)
 """
 
 
+# 파일 메타데이터 INSERT (단건/일괄 저장 공용) -> file_uid
+def _insert_file_metadata(cursor, file_info: dict) -> int:
+    cursor.execute('''
+        INSERT INTO h_file (
+            file_id, file_nm, org_file_nm, file_path, file_url, 
+            file_size, file_type, extension, storage_tp, 
+            reg_dt, reg_uid, use_at, delete_at, down_cnt, batch_id, file_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'Y', 'N', 0, ?, ?)
+    ''', (
+        file_info['file_id'],
+        file_info['file_nm'],
+        file_info['org_file_nm'],
+        file_info['file_path'],
+        file_info['file_url'],
+        file_info['file_size'],
+        file_info['file_type'],
+        file_info['extension'],
+        file_info['storage_tp'],
+        datetime.now(),
+        file_info['reg_uid'],
+        file_info.get('batch_id'),
+        file_info.get('file_hash')
+    ))
+    return cursor.lastrowid
+
+
 # [1] save_file_metadata: 파일 메타데이터 저장
 def save_file_metadata(file_info: dict):
     """
@@ -24,28 +61,7 @@ def save_file_metadata(file_info: dict):
     cursor = conn.cursor()
     
     try:
-        cursor.execute('''
-            INSERT INTO h_file (
-                file_id, file_nm, org_file_nm, file_path, file_url, 
-                file_size, file_type, extension, storage_tp, 
-                reg_dt, reg_uid, use_at, delete_at, down_cnt, batch_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'Y', 'N', 0, ?)
-        ''', (
-            file_info['file_id'],
-            file_info['file_nm'],
-            file_info['org_file_nm'],
-            file_info['file_path'],
-            file_info['file_url'],
-            file_info['file_size'],
-            file_info['file_type'],
-            file_info['extension'],
-            file_info['storage_tp'],
-            datetime.now(),
-            file_info['reg_uid'],
-            file_info.get('batch_id')
-        ))
-        
-        file_uid = cursor.lastrowid
+        file_uid = _insert_file_metadata(cursor, file_info)
         conn.commit()
         return file_uid
     except Exception as e:
@@ -145,7 +161,7 @@ def get_all_files(limit: int = 100):
     
     cursor.execute('''
         SELECT * FROM h_file 
-        WHERE use_at = 'Y' AND delete_at = 'N' 
+        WHERE use_at = 'Y' AND delete_at = 'N' AND storage_tp <> 'EXPORT'
         ORDER BY reg_dt DESC 
         LIMIT ?
     ''', (limit,))
@@ -199,7 +215,7 @@ def get_files_by_batch(batch_id: str):
     
     cursor.execute('''
         SELECT * FROM h_file 
-        WHERE batch_id = ? AND use_at = 'Y' AND delete_at = 'N'
+        WHERE batch_id = ? AND use_at = 'Y' AND delete_at = 'N' AND storage_tp <> 'EXPORT'
         ORDER BY reg_dt ASC
     ''', (batch_id,))
     
@@ -207,3 +223,135 @@ def get_files_by_batch(batch_id: str):
     conn.close()
     
     return [dict(row) for row in rows]
+
+# [9] save_file_metadata_bulk: 여러 파일 메타데이터 일괄 저장
+def save_file_metadata_bulk(file_infos: list) -> list:
+    """
+    여러 파일 메타데이터를 연결 1개, 트랜잭션 1개로 저장하고 file_uid 목록을 (입력 순서대로) 반환합니다.
+    - 하나라도 실패하면 전체 롤백
+    """
+    if not file_infos:
+        return []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        file_uids = [_insert_file_metadata(cursor, file_info) for file_info in file_infos]
+        conn.commit()
+        return file_uids
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+# [10] get_file_blobs: 내용 주소 blob 조회
+def get_file_blobs(file_hashes: list) -> dict:
+    """
+    SHA-256 목록에 해당하는 blob 정보를 {file_hash: row} 로 반환합니다. (연결 1회)
+    """
+    file_hashes = list(set(file_hashes))
+    if not file_hashes:
+        return {}
+    conn = get_db_connection()
+    try:
+        placeholders = ",".join("?" * len(file_hashes))
+        rows = conn.execute(f"SELECT * FROM h_file_blob WHERE file_hash IN ({placeholders})", file_hashes).fetchall()
+        return {row["file_hash"]: dict(row) for row in rows}
+    finally:
+        conn.close()
+
+# [11] collect_unreferenced_blobs: 참조가 없는 blob 정리
+def collect_unreferenced_blobs(grace_sec: int = 3600, limit: int = 500) -> dict:
+    """
+    ref_cnt = 0 상태로 grace_sec 이상 지난 blob 을 삭제하고 {"deleted": 건수, "reclaimed_bytes": 크기} 를 반환합니다.
+    - 쓰기 잠금(BEGIN IMMEDIATE) 안에서 물리 파일을 .gc 로 이름을 바꾸고 행을 삭제 -> 커밋 후 파일 삭제
+      (커밋 이후에는 blob 경로에 지울 파일이 없으므로, 그 사이 같은 내용을 다시 업로드해도 새 파일이 지워지지 않음)
+    """
+    conn = get_db_connection()
+    conn.isolation_level = None
+    tombstones = []
+    reclaimed = 0
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute('''
+                SELECT file_hash, blob_path, file_size FROM h_file_blob
+                WHERE ref_cnt = 0 AND upd_dt < datetime('now', 'localtime', ?)
+                ORDER BY upd_dt
+                LIMIT ?
+            ''', (f"-{int(grace_sec)} seconds", limit)).fetchall()
+            for row in rows:
+                tombstone = f"{row['blob_path']}.gc"
+                try:
+                    os.replace(row['blob_path'], tombstone)
+                    tombstones.append(tombstone)
+                    reclaimed += row['file_size']
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM h_file_blob WHERE file_hash = ?", (row['file_hash'],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            # 이름을 바꾼 파일 복구
+            for tombstone in tombstones:
+                os.replace(tombstone, tombstone[:-len(".gc")])
+            raise
+    finally:
+        conn.close()
+
+    for tombstone in tombstones:
+        try:
+            os.remove(tombstone)
+        except OSError as e:
+            print(f"Failed to remove blob {tombstone}: {e}")
+    return {"deleted": len(rows), "reclaimed_bytes": reclaimed}
+
+# [12] record_file_downloads: 다운로드 이력 / 횟수 일괄 기록
+def record_file_downloads(entries: list):
+    """
+    다운로드 이력 [(file_uid, file_id, reg_uid, reg_dt)] 를 h_file_log 에 일괄 저장하고,
+    h_file.down_cnt 를 파일별 건수만큼 한 번에 증가시킵니다. (연결 1개, 트랜잭션 1개)
+    """
+    if not entries:
+        return
+    counts = {}
+    for file_uid, _, _, _ in entries:
+        counts[file_uid] = counts.get(file_uid, 0) + 1
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.executemany('''
+            INSERT INTO h_file_log (
+                file_uid, file_id, reg_uid, reg_dt
+            ) VALUES (?, ?, ?, ?)
+        ''', entries)
+        cursor.executemany("UPDATE h_file SET down_cnt = down_cnt + ? WHERE file_uid = ?",
+                           [(count, file_uid) for file_uid, count in counts.items()])
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+# [13] release_file_blobs: 참조 등록에 실패한 blob 을 참조 0 으로 등록
+def release_file_blobs(file_infos: list):
+    """
+    메타데이터 저장이 롤백되어 h_file_blob 행 없이 남은 blob 을 ref_cnt = 0 으로 등록합니다. (유예 시간 후 GC 가 삭제)
+    - 이미 행이 있으면(다른 업로드가 참조 중이거나 이미 GC 대상) 그대로 둠
+    """
+    if not file_infos:
+        return
+    conn = get_db_connection()
+    try:
+        conn.executemany('''
+            INSERT INTO h_file_blob (file_hash, blob_path, file_size, ref_cnt, reg_dt, upd_dt)
+            VALUES (?, ?, ?, 0, datetime('now', 'localtime'), datetime('now', 'localtime'))
+            ON CONFLICT (file_hash) DO NOTHING
+        ''', [(info['file_hash'], info['file_path'], info['file_size']) for info in file_infos])
+        conn.commit()
+    finally:
+        conn.close()
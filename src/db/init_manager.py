@@ -6,11 +6,40 @@ try:
 except ImportError:
     from connection import get_db_connection
 
+# 스키마 버전 (PRAGMA user_version 에 기록)
+# - 스키마 변경은 src/db/migrations.py 에 번호를 붙인 migration 으로 추가하며, 최신 migration 번호가 곧 SCHEMA_VERSION
+# - init_db 는 DB 의 user_version 이 SCHEMA_VERSION 이상이면 아무것도 하지 않음
+#   (stdio 모드는 Claude Desktop 이 프로세스를 띄울 때마다 init_db 를 호출하므로, 매번 DDL/커밋(쓰기 잠금)을 하지 않도록 함)
+try:
+    from .migrations import LATEST_VERSION as SCHEMA_VERSION, get_schema_version, apply_migrations
+except ImportError:
+    from migrations import LATEST_VERSION as SCHEMA_VERSION, get_schema_version, apply_migrations
+
 def init_db():
-    """데이터베이스 테이블 구조(Schema)를 최신 상태로 생성합니다."""
+    """데이터베이스 스키마를 최신 버전으로 맞춥니다. (미적용 migration 순서대로 적용)"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    try:
+        # 스키마가 최신이면 생략
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return
+
+        # WAL 저널 모드 (DB 파일에 영구 저장됨, 트랜잭션 밖에서 설정해야 함)
+        # - 내보내기처럼 오래 걸리는 조회 중에도 사용 이력 기록/진행률 갱신 등 쓰기가 막히지 않도록 함
+        #   (기본 rollback journal 모드에서는 읽기 트랜잭션이 끝날 때까지 쓰기가 'database is locked' 로 실패)
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+    applied = apply_migrations()
+    print(f"[DB] Schema initialization completed. (applied: {[m['version'] for m in applied]}, version: {SCHEMA_VERSION})", file=sys.stderr)
+
+
+def create_baseline_schema(cursor):
+    """
+    Migration v1 (baseline): migration 도입 이전 init_db 가 만들던 스키마 전체.
+    - 모두 IF NOT EXISTS 이므로 기존 운영 DB(user_version=0)에도 안전하게 적용됨
+    - **중요** 이 함수는 더 이상 수정하지 않고, 이후 변경은 migrations.py 에 새 버전으로 추가
+    """
     # 1. 사용자 테이블
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS h_user (
@@ -317,6 +346,80 @@ def init_db():
     )
     ''')
 
-    conn.commit()
-    conn.close()
-    print("[DB] Schema initialization completed.", file=sys.stderr)
+    # 22. MCP Tool 사용 이력 전문 검색(FTS5) 인덱스
+    # - h_mcp_tool_usage를 content 테이블로 사용하는 External Content 방식 (본문은 중복 저장하지 않음)
+    # - trigram 토크나이저: 한글/JSON 문자열도 LIKE '%...%'처럼 부분 문자열 검색 가능
+    # - 동기화는 트리거(INSERT/UPDATE/DELETE)로 처리
+    _init_tool_usage_fts(cursor)
+
+    # 23. 내보내기(Export) 백그라운드 작업 테이블
+    # - 대용량 사용 이력 내보내기를 요청 처리와 분리하여 워커 스레드에서 파일로 생성
+    # - 완료된 파일은 h_file 에 등록되고 file_id 로 /api/files/download/{file_id} 에서 다운로드
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS h_export_job (
+        job_id TEXT PRIMARY KEY,
+        export_tp TEXT NOT NULL,
+        format TEXT NOT NULL,
+        filters TEXT,
+        status TEXT DEFAULT 'PENDING',
+        total_cnt INTEGER DEFAULT 0,
+        processed_cnt INTEGER DEFAULT 0,
+        file_id TEXT,
+        error_msg TEXT,
+        user_uid INTEGER,
+        reg_uid TEXT NOT NULL,
+        reg_dt TEXT DEFAULT (datetime('now', 'localtime')),
+        end_dt TEXT,
+        FOREIGN KEY (user_uid) REFERENCES h_user (uid)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_export_job_reg_uid ON h_export_job (reg_uid, reg_dt)')
+
+
+# h_mcp_tool_usage 전문 검색(FTS5) 인덱스 및 동기화 트리거 생성
+def _init_tool_usage_fts(cursor):
+    """h_mcp_tool_usage_fts 가상 테이블과 동기화 트리거를 생성합니다. (FTS5 미지원 빌드면 건너뜀)"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='h_mcp_tool_usage_fts'"
+    ).fetchone()
+
+    try:
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS h_mcp_tool_usage_fts USING fts5(
+            tool_nm,
+            tool_params,
+            tool_result,
+            content='h_mcp_tool_usage',
+            content_rowid='id',
+            tokenize='trigram'
+        )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite 빌드에 FTS5(trigram)가 없는 경우 -> 검색은 LIKE 방식으로 동작
+        print(f"[DB] FTS5 unavailable, skip usage search index: {e}", file=sys.stderr)
+        return
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_mcp_tool_usage_fts_ai AFTER INSERT ON h_mcp_tool_usage BEGIN
+        INSERT INTO h_mcp_tool_usage_fts (rowid, tool_nm, tool_params, tool_result)
+        VALUES (new.id, new.tool_nm, new.tool_params, new.tool_result);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_mcp_tool_usage_fts_ad AFTER DELETE ON h_mcp_tool_usage BEGIN
+        INSERT INTO h_mcp_tool_usage_fts (h_mcp_tool_usage_fts, rowid, tool_nm, tool_params, tool_result)
+        VALUES ('delete', old.id, old.tool_nm, old.tool_params, old.tool_result);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_mcp_tool_usage_fts_au AFTER UPDATE ON h_mcp_tool_usage BEGIN
+        INSERT INTO h_mcp_tool_usage_fts (h_mcp_tool_usage_fts, rowid, tool_nm, tool_params, tool_result)
+        VALUES ('delete', old.id, old.tool_nm, old.tool_params, old.tool_result);
+        INSERT INTO h_mcp_tool_usage_fts (rowid, tool_nm, tool_params, tool_result)
+        VALUES (new.id, new.tool_nm, new.tool_params, new.tool_result);
+    END
+    ''')
+
+    # 인덱스를 처음 만든 경우, 기존 이력 데이터로 인덱스 재구성 (1회)
+    if not exists:
+        cursor.execute("INSERT INTO h_mcp_tool_usage_fts (h_mcp_tool_usage_fts) VALUES ('rebuild')")
@@ -1,10 +1,11 @@
 from datetime import datetime
 from .connection import get_db_connection
+from .tool_result import split_tool_result, save_tool_result, get_tool_result, load_tool_results, RESULT_FTS_TABLE
 
 """
     h_mcp_tool_usage 테이블 관련
     - [1] log_tool_usage: MCP Tool 사용 이력을 기록
-    - [2] get_tool_usage_logs: MCP Tool 사용 이력을 조회 (페이징 + 필터링)
+    - [2] get_tool_usage_logs: MCP Tool 사용 이력을 조회 (페이징 + 필터링 + 전문 검색)
     - [3] get_tool_stats: 도구별 사용 통계 집계 (Total, Success, Failure)
     - [4] get_user_daily_usage: 사용자 또는 토큰의 금일 도구 사용 횟수 조회
     - [5] get_user_tool_stats: 사용자별 도구 사용 횟수 집계
@@ -12,8 +13,17 @@ from .connection import get_db_connection
     - [7] get_mcp_hourly_daily_stats: 시간대별/요일별 사용 통계 (Heatmap)
     - [8] get_mcp_user_tool_detail: 특정 유저의 전체 기간 도구별 사용량 (Top 5)
     - [9] get_all_tool_usage_logs: MCP Tool 사용 이력을 조회 (Excel 전용)
+    - [10] iter_tool_usage_logs: MCP Tool 사용 이력을 chunk 단위로 순회 (스트리밍 내보내기용)
+    - [11] count_tool_usage_logs: 조건에 맞는 MCP Tool 사용 이력 건수 조회 (내보내기 진행률용)
+    - [12] get_tool_usage_detail: MCP Tool 사용 이력 단건 상세 조회 (전체 실행 결과 포함)
+    - [13] log_tool_usage_batch: 여러 건의 MCP Tool 사용 이력을 한 트랜잭션으로 기록 (배치 실행용)
 """
 
+# 사용 이력 전문 검색(FTS5) 인덱스 테이블 (init_manager.py 참조)
+FTS_TABLE = "h_mcp_tool_usage_fts"
+# trigram 토크나이저는 3글자 이상의 검색어만 인덱스로 찾을 수 있음
+FTS_MIN_TERM_LEN = 3
+
 # [1] log_tool_usage: MCP Tool 사용 이력 관리 함수 (관리자용)
 def log_tool_usage(
     user_uid: int = None,
@@ -23,46 +33,36 @@ def log_tool_usage(
     result: str = "",
     token_id: int = None
 ):
-    """MCP Tool 사용 이력을 기록."""
+    """MCP Tool 사용 이력을 기록. (큰 실행 결과는 미리보기만 남기고 전체 본문은 압축하여 별도 저장)"""
     conn = get_db_connection()
     status = 'SUCCESS' if success else 'FAIL'
+    preview, payload, result_size = split_tool_result(result)
     
-    conn.execute('''
-    INSERT INTO h_mcp_tool_usage (user_uid, token_id, tool_nm, tool_params, tool_success, tool_result, reg_dt)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (user_uid, token_id, tool_nm, tool_params, status, result, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    cursor = conn.execute('''
+    INSERT INTO h_mcp_tool_usage (user_uid, token_id, tool_nm, tool_params, tool_success, tool_result, result_size, reg_dt)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (user_uid, token_id, tool_nm, tool_params, status, preview, result_size, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    if payload is not None:
+        save_tool_result(conn, cursor.lastrowid, payload, result_size, text=str(result))
     
     conn.commit()
     conn.close()
 
 # [2] get_tool_usage_logs: MCP Tool 사용 이력 조회
 # => 페이징 포함 (26.01.23)
+# => search: tool_nm / tool_params / tool_result 전문 검색 (FTS5, 관련도순 정렬)
 def get_tool_usage_logs(page: int = 1, size: int = 20, 
-                        search_user_id: str = None, search_tool_nm: str = None, search_success: str = None):
-    """MCP Tool 사용 이력을 조회 (페이징 + 필터링)."""
+                        search_user_id: str = None, search_tool_nm: str = None, search_success: str = None,
+                        search: str = None):
+    """MCP Tool 사용 이력을 조회 (페이징 + 필터링 + 전문 검색)."""
     conn = get_db_connection()
     offset = (page - 1) * size
     
-    # 기본 쿼리 및 파라미터 구성
-    base_where = " FROM h_mcp_tool_usage t LEFT JOIN h_user u ON t.user_uid = u.uid WHERE 1=1"
-    params = []
-    
-    # 조회 조건에 따라 -> where 쿼리 추가
-    if search_user_id:
-        base_where += " AND u.user_id LIKE ?"
-        params.append(f"%{search_user_id}%")
-        
-    if search_tool_nm:
-        base_where += " AND t.tool_nm LIKE ?"
-        params.append(f"%{search_tool_nm}%")
-        
-    if search_success and search_success != 'ALL':
-        base_where += " AND t.tool_success = ?"
-        params.append(search_success)
+    # 조회 조건에 따라 -> from/where 쿼리 구성 (count, 목록 조회 공통)
+    from_sql, params, order_sql = _build_usage_query(conn, search_user_id, search_tool_nm, search_success, search)
     
     # 전체 개수 조회
-    count_query = "SELECT COUNT(*)" + base_where
-    cursor = conn.execute(count_query, tuple(params))
+    cursor = conn.execute("SELECT COUNT(*) " + from_sql, tuple(params))
     total = cursor.fetchone()[0]
     
     # 이력 조회
@@ -73,36 +73,17 @@ def get_tool_usage_logs(page: int = 1, size: int = 20,
             t.tool_params,
             t.tool_success,
             t.tool_result,
+            t.result_size,
+            EXISTS (SELECT 1 FROM h_mcp_tool_result r WHERE r.usage_id = t.id) as result_truncated,
             t.reg_dt,
             u.user_id,
             u.user_nm,
             tk.name as token_name
-        FROM h_mcp_tool_usage t
-        LEFT JOIN h_user u ON t.user_uid = u.uid
-        LEFT JOIN h_access_token tk ON t.token_id = tk.id
-        WHERE 1=1
+        {from_sql}
+        {order_sql}
+        LIMIT ? OFFSET ?
     '''
-    
-    # [새로고침] where 조건 추가
-    where_sql = ""
-    if search_user_id:
-        where_sql += " AND (u.user_id LIKE ? OR tk.name LIKE ?)"
-        params.extend([f"%{search_user_id}%", f"%{search_user_id}%"])
-        
-    if search_tool_nm:
-        where_sql += " AND t.tool_nm LIKE ?"
-        params.append(f"%{search_tool_nm}%")
-        
-    if search_success and search_success != 'ALL':
-        where_sql += " AND t.tool_success = ?"
-        params.append(search_success)
-
-    query += where_sql
-    query += " ORDER BY t.reg_dt DESC LIMIT ? OFFSET ?"
-    # LIMIT, OFFSET 파라미터 추가
-    params.extend([size, offset])
-    
-    cursor = conn.execute(query, tuple(params))
+    cursor = conn.execute(query, tuple(params + [size, offset]))
     rows = cursor.fetchall()
     
     conn.close()
@@ -116,6 +97,8 @@ def get_tool_usage_logs(page: int = 1, size: int = 20,
             "tool_params": row['tool_params'],
             "tool_success": row['tool_success'],
             "tool_result": row['tool_result'],
+            "result_size": row['result_size'],
+            "result_truncated": bool(row['result_truncated']),
             "reg_dt": row['reg_dt'],
             "user_id": row['user_id'] or (f"token:{row['token_name']}" if row['token_name'] else "Unknown"),
             "user_nm": row['user_nm'] or row['token_name'] or "Unknown"
@@ -127,17 +110,94 @@ def get_tool_usage_logs(page: int = 1, size: int = 20,
         "items": items
     }
 
+# 사용 이력 조회용 from/where/order 절 구성 (목록 조회, 내보내기 공통)
+# - search가 있으면 FTS5 인덱스(h_mcp_tool_usage_fts)를 먼저 조회하고 관련도(rank)순으로 정렬
+# - 분리 저장된 큰 결과는 전체 결과 인덱스(h_mcp_tool_result_fts)도 함께 조회 (미리보기 이후 내용까지 검색)
+#   -> 모든 검색어가 이력 인덱스(도구명/파라미터/미리보기) 또는 전체 결과 인덱스 한쪽에서 함께 찾아져야 함
+# - trigram 인덱스로 찾을 수 없는 짧은 검색어(3글자 미만)나 FTS5 미지원 환경에서는 LIKE로 대체 (결과는 미리보기만 검색)
+def _build_usage_query(conn, search_user_id: str = None, search_tool_nm: str = None,
+                       search_success: str = None, search: str = None):
+    params = []
+    from_sql = "FROM h_mcp_tool_usage t"
+    order_sql = "ORDER BY t.reg_dt DESC"
+    like_terms = []
+
+    if search:
+        terms = _split_search_terms(search)
+        fts_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LEN]
+        like_terms = [term for term in terms if len(term) < FTS_MIN_TERM_LEN]
+
+        if fts_terms and _has_usage_fts(conn):
+            match = _build_fts_match(fts_terms)
+            fts_sql = f"SELECT rowid AS usage_id, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"
+            params.append(match)
+            if _has_usage_fts(conn, RESULT_FTS_TABLE):
+                fts_sql = f'''SELECT usage_id, MIN(rank) AS rank FROM (
+                    {fts_sql}
+                    UNION ALL
+                    SELECT rowid AS usage_id, rank FROM {RESULT_FTS_TABLE} WHERE {RESULT_FTS_TABLE} MATCH ?
+                ) GROUP BY usage_id'''
+                params.append(match)
+            from_sql = f'''FROM (
+                {fts_sql}
+            ) s
+            JOIN h_mcp_tool_usage t ON t.id = s.usage_id'''
+            order_sql = "ORDER BY s.rank, t.reg_dt DESC"
+        else:
+            like_terms = terms
+
+    from_sql += '''
+        LEFT JOIN h_user u ON t.user_uid = u.uid
+        LEFT JOIN h_access_token tk ON t.token_id = tk.id
+        WHERE 1=1'''
+
+    if search_user_id:
+        from_sql += " AND (u.user_id LIKE ? OR tk.name LIKE ?)"
+        params.extend([f"%{search_user_id}%", f"%{search_user_id}%"])
+        
+    if search_tool_nm:
+        from_sql += " AND t.tool_nm LIKE ?"
+        params.append(f"%{search_tool_nm}%")
+        
+    if search_success and search_success != 'ALL':
+        from_sql += " AND t.tool_success = ?"
+        params.append(search_success)
+
+    for term in like_terms:
+        from_sql += " AND (t.tool_nm LIKE ? OR t.tool_params LIKE ? OR t.tool_result LIKE ?)"
+        params.extend([f"%{term}%"] * 3)
+
+    return from_sql, params, order_sql
+
+# 검색어를 공백 기준으로 분리 (빈 값 제거)
+def _split_search_terms(search: str) -> list[str]:
+    return [term for term in search.split() if term]
+
+# FTS5 MATCH 구문 생성: 각 검색어를 "..."로 감싸 특수문자(:, -, * 등)를 문자 그대로 검색 (AND 조건)
+def _build_fts_match(terms: list[str]) -> str:
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+# FTS5 인덱스 테이블 존재 여부 확인
+def _has_usage_fts(conn, table: str = FTS_TABLE) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone()
+    return row is not None
+
 # [3] get_tool_stats: 도구별 사용 통계 집계 데이터 반환
 # => 대시보드에서 사용
 def get_tool_stats() -> dict:
     """도구별 사용 통계 집계 (Total, Success, Failure)."""
     conn = get_db_connection()
     
-    # 도구별/성공여부별 카운트
+    # 일별 집계(rollup) 테이블에서 도구별 합계 (원본 이력 전체 GROUP BY 대신)
     query = '''
-        SELECT tool_nm, tool_success, COUNT(*) as cnt
-        FROM h_mcp_tool_usage
-        GROUP BY tool_nm, tool_success
+        SELECT tool_nm,
+               SUM(total_cnt) as cnt,
+               SUM(success_cnt) as success_cnt,
+               SUM(fail_cnt) as fail_cnt
+        FROM h_mcp_tool_usage_daily
+        GROUP BY tool_nm
     '''
     cursor = conn.execute(query)
     rows = cursor.fetchall()
@@ -145,20 +205,11 @@ def get_tool_stats() -> dict:
     
     stats = {}
     for row in rows:
-        tool_nm = row['tool_nm']
-        success_flag = row['tool_success'] # 'SUCCESS' or 'FAIL'
-        count = row['cnt']
-        
-        if tool_nm not in stats:
-            stats[tool_nm] = {'count': 0, 'success': 0, 'failure': 0}
-            
-        stats[tool_nm]['count'] += count
-        
-        # 성공 조건 체크 ('SUCCESS', 'True', 1 등)
-        if str(success_flag).upper() in ['SUCCESS', 'TRUE', '1']:
-            stats[tool_nm]['success'] += count
-        else:
-            stats[tool_nm]['failure'] += count
+        stats[row['tool_nm']] = {
+            'count': row['cnt'],
+            'success': row['success_cnt'],
+            'failure': row['fail_cnt']
+        }
             
     return stats
 
@@ -299,59 +350,121 @@ def get_mcp_user_tool_detail(user_id: str):
     return [dict(row) for row in rows]
 
 # [9] get_all_tool_usage_logs: MCP Tool 전체 사용 이력 조회 (내보내기용)
-def get_all_tool_usage_logs(search_user_id: str = None, search_tool_nm: str = None, search_success: str = None):
+def get_all_tool_usage_logs(search_user_id: str = None, search_tool_nm: str = None, search_success: str = None,
+                            search: str = None):
     """MCP Tool 전체 사용 이력을 조회 (내보내기용, 필터링 포함)."""
+    return list(iter_tool_usage_logs(search_user_id, search_tool_nm, search_success, search))
+
+# [10] iter_tool_usage_logs: MCP Tool 전체 사용 이력을 chunk 단위로 순회 (스트리밍 내보내기용)
+def iter_tool_usage_logs(search_user_id: str = None, search_tool_nm: str = None, search_success: str = None,
+                         search: str = None, chunk_size: int = 1000):
+    """
+    MCP Tool 사용 이력을 커서에서 chunk_size 만큼씩 읽어 한 건씩 반환하는 generator.
+    - 전체 결과를 메모리에 올리지 않으므로 이력 건수와 무관하게 메모리 사용량이 일정함
+    - StreamingResponse 가 threadpool 에서 순회하므로 check_same_thread=False 로 연결
+    - 분리 저장된 결과는 chunk 마다 한 번에 읽어 전체 본문으로 내보냄 (없으면 이력 테이블의 값)
+    """
+    conn = get_db_connection(check_same_thread=False)
+    try:
+        # 이력 조회 쿼리 (목록 조회와 동일한 조건 사용)
+        from_sql, params, order_sql = _build_usage_query(conn, search_user_id, search_tool_nm, search_success, search)
+        query = f'''
+            SELECT 
+                t.id,
+                t.tool_nm,
+                t.tool_params,
+                t.tool_success,
+                t.tool_result,
+                t.reg_dt,
+                u.user_id,
+                u.user_nm,
+                tk.name as token_name
+            {from_sql}
+            {order_sql}
+        '''
+        cursor = conn.execute(query, tuple(params))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            full_results = load_tool_results(conn, [row['id'] for row in rows])
+            for row in rows:
+                yield {
+                    "id": row['id'],
+                    "tool_nm": row['tool_nm'],
+                    "tool_params": row['tool_params'],
+                    "tool_success": row['tool_success'],
+                    "tool_result": full_results.get(row['id'], row['tool_result']),
+                    "reg_dt": row['reg_dt'],
+                    "user_id": row['user_id'] or (f"token:{row['token_name']}" if row['token_name'] else "Unknown"),
+                    "user_nm": row['user_nm'] or row['token_name'] or "Unknown"
+                }
+    finally:
+        conn.close()
+
+# [11] count_tool_usage_logs: 조건에 맞는 MCP Tool 사용 이력 건수 조회 (내보내기 진행률용)
+def count_tool_usage_logs(search_user_id: str = None, search_tool_nm: str = None, search_success: str = None,
+                          search: str = None):
     conn = get_db_connection()
-    
-    # 이력 조회 쿼리
-    query = '''
-        SELECT 
-            t.id,
-            t.tool_nm,
-            t.tool_params,
-            t.tool_success,
-            t.tool_result,
-            t.reg_dt,
-            u.user_id,
-            u.user_nm,
-            tk.name as token_name
-        FROM h_mcp_tool_usage t
-        LEFT JOIN h_user u ON t.user_uid = u.uid
-        LEFT JOIN h_access_token tk ON t.token_id = tk.id
-        WHERE 1=1
-    '''
-    
-    params = []
-    if search_user_id:
-        query += " AND (u.user_id LIKE ? OR tk.name LIKE ?)"
-        params.extend([f"%{search_user_id}%", f"%{search_user_id}%"])
-        
-    if search_tool_nm:
-        query += " AND t.tool_nm LIKE ?"
-        params.append(f"%{search_tool_nm}%")
-        
-    if search_success and search_success != 'ALL':
-        query += " AND t.tool_success = ?"
-        params.append(search_success)
+    try:
+        from_sql, params, _ = _build_usage_query(conn, search_user_id, search_tool_nm, search_success, search)
+        return conn.execute("SELECT COUNT(*) " + from_sql, tuple(params)).fetchone()[0]
+    finally:
+        conn.close()
 
-    query += " ORDER BY t.reg_dt DESC"
-    
-    cursor = conn.execute(query, tuple(params))
-    rows = cursor.fetchall()
-    conn.close()
-    
-    # dict 형태로 변환
-    items = []
-    for row in rows:
-        items.append({
-            "id": row['id'],
-            "tool_nm": row['tool_nm'],
-            "tool_params": row['tool_params'],
-            "tool_success": row['tool_success'],
-            "tool_result": row['tool_result'],
-            "reg_dt": row['reg_dt'],
-            "user_id": row['user_id'] or (f"token:{row['token_name']}" if row['token_name'] else "Unknown"),
-            "user_nm": row['user_nm'] or row['token_name'] or "Unknown"
-        })
-        
-    return items
+# [12] get_tool_usage_detail: MCP Tool 사용 이력 단건 상세 조회
+def get_tool_usage_detail(usage_id: int) -> dict | None:
+    """사용 이력 단건 조회. 분리 저장된 결과는 이 시점에 압축 해제하여 전체 본문을 반환."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('''
+            SELECT t.id, t.tool_nm, t.tool_params, t.tool_success, t.tool_result, t.result_size, t.reg_dt,
+                   u.user_id, u.user_nm, tk.name as token_name
+            FROM h_mcp_tool_usage t
+            LEFT JOIN h_user u ON t.user_uid = u.uid
+            LEFT JOIN h_access_token tk ON t.token_id = tk.id
+            WHERE t.id = ?
+        ''', (usage_id,)).fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        return None
+    full_result = get_tool_result(usage_id)
+    return {
+        "id": row['id'],
+        "tool_nm": row['tool_nm'],
+        "tool_params": row['tool_params'],
+        "tool_success": row['tool_success'],
+        "tool_result": full_result if full_result is not None else row['tool_result'],
+        "result_size": row['result_size'],
+        "result_truncated": False,
+        "reg_dt": row['reg_dt'],
+        "user_id": row['user_id'] or (f"token:{row['token_name']}" if row['token_name'] else "Unknown"),
+        "user_nm": row['user_nm'] or row['token_name'] or "Unknown"
+    }
+
+
+# [13] log_tool_usage_batch: 여러 건의 사용 이력을 한 번에 기록
+def log_tool_usage_batch(records: list):
+    """
+    MCP Tool 사용 이력 여러 건을 한 트랜잭션(커밋 1회)으로 기록합니다.
+    - records: log_tool_usage 와 같은 키를 갖는 dict 목록 (user_uid, token_id, tool_nm, tool_params, success, result)
+    """
+    if not records:
+        return
+    conn = get_db_connection()
+    reg_dt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        for rec in records:
+            preview, payload, result_size = split_tool_result(rec.get('result', ""))
+            cursor = conn.execute('''
+            INSERT INTO h_mcp_tool_usage (user_uid, token_id, tool_nm, tool_params, tool_success, tool_result, result_size, reg_dt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (rec.get('user_uid'), rec.get('token_id'), rec.get('tool_nm', ""), rec.get('tool_params', ""),
+                  'SUCCESS' if rec.get('success', True) else 'FAIL', preview, result_size, reg_dt))
+            if payload is not None:
+                save_tool_result(conn, cursor.lastrowid, payload, result_size, text=str(rec['result']))
+        conn.commit()
+    finally:
+        conn.close()
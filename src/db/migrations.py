@@ -0,0 +1,651 @@
+import sys
+import time
+from datetime import datetime
+try:
+    from .connection import get_db_connection
+except ImportError:
+    from connection import get_db_connection
+
+"""
+    스키마 Migration 엔진 (PRAGMA user_version 기반)
+    - [1] get_schema_version: DB 에 기록된 스키마 버전 조회
+    - [2] get_pending_migrations: 미적용 migration 목록 조회
+    - [3] plan_migrations: 적용 계획(dry-run) 조회 - 실제 변경 없음
+    - [4] apply_migrations: 미적용 migration 을 순서대로 적용
+    - [5] get_migration_history: 적용 이력 조회 (h_schema_migration)
+
+    * migration 종류
+      (1) transactional=True : 하나의 트랜잭션(BEGIN IMMEDIATE)에서 DDL/DML + 버전 기록 -> 실패 시 전체 롤백
+      (2) transactional=False: 대용량 테이블 인덱스 생성(online index build)처럼 오래 걸리는 작업
+          - 문장마다 개별 트랜잭션으로 실행하여 인덱스 하나를 만드는 동안에만 쓰기를 잠그고, 사이사이에 다른 쓰기가 진행되도록 함
+          - 모든 문장은 IF NOT EXISTS 로 멱등해야 함 (중간에 실패/중단되면 다음 실행에서 처음부터 다시 적용)
+    * 새 migration 은 MIGRATIONS 맨 뒤에 다음 번호로 추가 (이미 배포된 migration 은 수정하지 않음)
+"""
+
+
+# v1: baseline - migration 도입 이전 init_db 스키마 (init_manager.create_baseline_schema)
+def _apply_baseline(cursor):
+    try:
+        from .init_manager import create_baseline_schema
+    except ImportError:
+        from init_manager import create_baseline_schema
+    create_baseline_schema(cursor)
+
+
+# v2: 일회성 스크립트(db_telegram_db.py 등)로만 추가되던 컬럼을 기존 DB 에 보강 (인덱스 생성 전에 필요)
+LEGACY_COLUMNS = [
+    ("h_mcp_tool_usage", "token_id", "INTEGER"),
+    ("h_user", "telegram_chat_id", "TEXT"),
+]
+
+# 컬럼이 없을 때만 추가 (SQLite 는 ADD COLUMN IF NOT EXISTS 미지원)
+def _add_column_if_missing(cursor, table: str, column: str, col_type: str):
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+
+def _add_legacy_columns(cursor):
+    for table, column, col_type in LEGACY_COLUMNS:
+        _add_column_if_missing(cursor, table, column, col_type)
+
+
+# v5: 실행 결과 원본 크기 컬럼
+def _add_result_size_column(cursor):
+    _add_column_if_missing(cursor, "h_mcp_tool_usage", "result_size", "INTEGER")
+
+
+# v5: 기존 이력 중 큰 실행 결과를 미리보기 + 압축 본문으로 분리 (id 목록을 먼저 읽고 1건씩 처리하여 메모리 일정)
+def _compact_tool_results(cursor):
+    try:
+        from .tool_result import split_tool_result, save_tool_result, RESULT_INLINE_MAX
+    except ImportError:
+        from tool_result import split_tool_result, save_tool_result, RESULT_INLINE_MAX
+    ids = [row[0] for row in cursor.execute(
+        "SELECT id FROM h_mcp_tool_usage WHERE length(tool_result) > ?", (RESULT_INLINE_MAX,)
+    ).fetchall()]
+    for usage_id in ids:
+        result = cursor.execute("SELECT tool_result FROM h_mcp_tool_usage WHERE id = ?", (usage_id,)).fetchone()[0]
+        preview, payload, size = split_tool_result(result)
+        save_tool_result(cursor, usage_id, payload, size)
+        cursor.execute("UPDATE h_mcp_tool_usage SET tool_result = ?, result_size = ? WHERE id = ?", (preview, size, usage_id))
+
+
+# v9: 예약 메일 선점(claim) 시각 컬럼
+def _add_email_claim_column(cursor):
+    _add_column_if_missing(cursor, "h_email_log", "claim_dt", "TEXT")
+
+
+# v12: 업로드 파일 SHA-256 컬럼
+def _add_file_hash_column(cursor):
+    _add_column_if_missing(cursor, "h_file", "file_hash", "VARCHAR(64)")
+
+
+# v15: 분리 저장된 전체 실행 결과 전문 검색 인덱스 (contentless FTS5 trigram, rowid = usage_id)
+# - 이력 테이블 인덱스(h_mcp_tool_usage_fts)는 미리보기만 보므로, 압축 본문을 풀어 원문으로 색인 (1건씩 처리하여 메모리 일정)
+def _index_tool_results(cursor):
+    try:
+        from .tool_result import RESULT_FTS_TABLE, _decode
+    except ImportError:
+        from tool_result import RESULT_FTS_TABLE, _decode
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {RESULT_FTS_TABLE} USING fts5(
+                tool_result,
+                content='',
+                tokenize='trigram'
+            )
+        ''')
+    except Exception as e:
+        # SQLite 빌드에 FTS5(trigram)가 없는 경우 -> 검색은 LIKE 방식(미리보기)으로 동작
+        print(f"[DB] FTS5 unavailable, skip tool result search index: {e}", file=sys.stderr)
+        return
+    ids = [row[0] for row in cursor.execute("SELECT usage_id FROM h_mcp_tool_result").fetchall()]
+    for usage_id in ids:
+        row = cursor.execute("SELECT payload FROM h_mcp_tool_result WHERE usage_id = ?", (usage_id,)).fetchone()
+        cursor.execute(f"INSERT INTO {RESULT_FTS_TABLE} (rowid, tool_result) VALUES (?, ?)", (usage_id, _decode(row)))
+
+
+
+# v16: 예약 이메일 scheduled_dt 형식 통일 (claim 은 문자열로 비교 -> 'T' 구분자 / 초 생략 형식은 선점되지 않았음)
+def _normalize_email_scheduled_dt(cursor):
+    try:
+        from .email_manager import normalize_scheduled_dt
+    except ImportError:
+        from email_manager import normalize_scheduled_dt
+    rows = cursor.execute(
+        "SELECT id, scheduled_dt FROM h_email_log WHERE scheduled_dt IS NOT NULL AND scheduled_dt <> ''"
+    ).fetchall()
+    for log_id, value in rows:
+        normalized = normalize_scheduled_dt(value)
+        if normalized != value:
+            cursor.execute("UPDATE h_email_log SET scheduled_dt = ? WHERE id = ?", (normalized, log_id))
+
+
+# v17: 내보내기 작업을 실행하는 워커 id 컬럼 (워커가 종료/비정상 종료된 작업만 실패 처리)
+def _add_export_job_owner_column(cursor):
+    _add_column_if_missing(cursor, "h_export_job", "owner", "TEXT")
+
+
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "baseline schema",
+        "transactional": True,
+        "apply": _apply_baseline,
+    },
+    {
+        # 도구 호출마다 실행되는 일일 사용량 체크(사용자/토큰 + 기간)와 이력 목록 정렬용 인덱스
+        "version": 2,
+        "name": "usage performance indexes",
+        "transactional": False,
+        "apply": _add_legacy_columns,
+        "sql": [
+            "CREATE INDEX IF NOT EXISTS idx_mcp_usage_user_dt ON h_mcp_tool_usage (user_uid, reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_mcp_usage_token_dt ON h_mcp_tool_usage (token_id, reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_mcp_usage_reg_dt ON h_mcp_tool_usage (reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_openapi_usage_user_dt ON h_openapi_usage (user_uid, reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_openapi_usage_token_dt ON h_openapi_usage (token_id, reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_login_hist_user ON h_login_hist (user_uid, login_dt)",
+        ],
+    },
+    {
+        # 일별 도구 사용량 집계(rollup) 테이블
+        # - 대시보드 통계가 원본 이력 전체를 GROUP BY 하지 않도록 INSERT 트리거로 누적
+        # - 원본 이력이 보관 정책으로 삭제되어도 집계는 유지됨 (DELETE 트리거 없음)
+        "version": 3,
+        "name": "daily tool usage rollup",
+        "transactional": True,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_mcp_tool_usage_daily (
+                usage_dt TEXT NOT NULL,
+                user_uid INTEGER NOT NULL DEFAULT 0,
+                token_id INTEGER NOT NULL DEFAULT 0,
+                tool_nm TEXT NOT NULL,
+                total_cnt INTEGER NOT NULL DEFAULT 0,
+                success_cnt INTEGER NOT NULL DEFAULT 0,
+                fail_cnt INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (usage_dt, user_uid, token_id, tool_nm)
+            )
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_mcp_tool_usage_daily_ai AFTER INSERT ON h_mcp_tool_usage BEGIN
+                INSERT INTO h_mcp_tool_usage_daily (usage_dt, user_uid, token_id, tool_nm, total_cnt, success_cnt, fail_cnt)
+                VALUES (
+                    date(new.reg_dt), COALESCE(new.user_uid, 0), COALESCE(new.token_id, 0), new.tool_nm, 1,
+                    CASE WHEN UPPER(new.tool_success) IN ('SUCCESS', 'TRUE', '1') THEN 1 ELSE 0 END,
+                    CASE WHEN UPPER(new.tool_success) IN ('SUCCESS', 'TRUE', '1') THEN 0 ELSE 1 END
+                )
+                ON CONFLICT (usage_dt, user_uid, token_id, tool_nm) DO UPDATE SET
+                    total_cnt = total_cnt + 1,
+                    success_cnt = success_cnt + excluded.success_cnt,
+                    fail_cnt = fail_cnt + excluded.fail_cnt;
+            END
+            ''',
+            # 기존 이력 backfill (트리거 생성과 같은 트랜잭션이므로 누락/중복 없음)
+            '''
+            INSERT OR REPLACE INTO h_mcp_tool_usage_daily (usage_dt, user_uid, token_id, tool_nm, total_cnt, success_cnt, fail_cnt)
+            SELECT
+                date(reg_dt), COALESCE(user_uid, 0), COALESCE(token_id, 0), tool_nm, COUNT(*),
+                SUM(CASE WHEN UPPER(tool_success) IN ('SUCCESS', 'TRUE', '1') THEN 1 ELSE 0 END),
+                SUM(CASE WHEN UPPER(tool_success) IN ('SUCCESS', 'TRUE', '1') THEN 0 ELSE 1 END)
+            FROM h_mcp_tool_usage
+            GROUP BY date(reg_dt), COALESCE(user_uid, 0), COALESCE(token_id, 0), tool_nm
+            ''',
+        ],
+    },
+    {
+        # 보관 정책(src/db/retention.py) 지원
+        # - 기간 조건 일괄 삭제용 날짜 인덱스 (h_mcp_tool_usage, h_notification 은 기존 인덱스 사용)
+        # - auto_vacuum=INCREMENTAL 전환은 DB 파일 전체를 다시 쓰는 VACUUM 이 필요하므로 기동 시 migration 에서 하지 않음
+        #   (관리자가 POST /api/admin/db/vacuum 으로 명시 실행 -> retention.enable_incremental_vacuum)
+        "version": 4,
+        "name": "retention date indexes",
+        "transactional": False,
+        "sql": [
+            "CREATE INDEX IF NOT EXISTS idx_openapi_usage_reg_dt ON h_openapi_usage (reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_login_hist_dt ON h_login_hist (login_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_file_log_reg_dt ON h_file_log (reg_dt)",
+            "CREATE INDEX IF NOT EXISTS idx_email_otp_expires ON h_email_otp (expires_at)",
+        ],
+    },
+    {
+        # 큰 도구 실행 결과 분리 저장 (src/db/tool_result.py)
+        # - 이력 테이블에는 미리보기만, 전체 본문은 zlib 압축하여 h_mcp_tool_result 에 저장
+        "version": 5,
+        "name": "compressed tool result storage",
+        "transactional": True,
+        "apply": _add_result_size_column,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_mcp_tool_result (
+                usage_id INTEGER PRIMARY KEY,
+                encoding TEXT NOT NULL DEFAULT 'zlib',
+                orig_size INTEGER NOT NULL,
+                comp_size INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            )
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_mcp_tool_result_ad AFTER DELETE ON h_mcp_tool_usage BEGIN
+                DELETE FROM h_mcp_tool_result WHERE usage_id = old.id;
+            END
+            ''',
+        ],
+        # sql 실행 후 기존 이력 변환
+        "post_apply": _compact_tool_results,
+    },
+    {
+        # 도구 레지스트리 버전 (src/utils/tool_registry_cache.py)
+        # - 커스텀 도구/파라미터, OpenAPI 도구가 바뀔 때마다 트리거로 버전 증가
+        # - 도구 목록을 캐시하는 쪽(SSE/stdio 서버, FastMCP 로더)은 버전만 조회하여 바뀐 경우에만 다시 로드
+        "version": 6,
+        "name": "tool registry version",
+        "transactional": True,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_tool_registry (
+                registry_nm TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                upd_dt TEXT
+            )
+            ''',
+            "INSERT OR IGNORE INTO h_tool_registry (registry_nm, version, upd_dt) VALUES ('custom_tool', 1, datetime('now', 'localtime'))",
+            "INSERT OR IGNORE INTO h_tool_registry (registry_nm, version, upd_dt) VALUES ('openapi', 1, datetime('now', 'localtime'))",
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_custom_tool_registry_ai AFTER INSERT ON h_custom_tool BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'custom_tool';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_custom_tool_registry_au AFTER UPDATE ON h_custom_tool BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'custom_tool';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_custom_tool_registry_ad AFTER DELETE ON h_custom_tool BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'custom_tool';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_custom_tool_param_registry_ai AFTER INSERT ON h_custom_tool_param BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'custom_tool';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_custom_tool_param_registry_au AFTER UPDATE ON h_custom_tool_param BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'custom_tool';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_custom_tool_param_registry_ad AFTER DELETE ON h_custom_tool_param BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'custom_tool';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_openapi_registry_ai AFTER INSERT ON h_openapi BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'openapi';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_openapi_registry_au AFTER UPDATE ON h_openapi BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'openapi';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_openapi_registry_ad AFTER DELETE ON h_openapi BEGIN
+                UPDATE h_tool_registry SET version = version + 1, upd_dt = datetime('now', 'localtime') WHERE registry_nm = 'openapi';
+            END
+            ''',
+        ],
+    },
+    {
+        # 일일 사용량 카운터 (src/utils/quota_manager.py 가 메모리 카운터를 주기적으로 반영)
+        # - 대상(user:<uid> / token:<id>)별 1일 1행, 값이 없으면 처음 조회 시 사용 이력 COUNT 로 채움
+        "version": 7,
+        "name": "quota counter",
+        "transactional": True,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_quota_counter (
+                subject_key TEXT NOT NULL,
+                usage_dt TEXT NOT NULL,
+                used INTEGER NOT NULL DEFAULT 0,
+                upd_dt TEXT,
+                PRIMARY KEY (subject_key, usage_dt)
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_quota_counter_usage_dt ON h_quota_counter(usage_dt)",
+        ],
+    },
+    {
+        # 워커(프로세스) 간 공유 상태 (src/utils/shared_state.py 의 SQLite backend)
+        # - h_shared_event: pub/sub 이벤트 (각 워커가 id 순으로 polling, 오래된 이벤트는 주기적으로 삭제)
+        # - h_shared_lease: 이름별 lease (리더 선출), h_shared_kv: 만료 시간이 있는 key-value
+        "version": 8,
+        "name": "shared state",
+        "transactional": True,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_shared_event (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                payload TEXT,
+                origin TEXT,
+                reg_ts REAL NOT NULL
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_shared_event_reg_ts ON h_shared_event(reg_ts)",
+            '''
+            CREATE TABLE IF NOT EXISTS h_shared_lease (
+                lease_nm TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_ts REAL NOT NULL,
+                upd_dt TEXT
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS h_shared_kv (
+                kv_key TEXT PRIMARY KEY,
+                kv_value TEXT,
+                expires_ts REAL
+            )
+            ''',
+        ],
+    },
+    {
+        # 스케줄러 리더 선출 + 예약 메일 중복 발송 방지 (src/scheduler.py)
+        # - h_scheduler_job: APScheduler 작업 저장소 (리더 워커만 실행, 재시작해도 작업 유지)
+        # - h_email_log.claim_dt: PENDING -> SENDING 으로 선점한 시각 (발송 중 종료된 워커의 선점 해제용)
+        "version": 9,
+        "name": "scheduler job store",
+        "transactional": True,
+        "apply": _add_email_claim_column,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_scheduler_job (
+                id TEXT PRIMARY KEY,
+                next_run_time REAL,
+                job_state BLOB NOT NULL
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_scheduler_job_next_run ON h_scheduler_job(next_run_time)",
+        ],
+    },
+    {
+        # 예약 메일 dispatcher (src/utils/email_dispatcher.py)
+        # - 발송 대기 예약 메일 로드 / 발송 시각이 된 메일 선점 / 오래된 선점 해제가 상태 + 예약 시각 인덱스 사용
+        "version": 10,
+        "name": "email schedule index",
+        "transactional": False,
+        "sql": [
+            "CREATE INDEX IF NOT EXISTS idx_email_log_status_scheduled ON h_email_log (status, scheduled_dt)",
+        ],
+    },
+    {
+        # 사용자별 읽지 않은 알림 개수 카운터 (src/db/notification.py get_unread_count)
+        # - 알림 생성/읽음/삭제(소프트 삭제, 보관 정책 삭제)마다 트리거로 증감 -> COUNT(*) 대신 PK 조회
+        # - 읽지 않음 = is_read = 'N' AND delete_at IS NULL (기존 COUNT 조건과 동일)
+        "version": 11,
+        "name": "notification unread counter",
+        "transactional": True,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_notification_unread (
+                user_uid INTEGER PRIMARY KEY,
+                unread_cnt INTEGER NOT NULL DEFAULT 0,
+                upd_dt TEXT
+            )
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_notification_unread_ai AFTER INSERT ON h_notification
+            WHEN new.is_read = 'N' AND new.delete_at IS NULL BEGIN
+                INSERT INTO h_notification_unread (user_uid, unread_cnt, upd_dt)
+                VALUES (new.receive_user_uid, 1, datetime('now', 'localtime'))
+                ON CONFLICT (user_uid) DO UPDATE SET unread_cnt = unread_cnt + 1, upd_dt = excluded.upd_dt;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_notification_unread_au AFTER UPDATE OF is_read, delete_at ON h_notification
+            WHEN (old.is_read = 'N' AND old.delete_at IS NULL) <> (new.is_read = 'N' AND new.delete_at IS NULL) BEGIN
+                INSERT INTO h_notification_unread (user_uid, unread_cnt, upd_dt)
+                VALUES (new.receive_user_uid, CASE WHEN new.is_read = 'N' AND new.delete_at IS NULL THEN 1 ELSE 0 END,
+                        datetime('now', 'localtime'))
+                ON CONFLICT (user_uid) DO UPDATE SET
+                    unread_cnt = MAX(unread_cnt + CASE WHEN new.is_read = 'N' AND new.delete_at IS NULL THEN 1 ELSE -1 END, 0),
+                    upd_dt = excluded.upd_dt;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_notification_unread_ad AFTER DELETE ON h_notification
+            WHEN old.is_read = 'N' AND old.delete_at IS NULL BEGIN
+                UPDATE h_notification_unread SET unread_cnt = MAX(unread_cnt - 1, 0), upd_dt = datetime('now', 'localtime')
+                WHERE user_uid = old.receive_user_uid;
+            END
+            ''',
+            # 기존 알림 backfill (트리거 생성과 같은 트랜잭션이므로 누락/중복 없음)
+            '''
+            INSERT OR REPLACE INTO h_notification_unread (user_uid, unread_cnt, upd_dt)
+            SELECT receive_user_uid, COUNT(*), datetime('now', 'localtime')
+            FROM h_notification
+            WHERE is_read = 'N' AND delete_at IS NULL
+            GROUP BY receive_user_uid
+            ''',
+        ],
+    },
+    {
+        # 업로드 중 계산한 파일 SHA-256 (src/routers/files.py), 기존 파일은 NULL
+        "version": 12,
+        "name": "file content hash",
+        "transactional": True,
+        "apply": _add_file_hash_column,
+    },
+    {
+        # 내용 주소(SHA-256) 기반 파일 저장소 (storage_tp = 'CAS')
+        # - 같은 내용의 업로드는 blob 1개를 공유, ref_cnt 는 h_file 트리거로 유지 (삭제되지 않은 h_file 행 수)
+        # - ref_cnt = 0 인 blob 은 GC(file_manager.collect_unreferenced_blobs)가 유예 시간 후 삭제
+        "version": 13,
+        "name": "content addressed file blobs",
+        "transactional": True,
+        "sql": [
+            '''
+            CREATE TABLE IF NOT EXISTS h_file_blob (
+                file_hash VARCHAR(64) PRIMARY KEY,
+                blob_path VARCHAR(2000) NOT NULL,
+                file_size BIGINT NOT NULL,
+                ref_cnt INTEGER NOT NULL DEFAULT 0,
+                reg_dt TEXT,
+                upd_dt TEXT
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_file_blob_unref ON h_file_blob (upd_dt) WHERE ref_cnt = 0",
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_file_blob_ai AFTER INSERT ON h_file
+            WHEN new.storage_tp = 'CAS' AND new.delete_at = 'N' BEGIN
+                INSERT INTO h_file_blob (file_hash, blob_path, file_size, ref_cnt, reg_dt, upd_dt)
+                VALUES (new.file_hash, new.file_path, new.file_size, 1, datetime('now', 'localtime'), datetime('now', 'localtime'))
+                ON CONFLICT (file_hash) DO UPDATE SET ref_cnt = ref_cnt + 1, upd_dt = excluded.upd_dt;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_file_blob_au AFTER UPDATE OF delete_at ON h_file
+            WHEN new.storage_tp = 'CAS' AND (old.delete_at = 'N') <> (new.delete_at = 'N') BEGIN
+                INSERT INTO h_file_blob (file_hash, blob_path, file_size, ref_cnt, reg_dt, upd_dt)
+                VALUES (new.file_hash, new.file_path, new.file_size, CASE WHEN new.delete_at = 'N' THEN 1 ELSE 0 END,
+                        datetime('now', 'localtime'), datetime('now', 'localtime'))
+                ON CONFLICT (file_hash) DO UPDATE SET
+                    ref_cnt = MAX(ref_cnt + CASE WHEN new.delete_at = 'N' THEN 1 ELSE -1 END, 0),
+                    upd_dt = excluded.upd_dt;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_file_blob_ad AFTER DELETE ON h_file
+            WHEN old.storage_tp = 'CAS' AND old.delete_at = 'N' BEGIN
+                UPDATE h_file_blob SET ref_cnt = MAX(ref_cnt - 1, 0), upd_dt = datetime('now', 'localtime')
+                WHERE file_hash = old.file_hash;
+            END
+            ''',
+        ],
+    },
+    {
+        # 내보내기 파일 구분 (관리자 전용 사용 이력 -> 파일 목록/일반 다운로드에서 제외, /api/export/jobs/{job_id}/download 로만 제공)
+        "version": 14,
+        "name": "export file storage type",
+        "transactional": True,
+        "sql": [
+            "UPDATE h_file SET storage_tp = 'EXPORT' WHERE batch_id LIKE 'export:%' AND storage_tp = 'LOCAL'",
+        ],
+    },
+    {
+        # 분리 저장된(미리보기 이후 포함) 전체 실행 결과 전문 검색 (src/db/tool_result.py, mcp_tool_usage._build_usage_query)
+        "version": 15,
+        "name": "tool result full text index",
+        "transactional": True,
+        "apply": _index_tool_results,
+    },
+    {
+        "version": 16,
+        "name": "normalize email scheduled_dt",
+        "transactional": True,
+        "apply": _normalize_email_scheduled_dt,
+    },
+    {
+        # 내보내기 작업 워커 id (src/utils/export_jobs.py) - 리더가 살아 있지 않은 워커의 미완료 작업만 실패 처리
+        "version": 17,
+        "name": "export job owner",
+        "transactional": True,
+        "apply": _add_export_job_owner_column,
+        "sql": [
+            "CREATE INDEX IF NOT EXISTS idx_export_job_status ON h_export_job (status, owner)",
+        ],
+    },
+]
+
+LATEST_VERSION = MIGRATIONS[-1]["version"]
+
+
+# 적용 이력 테이블 (버전 자체는 user_version 으로 관리하고, 이 테이블은 운영 확인용)
+def _ensure_history_table(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS h_schema_migration (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_dt TEXT NOT NULL,
+        duration_ms INTEGER
+    )
+    ''')
+
+
+# [1] get_schema_version: DB 에 기록된 스키마 버전 조회
+def get_schema_version(conn) -> int:
+    """DB 에 기록된 스키마 버전(PRAGMA user_version)을 조회합니다."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# [2] get_pending_migrations: 미적용 migration 목록 조회
+def get_pending_migrations(conn, target: int = None) -> list:
+    current = get_schema_version(conn)
+    target = LATEST_VERSION if target is None else target
+    return [m for m in MIGRATIONS if current < m["version"] <= target]
+
+
+# [3] plan_migrations: 적용 계획(dry-run) 조회
+def plan_migrations(target: int = None) -> dict:
+    """실제로 적용하지 않고, 현재 버전과 적용될 migration/SQL 목록을 반환합니다."""
+    conn = get_db_connection()
+    try:
+        current = get_schema_version(conn)
+        pending = get_pending_migrations(conn, target)
+    finally:
+        conn.close()
+
+    return {
+        "current_version": current,
+        "latest_version": LATEST_VERSION,
+        "pending": [
+            {
+                "version": m["version"],
+                "name": m["name"],
+                "transactional": m["transactional"],
+                "sql": ([f"-- {m['apply'].__name__}()"] if "apply" in m else [])
+                       + [" ".join(sql.split()) for sql in m.get("sql", [])]
+                       + ([f"-- {m['post_apply'].__name__}()"] if "post_apply" in m else []),
+            }
+            for m in pending
+        ],
+    }
+
+
+# 버전 기록 (user_version + 이력)
+def _stamp(cursor, migration: dict, duration_ms: int):
+    cursor.execute(f"PRAGMA user_version = {int(migration['version'])}")
+    cursor.execute(
+        "INSERT OR REPLACE INTO h_schema_migration (version, name, applied_dt, duration_ms) VALUES (?, ?, ?, ?)",
+        (migration["version"], migration["name"], datetime.now().strftime("%Y-%m-%d %H:%M:%S"), duration_ms)
+    )
+
+
+def _run_statements(cursor, migration: dict):
+    if "apply" in migration:
+        migration["apply"](cursor)
+    for sql in migration.get("sql", []):
+        cursor.execute(sql)
+    if "post_apply" in migration:
+        migration["post_apply"](cursor)
+
+
+# 단일 migration 적용 (다른 프로세스가 먼저 적용한 경우 False)
+def _apply_one(conn, migration: dict) -> bool:
+    started = time.perf_counter()
+    cursor = conn.cursor()
+
+    if not migration["transactional"]:
+        # online index build: 문장마다 autocommit (개별 트랜잭션), 모든 문장은 멱등
+        _run_statements(cursor, migration)
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # 쓰기 잠금을 잡은 뒤 버전 재확인 (SSE 서버와 stdio 서버가 동시에 기동하는 경우)
+        if get_schema_version(conn) >= migration["version"]:
+            cursor.execute("ROLLBACK")
+            return False
+        if migration["transactional"]:
+            _run_statements(cursor, migration)
+        _stamp(cursor, migration, int((time.perf_counter() - started) * 1000))
+        cursor.execute("COMMIT")
+        return True
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+# [4] apply_migrations: 미적용 migration 을 순서대로 적용
+def apply_migrations(target: int = None) -> list:
+    """
+    미적용 migration 을 버전 순서대로 적용하고, 적용한 migration 목록을 반환합니다.
+    - 실패 시 해당 migration 은 롤백(transactional)되고 예외를 그대로 올림 (이전 버전까지는 적용된 상태 유지)
+    """
+    conn = get_db_connection()
+    # 트랜잭션을 직접 제어하기 위해 autocommit 모드로 사용
+    conn.isolation_level = None
+    applied = []
+    try:
+        _ensure_history_table(conn)
+        for migration in get_pending_migrations(conn, target):
+            print(f"[DB] Applying migration v{migration['version']}: {migration['name']}", file=sys.stderr)
+            if _apply_one(conn, migration):
+                applied.append(migration)
+    finally:
+        conn.close()
+    return applied
+
+
+# [5] get_migration_history: 적용 이력 조회
+def get_migration_history() -> list:
+    conn = get_db_connection()
+    try:
+        _ensure_history_table(conn)
+        rows = conn.execute("SELECT * FROM h_schema_migration ORDER BY version").fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
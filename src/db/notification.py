@@ -1,3 +1,6 @@
+import os
+import threading
+import time
 from datetime import datetime
 try:
     from .connection import get_db_connection
@@ -13,8 +16,35 @@ except ImportError:
     - [5] mark_all_notifications_as_read: 모든 알림 읽음 처리
     - [6] delete_notification: 알림 삭제 (소프트 삭제)
     - [7] get_unread_count: 읽지 않은 알림 개수 조회
+    - [8] get_notification_recipients: 토픽 알림 수신 대상 조회 (전체 또는 역할별 활성 사용자)
+    - [9] create_notifications_bulk: 같은 알림을 여러 사용자에게 일괄 생성 (INSERT 1회)
+    - [10] clear_unread_cache: 읽지 않은 개수 메모리 캐시 초기화 (DB 복원 등)
+    - [11] get_last_notification_id: 마지막 알림 id (SSE replay 기록 시작 기준)
+    - [12] get_notifications_since: 특정 id 이후 사용자 알림 조회 (SSE 재연결 replay)
+
+    * 읽지 않은 개수는 h_notification_unread 카운터(트리거로 증감, migration v11)를 PK 로 조회하고,
+      프로세스 메모리에도 캐시 (이 프로세스의 생성/읽음/삭제는 바로 반영, 다른 프로세스 변경은 NOTIFY_UNREAD_CACHE_TTL_SEC 이내 반영)
 """
 
+NOTIFY_UNREAD_CACHE_TTL_SEC = float(os.getenv("NOTIFY_UNREAD_CACHE_TTL_SEC", "5"))
+
+# user_uid -> (읽지 않은 개수, 조회 시각)
+_unread_cache = {}
+_unread_lock = threading.Lock()
+
+
+def _load_unread_count(conn, user_uid: int) -> int:
+    row = conn.execute("SELECT unread_cnt FROM h_notification_unread WHERE user_uid = ?", (user_uid,)).fetchone()
+    count = row[0] if row else 0
+    with _unread_lock:
+        _unread_cache[user_uid] = (count, time.monotonic())
+    return count
+
+
+def _notification_owner(conn, notify_id: int):
+    row = conn.execute("SELECT receive_user_uid FROM h_notification WHERE id = ?", (notify_id,)).fetchone()
+    return row[0] if row else None
+
 # [1] create_notification: 알림 생성
 def create_notification(receive_user_uid: int, title: str, message: str, send_user_uid: int = None):
     """새로운 알림을 생성합니다."""
@@ -30,6 +60,7 @@ def create_notification(receive_user_uid: int, title: str, message: str, send_us
     
     notify_id = cursor.lastrowid
     conn.commit()
+    _load_unread_count(conn, receive_user_uid)
     conn.close()
     return notify_id
 
@@ -97,7 +128,7 @@ def get_user_notifications(user_uid: int, page: int = 1, size: int = 20):
 
 # [4] mark_notification_as_read: 알림 읽음 처리
 def mark_notification_as_read(notify_id: int):
-    """알림을 읽음 처리합니다."""
+    """알림을 읽음 처리합니다. -> 수신자의 읽지 않은 개수 (알림이 없으면 None)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -109,7 +140,10 @@ def mark_notification_as_read(notify_id: int):
     ''', (timestamp, notify_id))
     
     conn.commit()
+    owner = _notification_owner(conn, notify_id)
+    count = _load_unread_count(conn, owner) if owner is not None else None
     conn.close()
+    return count
 
 # [5] mark_all_notifications_as_read: 모든 알림 읽음 처리
 def mark_all_notifications_as_read(user_uid: int):
@@ -125,11 +159,12 @@ def mark_all_notifications_as_read(user_uid: int):
     ''', (timestamp, user_uid))
     
     conn.commit()
+    _load_unread_count(conn, user_uid)
     conn.close()
 
 # [6] delete_notification: 알림 삭제 (소프트 삭제)
 def delete_notification(notify_id: int):
-    """알림을 소프트 삭제합니다."""
+    """알림을 소프트 삭제합니다. -> 수신자의 읽지 않은 개수 (알림이 없으면 None)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -141,19 +176,99 @@ def delete_notification(notify_id: int):
     ''', (timestamp, notify_id))
     
     conn.commit()
+    owner = _notification_owner(conn, notify_id)
+    count = _load_unread_count(conn, owner) if owner is not None else None
     conn.close()
+    return count
 
 # [7] get_unread_count: 읽지 않은 알림 개수 조회
 def get_unread_count(user_uid: int):
-    """읽지 않은 알림 개수를 조회합니다."""
+    """읽지 않은 알림 개수를 조회합니다. (메모리 캐시 -> h_notification_unread 카운터)"""
+    with _unread_lock:
+        cached = _unread_cache.get(user_uid)
+    if cached and time.monotonic() - cached[1] < NOTIFY_UNREAD_CACHE_TTL_SEC:
+        return cached[0]
+
+    conn = get_db_connection()
+    try:
+        return _load_unread_count(conn, user_uid)
+    finally:
+        conn.close()
+
+# [8] get_notification_recipients: 토픽 알림 수신 대상 조회
+def get_notification_recipients(role: str = None):
+    """삭제/비활성화되지 않은 사용자 uid 목록 (role 지정 시 해당 역할만)"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT COUNT(*) FROM h_notification
-        WHERE receive_user_uid = ? AND is_read = 'N' AND delete_at IS NULL
-    ''', (user_uid,))
-    
-    count = cursor.fetchone()[0]
+
+    query = "SELECT uid FROM h_user WHERE is_delete = 'N' AND is_enable = 'Y'"
+    params = ()
+    if role:
+        query += " AND role = ?"
+        params = (role,)
+    cursor.execute(query + " ORDER BY uid", params)
+
+    uids = [row[0] for row in cursor.fetchall()]
     conn.close()
-    return count
+    return uids
+
+# [9] create_notifications_bulk: 같은 알림을 여러 사용자에게 일괄 생성
+def create_notifications_bulk(receive_user_uids: list, title: str, message: str, send_user_uid: int = None):
+    """같은 알림을 여러 사용자에게 한 트랜잭션으로 생성합니다. -> {receive_user_uid: notify_id}"""
+    if not receive_user_uids:
+        return {}
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        # 쓰기 잠금을 먼저 잡아 이번 INSERT 로 생긴 id 만 다시 조회
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM h_notification")
+        last_id = cursor.fetchone()[0]
+        cursor.executemany('''
+            INSERT INTO h_notification (receive_user_uid, title, message, send_user_uid, reg_dt)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(uid, title, message, send_user_uid, timestamp) for uid in receive_user_uids])
+        cursor.execute("SELECT id, receive_user_uid FROM h_notification WHERE id > ? ORDER BY id", (last_id,))
+        ids = {row[1]: row[0] for row in cursor.fetchall()}
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    # 수신자가 많을 수 있으므로 다시 조회하지 않고 캐시만 비움 (다음 조회 시 카운터 PK 조회)
+    with _unread_lock:
+        for uid in receive_user_uids:
+            _unread_cache.pop(uid, None)
+    return ids
+
+# [10] clear_unread_cache: 읽지 않은 개수 메모리 캐시 초기화
+def clear_unread_cache():
+    with _unread_lock:
+        _unread_cache.clear()
+
+# [11] get_last_notification_id: 마지막 알림 id
+def get_last_notification_id() -> int:
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM h_notification").fetchone()[0]
+    finally:
+        conn.close()
+
+# [12] get_notifications_since: 특정 id 이후 사용자 알림 조회 (SSE 재연결 replay)
+def get_notifications_since(user_uid: int, last_id: int, limit: int = 100):
+    """last_id 이후 생성된 사용자 알림 (id 순, 삭제 제외) -> idx_notify_receive_user(receive_user_uid, rowid) 범위 조회"""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute('''
+            SELECT id, title, message, reg_dt, send_user_uid
+            FROM h_notification
+            WHERE receive_user_uid = ? AND id > ? AND delete_at IS NULL
+            ORDER BY id
+            LIMIT ?
+        ''', (user_uid, last_id, limit)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
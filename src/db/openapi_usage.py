@@ -16,6 +16,9 @@ except ImportError:
     - [6] get_openapi_hourly_daily_stats: 시간대별/요일별 사용 통계 (Heatmap)
     - [7] get_openapi_user_tool_detail: 특정 유저의 전체 기간 도구별 사용량 (Top 5)
     - [8] get_all_openapi_usage_logs: MCP Tool 사용 이력을 조회 (Excel 전용)
+    - [9] iter_openapi_usage_logs: OpenAPI 사용 이력을 chunk 단위로 순회 (스트리밍 내보내기용)
+    - [10] count_openapi_usage_logs: OpenAPI 전체 사용 이력 건수 조회 (내보내기 진행률용)
+    - [11] log_openapi_usage_batch: 여러 건의 사용 이력을 한 트랜잭션으로 저장 (배치 실행용)
 """
 
 # [1] log_openapi_usage: 사용 이력 저장
@@ -119,8 +122,9 @@ def get_user_openapi_daily_usage(user_uid: int = None, token_id: int = None):
     conn = get_db_connection()
     today = datetime.now().strftime("%Y-%m-%d")
     try:
-        sql = "SELECT COUNT(*) FROM h_openapi_usage WHERE substr(reg_dt, 1, 10) = ?"
-        params = [today]
+        # reg_dt 범위 조건 -> (token_id|user_uid, reg_dt) 인덱스 사용 (substr 비교는 전체 스캔)
+        sql = "SELECT COUNT(*) FROM h_openapi_usage WHERE reg_dt BETWEEN ? AND ?"
+        params = [f"{today} 00:00:00", f"{today} 23:59:59"]
         
         if token_id:
             sql += " AND token_id = ?"
@@ -143,9 +147,9 @@ def get_user_openapi_tool_usage(user_uid: int = None, token_id: int = None):
         sql = '''
             SELECT tool_id, COUNT(*) as cnt 
             FROM h_openapi_usage 
-            WHERE substr(reg_dt, 1, 10) = ?
+            WHERE reg_dt BETWEEN ? AND ?
         '''
-        params = [today]
+        params = [f"{today} 00:00:00", f"{today} 23:59:59"]
         
         if token_id:
             sql += " AND token_id = ?"
@@ -205,7 +209,12 @@ def get_openapi_user_tool_detail(label: str):
 # [8] get_all_openapi_usage_logs: OpenAPI 전체 사용 이력 조회 (내보내기용)
 def get_all_openapi_usage_logs():
     """OpenAPI 전체 사용 이력을 조회 (내보내기용)."""
-    conn = get_db_connection()
+    return list(iter_openapi_usage_logs())
+
+# [9] iter_openapi_usage_logs: OpenAPI 전체 사용 이력을 chunk 단위로 순회 (스트리밍 내보내기용)
+def iter_openapi_usage_logs(chunk_size: int = 1000):
+    """OpenAPI 사용 이력을 커서에서 chunk_size 만큼씩 읽어 한 건씩 반환하는 generator."""
+    conn = get_db_connection(check_same_thread=False)
     try:
         sql = '''
             SELECT
@@ -218,7 +227,40 @@ def get_all_openapi_usage_logs():
             LEFT JOIN h_access_token t ON log.token_id = t.id
             ORDER BY log.id DESC
         '''
-        rows = conn.execute(sql).fetchall()
-        return [dict(row) for row in rows]
+        cursor = conn.execute(sql)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(row)
+    finally:
+        conn.close()
+
+# [10] count_openapi_usage_logs: OpenAPI 전체 사용 이력 건수 조회 (내보내기 진행률용)
+def count_openapi_usage_logs():
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM h_openapi_usage").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# [11] log_openapi_usage_batch: 여러 건의 사용 이력을 한 번에 저장
+def log_openapi_usage_batch(items: list):
+    """log_openapi_usage 와 같은 형태의 dict 목록을 커밋 1회로 저장합니다."""
+    if not items:
+        return
+    conn = get_db_connection()
+    try:
+        conn.executemany('''
+            INSERT INTO h_openapi_usage (
+                user_uid, token_id, tool_id, method, url, status_code, success, error_msg, ip_addr
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            data.get('user_uid'), data.get('token_id'), data.get('tool_id'), data.get('method'),
+            data.get('url'), data.get('status_code'), data.get('success'), data.get('error_msg'), data.get('ip_addr')
+        ) for data in items])
+        conn.commit()
     finally:
         conn.close()
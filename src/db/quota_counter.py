@@ -0,0 +1,109 @@
+from datetime import datetime
+try:
+    from .connection import get_db_connection
+except ImportError:
+    from connection import get_db_connection
+
+"""
+    h_quota_counter 테이블 관련 (일일 사용량 카운터)
+    - [1] get_quota_counter: 대상의 특정 일자 사용량 조회 (카운터가 없으면 사용 이력 COUNT 로 생성)
+    - [2] add_quota_usage: 여러 대상의 사용량 증가분을 한 트랜잭션으로 반영 -> 반영 후 값 반환
+    - [3] reserve_quota: 제한 확인 + 사용량 확보를 쓰기 잠금 안에서 한 번에 (여러 프로세스 간에도 원자적)
+
+    * subject_key: 'user:<uid>' 또는 'token:<token_id>' (get_user_daily_usage 와 같은 기준: 사용자 우선)
+    * 증가분(+N)으로 반영하므로 여러 프로세스(SSE 서버, stdio 서버)가 같은 카운터를 함께 갱신해도 값이 합산됨
+"""
+
+_SUBJECT_COLUMNS = {"user": "user_uid", "token": "token_id"}
+
+
+def _count_usage_logs(conn, subject_key: str, usage_dt: str) -> int:
+    kind, _, value = subject_key.partition(":")
+    column = _SUBJECT_COLUMNS.get(kind)
+    if not column:
+        return 0
+    return conn.execute(
+        f"SELECT COUNT(*) FROM h_mcp_tool_usage WHERE {column} = ? AND reg_dt BETWEEN ? AND ?",
+        (int(value), f"{usage_dt} 00:00:00", f"{usage_dt} 23:59:59")
+    ).fetchone()[0]
+
+
+# [1] get_quota_counter: 대상의 특정 일자 사용량 조회
+def get_quota_counter(subject_key: str, usage_dt: str) -> int:
+    """카운터 값을 반환합니다. (처음 조회하는 대상/일자는 기존 사용 이력 건수로 카운터 생성)"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT used FROM h_quota_counter WHERE subject_key = ? AND usage_dt = ?", (subject_key, usage_dt)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        conn.execute(
+            "INSERT OR IGNORE INTO h_quota_counter (subject_key, usage_dt, used, upd_dt) VALUES (?, ?, ?, ?)",
+            (subject_key, usage_dt, _count_usage_logs(conn, subject_key, usage_dt),
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        )
+        conn.commit()
+        # 다른 프로세스가 먼저 생성했을 수 있으므로 다시 조회
+        return conn.execute(
+            "SELECT used FROM h_quota_counter WHERE subject_key = ? AND usage_dt = ?", (subject_key, usage_dt)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+# [2] add_quota_usage: 사용량 증가분 반영
+def add_quota_usage(deltas: dict) -> dict:
+    """
+    {(subject_key, usage_dt): 증가분} 을 반영하고 {(subject_key, usage_dt): 반영 후 값} 을 반환합니다.
+    - 다른 프로세스가 반영한 증가분도 포함된 값이 반환됨
+    """
+    if not deltas:
+        return {}
+    conn = get_db_connection()
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        conn.executemany('''
+            INSERT INTO h_quota_counter (subject_key, usage_dt, used, upd_dt) VALUES (?, ?, ?, ?)
+            ON CONFLICT(subject_key, usage_dt) DO UPDATE SET used = used + excluded.used, upd_dt = excluded.upd_dt
+        ''', [(key, day, delta, now) for (key, day), delta in deltas.items()])
+        totals = {}
+        for key, day in deltas:
+            totals[(key, day)] = conn.execute(
+                "SELECT used FROM h_quota_counter WHERE subject_key = ? AND usage_dt = ?", (key, day)
+            ).fetchone()[0]
+        conn.commit()
+        return totals
+    finally:
+        conn.close()
+
+
+# [3] reserve_quota: 제한 확인 + 사용량 확보 (프로세스 간 원자적)
+def reserve_quota(subject_key: str, usage_dt: str, count: int, limit: int,
+                  partial: bool = False, carry: int = 0) -> tuple:
+    """
+    BEGIN IMMEDIATE 로 쓰기 잠금을 잡은 상태에서 남은 양을 확인하고 확보한 건수만큼 카운터를 올립니다.
+    - carry: 호출한 프로세스가 아직 반영하지 않은 증가분 (함께 반영)
+    - 반환: (확보 직전 사용량, 확보한 건수)
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT used FROM h_quota_counter WHERE subject_key = ? AND usage_dt = ?", (subject_key, usage_dt)
+        ).fetchone()
+        used = (row[0] if row else 0) + carry
+        remaining = max(limit - used, 0)
+        granted = min(count, remaining) if partial else (count if count <= remaining else 0)
+        conn.execute('''
+            INSERT INTO h_quota_counter (subject_key, usage_dt, used, upd_dt) VALUES (?, ?, ?, ?)
+            ON CONFLICT(subject_key, usage_dt) DO UPDATE SET used = used + excluded.used, upd_dt = excluded.upd_dt
+        ''', (subject_key, usage_dt, carry + granted, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+        return used, granted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
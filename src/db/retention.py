@@ -0,0 +1,296 @@
+import os
+import json
+import gzip
+import sqlite3
+import time
+from datetime import datetime, timedelta
+try:
+    from .connection import get_db_connection, PROJECT_ROOT
+    from .system_config import get_config_value
+    from .tool_result import load_tool_results, unindex_tool_results
+except ImportError:
+    from connection import get_db_connection, PROJECT_ROOT
+    from system_config import get_config_value
+    from tool_result import load_tool_results, unindex_tool_results
+
+"""
+    이력/로그 테이블 보관 정책 (Retention)
+    - [1] get_retention_policies: 테이블별 보관 정책 조회 (기본값 + h_system_config 'retention_policy')
+    - [2] get_retention_report: 정책 적용 시 삭제될 건수/회수 용량 리포트 (dry-run, DB 변경 없음)
+    - [3] run_retention: 정책 적용 (보관 기간이 지난 행 아카이브 -> 소량 배치 삭제 -> incremental_vacuum)
+    - [4] enable_incremental_vacuum: auto_vacuum=INCREMENTAL 전환 (VACUUM, 관리자가 명시 실행)
+
+    * 삭제는 opt-in: 관리자가 'retention_policy' 에 enabled 를 저장하기 전에는 어떤 테이블도 삭제하지 않음 (업그레이드 시 데이터 보존)
+    * 'retention_policy' 설정 예시 (테이블별 값은 기본값을 덮어씀)
+      {
+        "enabled": true,
+        "batch_size": 500,
+        "vacuum_pages": 0,
+        "tables": {
+          "h_mcp_tool_usage": {"days": 30, "archive": "ndjson"},
+          "h_login_hist": {"enabled": false}
+        }
+      }
+      - enabled: 전체 테이블 기본값 (없으면 false), 테이블별 enabled 가 있으면 그 값 사용
+      - days: 보관 기간(일), 0 이하이면 삭제하지 않음
+      - archive: 'ndjson' (월별 gzip NDJSON) | 'sqlite' (월별 SQLite 파일) | null (아카이브 없이 삭제)
+      - vacuum_pages: 실행 후 반환할 빈 페이지 수 (0 이면 전체)
+    * incremental_vacuum 은 auto_vacuum=INCREMENTAL 인 DB 에서만 빈 페이지를 반환 (전환 전에는 삭제해도 파일 크기 유지)
+      -> 전환은 DB 파일 전체를 다시 쓰므로 서버 기동/migration 이 아니라 [4] 로 사용량이 적을 때 한 번 실행
+    * 일별 도구 사용량 집계(h_mcp_tool_usage_daily)는 원본이 삭제되어도 유지되므로 대시보드 통계는 그대로 남음
+"""
+
+ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", os.path.join(PROJECT_ROOT, "archives"))
+
+DEFAULT_BATCH_SIZE = 500
+
+# 테이블별 기본 정책 (date_col: 보관 기간 비교 컬럼)
+DEFAULT_POLICIES = {
+    "h_mcp_tool_usage": {"date_col": "reg_dt", "days": 90, "archive": "ndjson"},
+    "h_openapi_usage": {"date_col": "reg_dt", "days": 90, "archive": "ndjson"},
+    "h_login_hist": {"date_col": "login_dt", "days": 180, "archive": "ndjson"},
+    "h_file_log": {"date_col": "reg_dt", "days": 180, "archive": "ndjson"},
+    "h_notification": {"date_col": "reg_dt", "days": 90, "archive": None},
+    "h_email_otp": {"date_col": "expires_at", "days": 1, "archive": None},
+    "h_quota_counter": {"date_col": "usage_dt", "days": 30, "archive": None},
+}
+
+
+# [1] get_retention_policies: 테이블별 보관 정책 조회
+def get_retention_policies() -> dict:
+    """기본 정책에 'retention_policy' 설정을 덮어쓴 정책을 반환합니다. (정의된 테이블만 허용, 설정 전에는 모두 비활성)"""
+    config = get_config_value("retention_policy") or {}
+    overrides = config.get("tables") or {}
+
+    tables = {}
+    for table, default in DEFAULT_POLICIES.items():
+        policy = {**default, "enabled": bool(config.get("enabled", False))}
+        for key in ("days", "archive", "enabled"):
+            if key in (overrides.get(table) or {}):
+                policy[key] = overrides[table][key]
+        if policy["archive"] not in (None, "ndjson", "sqlite"):
+            policy["archive"] = "ndjson"
+        tables[table] = policy
+
+    return {
+        "batch_size": max(1, int(config.get("batch_size") or DEFAULT_BATCH_SIZE)),
+        "vacuum_pages": max(0, int(config.get("vacuum_pages") or 0)),
+        "tables": tables,
+    }
+
+
+def _is_active(policy: dict) -> bool:
+    return bool(policy["enabled"]) and int(policy["days"] or 0) > 0
+
+
+def _cutoff(days: int) -> str:
+    return (datetime.now() - timedelta(days=int(days))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _columns(conn, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _page_stats(conn) -> dict:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    return {
+        "db_bytes": page_size * page_count,
+        "freelist_bytes": page_size * freelist,
+        "auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}.get(auto_vacuum, str(auto_vacuum)),
+    }
+
+
+# [2] get_retention_report: 삭제 대상 건수/회수 용량 리포트 (dry-run)
+def get_retention_report() -> dict:
+    """
+    정책을 적용하면 삭제될 행 수와 회수될 용량(추정)을 반환합니다. DB 는 변경하지 않습니다.
+    - estimated_bytes: 대상 행의 컬럼 데이터 길이 합 (페이지/인덱스 오버헤드 제외한 근사치)
+    """
+    policies = get_retention_policies()
+    conn = get_db_connection()
+    try:
+        tables = []
+        for table, policy in policies["tables"].items():
+            item = {"table": table, **policy, "cutoff": None, "rows": 0, "estimated_bytes": 0}
+            if _is_active(policy):
+                item["cutoff"] = _cutoff(policy["days"])
+                size_sql = " + ".join(f"COALESCE(length({col}), 0)" for col in _columns(conn, table))
+                row = conn.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM({size_sql}), 0) FROM {table} WHERE {policy['date_col']} < ?",
+                    (item["cutoff"],)
+                ).fetchone()
+                item["rows"], item["estimated_bytes"] = row[0], row[1]
+            tables.append(item)
+
+        return {
+            "dry_run": True,
+            "generated_dt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tables": tables,
+            "total_rows": sum(t["rows"] for t in tables),
+            "estimated_bytes": sum(t["estimated_bytes"] for t in tables),
+            **_page_stats(conn),
+        }
+    finally:
+        conn.close()
+
+
+# 도구 실행 결과는 이력 테이블에 미리보기만 있으므로, 아카이브에는 분리 저장된 전체 결과를 넣음
+# (이력 삭제 시 트리거로 h_mcp_tool_result 도 삭제됨)
+def _expand_tool_results(conn, rows: list):
+    full_results = load_tool_results(conn, [row["id"] for row in rows])
+    for row in rows:
+        if row["id"] in full_results:
+            row["tool_result"] = full_results[row["id"]]
+
+ARCHIVE_EXPANDERS = {
+    "h_mcp_tool_usage": _expand_tool_results,
+}
+
+# 행 삭제 전에 정리할 연관 데이터 (트리거로 정리할 수 없는 것: 압축 결과의 전문 검색 색인)
+DELETE_HOOKS = {
+    "h_mcp_tool_usage": unindex_tool_results,
+}
+
+
+# 월별(YYYY-MM) 아카이브 파일 경로
+def _archive_path(table: str, month: str, archive: str) -> str:
+    directory = os.path.join(ARCHIVE_DIR, table)
+    os.makedirs(directory, exist_ok=True)
+    ext = "ndjson.gz" if archive == "ndjson" else "db"
+    return os.path.join(directory, f"{table}_{month}.{ext}")
+
+
+# 배치 행을 월별 파일에 추가 (삭제 전에 기록 -> 중간에 중단되어도 유실 없음, 재실행 시 sqlite 는 중복 무시)
+def _archive_rows(conn, table: str, date_col: str, rows: list, archive: str) -> set:
+    by_month = {}
+    for row in rows:
+        month = str(row[date_col] or "unknown")[:7]
+        by_month.setdefault(month, []).append(row)
+
+    paths = set()
+    for month, month_rows in by_month.items():
+        path = _archive_path(table, month, archive)
+        if archive == "ndjson":
+            # gzip 멤버를 이어 붙이는 방식 (gzip/zcat 으로 한 번에 읽힘)
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                for row in month_rows:
+                    f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        else:
+            columns = list(month_rows[0].keys())
+            create_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()[0]
+            archive_conn = sqlite3.connect(path)
+            try:
+                archive_conn.execute(create_sql.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1)
+                                     if "IF NOT EXISTS" not in create_sql.upper() else create_sql)
+                archive_conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [tuple(row[col] for col in columns) for row in month_rows]
+                )
+                archive_conn.commit()
+            finally:
+                archive_conn.close()
+        paths.add(path)
+    return paths
+
+
+# [3] run_retention: 보관 정책 적용
+def run_retention(pause_sec: float = 0.0) -> dict:
+    """
+    보관 기간이 지난 행을 (아카이브 후) batch_size 건씩 나누어 삭제하고, 빈 페이지를 incremental_vacuum 으로 반환합니다.
+    - 배치마다 커밋하여 쓰기 잠금을 짧게 유지 (사용 이력 기록 등 다른 쓰기가 사이사이 진행됨)
+    - pause_sec: 배치 사이 대기 시간 (운영 중 부하 분산)
+    """
+    policies = get_retention_policies()
+    batch_size = policies["batch_size"]
+    started = time.perf_counter()
+
+    conn = get_db_connection()
+    try:
+        before = _page_stats(conn)
+        tables = []
+        for table, policy in policies["tables"].items():
+            item = {"table": table, "days": policy["days"], "archive": policy["archive"],
+                    "cutoff": None, "deleted": 0, "archive_files": []}
+            tables.append(item)
+            if not _is_active(policy):
+                continue
+
+            item["cutoff"] = _cutoff(policy["days"])
+            date_col = policy["date_col"]
+            archive_files = set()
+            while True:
+                rows = conn.execute(
+                    f"SELECT rowid AS _rowid_, * FROM {table} WHERE {date_col} < ? LIMIT ?",
+                    (item["cutoff"], batch_size)
+                ).fetchall()
+                if not rows:
+                    break
+
+                if policy["archive"]:
+                    archive_rows = [{k: row[k] for k in row.keys() if k != "_rowid_"} for row in rows]
+                    if table in ARCHIVE_EXPANDERS:
+                        ARCHIVE_EXPANDERS[table](conn, archive_rows)
+                    archive_files |= _archive_rows(conn, table, date_col, archive_rows, policy["archive"])
+
+                rowids = [row["_rowid_"] for row in rows]
+                if table in DELETE_HOOKS:
+                    DELETE_HOOKS[table](conn, rowids)
+                conn.execute(f"DELETE FROM {table} WHERE rowid IN ({', '.join('?' * len(rowids))})", rowids)
+                conn.commit()
+                item["deleted"] += len(rowids)
+
+                if len(rows) < batch_size:
+                    break
+                if pause_sec:
+                    time.sleep(pause_sec)
+            item["archive_files"] = sorted(archive_files)
+
+        # 빈 페이지 반환 (auto_vacuum=INCREMENTAL 인 경우에만 동작, 아니면 no-op)
+        vacuum_pages = policies["vacuum_pages"]
+        conn.execute(f"PRAGMA incremental_vacuum({vacuum_pages})" if vacuum_pages else "PRAGMA incremental_vacuum").fetchall()
+        conn.commit()
+        after = _page_stats(conn)
+    finally:
+        conn.close()
+
+    return {
+        "dry_run": False,
+        "tables": tables,
+        "total_deleted": sum(t["deleted"] for t in tables),
+        "db_bytes_before": before["db_bytes"],
+        "db_bytes_after": after["db_bytes"],
+        "reclaimed_bytes": before["db_bytes"] - after["db_bytes"],
+        "auto_vacuum": after["auto_vacuum"],
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
+
+
+# [4] enable_incremental_vacuum: auto_vacuum=INCREMENTAL 전환
+def enable_incremental_vacuum(busy_timeout_ms: int = 30000) -> dict:
+    """
+    auto_vacuum 을 INCREMENTAL 로 바꾸고 VACUUM 으로 DB 파일을 다시 씁니다. (이미 INCREMENTAL 이면 아무것도 하지 않음)
+    - DB 크기에 비례하여 시간이 걸리고, 그동안 다른 쓰기는 대기 (다른 연결이 잠금을 오래 잡고 있으면 database is locked)
+    """
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        before = _page_stats(conn)
+        if before["auto_vacuum"] != "INCREMENTAL":
+            conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        after = _page_stats(conn)
+    finally:
+        conn.close()
+
+    return {
+        "vacuumed": before["auto_vacuum"] != "INCREMENTAL",
+        "auto_vacuum_before": before["auto_vacuum"],
+        "auto_vacuum": after["auto_vacuum"],
+        "db_bytes_before": before["db_bytes"],
+        "db_bytes_after": after["db_bytes"],
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
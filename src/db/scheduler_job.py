@@ -0,0 +1,99 @@
+import sqlite3
+try:
+    from .connection import get_db_connection
+except ImportError:
+    from connection import get_db_connection
+
+"""
+    스케줄러 작업 저장소 테이블 관련 (h_scheduler_job)
+    - [1] get_job_state: 작업 1건의 상태(pickle) 조회
+    - [2] get_job_states: 작업 목록 조회 (next_run_time 순, due_ts 지정 시 실행 시각이 된 작업만)
+    - [3] get_next_run_time: 가장 빠른 다음 실행 시각
+    - [4] insert_job: 작업 추가 (같은 id 가 있으면 False)
+    - [5] update_job: 작업 변경 (없으면 False)
+    - [6] delete_jobs: 작업 삭제 (id 목록, None 이면 전체) -> 삭제 건수
+
+    * next_run_time 은 UTC epoch 초, job_state 는 APScheduler Job 상태를 pickle 한 값
+    * src/utils/scheduler_jobstore.py 의 SQLiteJobStore 가 사용
+"""
+
+
+# [1] get_job_state: 작업 1건 조회
+def get_job_state(job_id: str):
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT job_state FROM h_scheduler_job WHERE id = ?", (job_id,)).fetchone()
+        return row["job_state"] if row else None
+    finally:
+        conn.close()
+
+
+# [2] get_job_states: 작업 목록 조회 -> [(id, job_state)]
+def get_job_states(due_ts: float = None) -> list:
+    query = "SELECT id, job_state FROM h_scheduler_job"
+    params = ()
+    if due_ts is not None:
+        query += " WHERE next_run_time <= ?"
+        params = (due_ts,)
+    # 일시 중지된 작업(next_run_time NULL)은 맨 뒤
+    query += " ORDER BY next_run_time IS NULL, next_run_time"
+    conn = get_db_connection()
+    try:
+        return [(row["id"], row["job_state"]) for row in conn.execute(query, params).fetchall()]
+    finally:
+        conn.close()
+
+
+# [3] get_next_run_time: 가장 빠른 다음 실행 시각
+def get_next_run_time():
+    conn = get_db_connection()
+    try:
+        return conn.execute(
+            "SELECT MIN(next_run_time) FROM h_scheduler_job WHERE next_run_time IS NOT NULL"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+# [4] insert_job: 작업 추가
+def insert_job(job_id: str, next_run_time: float, job_state: bytes) -> bool:
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO h_scheduler_job (id, next_run_time, job_state) VALUES (?, ?, ?)",
+            (job_id, next_run_time, sqlite3.Binary(job_state))
+        )
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError:
+        return False
+    finally:
+        conn.close()
+
+
+# [5] update_job: 작업 변경
+def update_job(job_id: str, next_run_time: float, job_state: bytes) -> bool:
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute(
+            "UPDATE h_scheduler_job SET next_run_time = ?, job_state = ? WHERE id = ?",
+            (next_run_time, sqlite3.Binary(job_state), job_id)
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+# [6] delete_jobs: 작업 삭제
+def delete_jobs(job_ids: list = None) -> int:
+    conn = get_db_connection()
+    try:
+        if job_ids is None:
+            cursor = conn.execute("DELETE FROM h_scheduler_job")
+        else:
+            cursor = conn.executemany("DELETE FROM h_scheduler_job WHERE id = ?", [(job_id,) for job_id in job_ids])
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
@@ -0,0 +1,157 @@
+import json
+import time
+from datetime import datetime
+try:
+    from .connection import get_db_connection
+except ImportError:
+    from connection import get_db_connection
+
+"""
+    워커 간 공유 상태 테이블 관련 (h_shared_event, h_shared_lease, h_shared_kv)
+    - [1] insert_shared_events: pub/sub 이벤트 여러 건을 한 트랜잭션으로 저장 (발행 순서대로)
+    - [2] fetch_shared_events: 특정 id 이후의 이벤트 조회 (자기 자신이 발행한 이벤트 제외) -> (이벤트 목록, 마지막 id)
+    - [3] get_last_shared_event_id: 마지막 이벤트 id (구독 시작 위치)
+    - [4] purge_shared_events: 오래된 이벤트 삭제
+    - [5] acquire_lease: lease 획득/갱신 (비어 있거나, 만료되었거나, 이미 내 것이면 성공)
+    - [6] release_lease: 내 lease 반납
+    - [7] get_lease: lease 현재 소유자/만료 시각 조회
+    - [8] set_shared_value / get_shared_value / delete_shared_value: 만료 시간이 있는 key-value
+
+    * 시각은 epoch 초(time.time()) 기준 (lease/이벤트 만료 비교용)
+    * src/utils/shared_state.py 의 SQLiteBackend 가 사용
+"""
+
+
+# [1] insert_shared_events: 이벤트 저장
+def insert_shared_events(events: list, origin: str) -> int:
+    """[(channel, payload)] 를 저장하고 저장한 건수를 반환합니다."""
+    if not events:
+        return 0
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.executemany(
+            "INSERT INTO h_shared_event (channel, payload, origin, reg_ts) VALUES (?, ?, ?, ?)",
+            [(channel, json.dumps(payload, ensure_ascii=False, default=str), origin, now) for channel, payload in events]
+        )
+        conn.commit()
+        return len(events)
+    finally:
+        conn.close()
+
+
+# [2] fetch_shared_events: 특정 id 이후의 이벤트 조회
+def fetch_shared_events(after_id: int, exclude_origin: str = None, limit: int = 500) -> tuple:
+    """
+    ([{id, channel, payload(dict)}], 마지막으로 읽은 id) 를 반환합니다.
+    - 자기 자신(exclude_origin)이 발행한 이벤트는 제외하지만, 읽은 위치는 그만큼 전진
+    """
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT id, channel, payload, origin FROM h_shared_event WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        ).fetchall()
+    finally:
+        conn.close()
+    events = [
+        {"id": row["id"], "channel": row["channel"], "payload": json.loads(row["payload"]) if row["payload"] else None}
+        for row in rows if row["origin"] != exclude_origin
+    ]
+    return events, (rows[-1]["id"] if rows else after_id)
+
+
+# [3] get_last_shared_event_id: 마지막 이벤트 id
+def get_last_shared_event_id() -> int:
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM h_shared_event").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# [4] purge_shared_events: 오래된 이벤트 삭제
+def purge_shared_events(before_ts: float) -> int:
+    conn = get_db_connection()
+    try:
+        deleted = conn.execute("DELETE FROM h_shared_event WHERE reg_ts < ?", (before_ts,)).rowcount
+        conn.execute("DELETE FROM h_shared_kv WHERE expires_ts IS NOT NULL AND expires_ts < ?", (time.time(),))
+        conn.commit()
+        return deleted
+    finally:
+        conn.close()
+
+
+# [5] acquire_lease: lease 획득/갱신
+def acquire_lease(lease_nm: str, owner: str, ttl_sec: float) -> bool:
+    """비어 있거나 만료된 lease, 또는 이미 owner 가 가진 lease 면 만료 시각을 연장하고 True 를 반환합니다."""
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute('''
+            INSERT INTO h_shared_lease (lease_nm, owner, expires_ts, upd_dt) VALUES (?, ?, ?, ?)
+            ON CONFLICT(lease_nm) DO UPDATE SET owner = excluded.owner, expires_ts = excluded.expires_ts, upd_dt = excluded.upd_dt
+            WHERE h_shared_lease.owner = excluded.owner OR h_shared_lease.expires_ts < ?
+        ''', (lease_nm, owner, now + ttl_sec, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), now))
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+# [6] release_lease: 내 lease 반납
+def release_lease(lease_nm: str, owner: str) -> bool:
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute("DELETE FROM h_shared_lease WHERE lease_nm = ? AND owner = ?", (lease_nm, owner))
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+# [7] get_lease: lease 조회
+def get_lease(lease_nm: str):
+    """{owner, expires_ts} 또는 None (없거나 만료된 경우)"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT owner, expires_ts FROM h_shared_lease WHERE lease_nm = ? AND expires_ts >= ?", (lease_nm, time.time())
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+# [8] set_shared_value / get_shared_value / delete_shared_value: key-value
+def set_shared_value(key: str, value, ttl_sec: float = None):
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO h_shared_kv (kv_key, kv_value, expires_ts) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False, default=str), time.time() + ttl_sec if ttl_sec else None)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_shared_value(key: str, default=None):
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT kv_value FROM h_shared_kv WHERE kv_key = ? AND (expires_ts IS NULL OR expires_ts >= ?)",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row["kv_value"]) if row else default
+    finally:
+        conn.close()
+
+
+def delete_shared_value(key: str):
+    conn = get_db_connection()
+    try:
+        conn.execute("DELETE FROM h_shared_kv WHERE kv_key = ?", (key,))
+        conn.commit()
+    finally:
+        conn.close()
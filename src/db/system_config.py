@@ -12,8 +12,12 @@ import json
     - [2] get_config_value: 특정 설정 이름의 JSON 설정 조회.
     - [3] set_config: 설정 값 저장 (Insert od Update)
     - [4] delete_config: 설정 삭제
+    - [5] get_config_version: 설정 변경 횟수 (설정을 캐시하는 쪽의 무효화 확인용, 예: src/utils/mailer.py)
 """
 
+# 이 프로세스에서 설정을 저장/삭제한 횟수
+_config_version = 0
+
 # [1] get_all_configs: 모든 시스템 설정 목록 조회 (페이징 적용)
 def get_all_configs(page: int = 1, size: int = 10) -> dict:
     """모든 시스템 설정 목록 조회 (페이징 적용)."""
@@ -95,6 +99,7 @@ def set_config(name: str, configuration: str, description: str = None):
         
     conn.commit()
     conn.close()
+    _bump_config_version()
     return True
 
 # [4] delete_config: 설정 삭제
@@ -105,4 +110,14 @@ def delete_config(name: str):
     cursor.execute("DELETE FROM h_system_config WHERE name = ?", (name,))
     conn.commit()
     conn.close()
+    _bump_config_version()
     return True
+
+def _bump_config_version():
+    global _config_version
+    _config_version += 1
+
+# [5] get_config_version: 설정 변경 횟수
+def get_config_version() -> int:
+    """set_config / delete_config 가 호출될 때마다 증가합니다. (다른 프로세스의 변경은 캐시 TTL 로 반영)"""
+    return _config_version
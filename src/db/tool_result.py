@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import zlib
+try:
+    from .connection import get_db_connection
+except ImportError:
+    from connection import get_db_connection
+
+"""
+    MCP Tool 실행 결과 저장 (h_mcp_tool_result)
+    - [1] split_tool_result: 실행 결과를 미리보기(inline) + 압축 본문으로 분리
+    - [2] save_tool_result: 압축 본문 저장 (이력 INSERT 와 같은 트랜잭션에서 호출)
+    - [3] get_tool_result: 이력 1건의 전체 결과 조회 (조회 시점에 압축 해제)
+    - [4] load_tool_results: 여러 이력의 전체 결과 조회 (아카이브 등 배치 처리용)
+    - [5] unindex_tool_results: 삭제할 이력의 전체 결과를 검색 인덱스에서 제거 (보관 정책 삭제 전에 호출)
+
+    * OpenAPI/SQL 도구의 결과는 수 MB JSON 이 될 수 있어, h_mcp_tool_usage.tool_result 에는 앞부분 미리보기만 두고
+      전체 본문은 zlib 압축하여 별도 테이블에 저장 -> 이력 목록/검색(FTS) 조회가 큰 행을 읽지 않음
+    * 이력이 삭제되면 트리거(trg_mcp_tool_result_ad)로 본문도 함께 삭제
+    * 전체 결과 전문 검색: h_mcp_tool_result_fts (contentless FTS5 trigram, rowid = usage_id, migration v15)
+      - 이력 테이블 인덱스(h_mcp_tool_usage_fts)는 미리보기만 보므로, 분리 저장한 결과는 저장 시점에 원문으로 색인
+      - 본문은 압축 저장이라 트리거로 색인을 지울 수 없음 -> 보관 정책 삭제는 [5] 로 먼저 제거
+        (그 외 방식으로 삭제된 이력의 색인은 남지만, 검색은 h_mcp_tool_usage 와 JOIN 하고 id 는 재사용되지 않으므로 결과에 나오지 않음)
+"""
+
+# 이 길이(문자 수)를 넘는 결과만 분리 저장
+RESULT_INLINE_MAX = int(os.getenv("TOOL_RESULT_INLINE_MAX", "4096"))
+# 분리 저장 시 이력 테이블에 남길 미리보기 길이
+RESULT_PREVIEW_LEN = int(os.getenv("TOOL_RESULT_PREVIEW_LEN", "1000"))
+PREVIEW_SUFFIX = " ...(truncated)"
+
+
+# [1] split_tool_result: 미리보기 + 압축 본문 분리
+def split_tool_result(result) -> tuple:
+    """
+    (미리보기, 압축 본문 or None, 원본 크기(byte)) 를 반환합니다.
+    - 짧은 결과는 그대로 inline 저장 (압축 본문 None)
+    """
+    if result is None:
+        return None, None, 0
+    text = result if isinstance(result, str) else str(result)
+    raw = text.encode("utf-8")
+    if len(text) <= RESULT_INLINE_MAX:
+        return text, None, len(raw)
+    return text[:RESULT_PREVIEW_LEN] + PREVIEW_SUFFIX, zlib.compress(raw, 6), len(raw)
+
+
+# 전체 결과 전문 검색 인덱스 (contentless, migration v15)
+RESULT_FTS_TABLE = "h_mcp_tool_result_fts"
+
+
+# [2] save_tool_result: 압축 본문 저장 (+ 원문 text 가 있으면 전문 검색 색인)
+def save_tool_result(conn, usage_id: int, payload: bytes, orig_size: int, text: str = None):
+    conn.execute('''
+        INSERT OR REPLACE INTO h_mcp_tool_result (usage_id, encoding, orig_size, comp_size, payload)
+        VALUES (?, 'zlib', ?, ?, ?)
+    ''', (usage_id, orig_size, len(payload), payload))
+    if text is not None:
+        try:
+            conn.execute(f"INSERT INTO {RESULT_FTS_TABLE} (rowid, tool_result) VALUES (?, ?)", (usage_id, text))
+        except sqlite3.OperationalError:
+            # FTS5 미지원 빌드 또는 v15 이전 스키마 -> 색인 없이 저장 (v15 migration 이 기존 결과를 색인)
+            pass
+
+
+def _decode(row) -> str:
+    return zlib.decompress(row['payload']).decode("utf-8")
+
+
+# [3] get_tool_result: 이력 1건의 전체 결과 조회
+def get_tool_result(usage_id: int) -> str | None:
+    """분리 저장된 전체 결과를 압축 해제하여 반환합니다. (분리 저장되지 않은 이력은 None)"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT payload FROM h_mcp_tool_result WHERE usage_id = ?", (usage_id,)).fetchone()
+        return _decode(row) if row else None
+    finally:
+        conn.close()
+
+
+# [4] load_tool_results: 여러 이력의 전체 결과 조회
+def load_tool_results(conn, usage_ids: list) -> dict:
+    """{usage_id: 전체 결과} 형태로 반환합니다. (분리 저장된 이력만 포함)"""
+    if not usage_ids:
+        return {}
+    rows = conn.execute(
+        f"SELECT usage_id, payload FROM h_mcp_tool_result WHERE usage_id IN ({', '.join('?' * len(usage_ids))})",
+        list(usage_ids)
+    ).fetchall()
+    return {row['usage_id']: _decode(row) for row in rows}
+
+
+# [5] unindex_tool_results: 전체 결과 검색 색인 제거
+def unindex_tool_results(conn, usage_ids: list):
+    """
+    contentless FTS5 는 색인 시점의 원문을 넘겨야 삭제되므로, 압축 본문을 풀어 'delete' 명령으로 제거합니다.
+    - h_mcp_tool_usage 행을 삭제하기 전에 같은 연결에서 호출 (행 삭제 시 트리거로 본문도 삭제됨)
+    """
+    try:
+        conn.executemany(
+            f"INSERT INTO {RESULT_FTS_TABLE} ({RESULT_FTS_TABLE}, rowid, tool_result) VALUES ('delete', ?, ?)",
+            list(load_tool_results(conn, usage_ids).items())
+        )
+    except sqlite3.OperationalError:
+        pass
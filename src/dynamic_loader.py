@@ -1,61 +1,138 @@
 
 import sys
+import inspect
+import time
+from collections import OrderedDict
 from mcp.server.fastmcp import FastMCP
 from pydantic import create_model
 from typing import Any, Callable
 try:
-    from src.db import get_active_tools, get_tool_params
     from src.tool_executor import execute_sql_tool, execute_python_tool
     from src.utils.server_audit import audit_log
+    from src.utils.tool_registry_cache import custom_tool_snapshot, diff_tool_definitions
 except ImportError:
-    from db import get_active_tools, get_tool_params
     from tool_executor import execute_sql_tool, execute_python_tool
     from utils.server_audit import audit_log
+    from utils.tool_registry_cache import custom_tool_snapshot, diff_tool_definitions
 
 """
-    해당 파일은 python server 시작 시점에 사용자가 동적으로 생성한 tool 목록을 로딩하기 위한 def
-    - register_dynamic_tools: DB에 정의된 동적 tool들을 FastMCP 서버에 등록합니다.
-    - _register_single_tool: 각각의 tool을 등록
+    해당 파일은 사용자가 동적으로 생성한 tool 목록을 FastMCP 서버에 등록/갱신하기 위한 def
+    - register_dynamic_tools: DB에 정의된 동적 tool들을 FastMCP 서버에 등록합니다. (reload 1회)
+    - DynamicToolReloader: 레지스트리 버전이 바뀌면 정의 해시를 비교하여 바뀐 tool 만 등록/교체/해제
+    - _build_tool_handler: 각각의 tool 실행 핸들러(Pydantic 모델 + 시그니처) 생성
+
+    * 생성한 핸들러는 정의 해시 기준으로 캐시하므로, 같은 정의로 다시 활성화되면 모델을 새로 만들지 않음
 """
 
+# 정의 해시별 핸들러 캐시 크기
+HANDLER_CACHE_SIZE = 512
+
+
+# DynamicToolReloader: 정의 해시 비교 기반 증분 등록
+class DynamicToolReloader:
+    def __init__(self, mcp: FastMCP):
+        self.mcp = mcp
+        self.registered = {}            # {tool_name: 정의 해시} - 현재 FastMCP 에 등록된 동적 tool
+        self.version = None             # 마지막으로 반영한 레지스트리 버전
+        self._snapshot = None           # 마지막으로 반영한 스냅샷 (캐시가 다시 로드되면 다른 객체)
+        self._handler_cache = OrderedDict()
+
+    def reload(self, force: bool = False) -> dict:
+        """
+        레지스트리 버전이 바뀐 경우에만 DB 정의를 읽어, 추가/변경/삭제된 tool 만 FastMCP 에 반영합니다.
+        - 반환: {"version", "added", "updated", "removed", "elapsed_ms"}
+        """
+        started = time.perf_counter()
+        if force:
+            custom_tool_snapshot.invalidate()
+        tools = custom_tool_snapshot.get()
+        version = custom_tool_snapshot.version
+        if not force and tools is self._snapshot:
+            return {"version": version, "added": [], "updated": [], "removed": [], "elapsed_ms": 0.0}
+
+        current = {name: tool['hash'] for name, tool in tools.items()}
+        added, updated, removed = diff_tool_definitions(self.registered, current)
+
+        for name in removed + updated:
+            self._unregister(name)
+        for name in added + updated:
+            try:
+                self._register(tools[name])
+            except Exception as e:
+                print(f"[DynamicLoader] Failed to register tool '{name}': {e}", file=sys.stderr)
+
+        self.version = version
+        self._snapshot = tools
+        result = {
+            "version": version, "added": added, "updated": updated, "removed": removed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        if added or updated or removed:
+            print(f"[DynamicLoader] Reloaded (v{version}): +{len(added)} ~{len(updated)} -{len(removed)} "
+                  f"in {result['elapsed_ms']} ms", file=sys.stderr)
+        return result
+
+    def _register(self, tool: dict):
+        handler = self._handler_cache.get(tool['hash'])
+        if handler is None:
+            handler = _build_tool_handler(tool)
+            self._handler_cache[tool['hash']] = handler
+            while len(self._handler_cache) > HANDLER_CACHE_SIZE:
+                self._handler_cache.popitem(last=False)
+        else:
+            self._handler_cache.move_to_end(tool['hash'])
+
+        self.mcp.add_tool(handler, name=tool['name'], description=tool['description_agent'] or "")
+        self.registered[tool['name']] = tool['hash']
+
+    def _unregister(self, name: str):
+        try:
+            self.mcp.remove_tool(name)
+        except Exception:
+            pass  # 이미 해제된 경우
+        self.registered.pop(name, None)
+
+
+_reloaders = {}
+
+def _get_reloader(mcp: FastMCP) -> DynamicToolReloader:
+    if id(mcp) not in _reloaders:
+        _reloaders[id(mcp)] = DynamicToolReloader(mcp)
+    return _reloaders[id(mcp)]
+
 
 # server.py: 서버 시작 시점에 동적 툴 로딩을 위한 def
 def register_dynamic_tools(mcp: FastMCP):
     """
     DB에 정의된 동적 Tool들을 FastMCP 서버에 등록합니다.
+    - 다시 호출하면 바뀐 Tool 만 반영합니다.
     """
     try:
-        active_tools = get_active_tools()
-        print(f"[DynamicLoader] Found {len(active_tools)} active custom tools.", file=sys.stderr)
-        
-        for tool in active_tools:
-            try:
-                _register_single_tool(mcp, tool) # 각각의 tool을 등록
-            except Exception as e:
-                print(f"[DynamicLoader] Failed to register tool '{tool['name']}': {e}", file=sys.stderr)
-                
+        reloader = _get_reloader(mcp)
+        result = reloader.reload()
+        print(f"[DynamicLoader] Found {len(reloader.registered)} active custom tools.", file=sys.stderr)
+        return result
     except Exception as e:
         print(f"[DynamicLoader] Error loading tools: {e}", file=sys.stderr)
 
-# dynamic_loader.py: 동적 툴 로딩을 위한 def
-def _register_single_tool(mcp: FastMCP, tool: dict):
-    tool_id = tool['id']
+
+# dynamic_loader.py: 동적 툴 실행 핸들러 생성
+def _build_tool_handler(tool: dict) -> Callable[..., Any]:
     tool_name = tool['name']
     tool_type = tool['tool_type']
     definition = tool['definition']
     desc_agent = tool['description_agent'] or ""
-    
-    # 1. 파라미터 정보 로드
-    params = get_tool_params(tool_id)
-    
+
+    # 1. 파라미터 정보 (스냅샷에 포함되어 있어 도구별 DB 조회 없음)
+    params = tool.get('params', [])
+
     # 2. Pydantic 모델 동적 생성
     field_definitions = {}
     for p in params:
         p_name = p['param_name']
         p_type_str = p['param_type'].upper()
         is_required = (p['is_required'] == 'Y')
-        p_desc = p['description'] or ""
-        
+
         # 타입 매핑
         if p_type_str == 'NUMBER':
             py_type = float # or int, but float is safer for general number
@@ -63,22 +140,21 @@ def _register_single_tool(mcp: FastMCP, tool: dict):
             py_type = bool
         else: # STRING or Default
             py_type = str
-            
+
         # Optional 처리
         if not is_required:
             field_definitions[p_name] = (py_type | None, None) # Default None
         else:
             field_definitions[p_name] = (py_type, ...) # Required
-            
+
     # 모델명은 Unique하게 (Tool 이름 활용)
-    # create_model(name, **fields)
     DynamicModel = create_model(f"DynamicArgs_{tool_name}", **field_definitions)
-    
+
     # 3. 실행 핸들러 생성 (Closure 활용)
     async def dynamic_handler(**kwargs) -> str:
         # 인자 검증 (Pydantic이 이미 수행했으나, 값 추출)
         # kwargs에는 모델의 필드들이 들어옴
-        
+
         if tool_type == 'SQL':
             return await execute_sql_tool(definition, kwargs)
         elif tool_type == 'PYTHON':
@@ -89,46 +165,24 @@ def _register_single_tool(mcp: FastMCP, tool: dict):
     # 4. 함수의 메타데이터 설정 (FastMCP가 이를 읽어 Tool Description으로 사용)
     dynamic_handler.__name__ = tool_name
     dynamic_handler.__doc__ = desc_agent
-    
+
     # [수정] 이름을 설정한 후에 감싸야 audit_log 내부에서 바뀐 이름을 정확히 인식함
     dynamic_handler = audit_log(dynamic_handler)
 
-    # 중요: Type Hinting을 동적으로 설정해야 FastMCP가 Schema를 추출함
-    # 하지만 FastMCP(mcp) 데코레이터가 Pydantic 모델을 인자로 받는 방식이 아니라,
-    # 함수 시그니처를 분석하는 방식이라면 inspect 조작이 필요할 수 있음.
-    # FastMCP는 Type Hint를 분석함.
-    
-    # Hack: FastMCP가 지원하는 방식에 따라 다름.
-    # 만약 FastMCP가 Pydantic Model을 통째로 받는 것을 지원하지 않는다면,
-    # **kwargs 대신 명시적 시그니처를 만들어야 하는데 Python에서 동적으로 만들기 까다로움.
-    # 다행히 FastMCP는 내부적으로 Pydantic V2를 쓰고, 기본적인 함수 시그니처 분석을 함.
-    
-    # 대안: Context(ctx)를 사용하지 않는 간단한 방식으로 등록.
-    # FastMCP의 tool() 데코레이터는 함수를 감싸서 등록함.
-    
-    # 여기서 핵심문제: **kwargs를 쓰면 인자 정보가 사라짐.
-    # inspect.signature를 덮어씌워야 함.
-    
-    import inspect
-    
-    # 동적 시그니처 생성
+    # FastMCP 는 함수 시그니처(Type Hint)를 분석하여 Schema 를 추출하므로,
+    # **kwargs 대신 파라미터 정의로 만든 시그니처를 덮어씌움
     parameters = []
     for p_name, (p_type, p_default) in field_definitions.items():
-        kind = inspect.Parameter.KEYWORD_ONLY
         default = inspect.Parameter.empty if p_default is ... else p_default
         parameters.append(
             inspect.Parameter(
                 name=p_name,
-                kind=kind,
+                kind=inspect.Parameter.KEYWORD_ONLY,
                 default=default,
                 annotation=p_type
             )
         )
-        
-    sig = inspect.Signature(parameters, return_annotation=str)
-    dynamic_handler.__signature__ = sig
-    
-    # 5. 등록
-    # mcp.tool()(dynamic_handler) 형태로 호출
-    mcp.tool(name=tool_name, description=desc_agent)(dynamic_handler)
-    print(f"[DynamicLoader] Registered tool '{tool_name}' ({tool_type})", file=sys.stderr)
+
+    dynamic_handler.__signature__ = inspect.Signature(parameters, return_annotation=str)
+    dynamic_handler.args_model = DynamicModel
+    return dynamic_handler
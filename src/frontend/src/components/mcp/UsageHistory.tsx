@@ -20,6 +20,7 @@ export function UsageHistory() {
     const [searchUserId, setSearchUserId] = useState('');
     const [searchToolNm, setSearchToolNm] = useState('');
     const [searchSuccess, setSearchSuccess] = useState('ALL'); // 'ALL' | 'SUCCESS' | 'FAIL'
+    const [searchText, setSearchText] = useState(''); // 파라미터/결과 전문 검색
 
     // 통계 상태 (Stats State)
     const [stats, setStats] = useState<UsageStats[]>([]);
@@ -63,6 +64,7 @@ export function UsageHistory() {
             if (searchUserId) params.append('user_id', searchUserId);
             if (searchToolNm) params.append('tool_nm', searchToolNm);
             if (searchSuccess !== 'ALL') params.append('success', searchSuccess);
+            if (searchText) params.append('search', searchText);
 
             const res = await fetch(`/api/mcp/usage-history?${params.toString()}`, {
                 headers: getAuthHeaders()
@@ -83,7 +85,7 @@ export function UsageHistory() {
         } finally {
             setLoading(false);
         }
-    }, [searchUserId, searchToolNm, searchSuccess, pageSize]);
+    }, [searchUserId, searchToolNm, searchSuccess, searchText, pageSize]);
 
     // 초기 로딩 및 성공여부 필터 변경 시 자동 검색
     useEffect(() => {
@@ -115,6 +117,25 @@ export function UsageHistory() {
         setSelectedJson(formatJson(content));
     };
 
+    // 실행 결과 상세 보기 (미리보기만 저장된 큰 결과는 상세 API 로 전체 본문 조회)
+    const openResultModal = async (log: UsageLog) => {
+        if (!log.result_truncated) {
+            openJsonModal('결과 상세 (Result)', log.tool_result);
+            return;
+        }
+        try {
+            const res = await fetch(`/api/mcp/usage-history/${log.id}`, {
+                headers: getAuthHeaders()
+            });
+            if (!res.ok) throw new Error('Failed to fetch result detail');
+            const detail: UsageLog = await res.json();
+            openJsonModal('결과 상세 (Result)', detail.tool_result);
+        } catch (err) {
+            console.error(err);
+            openJsonModal('결과 상세 (Result)', log.tool_result);
+        }
+    };
+
     // MCP Tool 사용 이력 내보내기
     const handleExport = async (format: 'csv' | 'excel') => {
         try {
@@ -124,6 +145,7 @@ export function UsageHistory() {
             if (searchUserId) params.append('user_id', searchUserId);
             if (searchToolNm) params.append('tool_nm', searchToolNm);
             if (searchSuccess !== 'ALL') params.append('success', searchSuccess);
+            if (searchText) params.append('search', searchText);
 
             const url = `/api/export/mcp/usage?${params.toString()}`;
             const res = await fetch(url, {
@@ -289,6 +311,17 @@ export function UsageHistory() {
                             <option value="FAIL">Error / Fail</option>
                         </select>
                     </div>
+                    <div>
+                        <label className="block text-xs font-medium text-gray-700 dark:text-slate-400 mb-1">파라미터/결과 검색</label>
+                        <input
+                            type="text"
+                            value={searchText}
+                            onChange={(e) => setSearchText(e.target.value)}
+                            onKeyDown={handleKeyDown}
+                            placeholder="파라미터, 실행 결과 내용 검색..."
+                            className="px-3 py-2 border border-gray-200 dark:border-slate-700 rounded-lg shadow-sm focus:outline-none focus:ring-2 focus:ring-blue-500/20 focus:border-blue-500 sm:text-sm transition-all w-64 bg-white dark:bg-slate-800 text-gray-900 dark:text-slate-100"
+                        />
+                    </div>
                     <div className="flex gap-2">
                         <button
                             onClick={handleSearch}
@@ -302,6 +335,7 @@ export function UsageHistory() {
                                 setSearchUserId('');
                                 setSearchToolNm('');
                                 setSearchSuccess('ALL');
+                                setSearchText('');
                             }}
                             className="px-3 py-2 text-gray-500 dark:text-slate-400 hover:text-gray-700 dark:hover:text-slate-200 text-sm font-medium transition-colors"
                         >
@@ -310,14 +344,14 @@ export function UsageHistory() {
                     </div>
 
                     <div className="flex-none flex gap-2">
-                        {/* <button
+                        <button
                             onClick={() => handleExport('csv')}
                             className="inline-flex items-center px-3 py-2 bg-white dark:bg-slate-800 border border-gray-300 dark:border-slate-700 rounded-md text-sm font-medium text-green-600 dark:text-green-400 hover:bg-green-50 dark:hover:bg-green-900/10 transition-colors"
                             title="CSV 내보내기"
                         >
                             <Download className="w-4 h-4 mr-2" />
                             CSV
-                        </button> */}
+                        </button>
                         <button
                             onClick={() => handleExport('excel')}
                             className="inline-flex items-center px-3 py-2 bg-white dark:bg-slate-800 border border-gray-300 dark:border-slate-700 rounded-md text-sm font-medium text-blue-600 dark:text-blue-400 hover:bg-blue-50 dark:hover:bg-blue-900/10 transition-colors"
@@ -421,7 +455,7 @@ export function UsageHistory() {
                                                     <div className="flex items-center space-x-2">
                                                         <span className="truncate" title={log.tool_result}>{log.tool_result}</span>
                                                         <button
-                                                            onClick={() => openJsonModal('결과 상세 (Result)', log.tool_result)}
+                                                            onClick={() => openResultModal(log)}
                                                             className="p-1 hover:bg-gray-100 dark:hover:bg-slate-800 rounded text-gray-400 dark:text-slate-500 hover:text-blue-600 dark:hover:text-blue-400 transition-colors flex-shrink-0"
                                                             title="상세 보기"
                                                         >
@@ -424,14 +424,14 @@ export default function OpenApiStatsView({ theme }: Props) {
                     </h3>
                     <div className="flex items-center space-x-3">
                         <div className="flex bg-white dark:bg-slate-800 border border-gray-200 dark:border-slate-700 rounded-lg p-0.5">
-                            {/* <button
+                            <button
                                 onClick={() => handleExport('csv')}
                                 className="flex items-center px-2 py-1 text-[10px] font-bold text-green-600 dark:text-green-400 hover:bg-green-50 dark:hover:bg-green-900/10 rounded-md transition-colors"
                             >
                                 <Download className="w-3 h-3 mr-1" />
                                 CSV
                             </button>
-                            <div className="w-px h-3 bg-gray-200 dark:bg-slate-700 mx-0.5 self-center" /> */}
+                            <div className="w-px h-3 bg-gray-200 dark:bg-slate-700 mx-0.5 self-center" />
                             <button
                                 onClick={() => handleExport('excel')}
                                 className="flex items-center px-2 py-1 text-[10px] font-bold text-blue-600 dark:text-blue-400 hover:bg-blue-50 dark:hover:bg-blue-900/10 rounded-md transition-colors"
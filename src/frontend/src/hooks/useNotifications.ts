@@ -16,6 +16,20 @@ export function useNotifications() {
   const [loading, setLoading] = useState(true);
   const [connected, setConnected] = useState(false);
   const eventSourceRef = useRef<EventSource | null>(null);
+  const replayTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  // 알림 목록만 다시 조회 (읽지 않은 개수는 SSE unread_count_update 로 수신)
+  const fetchList = useCallback(async () => {
+    try {
+      const listRes = await fetch('/api/notifications/me?size=10', { headers: getAuthHeaders() });
+      if (listRes.ok) {
+        const data = await listRes.json();
+        setNotifications(data.items);
+      }
+    } catch (err) {
+      console.error('Failed to fetch notifications:', err);
+    }
+  }, []);
 
   const fetchInitialData = useCallback(async () => {
     try {
@@ -61,10 +75,22 @@ export function useNotifications() {
         const data = JSON.parse(event.data);
         console.log('Received notification event:', data);
 
-        if (data.type === 'new_notification') {
-          // 새로운 알림이 오면 목록 앞에 추가 (최신 10개 유지)
-          // 실제로는 fetchInitialData를 다시 부르는게 더 정확할 수도 있음
-          fetchInitialData();
+        if (data.type === 'new_notification' && data.replay) {
+          // 재연결 시 놓친 알림 replay: 연속으로 오므로 목록 조회는 마지막에 한 번만 (개수는 연결 시 별도 수신)
+          if (replayTimerRef.current) clearTimeout(replayTimerRef.current);
+          replayTimerRef.current = setTimeout(() => {
+            replayTimerRef.current = null;
+            fetchList();
+          }, 200);
+        } else if (data.type === 'new_notification') {
+          // 새로운 알림이 오면 목록 다시 조회 (최신 10개 유지)
+          // 개별 알림은 읽지 않은 개수를 함께 보내므로 개수는 다시 조회하지 않음 (토픽 알림은 개수 없음)
+          if (typeof data.unread_count === 'number') {
+            setUnreadCount(data.unread_count);
+            fetchList();
+          } else {
+            fetchInitialData();
+          }
 
           // 브라우저 기본 알림 (선택 사항)
           if (Notification.permission === 'granted') {
@@ -72,7 +98,8 @@ export function useNotifications() {
           }
         } else if (data.type === 'unread_count_update') {
           setUnreadCount(data.unread_count);
-        } else if (data.type === 'all_read_success') {
+        } else if (data.type === 'all_read_success' || data.type === 'overflow' || data.type === 'resync') {
+          // overflow: 서버 버퍼가 가득 차 일부 알림이 버려짐, resync: 재연결 중 놓친 알림이 너무 많음 -> 목록/개수를 다시 조회
           fetchInitialData();
         }
       } catch (err) {
@@ -80,14 +107,15 @@ export function useNotifications() {
       }
     });
 
+    // 연결이 끊기면 EventSource 가 자동으로 재연결하며 Last-Event-ID 헤더로 마지막 알림 id 를 보냄
+    // -> 서버가 놓친 알림만 replay 하므로 닫지 않음 (닫으면 재연결/replay 가 되지 않음)
     source.onerror = () => {
       setConnected(false);
       console.warn('Notification SSE error, reconnecting...');
-      source.close();
     };
 
     return source;
-  }, [fetchInitialData]);
+  }, [fetchInitialData, fetchList]);
 
   useEffect(() => {
     fetchInitialData();
@@ -102,6 +130,7 @@ export function useNotifications() {
 
     return () => {
       source.close();
+      if (replayTimerRef.current) clearTimeout(replayTimerRef.current);
     };
   }, [fetchInitialData, connectSSE]);
 
@@ -11,6 +11,8 @@ export interface UsageLog {
     tool_params: string;
     tool_success: string; // 'SUCCESS' | 'FAIL'
     tool_result: string;
+    result_size?: number | null;
+    result_truncated?: boolean; // true 면 tool_result 는 미리보기 (전체는 상세 API 조회)
     reg_dt: string;
     user_id: string;
     user_nm: string;
@@ -10,8 +10,10 @@ mcp_server_impl.py
 1. 도구 통합 관리: 정적 도구 목록과 DB(h_custom_tool) 로드 동적 도구를 에이전트에 통합 제공
 2. 실행 제어 및 보안 (call_tool):
    - 인증 체크: 토큰 및 사용자 유효성 검증
-   - 사용량 제한: 일일 사용량 체크 및 임계치 알림
+   - 사용량 제한: 일일 사용량 예약(src/utils/quota_manager.py) 및 임계치 알림
    - 이력 기록: 실행 결과 및 성공 여부 DB 저장
+3. 동시 실행: 블로킹 작업(DB, SMTP, SQL/Python 도구)은 스레드에서 실행, 세션별 동시 실행 수 제한 (MCP_SESSION_CONCURRENCY)
+4. 일괄 실행 (call_tools_batch): 여러 도구를 동시 실행 수 제한 하에 병렬 실행 (인증/사용량 확인/이력 기록은 배치당 1회)
 
 # 도구 유형:
 1. 정적(Static): 미리 정의된 파이썬 함수 직접 호출 (add, subtract 등)
@@ -29,49 +31,141 @@ mcp_server_impl.py
 
 from mcp.server import Server
 from mcp.types import Tool, TextContent
+from contextvars import ContextVar
+from typing import Optional
+import asyncio
 import logging
 import json
+import os
+import sys
+import time
+import weakref
 import httpx
 
 # DB 및 유틸리티 모듈 유연한 임포트 처리
 try:
     from src.db import (
-        get_active_tools, get_tool_params, get_user, log_tool_usage,
+        get_user, log_tool_usage,
         get_user_daily_usage, get_user_limit, get_all_access_tokens as get_all_user_tokens,
         log_email, update_email_status,
         get_openapi_list, get_openapi_by_tool_id, get_openapi_limit,
         get_user_openapi_daily_usage, log_openapi_usage,
+        log_tool_usage_batch, log_openapi_usage_batch,
         check_access_token_permission
     )
     from src.tool_executor import execute_sql_tool, execute_python_tool
     from src.utils.context import get_current_user
-    from src.utils.mailer import EmailSender
-    from src.scheduler import add_scheduled_job
     from src.utils.notification_helper import send_system_notification
+    from src.utils.tool_registry_cache import VersionedCache, custom_tool_snapshot
+    from src.utils.quota_manager import quota_manager
     logger_prefix = "[SRC-IMPORT]"
 except ImportError:
     # This block is problematic for some environments, but let's keep it with absolute paths if possible
     from src.db import (
-        get_active_tools, get_tool_params, get_user, log_tool_usage,
+        get_user, log_tool_usage,
         get_user_daily_usage, get_user_limit, get_all_access_tokens as get_all_user_tokens,
         log_email, update_email_status,
         get_openapi_list, get_openapi_by_tool_id, get_openapi_limit,
         get_user_openapi_daily_usage, log_openapi_usage,
+        log_tool_usage_batch, log_openapi_usage_batch,
         check_access_token_permission
     )
     from src.tool_executor import execute_sql_tool, execute_python_tool
     from src.utils.context import get_current_user
-    from src.utils.mailer import EmailSender
-    from src.scheduler import add_scheduled_job
     from src.utils.notification_helper import send_system_notification
+    from src.utils.tool_registry_cache import VersionedCache, custom_tool_snapshot
+    from src.utils.quota_manager import quota_manager
     logger_prefix = "[LOCAL-IMPORT]"
 
 logger = logging.getLogger(__name__)
-print(f"{logger_prefix} DB and utilities loaded successfully.")
+# stdout 은 stdio 모드의 JSON-RPC 채널이므로 로그는 stderr 로 출력
+print(f"{logger_prefix} DB and utilities loaded successfully.", file=sys.stderr)
 
 # 전역 MCP 서버 인스턴스 초기화
 mcp = Server("agent-mcp-sse")
 
+# 동적 도구 Tool 목록 생성 (커스텀 도구 스냅샷 기반, 파라미터 포함)
+def _build_dynamic_tools(tools: dict) -> list:
+    dynamic_tools = []
+    for tool_data in tools.values():
+        tool_name = tool_data['name']
+        desc_agent = tool_data['description_agent'] or ""
+
+        # 도구별 파라미터 정보로 JSON Schema 생성
+        properties = {}
+        required = []
+        for p in tool_data['params']:
+            p_name = p['param_name']
+            p_type_str = p['param_type'].upper()
+            is_required = (p['is_required'] == 'Y')
+            json_type = "string"
+            if p_type_str == 'NUMBER':
+                json_type = "number"
+            elif p_type_str == 'BOOLEAN':
+                json_type = "boolean"
+
+            properties[p_name] = {
+                "type": json_type,
+                "description": p['description'] or ""
+            }
+            if is_required:
+                required.append(p_name)
+
+        dynamic_tools.append(
+            Tool(
+                name=tool_name,
+                description=f"[Dynamic] {desc_agent}",
+                inputSchema={
+                    "type": "object",
+                    "properties": properties,
+                    "required": required
+                }
+            )
+        )
+    return dynamic_tools
+
+# OpenAPI 도구 Tool 목록 생성
+def _build_openapi_tools() -> list:
+    openapi_tools = []
+    # 단일 페이지에 넉넉한 사이즈로 전체 조회
+    openapi_res = get_openapi_list(page=1, size=1000)
+    for api in openapi_res.get('items', []):
+        tool_id = api['tool_id']
+        name_ko = api['name_ko']
+        desc_agent = api['description_agent'] or f"{name_ko} API 도구"
+
+        # 파라미터 스키마 파싱 처리
+        properties = {}
+        required = []
+        if api.get('params_schema'):
+            try:
+                schema = json.loads(api['params_schema'])
+                # 단층형 Key-Value 구조인 경우 (에디터 입력 표준)
+                if isinstance(schema, dict):
+                    for k, v in schema.items():
+                        properties[k] = {
+                            "type": "string",
+                            "description": f"{k} 파라미터 (기본값/설명: {v})"
+                        }
+            except: pass
+
+        openapi_tools.append(
+            Tool(
+                name=tool_id,
+                description=f"[OpenAPI] {desc_agent}",
+                inputSchema={
+                    "type": "object",
+                    "properties": properties,
+                    "required": required
+                }
+            )
+        )
+    return openapi_tools
+
+# 레지스트리 버전별 Tool 목록 캐시 (도구 추가/수정/삭제 시 서버 재시작 없이 다음 list_tools 에 반영)
+_dynamic_tool_list = VersionedCache("custom_tool", lambda: _build_dynamic_tools(custom_tool_snapshot.get()))
+_openapi_tool_list = VersionedCache("openapi", _build_openapi_tools)
+
 # ==========================================
 # 1. 도구 목록 조회 (list_tools)
 # ==========================================
@@ -194,87 +288,17 @@ async def list_tools():
     for t in static_tools:
         t.description = t.description.strip()
 
-    # [2] 동적 도구 로드 (h_custom_tool 테이블 기반)
+    # [2] 동적 도구 (h_custom_tool 테이블 기반) / [3] OpenAPI 도구 (h_openapi 테이블 기반)
+    # => 레지스트리 버전이 바뀐 경우에만 DB 에서 다시 만들고, 그 외에는 캐시된 목록 사용
     dynamic_tools = []
     try:
-        active_tools = get_active_tools()
-        for tool_data in active_tools:
-            tool_id = tool_data['id']
-            tool_name = tool_data['name']
-            desc_agent = tool_data['description_agent'] or ""
-            
-            # 도구별 파라미터 정보 획득 및 JSON Schema 생성
-            params = get_tool_params(tool_id)
-            properties = {}
-            required = []
-            
-            for p in params:
-                p_name = p['param_name']
-                p_type_str = p['param_type'].upper()
-                is_required = (p['is_required'] == 'Y')
-                json_type = "string"
-                if p_type_str == 'NUMBER':
-                    json_type = "number"
-                elif p_type_str == 'BOOLEAN':
-                    json_type = "boolean"
-                
-                properties[p_name] = {
-                    "type": json_type,
-                    "description": p['description'] or ""
-                }
-                if is_required:
-                    required.append(p_name)
-            
-            dynamic_tools.append(
-                Tool(
-                    name=tool_name,
-                    description=f"[Dynamic] {desc_agent}",
-                    inputSchema={
-                        "type": "object",
-                        "properties": properties,
-                        "required": required
-                    }
-                )
-            )
+        dynamic_tools = _dynamic_tool_list.get()
     except Exception as e:
         logger.error(f"Failed to load dynamic tools: {e}")
 
-    # [3] OpenAPI 도구 목록 로드 (h_openapi 테이블 기반)
     openapi_tools = []
     try:
-        # 단일 페이지에 넉넉한 사이즈로 전체 조회
-        openapi_res = get_openapi_list(page=1, size=1000)
-        for api in openapi_res.get('items', []):
-            tool_id = api['tool_id']
-            name_ko = api['name_ko']
-            desc_agent = api['description_agent'] or f"{name_ko} API 도구"
-            
-            # 파라미터 스키마 파싱 처리
-            properties = {}
-            required = []
-            if api.get('params_schema'):
-                try:
-                    schema = json.loads(api['params_schema'])
-                    # 단층형 Key-Value 구조인 경우 (에디터 입력 표준)
-                    if isinstance(schema, dict):
-                        for k, v in schema.items():
-                            properties[k] = {
-                                "type": "string",
-                                "description": f"{k} 파라미터 (기본값/설명: {v})"
-                            }
-                except: pass
-            
-            openapi_tools.append(
-                Tool(
-                    name=tool_id,
-                    description=f"[OpenAPI] {desc_agent}",
-                    inputSchema={
-                        "type": "object",
-                        "properties": properties,
-                        "required": required
-                    }
-                )
-            )
+        openapi_tools = _openapi_tool_list.get()
     except Exception as e:
         logger.error(f"Failed to load OpenAPI tools: {e}")
 
@@ -282,19 +306,102 @@ async def list_tools():
     all_tools = static_tools + dynamic_tools + openapi_tools
     msg = f"Returning {len(all_tools)} tools (Static: {len(static_tools)}, Dynamic: {len(dynamic_tools)}, OpenAPI: {len(openapi_tools)})"
     logger.info(msg)
-    print(f"[DEBUG] {msg}")
+    print(f"[DEBUG] {msg}", file=sys.stderr)
     return all_tools
 
+# ==========================================
+# 사용 이력 기록 / 배치 실행 컨텍스트
+# ==========================================
+# 배치 실행(call_tools_batch) 중에는 이력을 바로 INSERT 하지 않고 버퍼에 모았다가 한 번에 기록
+# {"usage_logs": [...], "openapi_logs": [...]} or None(단건 실행)
+_batch_context: ContextVar[Optional[dict]] = ContextVar("mcp_batch_context", default=None)
+# 도구 1회 실행 중 기록한 사용 이력 건수 {"logged": int} (사용량 예약 확정용)
+_usage_tracker: ContextVar[Optional[dict]] = ContextVar("mcp_usage_tracker", default=None)
+
+# 배치 1회 최대 도구 호출 수 / 기본 동시 실행 수
+BATCH_MAX_CALLS = int(os.getenv("MCP_PROXY_BATCH_MAX_CALLS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("MCP_PROXY_BATCH_CONCURRENCY", "4"))
+# 가용성 확보를 위한 시스템 도구 - 일일 사용량 제한 체크/예약 대상에서 제외
+SYSTEM_TOOLS = ("refresh_tools",)
+
+
+async def _record_tool_usage(**kwargs):
+    """MCP Tool 사용 이력 기록 (배치 실행 중이면 버퍼에 추가)"""
+    tracker = _usage_tracker.get()
+    if tracker is not None:
+        tracker["logged"] += 1
+    batch = _batch_context.get()
+    if batch is not None:
+        batch["usage_logs"].append(kwargs)
+    else:
+        await asyncio.to_thread(log_tool_usage, **kwargs)
+
+
+async def _record_openapi_usage(data: dict):
+    """OpenAPI 사용 이력 기록 (배치 실행 중이면 버퍼에 추가)"""
+    batch = _batch_context.get()
+    if batch is not None:
+        batch["openapi_logs"].append(data)
+    else:
+        await asyncio.to_thread(log_openapi_usage, data)
+
+
+async def _notify_usage_threshold(user_uid: int, usage_before: int, usage_after: int, daily_limit: int):
+    """사용량이 usage_before -> usage_after 로 늘 때 임계치(80%, 90%, 100%)를 지나면 시스템 알림 발송 (DB 기록은 threadpool)"""
+    for threshold in [0.8, 0.9, 1.0]:
+        if usage_before < int(daily_limit * threshold) <= usage_after:
+            await asyncio.to_thread(
+                send_system_notification,
+                receive_user_uid=user_uid, 
+                title="MCP 사용량 임계치 도달", 
+                message=f"MCP 도구 사용량이 제한의 {int(threshold*100)}%에 근접/도달함."
+            )
+
+
+# ==========================================
+# 세션별 동시 실행 수 제한
+# ==========================================
+# lowlevel Server 는 요청마다 태스크를 만들어 처리하므로, 한 세션에서 동시에 들어온 도구 호출은 병렬 실행됨
+# -> 세션 1개가 서버 자원을 독점하지 않도록 세션별 동시 실행 수를 제한
+SESSION_CONCURRENCY = int(os.getenv("MCP_SESSION_CONCURRENCY", "8"))
+_session_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_session_semaphore() -> Optional[asyncio.Semaphore]:
+    """현재 MCP 세션의 세마포어 (REST Proxy 처럼 MCP 요청 컨텍스트 밖에서 호출되면 None)"""
+    try:
+        session = mcp.request_context.session
+    except LookupError:
+        return None
+    semaphore = _session_semaphores.get(session)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, SESSION_CONCURRENCY))
+        _session_semaphores[session] = semaphore
+    return semaphore
+
+
 # ==========================================
 # 2. 도구 실행 처리 (call_tool)
 # ==========================================
 @mcp.call_tool()
 async def call_tool(name: str, arguments: dict):
-    """요청 및 인증 정보 확인 후 해당 도구 실행 및 결과 반환"""
+    """요청 및 인증 정보 확인 후 해당 도구 실행 및 결과 반환 (세션별 동시 실행 수 제한)"""
+    semaphore = _get_session_semaphore()
+    if semaphore is None:
+        return await _execute_tool(name, arguments)
+    async with semaphore:
+        return await _execute_tool(name, arguments)
+
+
+async def _execute_tool(name: str, arguments: dict):
+    """
+    call_tool 실제 처리부
+    - DB 조회/기록, SMTP 발송 등 블로킹 작업은 asyncio.to_thread 로 실행하여 이벤트 루프를 막지 않음
+    """
     
     log_msg = f"Tool execution requested: {name} with args {arguments}"
     logger.info(log_msg)
-    print(f"[DEBUG] {log_msg}")
+    print(f"[DEBUG] {log_msg}", file=sys.stderr)
     
     # [1-1] 사용자 인증 정보 획득 (Context 기반) 및 필요한 권한 함수 임포트
     current_user = get_current_user()
@@ -307,12 +414,11 @@ async def call_tool(name: str, arguments: dict):
     
     # [1-2] Stdio/Claude Desktop 환경 대응 (환경변수 'token' 기반 세션 복구 시도)
     if not current_user:
-        import os
         from src.db.access_token import get_user_by_active_token
         token_env = os.environ.get('token')
         if token_env:
             try:
-                user = get_user_by_active_token(token_env)
+                user = await asyncio.to_thread(get_user_by_active_token, token_env)
                 if user:
                     current_user = dict(user)
                     logger.info(f"Authenticated via ENV token: {current_user['user_id']}")
@@ -331,24 +437,43 @@ async def call_tool(name: str, arguments: dict):
 
     # [2] 전체 일일 사용량 제한 확인 (User/Token 통합)
     # 가용성 확보를 위한 시스템 도구(refresh_tools 등)는 제한 체크에서 제외
-    is_system_tool = name in ["refresh_tools"]
-    
-    daily_usage = get_user_daily_usage(user_uid=user_uid, token_id=token_id)
-    daily_limit = get_user_limit(user_uid=user_uid, role=role, token_id=token_id)
+    is_system_tool = name in SYSTEM_TOOLS
     
-    if not is_system_tool and daily_limit != -1 and daily_usage >= daily_limit:
-        logger.warning(f"Limit exceeded: {daily_usage}/{daily_limit}")
-        return [TextContent(type="text", text=f"Error: Daily usage limit exceeded ({daily_usage}/{daily_limit}).")]
-
-    # 임계치(80%, 90%, 100%) 도달 시 시스템 알림 발송 (시스템 도구가 아닐 때만)
-    if not is_system_tool and daily_limit != -1 and user_uid:
-        for threshold in [0.8, 0.9, 1.0]:
-            if daily_usage + 1 == int(daily_limit * threshold):
-                send_system_notification(
-                    receive_user_uid=user_uid, 
-                    title="MCP 사용량 임계치 도달", 
-                    message=f"MCP 도구 사용량이 제한의 {int(threshold*100)}%에 근접/도달함."
-                )
+    # 사용량 1건 예약 (제한 확인 + 확보를 원자적으로 -> 동시 호출도 제한을 넘지 않음)
+    # 배치 실행(call_tools_batch)은 배치 전체 건수를 한 번에 예약하므로 건별 예약 생략
+    in_batch = _batch_context.get() is not None
+    reservation = None
+    if not in_batch and not is_system_tool:
+        daily_limit = await asyncio.to_thread(get_user_limit, user_uid=user_uid, role=role, token_id=token_id)
+        reservation = await asyncio.to_thread(quota_manager.reserve, user_uid, token_id, daily_limit)
+
+        if not reservation.count:
+            logger.warning(f"Limit exceeded: {reservation.used_before}/{daily_limit}")
+            return [TextContent(type="text", text=f"Error: Daily usage limit exceeded ({reservation.used_before}/{daily_limit}).")]
+
+        # 임계치(80%, 90%, 100%) 도달 시 시스템 알림 발송 (시스템 도구가 아닐 때만)
+        if daily_limit != -1 and user_uid:
+            await _notify_usage_threshold(user_uid, reservation.used_before, reservation.used_before + 1, daily_limit)
+
+    # 도구 실행 -> 사용 이력이 기록된 건수만큼 사용량 확정 (이력이 없으면 예약 반환)
+    tracker = {"logged": 0}
+    tracker_token = _usage_tracker.set(tracker)
+    try:
+        return await _run_tool(name, arguments, current_user)
+    finally:
+        _usage_tracker.reset(tracker_token)
+        if reservation is not None:
+            quota_manager.commit(reservation, used=tracker["logged"])
+        elif not in_batch and tracker["logged"]:
+            await asyncio.to_thread(quota_manager.add_usage, user_uid, token_id, tracker["logged"])
+
+
+async def _run_tool(name: str, arguments: dict, current_user: dict):
+    """인증/사용량 확인을 마친 도구 호출 실행 (정적 -> OpenAPI -> Custom 순으로 탐색)"""
+    user_uid = current_user.get('uid')
+    token_id = current_user.get('_token_id')
+    user_id = current_user.get('user_id')
+    role = current_user.get('role')
 
     # 내부 처리용 인자 제거 및 복사
     tool_args = arguments.copy()
@@ -364,7 +489,7 @@ async def call_tool(name: str, arguments: dict):
             b = tool_args.get("b", 0)
             result_val = str(a + b)
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "subtract":
@@ -373,7 +498,7 @@ async def call_tool(name: str, arguments: dict):
             b = tool_args.get("b", 0)
             result_val = str(a - b)
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "hellouser":
@@ -381,7 +506,7 @@ async def call_tool(name: str, arguments: dict):
             user_name = tool_args.get("name", "User")
             result_val = f"Hello {user_name}"
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "get_user_info":
@@ -389,7 +514,7 @@ async def call_tool(name: str, arguments: dict):
             if role != 'ROLE_ADMIN':
                 return [TextContent(type="text", text="Error: Admin privileges required.")]
             target_id = tool_args.get("user_id")
-            target_user = get_user(target_id)
+            target_user = await asyncio.to_thread(get_user, target_id)
             if not target_user:
                 result_val = f"User not found: {target_id}"
                 is_success = False
@@ -399,7 +524,7 @@ async def call_tool(name: str, arguments: dict):
                 result_val = json.dumps(user_dict, default=str, ensure_ascii=False)
                 is_success = True
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "get_current_time":
@@ -408,11 +533,14 @@ async def call_tool(name: str, arguments: dict):
             now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             result_val = f"현재 서버 시간: {now_str}"
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=True, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "send_email":
             # 즉시 발송 혹은 예약 발송 처리
+            # (메일/스케줄러 모듈은 이 도구를 호출할 때만 로드 -> stdio 모드 기동 시간 단축)
+            from src.utils.mailer import EmailSender
+            from src.scheduler import add_scheduled_job
             recipient = tool_args.get("recipient")
             subject = tool_args.get("subject") or "AI Assistant Message"
             content = tool_args.get("content")
@@ -423,15 +551,15 @@ async def call_tool(name: str, arguments: dict):
             is_scheduled = bool(formatted_dt)
             
             try:
-                log_id = log_email(user_uid=None, recipient=recipient, subject=subject, content=content, is_scheduled=is_scheduled, scheduled_dt=formatted_dt)
+                log_id = await asyncio.to_thread(log_email, user_uid=None, recipient=recipient, subject=subject, content=content, is_scheduled=is_scheduled, scheduled_dt=formatted_dt)
                 if not is_scheduled:
                     sender = EmailSender()
-                    success, err = sender.send_immediate(recipient, subject, content)
-                    update_email_status(log_id, 'SENT' if success else 'FAILED', err)
+                    success, err = await asyncio.to_thread(sender.send_immediate, recipient, subject, content)
+                    await asyncio.to_thread(update_email_status, log_id, 'SENT' if success else 'FAILED', err)
                     result_val = f"이메일 발송 완료 (Log ID: {log_id})" if success else f"이메일 발송 실패: {err}"
                     is_success = success
                 else:
-                    add_scheduled_job(log_id, formatted_dt)
+                    await asyncio.to_thread(add_scheduled_job, log_id, formatted_dt)
                     result_val = f"이메일 예약 완료 (Log ID: {log_id}, 시간: {formatted_dt})"
                     is_success = True
             except Exception as e_em:
@@ -439,7 +567,7 @@ async def call_tool(name: str, arguments: dict):
                 is_success = False
             
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "get_tool_analysis":
@@ -450,7 +578,7 @@ async def call_tool(name: str, arguments: dict):
             result_val = json.dumps(analysis, ensure_ascii=False, indent=2)
             is_success = (analysis.get("status") == "success")
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         if name == "refresh_tools":
@@ -464,24 +592,28 @@ async def call_tool(name: str, arguments: dict):
                 is_success = False
             
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         # ------------------------------------------
         # Case 2: OpenAPI 도구 실행 로직
         # ------------------------------------------
-        openapi_config = get_openapi_by_tool_id(name)
+        openapi_config = await asyncio.to_thread(get_openapi_by_tool_id, name)
         if openapi_config:
             # [2-1] 외부 액세스 토큰 권한 체크
             if token_id:
-                if not check_access_token_permission(token_id, name, "OPENAPI"):
+                if not await asyncio.to_thread(check_access_token_permission, token_id, name, "OPENAPI"):
                     logger.warning(f"Access Denied: Token {token_id} lacks permission for OpenAPI {name}")
                     return [TextContent(type="text", text=f"Error: Access Denied for this OpenAPI tool ('{name}').")]
             
             # [2-2] OpenAPI별 개별 사용량 제한 확인
-            openapi_max = get_openapi_limit(user_uid=user_uid, user_id=user_id, token_id=token_id, role=role)
+            openapi_max = await asyncio.to_thread(get_openapi_limit, user_uid=user_uid, user_id=user_id, token_id=token_id, role=role)
             if openapi_max != -1:
-                openapi_usage = get_user_openapi_daily_usage(user_uid=user_uid, token_id=token_id)
+                openapi_usage = await asyncio.to_thread(get_user_openapi_daily_usage, user_uid=user_uid, token_id=token_id)
+                # 배치 실행 중 아직 기록되지 않은(버퍼에 있는) OpenAPI 호출도 포함
+                batch = _batch_context.get()
+                if batch is not None:
+                    openapi_usage += len(batch["openapi_logs"])
                 if openapi_usage >= openapi_max:
                     return [TextContent(type="text", text=f"Error: OpenAPI '{name}' limit exceeded.")]
 
@@ -531,7 +663,7 @@ async def call_tool(name: str, arguments: dict):
                     except: pass
 
                 # OpenAPI 실행 로그 및 통계 DB 기록
-                log_openapi_usage({
+                await _record_openapi_usage({
                     "user_uid": user_uid, "token_id": token_id, "tool_id": name,
                     "method": method, "url": str(response.url), "status_code": status_code,
                     "success": 'SUCCESS' if is_success else 'FAIL', "ip_addr": "MCP-INTERNAL"
@@ -541,14 +673,13 @@ async def call_tool(name: str, arguments: dict):
         # ------------------------------------------
         # Case 3: Custom 도구(SQL/Python) 실행 로직
         # ------------------------------------------
-        active_custom_tools = get_active_tools()
-        print(active_custom_tools)
-        target_tool = next((t for t in active_custom_tools if t['name'] == name), None)
+        # 활성 커스텀 도구 스냅샷 (레지스트리 버전이 그대로면 DB 재조회 없음)
+        target_tool = (await asyncio.to_thread(custom_tool_snapshot.get)).get(name)
         
         if target_tool:
             # [3-1] 외부 액세스 토큰 권한 체크
             if token_id:
-                if not check_access_token_permission(token_id, name, "CUSTOM"):
+                if not await asyncio.to_thread(check_access_token_permission, token_id, name, "CUSTOM"):
                     logger.warning(f"Access Denied: Token {token_id} lacks permission for Custom Tool {name}")
                     return [TextContent(type="text", text=f"Error: Access Denied for this Custom tool ('{name}').")]
 
@@ -568,7 +699,7 @@ async def call_tool(name: str, arguments: dict):
             # 실행 성공 여부 판단 및 로그 기록
             is_success = not result_val.startswith("Error")
             if user_uid or token_id:
-                log_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
+                await _record_tool_usage(user_uid=user_uid, token_id=token_id, tool_nm=name, tool_params=str(tool_args), success=is_success, result=result_val)
             return [TextContent(type="text", text=result_val)]
 
         # 해당 이름의 도구가 존재하지 않거나 비활성화된 경우
@@ -577,3 +708,83 @@ async def call_tool(name: str, arguments: dict):
     except Exception as e:
         logger.error(f"Execution error: {e}")
         return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+
+# ==========================================
+# 3. 여러 도구 일괄 실행 (call_tools_batch)
+# ==========================================
+async def call_tools_batch(calls: list, max_concurrency: int = None) -> dict:
+    """
+    여러 도구 호출을 동시 실행 수 제한 하에 병렬 실행하고, 호출별 결과와 소요 시간을 반환합니다.
+    - calls: [{"tool": 도구 이름, "arguments": dict}, ...] (요청 순서대로 결과 반환)
+    - 인증/일일 사용량 예약은 배치당 1회 (남은 사용량을 넘는 호출은 실행하지 않고 에러로 반환)
+    - 사용 이력은 배치 종료 후 한 트랜잭션으로 기록
+    - max_concurrency 는 BATCH_CONCURRENCY(MCP_PROXY_BATCH_CONCURRENCY) 이하로 제한
+    """
+    started = time.perf_counter()
+    current_user = get_current_user()
+    if not current_user:
+        raise PermissionError("Authentication required (invalid or missing token).")
+
+    user_uid = current_user.get('uid')
+    token_id = current_user.get('_token_id')
+    role = current_user.get('role')
+
+    # [1] 배치 전체 건수만큼 일일 사용량 예약 (시스템 도구는 제외, 남은 만큼만 확보)
+    counted = [i for i, call in enumerate(calls) if call["tool"] not in SYSTEM_TOOLS]
+    daily_limit = await asyncio.to_thread(get_user_limit, user_uid=user_uid, role=role, token_id=token_id)
+    reservation = await asyncio.to_thread(
+        quota_manager.reserve, user_uid, token_id, daily_limit, len(counted), True
+    )
+    daily_usage = reservation.used_before
+    rejected = set(counted[reservation.count:])
+    if daily_limit != -1 and user_uid and reservation.count:
+        await _notify_usage_threshold(user_uid, daily_usage, daily_usage + reservation.count, daily_limit)
+
+    # [2] 동시 실행 수 제한 하에 병렬 실행 (이력은 버퍼에 모음)
+    semaphore = asyncio.Semaphore(max(1, min(max_concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)))
+
+    async def run_one(index: int, call: dict) -> dict:
+        item_started = time.perf_counter()
+        if index in rejected:
+            text = f"Error: Daily usage limit exceeded ({daily_usage}/{daily_limit})."
+        else:
+            async with semaphore:
+                item_started = time.perf_counter()
+                try:
+                    contents = await call_tool(call["tool"], call.get("arguments") or {})
+                    text = contents[0].text if contents and hasattr(contents[0], "text") else str(contents)
+                except Exception as e:
+                    text = f"Error: {str(e)}"
+        return {
+            "index": index,
+            "tool": call["tool"],
+            "success": "Error" not in text and "WARN" not in text,
+            "result": text,
+            "elapsed_ms": round((time.perf_counter() - item_started) * 1000, 2),
+        }
+
+    batch = {"usage_logs": [], "openapi_logs": []}
+    token = _batch_context.set(batch)
+    try:
+        results = await asyncio.gather(*(run_one(i, call) for i, call in enumerate(calls)))
+    finally:
+        _batch_context.reset(token)
+        # 사용 이력이 남은 건수만 확정, 나머지 예약은 반환 (예약하지 않은 시스템 도구 이력은 제외)
+        quota_manager.commit(
+            reservation, used=sum(1 for log in batch["usage_logs"] if log["tool_nm"] not in SYSTEM_TOOLS)
+        )
+
+    # [3] 사용 이력 일괄 기록 (커밋 1회)
+    if batch["usage_logs"]:
+        await asyncio.to_thread(log_tool_usage_batch, batch["usage_logs"])
+    if batch["openapi_logs"]:
+        await asyncio.to_thread(log_openapi_usage_batch, batch["openapi_logs"])
+
+    succeeded = sum(1 for r in results if r["success"])
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -1,9 +1,14 @@
 import os
-import shutil
+import sqlite3
 import datetime
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
-from src.db.connection import DB_PATH, PROJECT_ROOT
+from src.db.connection import get_db_connection, PROJECT_ROOT
+from src.db.migrations import plan_migrations, apply_migrations, get_migration_history
+from src.db.retention import get_retention_report, run_retention, enable_incremental_vacuum
+from src.utils.tool_registry_cache import invalidate_tool_caches
+from src.utils.quota_manager import quota_manager
+from src.utils.shared_state import get_shared_state
 from src.dependencies import get_current_active_user
 
 router = APIRouter(prefix="/api/admin/db", tags=["Admin DB"])
@@ -20,6 +25,16 @@ BACKUP_DIR = os.path.join(PROJECT_ROOT, "backups")
 # Ensure backup directory exists
 os.makedirs(BACKUP_DIR, exist_ok=True)
 
+# SQLite Online Backup API 로 DB 복사
+# - WAL 모드에서는 최신 데이터가 -wal 파일에 남아 있을 수 있어 파일 단위 복사(shutil.copy2)로는 누락/손상 위험이 있음
+# - backup API 는 사용 중인 DB 에서도 일관된 스냅샷을 복사하고, 복원 시에도 운영 DB 의 잠금을 지켜서 덮어씀
+def _copy_database(src_conn: sqlite3.Connection, dst_conn: sqlite3.Connection):
+    try:
+        src_conn.backup(dst_conn)
+    finally:
+        src_conn.close()
+        dst_conn.close()
+
 # DB 백업 생성 API
 @router.post("/backup")
 async def create_backup(
@@ -35,8 +50,8 @@ async def create_backup(
         backup_filename = f"{timestamp}.db"
         backup_path = os.path.join(BACKUP_DIR, backup_filename)
         
-        # 현재 DB 파일을 백업 디렉토리로 복사 (**중요**)
-        shutil.copy2(DB_PATH, backup_path)
+        # 현재 DB 를 백업 디렉토리로 복사 (**중요**)
+        _copy_database(get_db_connection(), sqlite3.connect(backup_path))
         
         return {"message": "Backup created successfully", "filename": backup_filename}
     except Exception as e:
@@ -91,12 +106,20 @@ async def restore_db(
         # 1. 현재 DB 파일의 안전한 백업 생성
         safety_timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%m-%S_safety")
         safety_path = os.path.join(BACKUP_DIR, f"{safety_timestamp}.db")
-        shutil.copy2(DB_PATH, safety_path)
+        _copy_database(get_db_connection(), sqlite3.connect(safety_path))
         
         # 2. 선택한 백업 파일로 복원
-        # => {shutil.copy2}는 파일을 덮어쓰므로, 복원 시 현재 실행 중인 애플리케이션이 DB 파일을 사용 중이면 오류가 발생할 수 있음.
-        #    이 경우, 애플리케이션을 재시작해야 함.
-        shutil.copy2(backup_path, DB_PATH)
+        # => backup API 로 운영 DB 에 페이지 단위로 덮어쓰므로 실행 중에도 재시작 없이 반영됨
+        _copy_database(sqlite3.connect(backup_path), get_db_connection())
+
+        # 3. 이전 스키마 버전의 백업이면 최신 버전까지 migration 적용
+        apply_migrations()
+        # 4. 도구 레지스트리 버전 번호가 백업 시점으로 돌아가므로 도구 목록 캐시 무효화
+        invalidate_tool_caches()
+        # 5. 사용량 카운터도 백업 시점 값으로 다시 로드
+        quota_manager.reset()
+        # 6. 다른 워커의 캐시도 무효화 (src/sse_server.py 'cache.invalidate' 구독)
+        get_shared_state().publish("cache.invalidate", {"reason": "db_restore"})
         
         return {"message": "Database restored successfully. Please refresh the page."}
     except Exception as e:
@@ -121,4 +144,72 @@ async def delete_backup(
         os.remove(backup_path)
         return {"message": "Backup deleted successfully"}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+# 스키마 Migration 계획(dry-run) + 적용 이력 조회 API
+@router.get("/migrations")
+async def get_migrations(
+    user: dict = Depends(get_current_active_user)
+):
+    # 관리자만 접근 가능
+    if user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin permission required")
+
+    plan = plan_migrations()
+    plan["history"] = get_migration_history()
+    return plan
+
+# 미적용 스키마 Migration 적용 API
+@router.post("/migrations/apply")
+async def apply_pending_migrations(
+    user: dict = Depends(get_current_active_user)
+):
+    # 관리자만 접근 가능
+    if user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin permission required")
+
+    try:
+        applied = apply_migrations()
+        return {"applied": [m['version'] for m in applied], **plan_migrations()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 보관 정책 dry-run 리포트 API (삭제 대상 건수/회수 용량 추정)
+@router.get("/retention")
+async def retention_report(
+    user: dict = Depends(get_current_active_user)
+):
+    # 관리자만 접근 가능
+    if user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin permission required")
+
+    return get_retention_report()
+
+# 보관 정책 즉시 실행 API
+@router.post("/retention/run")
+def retention_run(
+    user: dict = Depends(get_current_active_user)
+):
+    # 관리자만 접근 가능
+    if user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin permission required")
+
+    # 오래 걸릴 수 있으므로 def 로 선언하여 threadpool 에서 실행 (이벤트 루프 차단 방지)
+    try:
+        return run_retention()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# auto_vacuum=INCREMENTAL 전환 API (VACUUM - DB 파일 전체를 다시 쓰므로 사용량이 적을 때 한 번 실행)
+@router.post("/vacuum")
+def vacuum_db(
+    user: dict = Depends(get_current_active_user)
+):
+    # 관리자만 접근 가능
+    if user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin permission required")
+
+    # DB 크기에 비례하여 오래 걸리므로 def 로 선언하여 threadpool 에서 실행
+    try:
+        return enable_incremental_vacuum()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,129 +1,179 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
-import pandas as pd
-import io
+from pydantic import BaseModel
 import urllib.parse
+import uuid
 from datetime import datetime
-from src.db import get_all_tool_usage_logs, get_all_openapi_usage_logs
+from src.db import iter_tool_usage_logs, iter_openapi_usage_logs, count_tool_usage_logs, count_openapi_usage_logs
+from src.db.export_job import create_export_job, get_export_job, get_export_jobs
 from src.dependencies import get_current_user_jwt
+from src.utils.export_writer import iter_csv, iter_xlsx, CSV_MEDIA_TYPE, XLSX_MEDIA_TYPE
+from src.utils.export_jobs import submit_export_job
+from src.utils.shared_state import get_shared_state
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 """
     MCP Tool 사용 이력 내보내기
+    - DB 커서를 chunk 단위로 읽으면서 CSV 행 / Excel(write_only) 행을 바로 흘려 보냄
+      (이력 건수와 무관하게 메모리 사용량 일정)
+    - 대용량은 /jobs 로 백그라운드 작업을 등록하고 진행률 확인 후 /jobs/{job_id}/download 로 다운로드
+      (내보내기 파일은 작업을 등록한 관리자만 다운로드, /api/files 목록/다운로드에서는 제외)
 """
 
+# MCP Tool 사용 이력 컬럼 (한글 헤더, 출력 순서)
+MCP_USAGE_COLUMNS = {
+    "reg_dt": "시간",
+    "user_nm": "사용자명",
+    "user_id": "사용자ID",
+    "tool_nm": "도구명",
+    "tool_success": "성공여부",
+    "tool_params": "파라미터",
+    "tool_result": "결과"
+}
+
+# OpenAPI 사용 이력 컬럼 (한글 헤더, 출력 순서)
+OPENAPI_USAGE_COLUMNS = {
+    "reg_dt": "시간",
+    "user_nm": "사용자명",
+    "user_id": "사용자ID",
+    "token_name": "토큰명",
+    "tool_id": "도구ID",
+    "method": "메서드",
+    "url": "URL",
+    "status_code": "상태코드",
+    "success": "성공여부",
+    "error_msg": "에러메시지",
+    "ip_addr": "IP주소"
+}
+
+
+# 포맷별 스트리밍 응답 생성
+def _stream_export(rows, column_map: dict, format: str, filename: str, sheet_name: str):
+    if format == "csv":
+        response = StreamingResponse(iter_csv(rows, column_map), media_type=CSV_MEDIA_TYPE)
+        filename += ".csv"
+    else:
+        response = StreamingResponse(iter_xlsx(rows, column_map, sheet_name), media_type=XLSX_MEDIA_TYPE)
+        filename += ".xlsx"
+
+    encoded_filename = urllib.parse.quote(filename)
+    response.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{encoded_filename}"
+    return response
+
 # MCP Tool 사용 이력 내보내기
 @router.get("/mcp/usage")
 async def export_mcp_usage(
-    format: str = Query("excel", regex="^(csv|excel)$"),
+    format: str = Query("excel", pattern="^(csv|excel)$"),
     user_id: str | None = None,
     tool_nm: str | None = None,
     success: str | None = None,
+    search: str | None = None,
     current_user: dict = Depends(get_current_user_jwt)
 ):
     """MCP 도구 사용 이력을 CSV 또는 Excel로 내보내기."""
     if current_user['role'] != 'ROLE_ADMIN':
         raise HTTPException(status_code=403, detail="Admin access required")
-    
-    logs = get_all_tool_usage_logs(user_id, tool_nm, success)
-    df = pd.DataFrame(logs)
-    
-    # 컬럼명 한글 변환 및 순서 조정
-    column_map = {
-        "reg_dt": "시간",
-        "user_nm": "사용자명",
-        "user_id": "사용자ID",
-        "tool_nm": "도구명",
-        "tool_success": "성공여부",
-        "tool_params": "파라미터",
-        "tool_result": "결과"
-    }
-    
-    if not df.empty:
-        df = df[list(column_map.keys())].rename(columns=column_map)
-    else:
-        df = pd.DataFrame(columns=list(column_map.values()))
 
+    rows = iter_tool_usage_logs(user_id, tool_nm, success, search)
     filename = f"mcp_usage_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    
-    # if format == "csv":
-    #     stream = io.StringIO()
-    #     df.to_csv(stream, index=False, encoding='utf-8-sig')
-    #     response = StreamingResponse(
-    #         iter([stream.getvalue()]),
-    #         media_type="text/csv"
-    #     )
-    #     filename += ".csv"
-    # else:
-    stream = io.BytesIO()
-    with pd.ExcelWriter(stream, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='MCP Usage')
-    response = StreamingResponse(
-        io.BytesIO(stream.getvalue()),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    filename += ".xlsx"
-    
-    encoded_filename = urllib.parse.quote(filename)
-    response.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{encoded_filename}"
-    return response
+    return _stream_export(rows, MCP_USAGE_COLUMNS, format, filename, 'MCP Usage')
 
 # OpenAPI 사용 이력 내보내기
 @router.get("/openapi/usage")
 async def export_openapi_usage(
-    format: str = Query("excel", regex="^(csv|excel)$"),
+    format: str = Query("excel", pattern="^(csv|excel)$"),
     current_user: dict = Depends(get_current_user_jwt)
 ):
     """OpenAPI 사용 이력을 CSV 또는 Excel로 내보내기."""
     if current_user['role'] != 'ROLE_ADMIN':
         raise HTTPException(status_code=403, detail="Admin access required")
-    
-    logs = get_all_openapi_usage_logs()
-    df = pd.DataFrame(logs)
-    
-    # 컬럼명 한글 변환 및 순서 조정
-    column_map = {
-        "reg_dt": "시간",
-        "user_nm": "사용자명",
-        "user_id": "사용자ID",
-        "token_name": "토큰명",
-        "tool_id": "도구ID",
-        "method": "메서드",
-        "url": "URL",
-        "status_code": "상태코드",
-        "success": "성공여부",
-        "error_msg": "에러메시지",
-        "ip_addr": "IP주소"
-    }
-    
-    if not df.empty:
-        # 필터링 (필요한 컬럼만)
-        available_cols = [c for c in column_map.keys() if c in df.columns]
-        df = df[available_cols].rename(columns={c: column_map[c] for c in available_cols})
-    else:
-        df = pd.DataFrame(columns=list(column_map.values()))
 
+    rows = iter_openapi_usage_logs()
     filename = f"openapi_usage_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    
-    # if format == "csv":
-    #     stream = io.StringIO()
-    #     df.to_csv(stream, index=False, encoding='utf-8-sig')
-    #     response = StreamingResponse(
-    #         iter([stream.getvalue()]),
-    #         media_type="text/csv"
-    #     )
-    #     filename += ".csv"
-    # else:
-    stream = io.BytesIO()
-    with pd.ExcelWriter(stream, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='OpenAPI Usage')
-    response = StreamingResponse(
-        io.BytesIO(stream.getvalue()),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    filename += ".xlsx"
-    
-    encoded_filename = urllib.parse.quote(filename)
-    response.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{encoded_filename}"
-    return response
+    return _stream_export(rows, OPENAPI_USAGE_COLUMNS, format, filename, 'OpenAPI Usage')
+
+
+class ExportJobRequest(BaseModel):
+    target: str = "mcp"                 # mcp | openapi
+    format: str = "excel"               # csv | excel
+    user_id: str | None = None
+    tool_nm: str | None = None
+    success: str | None = None
+    search: str | None = None
+
+# 작업 응답 (진행률 % 포함)
+def _job_response(job: dict):
+    total = job.get('total_cnt') or 0
+    job['progress'] = 100 if job['status'] == 'DONE' else (int(job['processed_cnt'] * 100 / total) if total else 0)
+    job['download_url'] = f"/api/export/jobs/{job['job_id']}/download" if job.get('file_id') else None
+    return job
+
+# 백그라운드 내보내기 작업 등록
+@router.post("/jobs", status_code=202)
+async def submit_export(
+    req: ExportJobRequest,
+    current_user: dict = Depends(get_current_user_jwt)
+):
+    """사용 이력 내보내기를 백그라운드 작업으로 등록 (요청은 즉시 반환)."""
+    if current_user['role'] != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if req.target not in ("mcp", "openapi"):
+        raise HTTPException(status_code=400, detail="target must be 'mcp' or 'openapi'")
+    if req.format not in ("csv", "excel"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'excel'")
+
+    job_id = str(uuid.uuid4())
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if req.target == "mcp":
+        filters = {"user_id": req.user_id, "tool_nm": req.tool_nm, "success": req.success, "search": req.search}
+        count_rows = lambda: count_tool_usage_logs(req.user_id, req.tool_nm, req.success, req.search)
+        iter_rows = lambda: iter_tool_usage_logs(req.user_id, req.tool_nm, req.success, req.search)
+        column_map, filename, sheet_name = MCP_USAGE_COLUMNS, f"mcp_usage_{timestamp}", 'MCP Usage'
+    else:
+        filters = {}
+        count_rows, iter_rows = count_openapi_usage_logs, iter_openapi_usage_logs
+        column_map, filename, sheet_name = OPENAPI_USAGE_COLUMNS, f"openapi_usage_{timestamp}", 'OpenAPI Usage'
+
+    create_export_job(job_id, req.target.upper() + "_USAGE", req.format, filters,
+                      current_user.get('uid'), current_user['user_id'], owner=get_shared_state().worker_id)
+    submit_export_job(job_id, current_user, count_rows, iter_rows, column_map, req.format, filename, sheet_name)
+    return _job_response(get_export_job(job_id))
+
+# 내 내보내기 작업 목록
+@router.get("/jobs")
+async def list_export_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user_jwt)
+):
+    """내가 등록한 내보내기 작업 목록 (최신순)."""
+    return {"jobs": [_job_response(job) for job in get_export_jobs(current_user['user_id'], limit)]}
+
+# 내보내기 작업 상태(진행률) 조회
+@router.get("/jobs/{job_id}")
+async def get_export_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user_jwt)
+):
+    """내보내기 작업 상태/진행률 조회. 완료 시 download_url 포함."""
+    job = get_export_job(job_id)
+    if not job or job['reg_uid'] != current_user['user_id']:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _job_response(job)
+
+# 내보내기 파일 다운로드 (작업을 등록한 관리자만)
+@router.get("/jobs/{job_id}/download")
+async def download_export_file(
+    job_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user_jwt)
+):
+    """완료된 내보내기 파일 다운로드 (Range / ETag 지원)."""
+    if current_user['role'] != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    job = get_export_job(job_id)
+    if not job or job['reg_uid'] != current_user['user_id'] or not job.get('file_id'):
+        raise HTTPException(status_code=404, detail="Export file not found")
+
+    from src.routers.files import download_file
+    return await download_file(job['file_id'], request, current_user)
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response, RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
+import asyncio
 import os
 import uuid
 from datetime import datetime
-import shutil
 
 from src.dependencies import get_current_user_jwt
-from src.db.file_manager import save_file_metadata, log_file_action, get_file_by_id, increase_download_count
+from src.db.file_manager import save_file_metadata_bulk, get_file_by_id, get_file_blobs, release_file_blobs
+from src.utils.file_storage import save_upload, hash_upload, get_blob_path, remove_quietly, FileTooLargeError
+from src.utils.download_log import download_log
+from src.utils.storage_backend import get_storage_backend
 
 router = APIRouter(
     prefix="/api/files",
@@ -16,7 +20,98 @@ router = APIRouter(
 )
 
 # 기본 저장 경로 설정
-BASE_UPLOAD_DIR = "d:/files/agent_mcp"
+BASE_UPLOAD_DIR = os.getenv("FILE_UPLOAD_DIR", "d:/files/agent_mcp")
+# 파일 1개 최대 크기 (MB, 0 이면 제한 없음)
+FILE_MAX_SIZE_MB = float(os.getenv("FILE_MAX_SIZE_MB", "100"))
+# 저장 방식: date(기본) - 업로드마다 yyyy/mm/dd/{file_id}.ext, cas - 내용(SHA-256) 주소 blob 공유 ({BASE_UPLOAD_DIR}/cas/..)
+FILE_STORAGE_MODE = os.getenv("FILE_STORAGE_MODE", "date").lower()
+# 다운로드 캐시 정책: 인증이 필요한 파일이므로 공유 캐시에는 저장하지 않고, 브라우저는 매번 ETag 로 재검증
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+
+
+def _raise_if_too_large(results: list):
+    too_large = next((r for r in results if isinstance(r, FileTooLargeError)), None)
+    if too_large:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File '{too_large.filename}' exceeds the maximum upload size ({FILE_MAX_SIZE_MB:g} MB)"
+        )
+
+
+# 업로드마다 새 파일로 저장 (date 모드) -> 파일별 (경로, 크기, sha256) 또는 예외
+async def _store_dated(targets: list, max_size: int) -> list:
+    upload_dir = os.path.join(BASE_UPLOAD_DIR, datetime.now().strftime("%Y/%m/%d"))
+    os.makedirs(upload_dir, exist_ok=True)
+    paths = [os.path.join(upload_dir, saved_filename) for _, _, _, saved_filename in targets]
+    results = await asyncio.gather(
+        *(save_upload(file, path, max_size) for (file, _, _, _), path in zip(targets, paths)),
+        return_exceptions=True
+    )
+    if any(isinstance(r, FileTooLargeError) for r in results):
+        # 같은 요청에서 저장한 파일도 삭제
+        for path, result in zip(paths, results):
+            if not isinstance(result, BaseException):
+                remove_quietly(path)
+        _raise_if_too_large(results)
+    return [r if isinstance(r, BaseException) else (path, *r) for path, r in zip(paths, results)]
+
+
+# 내용 주소 blob 으로 저장 (cas 모드) -> 파일별 (blob 경로, 크기, sha256) 또는 예외
+async def _store_cas(targets: list, max_size: int) -> list:
+    # 1. 쓰기 없이 해시만 계산 (크기 초과는 아무것도 쓰기 전에 413)
+    hashed = await asyncio.gather(*(hash_upload(file, max_size) for file, _, _, _ in targets), return_exceptions=True)
+    _raise_if_too_large(hashed)
+
+    # 2. 이미 있는 blob 은 쓰지 않음, 없는 내용만 (같은 요청 안의 중복은 1번) 저장
+    blobs = get_file_blobs([r[1] for r in hashed if not isinstance(r, BaseException)])
+    paths, pending = {}, {}
+    for (file, _, _, _), result in zip(targets, hashed):
+        if isinstance(result, BaseException) or result[1] in paths:
+            continue
+        file_hash = result[1]
+        blob = blobs.get(file_hash)
+        if blob and os.path.exists(blob['blob_path']):
+            paths[file_hash] = blob['blob_path']
+        else:
+            paths[file_hash] = get_blob_path(BASE_UPLOAD_DIR, file_hash)
+            pending[file_hash] = file
+    saved = await asyncio.gather(
+        *(save_upload(file, paths[file_hash], max_size) for file_hash, file in pending.items()),
+        return_exceptions=True
+    )
+    failed = {file_hash: r for file_hash, r in zip(pending, saved) if isinstance(r, BaseException)}
+
+    results = []
+    for result in hashed:
+        if isinstance(result, BaseException):
+            results.append(result)
+        else:
+            file_size, file_hash = result
+            results.append(failed.get(file_hash) or (paths[file_hash], file_size, file_hash))
+    return results
+
+
+# S3 호환 저장소로 전송 (FILE_STORAGE_BACKEND=s3) -> 파일별 (객체 key, 크기, sha256) 또는 예외
+async def _store_s3(storage, targets: list, max_size: int) -> list:
+    # 1. 전송 전에 해시만 계산 (크기 초과는 아무것도 전송하기 전에 413, 해시는 ETag 로 사용)
+    hashed = await asyncio.gather(*(hash_upload(file, max_size) for file, _, _, _ in targets), return_exceptions=True)
+    _raise_if_too_large(hashed)
+
+    # 2. 파일마다 threadpool 작업 1개로 전송 (큰 파일은 multipart, part 는 병렬 전송)
+    key_prefix = datetime.now().strftime("%Y/%m/%d")
+
+    async def put(file, saved_filename, result):
+        if isinstance(result, BaseException):
+            return result
+        key = f"{key_prefix}/{saved_filename}"
+        await run_in_threadpool(storage.put, file.file, key, file.content_type)
+        return (key, *result)
+
+    return await asyncio.gather(
+        *(put(file, saved_filename, result) for (file, _, _, saved_filename), result in zip(targets, hashed)),
+        return_exceptions=True
+    )
+
 
 # [1] 파일 업로드
 @router.post("/upload")
@@ -27,114 +122,178 @@ async def upload_files(
 ):
     """
     다중 파일 업로드 처리
-    저장 경로: d:/files/agent_mcp/yyyy/mm/dd
+    저장 경로: {FILE_UPLOAD_DIR}/yyyy/mm/dd (date 모드, 기본) 또는 {FILE_UPLOAD_DIR}/cas/ab/cd/<sha256> (cas 모드)
+              FILE_STORAGE_BACKEND=s3 이면 버킷의 yyyy/mm/dd/{file_id}.ext (storage_tp = 'S3')
+    - 파일마다 chunk 단위 스트리밍 저장 + SHA-256 계산 (이벤트 루프 밖에서 동시에 진행)
+    - cas 모드: 이미 저장된 내용이면 디스크에 쓰지 않고 blob 참조만 추가 (file_id / 다운로드는 업로드마다 그대로)
+    - 한 파일이라도 FILE_MAX_SIZE_MB 를 넘으면 413 (이번 요청에서 저장한 파일 모두 삭제)
+    - 메타데이터는 한 트랜잭션으로 일괄 저장
     """
-    uploaded_files = []
-    
+    max_size = int(FILE_MAX_SIZE_MB * 1024 * 1024)
+    storage = get_storage_backend()
+    s3 = storage.storage_tp == 'S3'
+    cas = not s3 and FILE_STORAGE_MODE == "cas"
+
     # 0. 배치 ID 처리 (전달받았으면 그대로 쓰고, 없으면 신규 생성)
     if not batch_id:
         batch_id = str(uuid.uuid4())
-    
-    # 1. 저장 경로 생성 (yyyy/mm/dd)
-    today = datetime.now()
-    date_path = today.strftime("%Y/%m/%d")
-    upload_dir = os.path.join(BASE_UPLOAD_DIR, date_path)
-    
-    os.makedirs(upload_dir, exist_ok=True)
-    
+
+    # 1. 파일명 중복 방지 처리 (UUID + 확장자로 저장하여 충돌 완벽 방지)
+    targets = []
     for file in files:
-        try:
-            # 2. 파일명 중복 방지 처리
-            # 원본 파일명에서 확장자 추출
-            filename = file.filename
-            file_ext = os.path.splitext(filename)[1].lower().replace('.', '')
-            
-            # 고유한 file_id 생성
-            file_id = str(uuid.uuid4())
-            
-            # 저장될 파일명 (UUID_원본파일명 형태 또는 UUID만 사용)
-            # 여기서는 UUID + 확장자로 저장하여 충돌 완벽 방지
-            saved_filename = f"{file_id}.{file_ext}" if file_ext else file_id
-            
-            file_path = os.path.join(upload_dir, saved_filename)
-            
-            # 3. 파일 저장
-            # file.file is a SpooledTemporaryFile
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-                
-            # 파일 사이즈 확인
-            file_size = os.path.getsize(file_path)
-            
-            # 4. DB 메타데이터 저장
-            # 상대 경로 또는 URL 생성을 위한 처리 (필요시 수정)
-            # 여기서는 로컬 전체 경로를 file_path로, URL은 일단 path와 동일하게 저장하거나 다운로드 API 경로로 설정
-            # file_url 예시: /files/download/{file_id}
-            
-            file_info = {
-                'file_id': file_id,
-                'file_nm': saved_filename,
-                'org_file_nm': filename,
-                'file_path': file_path,
-                'file_url': f"/files/download/{file_id}", # 가상 URL
-                'file_size': file_size,
-                'file_type': file.content_type,
-                'extension': file_ext,
-                'storage_tp': 'LOCAL',
-                'reg_uid': current_user['user_id'],
-                'batch_id': batch_id
-            }
-            
-            file_uid = save_file_metadata(file_info)
-            
-            # 5. 로그 저장 - (파일 업로드 시에는 로그 저장 안 함, 다운로드 시에만 저장)
-            # log_file_action(file_uid, file_id, current_user['user_id'])
-            
-            uploaded_files.append({
-                "file_uid": file_uid,
-                "file_id": file_id,
-                "org_file_nm": filename,
-                "file_url": file_info['file_url']
-            })
-            
-        except Exception as e:
-            print(f"Error uploading file {file.filename}: {e}")
-            # 개별 파일 실패 시 전체 실패로 할지, 성공한 것만 리턴할지 결정 필요
-            # 일단 에러 로그만 남기고 계속 진행하도록 함
+        file_ext = os.path.splitext(file.filename)[1].lower().replace('.', '')
+        file_id = str(uuid.uuid4())
+        saved_filename = f"{file_id}.{file_ext}" if file_ext else file_id
+        targets.append((file, file_id, file_ext, saved_filename))
+
+    # 2. 파일 저장
+    if s3:
+        results = await _store_s3(storage, targets, max_size)
+    else:
+        results = await (_store_cas(targets, max_size) if cas else _store_dated(targets, max_size))
+
+    # 3. DB 메타데이터 일괄 저장
+    file_infos, stored_files = [], []
+    for (file, file_id, file_ext, saved_filename), result in zip(targets, results):
+        if isinstance(result, BaseException):
+            # 개별 파일 실패는 에러 로그만 남기고 나머지 파일은 계속 진행
+            print(f"Error uploading file {file.filename}: {result}")
             continue
+        file_path, file_size, file_hash = result
+        file_infos.append({
+            'file_id': file_id,
+            'file_nm': saved_filename,
+            'org_file_nm': file.filename,
+            'file_path': file_path,
+            'file_url': f"/files/download/{file_id}", # 가상 URL
+            'file_size': file_size,
+            'file_type': file.content_type,
+            'extension': file_ext,
+            'storage_tp': 'S3' if s3 else 'CAS' if cas else 'LOCAL',
+            'reg_uid': current_user['user_id'],
+            'batch_id': batch_id,
+            'file_hash': file_hash
+        })
+        stored_files.append(file)
+
+    try:
+        file_uids = save_file_metadata_bulk(file_infos)
+    except Exception as e:
+        # blob 은 다른 업로드와 공유될 수 있으므로 바로 지우지 않고 참조 0 으로 등록 -> 유예 시간 후 GC 가 정리
+        if cas:
+            try:
+                await run_in_threadpool(release_file_blobs, file_infos)
+            except Exception as release_error:
+                print(f"Failed to release file blobs: {release_error}")
+        else:
+            for file_info in file_infos:
+                try:
+                    await run_in_threadpool(storage.delete, file_info['file_path'])
+                except Exception as delete_error:
+                    print(f"Failed to delete stored file {file_info['file_path']}: {delete_error}")
+        print(f"Error saving file metadata: {e}")
+        raise HTTPException(status_code=500, detail="Failed to save file metadata")
+
+    # 4. 참조 등록 후 blob 확인 - 확인과 등록 사이에 GC 가 같은 blob 을 정리했으면 다시 저장
+    if cas:
+        for file, file_info in zip(stored_files, file_infos):
+            if not os.path.exists(file_info['file_path']):
+                await save_upload(file, file_info['file_path'])
+
+    # 5. 로그 저장 - (파일 업로드 시에는 로그 저장 안 함, 다운로드 시에만 저장)
 
     # 6. 결과 반환 > 업로드된 파일, batch_id
+    uploaded_files = [{
+        "file_uid": file_uid,
+        "file_id": file_info['file_id'],
+        "org_file_nm": file_info['org_file_nm'],
+        "file_url": file_info['file_url'],
+        "file_size": file_info['file_size'],
+        "file_hash": file_info['file_hash']
+    } for file_uid, file_info in zip(file_uids, file_infos)]
     return {"uploaded": uploaded_files, "batch_id": batch_id}
 
 
+def _get_accessible_file(file_id: str, current_user: dict) -> dict:
+    # 내보내기 파일(관리자 사용 이력)은 작업을 등록한 관리자 외에는 없는 파일로 처리
+    file_info = get_file_by_id(file_id)
+    if not file_info or (file_info['storage_tp'] == 'EXPORT' and (
+            current_user.get('role') != 'ROLE_ADMIN' or file_info['reg_uid'] != current_user.get('user_id'))):
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_info
+
+
+def _file_etag(file_info: dict, stat_result: os.stat_result) -> str:
+    # 내용 해시가 있으면 강한 ETag (같은 내용 = 같은 ETag), 이전 업로드 파일은 수정 시각/크기 기준
+    if file_info.get('file_hash'):
+        return f'"{file_info["file_hash"]}"'
+    return f'"{int(stat_result.st_mtime_ns)}-{stat_result.st_size}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match 는 약한 비교 (W/ 접두어 무시), 여러 개 또는 * 허용
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def _is_new_download(request: Request, etag: str) -> bool:
+    # 전체 전송 또는 0 바이트부터 시작하는 범위 요청만 다운로드 1회로 기록 (이어받기/분할 다운로드의 나머지 요청 제외)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if not range_header or (if_range is not None and if_range != etag):
+        return True
+    return range_header.replace(" ", "").lower().startswith("bytes=0-")
+
+
 # [2] 파일 다운로드
 @router.get("/download/{file_id}")
 async def download_file(
     file_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user_jwt)
 ):
     """
     파일 다운로드
+    - Range 요청(이어받기/분할 다운로드) 은 206 으로 일부만 전송 (If-Range 가 ETag 와 다르면 전체 전송)
+    - ETag 가 If-None-Match 와 같으면 304 (본문 없음, 다운로드 기록 없음)
+    - 다운로드 이력/횟수는 메모리 버퍼에 추가하고 백그라운드에서 일괄 기록 (응답 경로에서 DB 쓰기 없음)
+    - S3 저장 파일은 presigned URL 로 307 redirect (파일 바이트는 저장소에서 직접 전송, Range 도 저장소가 처리)
     """
     # 1. 파일 정보 조회
-    file_info = get_file_by_id(file_id)
-    if not file_info:
-        raise HTTPException(status_code=404, detail="File not found")
+    file_info = _get_accessible_file(file_id, current_user)
         
     file_path = file_info['file_path']
     org_file_nm = file_info['org_file_nm']
+
+    # 1-1. 객체 저장소 파일: 조건부 요청 / 로그 기록 후 presigned URL 로 redirect
+    storage = get_storage_backend(file_info['storage_tp'])
+    if storage.storage_tp == 'S3':
+        etag = f'"{file_info["file_hash"]}"'
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": DOWNLOAD_CACHE_CONTROL})
+        if _is_new_download(request, etag):
+            download_log.add(file_info['file_uid'], file_id, current_user['user_id'])
+        url = await run_in_threadpool(storage.presigned_url, file_path, org_file_nm, file_info['file_type'])
+        return RedirectResponse(url, status_code=307, headers={"ETag": etag, "Cache-Control": DOWNLOAD_CACHE_CONTROL})
     
-    # 2. 파일 존재 여부 확인
-    if not os.path.exists(file_path):
+    # 2. 파일 존재 여부 확인 (stat 결과는 응답 헤더에 재사용)
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="Physical file not found")
-        
-    # 3. 로그 기록
-    # 다운로드는 'DOWNLOAD' 액션으로 구분하면 좋겠지만, 현재 스키마에는 액션 타입이 없음.
-    # 단순히 이력 테이블에 추가. (추후 테이블에 action_type 컬럼 추가 고려)
-    log_file_action(file_info['file_uid'], file_id, current_user['user_id'])
-    increase_download_count(file_info['file_uid'])
+
+    # 3. 조건부 요청 (If-None-Match)
+    etag = _file_etag(file_info, stat_result)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": DOWNLOAD_CACHE_CONTROL})
+
+    # 4. 로그 기록 (일괄 반영)
+    if _is_new_download(request, etag):
+        download_log.add(file_info['file_uid'], file_id, current_user['user_id'])
     
-    # 4. 파일 반환
+    # 5. 파일 반환
     # 한글 파일명 처리를 위해 filename* 사용 권장되지만, 간단히 filename 설정
     from urllib.parse import quote
     encoded_filename = quote(org_file_nm)
@@ -142,8 +301,11 @@ async def download_file(
     return FileResponse(
         path=file_path,
         filename=org_file_nm,
+        stat_result=stat_result,
         headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
+            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+            "ETag": etag,
+            "Cache-Control": DOWNLOAD_CACHE_CONTROL
         }
     )
 
@@ -158,6 +320,8 @@ async def get_file_history(
     """
     from src.db.file_manager import get_file_logs
     
+    # 아직 반영하지 않은 다운로드 이력 먼저 기록
+    download_log.flush()
     logs = get_file_logs(file_uid)
     return {"logs": logs}
 
@@ -168,7 +332,7 @@ async def get_file_list(
     current_user: dict = Depends(get_current_user_jwt)
 ):
     """
-    전체 파일 목록 조회
+    전체 파일 목록 조회 (내보내기 파일 제외)
     """
     from src.db.file_manager import get_all_files
     
@@ -199,15 +363,13 @@ async def delete_file(
     물리 파일 및 DB 메타데이터 삭제
     """
     # 1. 파일 정보 조회
-    file_info = get_file_by_id(file_id)
-    if not file_info:
-        raise HTTPException(status_code=404, detail="File not found")
+    file_info = _get_accessible_file(file_id, current_user)
         
-    # 2. 물리 파일 삭제
+    # 2. 물리 파일 / 객체 삭제 (CAS blob 은 다른 파일과 공유 -> 참조 수만 줄이고 GC 가 정리)
     file_path = file_info['file_path']
     try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        if file_info['storage_tp'] != 'CAS':
+            await run_in_threadpool(get_storage_backend(file_info['storage_tp']).delete, file_path)
     except Exception as e:
         print(f"Failed to delete physical file {file_path}: {e}")
         # 물리 파일 삭제 실패 시에도 DB 삭제를 진행할지 결정 가능
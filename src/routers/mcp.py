@@ -8,7 +8,7 @@ try:
         get_limit_list, upsert_limit, delete_limit,
         get_all_tools, create_tool, update_tool, delete_tool, get_tool_params, add_tool_param, clear_tool_params, get_tool_by_id,
         create_access_token, get_all_access_tokens, delete_access_token, get_specific_user_tool_usage,
-        get_mcp_hourly_daily_stats, get_mcp_user_tool_detail
+        get_mcp_hourly_daily_stats, get_mcp_user_tool_detail, get_tool_usage_detail
     )
     from src.dependencies import get_current_user_jwt
     from src.tool_executor import execute_sql_tool, execute_python_tool
@@ -18,7 +18,7 @@ except ImportError:
         get_limit_list, upsert_limit, delete_limit,
         get_all_tools, create_tool, update_tool, delete_tool, get_tool_params, add_tool_param, clear_tool_params, get_tool_by_id,
         create_access_token, get_all_access_tokens, delete_access_token, get_specific_user_tool_usage,
-        get_mcp_hourly_daily_stats, get_mcp_user_tool_detail
+        get_mcp_hourly_daily_stats, get_mcp_user_tool_detail, get_tool_usage_detail
     )
     from dependencies import get_current_user_jwt
     from tool_executor import execute_sql_tool, execute_python_tool
@@ -38,11 +38,31 @@ async def get_usage_history(
     user_id: str | None = None,
     tool_nm: str | None = None,
     success: str | None = None,
+    search: str | None = None,
     current_user: dict = Depends(get_current_user_jwt)
 ):
-    """MCP Tool 사용 이력 조회 (관리자 전용, 필터링 포함)."""
+    """
+    MCP Tool 사용 이력 조회 (관리자 전용, 필터링 포함).
+    - search: 도구명/파라미터/실행 결과 전문 검색 (FTS5, 관련도순 정렬)
+    """
     if current_user['role'] != 'ROLE_ADMIN': raise HTTPException(status_code=403, detail="Admin access required")
-    return get_tool_usage_logs(page, size, user_id, tool_nm, success)
+    return get_tool_usage_logs(page, size, user_id, tool_nm, success, search)
+
+# MCP Tool 사용 이력 상세 조회 (관리자 전용, 전체 실행 결과 포함)
+@router.get("/mcp/usage-history/{usage_id}")
+async def get_usage_history_detail(
+    usage_id: int,
+    current_user: dict = Depends(get_current_user_jwt)
+):
+    """
+    MCP Tool 사용 이력 상세 조회.
+    - 목록의 tool_result 는 미리보기이며(result_truncated=true), 전체 결과는 이 API 에서 압축 해제하여 반환
+    """
+    if current_user['role'] != 'ROLE_ADMIN': raise HTTPException(status_code=403, detail="Admin access required")
+    detail = get_tool_usage_detail(usage_id)
+    if not detail:
+        raise HTTPException(status_code=404, detail="Usage history not found")
+    return detail
 
 # 대시보드 통계 집계
 @router.get("/mcp/stats")
@@ -4,7 +4,7 @@ import logging
 from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 from src.dependencies import get_current_active_user
-from src.mcp_server_impl import call_tool, list_tools
+from src.mcp_server_impl import call_tool, list_tools, call_tools_batch, BATCH_MAX_CALLS
 from src.utils.context import set_current_user
 
 router = APIRouter(tags=["MCP Execution Management"])
@@ -18,13 +18,63 @@ class ProxyResponse(BaseModel):
     success: bool = Field(..., description="실행 성공 여부")
     result: Any = Field(..., description="도구 실행 결과 (문자열 또는 JSON)")
 
+class BatchCall(BaseModel):
+    tool: str = Field(..., description="호출할 도구 이름")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="도구 호출에 필요한 인자들")
+
+class BatchProxyRequest(BaseModel):
+    calls: List[BatchCall] = Field(..., description="순서대로 실행할 도구 호출 목록")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="동시 실행 수 (미지정 시, 또는 MCP_PROXY_BATCH_CONCURRENCY 보다 크면 그 값)")
+
+class BatchItemResult(ProxyResponse):
+    index: int = Field(..., description="요청 calls 내 순번")
+    elapsed_ms: float = Field(..., description="도구 실행 소요 시간(ms)")
+
+class BatchProxyResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+    elapsed_ms: float = Field(..., description="배치 전체 소요 시간(ms)")
+
 @router.get("/api/mcp/proxy/tools", summary="사용 가능한 MCP 도구 목록 조회")
 async def get_proxy_tools_list():
     """
     현재 REST API Proxy를 통해 호출 가능한 모든 MCP 도구(정적/동적) 목록을 반환합니다.
     """
     tools = await list_tools()
-    return {"tools": [t.dict() for t in tools]}
+    return {"tools": [t.model_dump() for t in tools]}
+
+# 경로 매칭 순서상 /api/mcp/proxy/{tool_name} 보다 먼저 선언해야 함
+@router.post(
+    "/api/mcp/proxy/batch",
+    summary="여러 MCP 도구 일괄 REST API 호출",
+    response_model=BatchProxyResponse
+)
+async def api_proxy_mcp_tool_batch(
+    request_data: BatchProxyRequest,
+    current_user: Dict[str, Any] = Depends(get_current_active_user)
+):
+    """
+    여러 MCP 도구 호출을 한 번의 요청으로 병렬 실행합니다.
+    인증/일일 사용량 확인/이력 기록은 배치당 1회이며, 호출별 결과와 소요 시간을 요청 순서대로 반환합니다.
+
+    - **calls**: [{"tool": 도구 이름, "arguments": {...}}, ...]
+    - **max_concurrency**: 동시 실행 수 (선택)
+    """
+    if not request_data.calls:
+        raise HTTPException(status_code=400, detail="calls is empty")
+    if len(request_data.calls) > BATCH_MAX_CALLS:
+        raise HTTPException(status_code=400, detail=f"Too many calls (max {BATCH_MAX_CALLS})")
+
+    try:
+        set_current_user(current_user)
+        return await call_tools_batch(
+            [call.model_dump() for call in request_data.calls],
+            max_concurrency=request_data.max_concurrency
+        )
+    except Exception as e:
+        logger.error(f"MCP Proxy Batch Execution Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.post(
     "/api/mcp/proxy/{tool_name}",
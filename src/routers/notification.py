@@ -1,11 +1,15 @@
 import asyncio
-import json
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Set
+from typing import Optional, List, Dict
 
 from src.dependencies import get_current_user_jwt, get_current_active_user
+from src.utils.shared_state import get_shared_state
+from src.utils.notification_hub import (
+    NotificationHub, NotificationEvent, Subscriber, serialize_event, BROADCAST_TOPIC,
+    NOTIFY_HEARTBEAT_SEC, NOTIFY_SEND_TIMEOUT_SEC, NOTIFY_REPLAY_LIMIT
+)
 from src.db.notification import (
     get_notification_list_admin,
     create_notification,
@@ -13,44 +17,128 @@ from src.db.notification import (
     mark_notification_as_read,
     mark_all_notifications_as_read,
     delete_notification,
-    get_unread_count
+    get_unread_count,
+    get_last_notification_id,
+    get_notifications_since
 )
 
 router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
 
 # 실시간 알림을 위한 SSE(Server-Sent Events) 매니저 클래스
-# - 사용자별 SSE 연결(Queue) 관리 및 메시지 브로드캐스팅 담당
+# - 사용자별 SSE 연결 버퍼 관리는 NotificationHub(src/utils/notification_hub.py) 가 담당 (고정 크기 버퍼, 병합/버림 정책)
+# - 여러 워커(uvicorn --workers N)로 실행하면 사용자의 SSE 연결이 다른 워커에 있을 수 있으므로,
+#   알림은 공유 상태(src/utils/shared_state.py)의 'notification' 채널로도 발행하여 모든 워커가 자기 연결에 전달
+# - 토픽 알림(역할별 role:<ROLE>, 전체 'all')은 사용자 수와 무관하게 워커마다 1번 발행/직렬화
+# - event_id(h_notification.id)가 있는 알림은 SSE 이벤트 id 로 전송 -> 재연결 시 Last-Event-ID 이후 알림 replay
 class NotificationManager:
-    def __init__(self):
-        # user_uid -> set of asyncio.Queue
-        self.connections: Dict[int, Set[asyncio.Queue]] = {}
+    CHANNEL = "notification"
 
-    async def subscribe(self, user_uid: int) -> asyncio.Queue:
-        if user_uid not in self.connections:
-            self.connections[user_uid] = set()
-        
-        queue = asyncio.Queue()
-        self.connections[user_uid].add(queue)
-        return queue
+    def __init__(self, hub: NotificationHub = None):
+        self.hub = hub or NotificationHub()
+        self._unsubscribe_shared = None
+
+    @property
+    def connections(self) -> Dict[int, Dict[Subscriber, None]]:
+        return self.hub.connections
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self.hub.loop
+
+    async def subscribe(self, user_uid: int, topics: List[str] = ()) -> Subscriber:
+        if self._unsubscribe_shared is None:
+            # 이 프로세스에 SSE 연결이 생긴 시점에 다른 워커의 알림 수신 시작
+            self._unsubscribe_shared = get_shared_state().subscribe(self.CHANNEL, self._on_shared_event)
+            # 수신 시작 이후의 알림부터 replay ring 에 기록 (그 이전 구간은 DB 에서 조회)
+            self.hub.start_replay(get_last_notification_id())
+        return self.hub.subscribe(user_uid, topics)
+
+    def unsubscribe(self, user_uid: int, subscriber: Subscriber):
+        self.hub.unsubscribe(subscriber)
+
+    def notify(self, user_uid: int, data: dict, event_id: int = None):
+        # 이 프로세스의 연결에 전달 (루프 스레드에서 실행)
+        event = NotificationEvent(data, event_id=event_id)
+        self.hub.record(event, user_uid=user_uid)
+        self.hub.publish(user_uid, event)
+        get_shared_state().publish(self.CHANNEL, {"user_uid": user_uid, "data": data, "event_id": event_id}, local=False)
+
+    # 이벤트 루프 밖(백그라운드 워커 스레드 등)에서 알림 전송
+    # - 연결 버퍼는 루프 스레드에서만 다루므로 루프 스레드에서 전달되도록 예약
+    def notify_threadsafe(self, user_uid: int, data: dict, event_id: int = None):
+        event = NotificationEvent(data, event_id=event_id)
+        self.hub.record(event, user_uid=user_uid)
+        self.hub.publish_threadsafe(user_uid, event)
+        get_shared_state().publish(self.CHANNEL, {"user_uid": user_uid, "data": data, "event_id": event_id}, local=False)
+
+    # 토픽 구독 연결 전체에 알림 전송 (BROADCAST_TOPIC: 모든 연결)
+    def notify_topic(self, topic: str, data: dict, event_id: int = None):
+        event = NotificationEvent(data, event_id=event_id)
+        self.hub.record(event, topic=topic)
+        self.hub.publish_topic(topic, event)
+        get_shared_state().publish(self.CHANNEL, {"topic": topic, "data": data, "event_id": event_id}, local=False)
 
-    def unsubscribe(self, user_uid: int, queue: asyncio.Queue):
-        if user_uid in self.connections:
-            self.connections[user_uid].discard(queue)
-            if not self.connections[user_uid]:
-                del self.connections[user_uid]
+    def notify_topic_threadsafe(self, topic: str, data: dict, event_id: int = None):
+        event = NotificationEvent(data, event_id=event_id)
+        self.hub.record(event, topic=topic)
+        self.hub.publish_topic_threadsafe(topic, event)
+        get_shared_state().publish(self.CHANNEL, {"topic": topic, "data": data, "event_id": event_id}, local=False)
 
-    def notify(self, user_uid: int, data: dict):
-        if user_uid in self.connections:
-            for queue in self.connections[user_uid]:
-                queue.put_nowait(data)
+    # 다른 워커가 발행한 알림 (공유 상태 polling 스레드에서 호출)
+    def _on_shared_event(self, payload: dict):
+        event = NotificationEvent(payload["data"], event_id=payload.get("event_id"))
+        if "topic" in payload:
+            self.hub.record(event, topic=payload["topic"])
+            self.hub.publish_topic_threadsafe(payload["topic"], event)
+        else:
+            self.hub.record(event, user_uid=payload["user_uid"])
+            self.hub.publish_threadsafe(payload["user_uid"], event)
+
+    # 재연결 시 last_event_id 이후 놓친 알림 (ring -> 없으면 DB 범위 조회)
+    def replay(self, user_uid: int, topics: List[str], last_event_id: int) -> List[NotificationEvent]:
+        events = self.hub.replay(user_uid, topics, last_event_id)
+        if events is not None:
+            # 당시의 읽지 않은 개수는 의미 없으므로 제외 (현재 개수는 연결 시 별도 전송)
+            return [
+                NotificationEvent({k: v for k, v in event.items() if k != "unread_count"}, replay=True, event_id=event.event_id)
+                for event in events
+            ]
+
+        rows = get_notifications_since(user_uid, last_event_id, NOTIFY_REPLAY_LIMIT + 1)
+        events = [NotificationEvent(row, type="new_notification", replay=True, event_id=row["id"]) for row in rows[:NOTIFY_REPLAY_LIMIT]]
+        if len(rows) > NOTIFY_REPLAY_LIMIT:
+            # 놓친 알림이 너무 많으면 목록 전체를 다시 조회하도록 알림
+            events.append(NotificationEvent(type="resync"))
+        return events
 
 notification_manager = NotificationManager()
 
+
+def _parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _sse_event(data: dict) -> dict:
+    event = {"event": "notification", "data": serialize_event(data)}
+    event_id = getattr(data, "event_id", None)
+    if event_id is not None:
+        event["id"] = str(event_id)
+    return event
+
 class NotificationCreateRequest(BaseModel):
     receive_user_uid: int
     title: str
     message: str
 
+class NotificationBroadcastRequest(BaseModel):
+    title: str
+    message: str
+    # None 이면 전체 사용자, 'role:ROLE_ADMIN' 처럼 역할 토픽 지정 가능
+    topic: Optional[str] = None
+
 class NotificationResponse(BaseModel):
     id: int
     receive_user_uid: int
@@ -77,25 +165,45 @@ async def notification_stream(
     if not user_uid:
         raise HTTPException(status_code=401, detail="User not authenticated")
 
+    # 역할 토픽 구독 (전체 알림은 모든 연결에 전달되므로 별도 구독 불필요)
+    topics = [f"role:{current_user['role']}"] if current_user.get('role') else []
+    # 브라우저 EventSource 는 재연결 시 마지막으로 받은 이벤트 id 를 Last-Event-ID 헤더로 보냄
+    last_event_id = _parse_last_event_id(request.headers.get("last-event-id"))
+
     async def event_generator():
-        queue = await notification_manager.subscribe(user_uid)
+        subscriber = await notification_manager.subscribe(user_uid, topics)
         try:
-            # 초기 연결 시 현재 알림 상태 전송 (선택 사항)
-            # await queue.put({"type": "init", "unread_count": get_unread_count(user_uid)})
-            
-            while True:
+            # 연결(재연결) 시 현재 읽지 않은 개수 전송 -> 이후 변경은 unread_count_update 로 전달 (polling 불필요)
+            subscriber.push({"type": "unread_count_update", "unread_count": get_unread_count(user_uid)})
+
+            # 재연결: 놓친 알림을 먼저 전송 (구독 후 조회하므로 누락 없음, 버퍼와 겹치는 알림은 아래에서 제외)
+            replayed_id = 0
+            if last_event_id is not None:
+                for event in notification_manager.replay(user_uid, topics, last_event_id):
+                    replayed_id = max(replayed_id, event.event_id or 0)
+                    yield _sse_event(event)
+
+            # 알림이 없어도 NOTIFY_HEARTBEAT_SEC 마다 깨어나 연결 상태 확인 + ping (끊긴 연결을 바로 정리)
+            # 같은 사용자의 연결이 너무 많아 hub 가 종료시킨 연결(subscriber.closed)도 여기서 종료
+            while not subscriber.closed:
                 if await request.is_disconnected():
                     break
-                
-                data = await queue.get()
-                yield {
-                    "event": "notification",
-                    "data": json.dumps(data, ensure_ascii=False)
-                }
+
+                data = await subscriber.get(timeout=NOTIFY_HEARTBEAT_SEC)
+                if data is None:
+                    if subscriber.closed:
+                        break
+                    yield {"comment": "ping"}
+                    continue
+                event_id = getattr(data, "event_id", None)
+                if event_id is not None and event_id <= replayed_id:
+                    continue
+                yield _sse_event(data)
         finally:
-            notification_manager.unsubscribe(user_uid, queue)
+            notification_manager.unsubscribe(user_uid, subscriber)
 
-    return EventSourceResponse(event_generator())
+    # send_timeout: 응답을 받지 않는(버퍼가 가득 찬) 클라이언트로의 전송이 멈추면 연결 종료
+    return EventSourceResponse(event_generator(), send_timeout=NOTIFY_SEND_TIMEOUT_SEC)
 
 # 관리자용 전체 알림 내역 조회
 @router.get("/admin", response_model=dict)
@@ -111,7 +219,16 @@ async def list_notifications_admin(
     
     return get_notification_list_admin(page, size, include_deleted)
 
-from src.utils.notification_helper import send_dual_notification
+# 관리자용 실시간 알림 연결 통계
+@router.get("/metrics")
+async def notification_metrics(current_user: dict = Depends(get_current_user_jwt)):
+    """이 워커의 SSE 연결 수 / 버퍼 / 전달 / 버림 / 병합 통계"""
+    if current_user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+
+    return notification_manager.hub.metrics()
+
+from src.utils.notification_helper import send_dual_notification, send_topic_notification
 
 # 관리자가 사용자에게 알림 발송
 @router.post("/send", status_code=201)
@@ -136,6 +253,31 @@ async def send_notification(
         
     return {"status": "success", "id": notify_id}
 
+# 관리자가 전체/역할별 사용자에게 알림 발송
+@router.post("/broadcast", status_code=201)
+async def broadcast_notification(
+    request: NotificationBroadcastRequest,
+    current_user: dict = Depends(get_current_user_jwt)
+):
+    """관리자가 전체 또는 역할 토픽 사용자에게 알림 발송 (DB 일괄 저장 + SSE 1회 발행 + Telegram 1회)"""
+    if current_user.get('role') != 'ROLE_ADMIN':
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+
+    try:
+        count = send_topic_notification(
+            topic=request.topic or BROADCAST_TOPIC,
+            title=request.title,
+            message=request.message,
+            send_user_uid=current_user.get('uid')
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if count is None:
+        raise HTTPException(status_code=500, detail="Failed to send notification")
+
+    return {"status": "success", "count": count}
+
 # 내 알림 목록 조회
 @router.get("/me", response_model=dict)
 async def list_my_notifications(
@@ -1,75 +1,148 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
 import logging
+import os
+import threading
 
 try:
-    from src.db.email_manager import get_pending_scheduled_emails, update_email_status
+    from src.db.email_manager import (
+        update_email_status, claim_scheduled_emails, claim_email, release_stale_email_claims
+    )
+    from src.db.retention import run_retention
+    from src.db.file_manager import collect_unreferenced_blobs
     from src.utils.mailer import EmailSender
     from src.utils.notification_helper import send_system_notification
+    from src.utils.shared_state import get_shared_state
+    from src.utils.email_dispatcher import EmailDispatcher, parse_scheduled_dt
+    from src.utils.export_jobs import fail_orphaned_export_jobs
 except ImportError:
     # Absolute path fallback to ensure it works when run from project root or as a module
-    from src.db.email_manager import get_pending_scheduled_emails, update_email_status
+    from src.db.email_manager import (
+        update_email_status, claim_scheduled_emails, claim_email, release_stale_email_claims
+    )
+    from src.db.retention import run_retention
+    from src.db.file_manager import collect_unreferenced_blobs
     from src.utils.mailer import EmailSender
     from src.utils.notification_helper import send_system_notification
+    from src.utils.shared_state import get_shared_state
+    from src.utils.email_dispatcher import EmailDispatcher, parse_scheduled_dt
+    from src.utils.export_jobs import fail_orphaned_export_jobs
 
 logger = logging.getLogger(__name__)
 
-scheduler = BackgroundScheduler()
+# 보관 정책(retention) 일일 실행 시각 (0~23시)
+RETENTION_JOB_HOUR = int(os.getenv("RETENTION_JOB_HOUR", "3"))
+# 참조가 없는 파일 blob 정리 유예 시간 (마지막 참조가 삭제된 뒤 이 시간이 지나야 삭제)
+FILE_GC_GRACE_SEC = int(os.getenv("FILE_GC_GRACE_SEC", "3600"))
+
+# 리더 선출 (여러 워커 중 lease 를 가진 1개 프로세스만 예약 작업 실행)
+SCHEDULER_LEASE_NAME = "scheduler"
+SCHEDULER_LEASE_TTL_SEC = float(os.getenv("SCHEDULER_LEASE_TTL_SEC", "30"))
+SCHEDULER_LEASE_RENEW_SEC = float(os.getenv("SCHEDULER_LEASE_RENEW_SEC", "10"))
+# 워커 생존 lease 이름 접두사 (모든 워커가 리더 lease 와 같은 주기로 갱신, 만료되면 종료된 워커로 판단)
+WORKER_LEASE_PREFIX = "worker:"
+# 리더 워커만 연결하는 영구 작업 저장소(h_scheduler_job) 이름
+PERSISTENT_JOBSTORE = "persistent"
+# 리더가 아닌 워커에서 등록한 예약 메일 작업을 리더에게 전달하는 채널
+SCHEDULE_CHANNEL = "scheduler.email"
+
+# 예약 메일 발송 1회에 선점하는 건수 / 선점 후 결과가 없으면 다시 PENDING 으로 되돌리는 시간
+EMAIL_CLAIM_BATCH = int(os.getenv("EMAIL_CLAIM_BATCH", "100"))
+EMAIL_CLAIM_TIMEOUT_SEC = int(os.getenv("EMAIL_CLAIM_TIMEOUT_SEC", "600"))
+
+_is_leader = False
+_leader_lock = threading.Lock()
+_unsubscribe_schedule = None
+
+# apscheduler 는 스케줄러를 실제로 사용할 때 로드 (stdio 모드 등 스케줄러를 쓰지 않는 경로의 기동 시간 단축)
+# - 기존 `from src.scheduler import scheduler` 사용처는 모듈 __getattr__ 로 그대로 동작
+_scheduler = None
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        _scheduler = BackgroundScheduler()
+    return _scheduler
+
+def __getattr__(name):
+    if name == "scheduler":
+        return get_scheduler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 """
     스케줄러와 관련된 기능들
-    - [1] process_scheduled_emails: 주기적으로 실행되어 예약된 이메일을 발송하는 작업
+    - [1] process_scheduled_emails: 발송 시각이 된 예약 이메일을 발송하는 작업 (email_dispatcher 가 예약 시각에 호출)
     - [2] send_one_email: 특정 로그 ID의 이메일을 즉시 발송하고 결과를 업데이트하는 작업
     - [3] add_scheduled_job: 특정 시간에 이메일을 발송하도록 스케줄러에 작업을 등록하는 작업
     - [4] get_scheduler_jobs: 현재 스케줄러에 등록된 작업 목록을 반환하는 작업
     - [5] start_scheduler: 스케줄러를 시작하는 작업
     - [6] shutdown_scheduler: 스케줄러를 종료하는 작업
+    - [7] run_retention_job: 하루 한 번 이력/로그 테이블 보관 정책을 적용하는 작업
+    - [8] renew_scheduler_lease: 리더 lease 획득/갱신 -> 리더가 되면 영구 작업 저장소 연결 + dispatcher 시작, 잃으면 중지
+    - [9] is_scheduler_leader: 이 프로세스가 리더인지 여부
+    - [10] run_file_gc_job: 참조가 없는 내용 주소 파일 blob 을 정리하는 작업 (보관 정책 30분 뒤)
+    - [11] is_worker_alive: 워커 생존 lease 가 유효한지 여부
+
+    * 예약 메일은 리더 워커의 email_dispatcher 가 발송
+      - 시작 시 h_email_log 의 발송 대기 예약 메일로 heap 을 구성하고, 가장 빠른 예약 시각에 깨어나 발송 (매분 polling 없음)
+      - 예약 메일 정보는 h_email_log 에 있으므로 재시작/리더 교체 후에도 새 리더가 다시 로드
+      - 리더가 아닌 워커에서 등록한 예약 메일은 공유 상태 채널로 리더에게 전달
+    * 발송 전에 h_email_log 를 PENDING -> SENDING 으로 선점(claim)하고, 선점에 성공한 건만 발송 (중복 발송 방지)
+    * 보관 정책 / 파일 GC 작업은 리더 워커의 영구 작업 저장소(h_scheduler_job)에만 등록 -> 리더 1개 프로세스에서만 실행
+    * 리더는 lease 갱신 때마다 생존 lease 가 없는 워커의 미완료 내보내기 작업을 실패 처리 (살아 있는 워커의 작업은 유지)
 """
 
+# 선점한 이메일의 발송 결과 기록/알림
+def _record_send_result(email: dict, success: bool, error_msg: str = None, label: str = ""):
+    log_id = email['id']
+    recipient = email['recipient']
+    subject = email['subject']
+
+    if success:
+        update_email_status(log_id, 'SENT')
+        logger.info(f"Scheduled email{label} sent successfully. Log ID: {log_id}")
+        # 알림 발송
+        if email.get('user_uid'):
+            send_system_notification(
+                receive_user_uid=email['user_uid'],
+                title="예약 메일 발송 완료",
+                message=f"[{recipient}] 주소로 예약된 메일 '{subject}' 발송이 완료되었습니다."
+            )
+    else:
+        update_email_status(log_id, 'FAILED', error_msg)
+        logger.error(f"Failed to send scheduled email{label}. Log ID: {log_id}, Error: {error_msg}")
+        # 알림 발송
+        if email.get('user_uid'):
+            send_system_notification(
+                receive_user_uid=email['user_uid'],
+                title="예약 메일 발송 실패",
+                message=f"[{recipient}] 주소로 예약된 메일 발송에 실패했습니다. (사유: {error_msg})"
+            )
+
 # [1] process_scheduled_emails: 주기적으로 실행되어 예약된 이메일을 발송하는 작업
 def process_scheduled_emails():
     """
     주기적으로 실행되어 예약된 이메일을 발송하는 작업입니다.
+    발송 시각이 된 이메일을 EMAIL_CLAIM_BATCH 건씩 선점하여 발송하므로, 여러 워커가 동시에 실행해도 중복 발송되지 않습니다.
+    선점한 건은 SMTP 연결 풀을 통해 동시에 발송합니다. (EmailSender.send_many)
     """
     try:
-        pending_emails = get_pending_scheduled_emails()
-        if not pending_emails:
-            return
+        _release_stale_claims()
+
+        email_sender = None
+        while True:
+            claimed = claim_scheduled_emails(EMAIL_CLAIM_BATCH)
+            if not claimed:
+                return
+
+            logger.info(f"Checking scheduled emails... Claimed {len(claimed)} pending emails.")
+            email_sender = email_sender or EmailSender()
+            results = email_sender.send_many([(e['recipient'], e['subject'], e['content']) for e in claimed])
+            for email, (success, error_msg) in zip(claimed, results):
+                _record_send_result(email, success, error_msg)
+
+            if len(claimed) < EMAIL_CLAIM_BATCH:
+                return
 
-        logger.info(f"Checking scheduled emails... Found {len(pending_emails)} pending emails.")
-        
-        email_sender = EmailSender()
-        
-        for email in pending_emails:
-            log_id = email['id']
-            recipient = email['recipient']
-            subject = email['subject']
-            content = email['content']
-            
-            # 이메일 발송 시도
-            success, error_msg = email_sender.send_immediate(recipient, subject, content)
-            
-            if success:
-                update_email_status(log_id, 'SENT')
-                logger.info(f"Scheduled email sent successfully. Log ID: {log_id}")
-                # 알림 발송
-                if email.get('user_uid'):
-                    send_system_notification(
-                        receive_user_uid=email['user_uid'],
-                        title="예약 메일 발송 완료",
-                        message=f"[{recipient}] 주소로 예약된 메일 '{subject}' 발송이 완료되었습니다."
-                    )
-            else:
-                update_email_status(log_id, 'FAILED', error_msg)
-                logger.error(f"Failed to send scheduled email. Log ID: {log_id}, Error: {error_msg}")
-                # 알림 발송
-                if email.get('user_uid'):
-                    send_system_notification(
-                        receive_user_uid=email['user_uid'],
-                        title="예약 메일 발송 실패",
-                        message=f"[{recipient}] 주소로 예약된 메일 발송에 실패했습니다. (사유: {error_msg})"
-                    )
-                
     except Exception as e:
         logger.error(f"Error in process_scheduled_emails: {e}")
 
@@ -77,56 +150,18 @@ def process_scheduled_emails():
 def send_one_email(log_id: int):
     """
     특정 로그 ID의 이메일을 즉시 발송하고 결과를 업데이트합니다.
-    스케줄러에 의해 단일 작업으로 실행될 때 사용됩니다.
+    스케줄러에 의해 단일 작업으로 실행될 때 사용됩니다. (이전 버전이 h_scheduler_job 에 저장한 email_<id> 작업)
     """
     try:
-        # DB 연결 및 해당 로그 조회
-        try:
-            from src.db.connection import get_db_connection
-        except ImportError:
-            from db.connection import get_db_connection
-            
-        conn = get_db_connection()
-        # conn.row_factory = None  <-- Removed to use default sqlite3.Row from get_db_connection
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM h_email_log WHERE id = ? AND status = 'PENDING'", (log_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if not row:
+        # PENDING -> SENDING 선점 (polling 작업이나 다른 워커가 먼저 선점했으면 발송하지 않음)
+        email = claim_email(log_id)
+        if not email:
             logger.warning(f"send_one_email: Email log not found or not PENDING. Log ID: {log_id}")
             return
-            
-        email = dict(row)
-        recipient = email['recipient']
-        subject = email['subject']
-        content = email['content']
-        
-        email_sender = EmailSender()
-        success, error_msg = email_sender.send_immediate(recipient, subject, content)
-        
-        if success:
-            update_email_status(log_id, 'SENT')
-            logger.info(f"Scheduled email (One-time) sent successfully. Log ID: {log_id}")
-            # 알림 발송
-            if email.get('user_uid'):
-                send_system_notification(
-                    receive_user_uid=email['user_uid'],
-                    title="예약 메일 발송 완료",
-                    message=f"[{recipient}] 주소로 예약된 메일 '{subject}' 발송이 완료되었습니다."
-                )
-        else:
-            update_email_status(log_id, 'FAILED', error_msg)
-            logger.error(f"Failed to send scheduled email (One-time). Log ID: {log_id}, Error: {error_msg}")
-            # 알림 발송
-            if email.get('user_uid'):
-                send_system_notification(
-                    receive_user_uid=email['user_uid'],
-                    title="예약 메일 발송 실패",
-                    message=f"[{recipient}] 주소로 예약된 메일 발송에 실패했습니다. (사유: {error_msg})"
-                )
-            
+
+        success, error_msg = EmailSender().send_immediate(email['recipient'], email['subject'], email['content'])
+        _record_send_result(email, success, error_msg, label=" (One-time)")
+
     except Exception as e:
         logger.error(f"Error in send_one_email: {e}")
 
@@ -138,55 +173,82 @@ def add_scheduled_job(log_id: int, run_date: str):
     """
     logger.info("Adding scheduled job for Email Log ID: {} at {}".format(log_id, run_date))
     try:
-        from datetime import datetime
-        dt_run_date = None
-        
-        # 1. YYYY-MM-DD HH:MM:SS 포맷 시도
-        try:
-            dt_run_date = datetime.strptime(run_date, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            pass
-            
-        # 2. ISO 포맷 시도 (frontend에서 T가 포함된 문자열을 보낼 수 있음)
-        if not dt_run_date:
-            try:
-                dt_run_date = datetime.fromisoformat(run_date.replace('Z', '+00:00'))
-            except ValueError:
-                pass
-        
+        dt_run_date = parse_scheduled_dt(run_date)
         if not dt_run_date:
             logger.error(f"Invalid date format: {run_date}. Job not added.")
             return
 
+        scheduler = get_scheduler()
         if not scheduler.running:
             logger.info("Scheduler is not running. Starting it now.")
             start_scheduler()
 
-        scheduler.add_job(
-            send_one_email,
-            'date',
-            run_date=dt_run_date,
-            args=[log_id],
-            id=f"email_{log_id}",
-            replace_existing=True
-        )
-        logger.info(f"Added scheduled job for Email Log ID: {log_id} at {dt_run_date}")
+        if not _add_email_job(log_id, dt_run_date):
+            # 리더가 아니면 리더 워커에게 전달 (리더가 없는 동안 등록된 메일은 다음 리더가 DB 에서 로드)
+            get_shared_state().publish(
+                SCHEDULE_CHANNEL, {"log_id": log_id, "run_date": dt_run_date.isoformat()}, local=False
+            )
+            logger.info(f"Forwarded scheduled job for Email Log ID: {log_id} to the scheduler leader")
     except Exception as e:
         logger.error(f"Failed to add scheduled job: {e}")
 
+# 리더이면 dispatcher 에 예약 메일 추가 -> 추가 여부 반환
+def _add_email_job(log_id: int, dt_run_date) -> bool:
+    with _leader_lock:
+        if not _is_leader:
+            return False
+        get_email_dispatcher().schedule(log_id, dt_run_date)
+    logger.info(f"Added scheduled job for Email Log ID: {log_id} at {dt_run_date}")
+    return True
+
+_email_dispatcher = None
+
+def get_email_dispatcher() -> EmailDispatcher:
+    global _email_dispatcher
+    if _email_dispatcher is None:
+        _email_dispatcher = EmailDispatcher(process_scheduled_emails, release_stale=_release_stale_claims)
+    return _email_dispatcher
+
+# 발송 중 종료된 워커가 선점한 채 남긴 이메일은 다시 발송 대상으로 (dispatch 시, dispatcher 로드 시)
+def _release_stale_claims() -> int:
+    released = release_stale_email_claims(EMAIL_CLAIM_TIMEOUT_SEC)
+    if released:
+        logger.warning(f"Released {released} stale email claims.")
+    return released
+
+# 다른 워커가 전달한 정시 발송 작업 (공유 상태 polling 스레드에서 호출)
+def _on_schedule_event(payload: dict):
+    from datetime import datetime
+    try:
+        _add_email_job(payload["log_id"], datetime.fromisoformat(payload["run_date"]))
+    except Exception as e:
+        logger.error(f"Failed to add forwarded scheduled job: {e}")
+
 # [4] get_scheduler_jobs: 현재 스케줄러에 등록된 작업 목록을 반환하는 작업
 def get_scheduler_jobs():
     """
     현재 스케줄러에 등록된 작업 목록을 반환합니다.
     """
     jobs = []
-    for job in scheduler.get_jobs():
+    for job in get_scheduler().get_jobs():
         jobs.append({
             "id": job.id,
             "name": job.name,
             "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
             "args": str(job.args),
-            "pending": job.pending
+            "pending": job.pending,
+            "jobstore": job._jobstore_alias
+        })
+    # 예약 메일 dispatcher (리더 워커)
+    status = get_email_dispatcher().get_status()
+    if status["running"]:
+        jobs.append({
+            "id": "email_dispatcher",
+            "name": "EmailDispatcher",
+            "next_run_time": status["next_run_time"],
+            "args": f"queued={status['queued']}",
+            "pending": False,
+            "jobstore": "memory"
         })
     return jobs
 
@@ -195,18 +257,25 @@ def start_scheduler():
     """
     스케줄러를 시작합니다.
     """
+    global _unsubscribe_schedule
+    scheduler = get_scheduler()
     if not scheduler.running:
-        # 1. Polling Job (Fallback & Fail-safe) - 1분 주기
-        trigger = IntervalTrigger(minutes=1)
+        from apscheduler.triggers.interval import IntervalTrigger
+
+        # 리더 lease 갱신 Job - 리더가 되면 보관 정책 Job / 예약 메일 dispatcher 실행
+        # (예약 메일은 매분 polling 하지 않고 dispatcher 가 예약 시각에 발송)
         scheduler.add_job(
-            process_scheduled_emails,
-            trigger=trigger,
-            id='email_sender_job',
+            renew_scheduler_lease,
+            trigger=IntervalTrigger(seconds=SCHEDULER_LEASE_RENEW_SEC),
+            id='scheduler_lease_job',
             replace_existing=True,
             coalesce=True,
             max_instances=1
         )
         scheduler.start()
+        if _unsubscribe_schedule is None:
+            _unsubscribe_schedule = get_shared_state().subscribe(SCHEDULE_CHANNEL, _on_schedule_event)
+        renew_scheduler_lease()
         logger.info("Email Scheduler started.")
 
 # [6] shutdown_scheduler: 스케줄러를 종료하는 작업
@@ -214,6 +283,132 @@ def shutdown_scheduler():
     """
     스케줄러를 종료합니다.
     """
-    if scheduler.running:
-        scheduler.shutdown()
+    global _unsubscribe_schedule
+    # 한 번도 사용하지 않았다면 apscheduler 를 로드하지 않고 종료
+    if _scheduler is not None and _scheduler.running:
+        if _unsubscribe_schedule is not None:
+            _unsubscribe_schedule()
+            _unsubscribe_schedule = None
+        _scheduler.shutdown()
+        # 다른 워커가 lease 만료를 기다리지 않고 바로 리더가 되도록 반납
+        shared_state = get_shared_state()
+        if _step_down():
+            shared_state.release_lease(SCHEDULER_LEASE_NAME)
+        # 생존 lease 도 반납 -> 남은 내보내기 작업은 다음 리더가 실패 처리
+        shared_state.release_lease(_worker_lease_name(shared_state.worker_id))
         logger.info("Email Scheduler shut down.")
+
+# [7] run_retention_job: 이력/로그 테이블 보관 정책 적용
+def run_retention_job():
+    """
+    보관 기간이 지난 이력/로그를 아카이브 후 삭제합니다. (정책: h_system_config 'retention_policy')
+    """
+    try:
+        # 배치 사이 잠깐씩 쉬어서 운영 중 쓰기(사용 이력 기록 등)가 밀리지 않도록 함
+        result = run_retention(pause_sec=0.05)
+        logger.info(f"Retention job finished. Deleted: {result['total_deleted']}, Reclaimed: {result['reclaimed_bytes']} bytes")
+    except Exception as e:
+        logger.error(f"Error in run_retention_job: {e}")
+
+# [8] renew_scheduler_lease: 리더 lease 획득/갱신
+def renew_scheduler_lease():
+    """
+    SCHEDULER_LEASE_RENEW_SEC 마다 실행되어 lease 를 획득/갱신합니다. (만료: SCHEDULER_LEASE_TTL_SEC)
+    - 리더가 되면 영구 작업 저장소를 연결하여 저장된 작업(보관 정책)을 이어서 실행하고, 예약 메일 dispatcher 시작
+    - lease 를 잃으면(갱신 지연으로 다른 워커가 획득) 작업 저장소를 분리하고 dispatcher 중지
+    - 리더 여부와 관계없이 워커 생존 lease 도 갱신하고, 리더는 종료된 워커의 미완료 내보내기 작업을 실패 처리
+    """
+    global _is_leader
+    shared_state = get_shared_state()
+    try:
+        shared_state.acquire_lease(_worker_lease_name(shared_state.worker_id), SCHEDULER_LEASE_TTL_SEC)
+        acquired = shared_state.acquire_lease(SCHEDULER_LEASE_NAME, SCHEDULER_LEASE_TTL_SEC)
+    except Exception as e:
+        logger.error(f"Scheduler lease renewal failed: {e}")
+        acquired = False
+
+    if acquired:
+        try:
+            fail_orphaned_export_jobs(is_worker_alive)
+        except Exception as e:
+            logger.error(f"Error in fail_orphaned_export_jobs: {e}")
+
+    if acquired and not _is_leader:
+        from apscheduler.triggers.cron import CronTrigger
+        from src.utils.scheduler_jobstore import SQLiteJobStore
+
+        with _leader_lock:
+            if _is_leader:
+                return True
+            scheduler = get_scheduler()
+            scheduler.add_jobstore(SQLiteJobStore(), PERSISTENT_JOBSTORE)
+            # 보관 정책 Job - 매일 RETENTION_JOB_HOUR 시
+            scheduler.add_job(
+                run_retention_job,
+                trigger=CronTrigger(hour=RETENTION_JOB_HOUR, minute=0),
+                id='retention_job',
+                jobstore=PERSISTENT_JOBSTORE,
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1
+            )
+            # 파일 blob GC Job - 매일 RETENTION_JOB_HOUR 시 30분
+            scheduler.add_job(
+                run_file_gc_job,
+                trigger=CronTrigger(hour=RETENTION_JOB_HOUR, minute=30),
+                id='file_gc_job',
+                jobstore=PERSISTENT_JOBSTORE,
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1
+            )
+            # 예약 메일 dispatcher - DB 의 발송 대기 예약 메일 로드 후 시작
+            get_email_dispatcher().start()
+            _is_leader = True
+        logger.info("Scheduler leadership acquired.")
+    elif not acquired and _is_leader:
+        _step_down()
+        logger.warning("Scheduler leadership lost.")
+    return _is_leader
+
+# 리더 해제 (영구 작업 저장소 분리 + dispatcher 중지, 작업/예약 메일은 DB 에 남아 다음 리더가 실행) -> 리더였는지 반환
+def _step_down() -> bool:
+    global _is_leader
+    with _leader_lock:
+        if not _is_leader:
+            return False
+        _is_leader = False
+        try:
+            get_scheduler().remove_jobstore(PERSISTENT_JOBSTORE)
+        except KeyError:
+            pass
+    get_email_dispatcher().stop()
+    return True
+
+# [9] is_scheduler_leader: 이 프로세스가 리더인지 여부
+def is_scheduler_leader() -> bool:
+    return _is_leader
+
+# [10] run_file_gc_job: 참조가 없는 파일 blob 정리
+def run_file_gc_job():
+    """
+    ref_cnt 가 0 이 된 뒤 FILE_GC_GRACE_SEC 이 지난 blob 을 삭제합니다. (한 번에 500건씩, 남은 것이 없을 때까지)
+    """
+    try:
+        deleted, reclaimed = 0, 0
+        while True:
+            result = collect_unreferenced_blobs(grace_sec=FILE_GC_GRACE_SEC, limit=500)
+            deleted += result['deleted']
+            reclaimed += result['reclaimed_bytes']
+            if result['deleted'] < 500:
+                break
+        logger.info(f"File GC job finished. Deleted: {deleted}, Reclaimed: {reclaimed} bytes")
+    except Exception as e:
+        logger.error(f"Error in run_file_gc_job: {e}")
+
+# [11] is_worker_alive: 워커 생존 lease 가 유효한지 여부 (lease 는 renew_scheduler_lease 가 갱신)
+def is_worker_alive(worker_id: str) -> bool:
+    return get_shared_state().get_lease_owner(_worker_lease_name(worker_id)) == worker_id
+
+def _worker_lease_name(worker_id: str) -> str:
+    return f"{WORKER_LEASE_PREFIX}{worker_id}"
@@ -1,6 +1,7 @@
 import os
 import sys
 import asyncio
+from contextlib import redirect_stdout
 
 # 프로젝트 루트를 sys.path에 추가하여 어디서든 'src' 모듈을 찾을 수 있게 합니다.
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,20 +11,29 @@ if project_root not in sys.path:
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-try:
-    from src.db.init_manager import init_db
-    from src.mcp_server_impl import mcp
-    from mcp.server.stdio import stdio_server
-    from mcp.server.lowlevel.server import NotificationOptions
-except ImportError:
-    from db.init_manager import init_db
-    from mcp_server_impl import mcp
-    from mcp.server.stdio import stdio_server
-    from mcp.server.lowlevel.server import NotificationOptions
+"""
+    stdio 모드 (Claude Desktop 등 클라이언트가 세션마다 프로세스를 실행)
+    - FastAPI 앱(sse_server)은 임포트하지 않음, MCP 서버 구현(mcp_server_impl)은 기동 시 전체 로드 (initialize 부터 이 서버가 처리)
+    - stdout 은 JSON-RPC 채널이므로, 임포트/초기화 중 print 가 섞이지 않도록 stderr 로 돌림
+    - init_db 는 스키마 버전(PRAGMA user_version)이 최신이면 DDL 을 생략 (init_manager.SCHEMA_VERSION)
+"""
+
+with redirect_stdout(sys.stderr):
+    try:
+        from src.db.init_manager import init_db
+        from src.mcp_server_impl import mcp
+        from mcp.server.stdio import stdio_server
+        from mcp.server.lowlevel.server import NotificationOptions
+    except ImportError:
+        from db.init_manager import init_db
+        from mcp_server_impl import mcp
+        from mcp.server.stdio import stdio_server
+        from mcp.server.lowlevel.server import NotificationOptions
 
 async def main():
-    # 1. DB 초기화
-    init_db()
+    # 1. DB 초기화 (스키마가 최신이면 DDL 생략)
+    with redirect_stdout(sys.stderr):
+        init_db()
     
     # 2. 통합 MCP 서버 실행 (Stdio 방식)
     print("Starting Unified MCP Server (Stdio)...", file=sys.stderr)
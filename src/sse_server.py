@@ -4,6 +4,9 @@ from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from mcp.server.sse import SseServerTransport
+from uuid import UUID
+import asyncio
+import re
 import uvicorn
 import logging
 import os
@@ -19,9 +22,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.db.init_manager import init_db
 from src.mcp_server_impl import mcp
 from src.scheduler import start_scheduler, shutdown_scheduler
+from src.db.notification import clear_unread_cache
+from src.utils.export_jobs import shutdown_export_workers
 from src.utils.auth import verify_token
 from src.db import get_user, get_access_token
 from src.utils.context import set_current_user, clear_current_user
+from src.utils.shared_state import get_shared_state
+from src.utils.tool_registry_cache import invalidate_tool_caches
+from src.utils.quota_manager import quota_manager
+from src.utils.mailer import close_smtp_pool
+from src.utils.telegram_bot import close_telegram_dispatcher
+from src.utils.download_log import close_download_log
 # Include Routers
 from src.routers import auth, users, mcp as mcp_router, system, email, files, openapi, execution, admin_db, notification, mcp_execution, export
 from src.routers import token
@@ -34,6 +45,9 @@ from src.routers import token
     1. 앱 초기화
     2. 라우터 포함
     3. SSE 핸들러
+    4. 워커 간 공유 상태 (uvicorn --workers N)
+       - cache.invalidate: DB 복원 등으로 다른 워커의 도구/사용량 캐시 무효화
+       - mcp.message: /messages 요청이 SSE 세션을 갖지 않은 워커로 들어오면 세션을 가진 워커로 전달
 """
 
 # ==========================================
@@ -61,17 +75,40 @@ logger.info(f"Server started. Log file: {log_filename}")
 # ==========================================
 # 2. Server Init
 # ==========================================
+CACHE_INVALIDATE_CHANNEL = "cache.invalidate"
+MCP_MESSAGE_CHANNEL = "mcp.message"
+# 이 워커의 이벤트 루프 (공유 상태 polling 스레드에서 MCP 세션으로 메시지를 넣을 때 사용)
+_loop = None
+
+
+def _on_cache_invalidate(payload: dict):
+    invalidate_tool_caches()
+    quota_manager.reset()
+    clear_unread_cache()
+    logger.info(f"Caches invalidated by shared event: {payload}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         init_db()
         logger.info("Database initialized.")
         start_scheduler()
+        # 다른 워커가 발행한 캐시 무효화 / MCP 세션 메시지 수신
+        global _loop
+        _loop = asyncio.get_running_loop()
+        shared_state = get_shared_state()
+        shared_state.subscribe(CACHE_INVALIDATE_CHANNEL, _on_cache_invalidate)
+        shared_state.subscribe(MCP_MESSAGE_CHANNEL, _on_mcp_message)
     except Exception as e:
         logger.error(f"Startup error: {e}")
     yield
     try:
         shutdown_scheduler()
+        shutdown_export_workers()
+        get_shared_state().close()
+        close_smtp_pool()
+        close_telegram_dispatcher()
+        close_download_log()
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
 
@@ -156,8 +193,14 @@ async def handle_sse(
             logger.warning("Connection attempt without valid token - Access Denied")
             raise HTTPException(status_code=401, detail="Authentication required. Please provide a valid token.")
 
-        async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
-            await mcp.run(streams[0], streams[1], mcp.create_initialization_options())
+        # 다른 워커로 들어온 /messages 요청을 이 워커로 전달받을 수 있도록 세션 위치 등록 (종료 시 해제)
+        session = {}
+        try:
+            async with sse.connect_sse(request.scope, request.receive, _capture_session_id(request._send, session)) as streams:
+                await mcp.run(streams[0], streams[1], mcp.create_initialization_options())
+        finally:
+            if session.get("id"):
+                await _unregister_session(session["id"])
             
     except Exception as e:
         logger.error(f"SSE Error: {e}")
@@ -187,9 +230,111 @@ class NoOpResponse(Response):
 
 @app.post("/messages")
 async def handle_messages(request: Request):
+    session_id = request.query_params.get("session_id")
+    if session_id and not _is_local_session(session_id):
+        # SSE 세션이 다른 워커에 있으면 공유 상태로 전달
+        if get_shared_state().get_value(f"{MCP_SESSION_KEY_PREFIX}{session_id}") is None:
+            return Response("Could not find session", status_code=404)
+        body = await request.body()
+        headers = {k: request.headers[k] for k in RELAY_HEADERS if k in request.headers}
+        get_shared_state().publish(
+            MCP_MESSAGE_CHANNEL, {"session_id": session_id, "body": body.decode("utf-8"), "headers": headers}
+        )
+        return Response("Accepted", status_code=202)
+
     await sse.handle_post_message(request.scope, request.receive, request._send)
     return NoOpResponse()
 
+
+# ==========================================
+# 4-1. 워커 간 MCP 세션 메시지 전달
+# - SseServerTransport 는 세션(스트림)을 프로세스 메모리에 보관하므로,
+#   세션 위치(워커)를 공유 상태에 등록해 두고 다른 워커로 들어온 요청은 'mcp.message' 채널로 전달
+# - 세션 id 는 transport 가 클라이언트에 보내는 endpoint 이벤트(/messages?session_id=...)에서 얻어
+#   이 워커의 세션 목록(_local_sessions)에 기록 (transport 내부 상태를 읽지 않음)
+# - 전달받은 요청은 transport 의 공개 API(handle_post_message)로 처리
+# ==========================================
+MCP_SESSION_KEY_PREFIX = "mcp.session:"
+MCP_SESSION_TTL_SEC = 24 * 60 * 60
+# 전달 시 함께 넘기는 요청 헤더 (transport 의 Content-Type / Host / Origin 검증용)
+RELAY_HEADERS = ("content-type", "host", "origin")
+_SESSION_ID_PATTERN = re.compile(rb"session_id=([0-9a-f]{32})")
+_local_sessions = set()
+
+
+def _is_local_session(session_id: str) -> bool:
+    try:
+        return UUID(hex=session_id).hex in _local_sessions
+    except ValueError:
+        return True  # 형식 오류는 transport 가 400 으로 응답
+
+
+def _capture_session_id(send, session: dict):
+    """SSE 응답의 endpoint 이벤트에서 세션 id 를 읽어 등록한 뒤 클라이언트로 전송 (등록 전에는 클라이언트가 세션 id 를 모름)"""
+    async def wrapped_send(message):
+        if "id" not in session and message.get("type") == "http.response.body":
+            match = _SESSION_ID_PATTERN.search(message.get("body", b""))
+            if match:
+                session["id"] = match.group(1).decode()
+                await _register_session(session["id"])
+        await send(message)
+    return wrapped_send
+
+
+async def _register_session(session_id: str):
+    _local_sessions.add(session_id)
+    shared_state = get_shared_state()
+    try:
+        await asyncio.to_thread(
+            shared_state.set_value, f"{MCP_SESSION_KEY_PREFIX}{session_id}", shared_state.worker_id, MCP_SESSION_TTL_SEC
+        )
+    except Exception as e:
+        logger.error(f"MCP session registry error: {e}")
+
+
+async def _unregister_session(session_id: str):
+    _local_sessions.discard(session_id)
+    try:
+        await asyncio.to_thread(get_shared_state().delete_value, f"{MCP_SESSION_KEY_PREFIX}{session_id}")
+    except Exception as e:
+        logger.error(f"MCP session registry error: {e}")
+
+
+async def _deliver_relayed_message(session_id: str, body: bytes, headers: dict):
+    """다른 워커가 받은 /messages 요청을 이 워커의 transport 로 처리 (응답은 원래 워커가 이미 202 로 보냄)"""
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/messages",
+        "root_path": "",
+        "query_string": f"session_id={session_id}".encode(),
+        "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def discard(message):
+        pass
+
+    await sse.handle_post_message(scope, receive, discard)
+
+
+def _on_mcp_message(payload: dict):
+    """다른 워커가 전달한 /messages 요청 -> 이 워커의 세션이면 처리 (공유 상태 polling 스레드에서 호출)"""
+    session_id = payload.get("session_id")
+    if not session_id or session_id not in _local_sessions or _loop is None:
+        return
+    headers = payload.get("headers") or {"content-type": "application/json"}
+    asyncio.run_coroutine_threadsafe(
+        _deliver_relayed_message(session_id, payload["body"].encode("utf-8"), headers), _loop
+    )
+
 # ==========================================
 # 5. Static Files
 # ==========================================
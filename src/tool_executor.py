@@ -1,6 +1,7 @@
 
 import sys
 import json
+import asyncio
 try:
     from src.db.connection import get_db_connection
 except ImportError:
@@ -8,6 +9,8 @@ except ImportError:
 
 """ 
     해당 파일은 사용자가 동적으로 등록한 tool에 대해 SQL/PYTHON 타입에 따라 구분하여 실행하는 def
+    - 실제 실행(sqlite 조회, eval)은 블로킹 작업이므로 스레드(asyncio.to_thread)에서 실행
+      -> 한 세션에서 여러 도구를 동시에 호출해도 이벤트 루프가 막히지 않음
 """
 
 # [tool_type == 'SQL']의 경우에 실행
@@ -15,6 +18,9 @@ async def execute_sql_tool(query_template: str, params: dict) -> str:
     """
     SQL 쿼리를 실행하고 JSON 결과를 반환합니다.
     """
+    return await asyncio.to_thread(_run_sql_tool, query_template, params)
+
+def _run_sql_tool(query_template: str, params: dict) -> str:
     conn = get_db_connection()
     try:
         # 파라미터 바인딩 방식 결정
@@ -46,6 +52,9 @@ async def execute_python_tool(script: str, params: dict) -> str:
     현재는 Phase 2 단계이므로 기본 eval()을 사용하되 최소한의 제약을 둡니다.
     (추후 simpleeval 적용 예정)
     """
+    return await asyncio.to_thread(_run_python_tool, script, params)
+
+def _run_python_tool(script: str, params: dict) -> str:
     try:
         # 1. 사용할 수 있는 전역/지역 변수 제한
         # params를 지역 변수로 주입
@@ -1,10 +1,17 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Union
 
 # 비밀번호 해싱 설정 (Password Hashing Configuration)
 # bcrypt 알고리즘 사용, deprecated="auto"로 설정하여 구버전 호환성 확보
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# - passlib 은 src.db 임포트 시점마다 로드되므로, 실제 비밀번호 검증/해시 시점에 생성 (_get_pwd_context)
+_pwd_context = None
+
+def _get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 import os
 from dotenv import load_dotenv
@@ -37,6 +44,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30 # 기본 토큰 만료 시간 (30분)
     (4) jose 사용하는 def 내부로 import를 이동하여 해결
     =>> 특정 스크립트가 전체 패키지의 모든 라이브러리를 요구하지 않도록 만들어, 실행 환경에 대한 제약(dependency)을 낮춰준다.
     =>> 만일 jose 사용 def가 많아진다면, requirements.txt에 추가하기
+    - passlib(CryptContext)도 같은 방식으로 최초 사용 시점에 로드 (서버 기동 시간 단축)
 """
 
 # [1] verify_password: 평문 비밀번호와 해시된 비밀번호를 비교하여 '일치 여부'를 확인
@@ -47,7 +55,7 @@ def verify_password(plain_password, hashed_password):
     - :param hashed_password: DB에 저장된 해시 비밀번호
     -> :return: 일치하면 True, 아니면 False
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_pwd_context().verify(plain_password, hashed_password)
 
 # [2] get_password_hash: 평문 비밀번호 해시
 def get_password_hash(password):
@@ -57,7 +65,7 @@ def get_password_hash(password):
     :param password: 평문 비밀번호
     :return: 해시된 비밀번호 문자열
     """
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
 
 # [3] create_access_token: JWT 액세스 토큰 생성
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
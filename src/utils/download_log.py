@@ -0,0 +1,121 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from src.db.file_manager import record_file_downloads
+
+"""
+    파일 다운로드 이력 / 횟수 일괄 기록 (메모리 버퍼 + 백그라운드 반영)
+    - [1] DownloadLog.add: 다운로드 1건을 버퍼에 추가 (DB 접근 없음, 바로 반환)
+    - [2] DownloadLog.flush: 버퍼의 이력을 h_file_log 에 일괄 INSERT + h_file.down_cnt 를 파일별 합계로 증가 (연결 1개, 트랜잭션 1개)
+    - [3] DownloadLog.stop: 남은 이력 반영 후 반영 스레드 종료
+    - [4] download_log: 프로세스 공용 인스턴스 / close_download_log: 서버 종료 시 반영
+
+    * 기존 방식은 다운로드마다 log_file_action + increase_download_count 로 DB 연결/커밋을 2번씩 실행했음
+    * 반영 스레드가 DOWNLOAD_LOG_FLUSH_SEC 마다 또는 DOWNLOAD_LOG_BATCH 건이 쌓이면 반영
+    * 반영 실패 시 이력을 버퍼 앞에 되돌려 다음 반영에서 다시 시도 (DOWNLOAD_LOG_MAX_PENDING 초과분은 버림)
+"""
+
+DOWNLOAD_LOG_FLUSH_SEC = float(os.getenv("DOWNLOAD_LOG_FLUSH_SEC", "2"))
+DOWNLOAD_LOG_BATCH = int(os.getenv("DOWNLOAD_LOG_BATCH", "500"))
+DOWNLOAD_LOG_MAX_PENDING = int(os.getenv("DOWNLOAD_LOG_MAX_PENDING", "100000"))
+
+
+class DownloadLog:
+    def __init__(self, flush_sec: float = DOWNLOAD_LOG_FLUSH_SEC, batch: int = DOWNLOAD_LOG_BATCH):
+        self.flush_sec = flush_sec
+        self.batch = batch
+        self._pending = []              # [(file_uid, file_id, reg_uid, reg_dt)]
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self.stats = {"added": 0, "written": 0, "flushes": 0, "dropped": 0}
+
+    # [1] add: 다운로드 1건 추가
+    def add(self, file_uid: int, file_id: str, reg_uid: str):
+        with self._cond:
+            self._pending.append((file_uid, file_id, reg_uid, datetime.now()))
+            self.stats["added"] += 1
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name="download-log", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch:
+                self._cond.notify_all()
+
+    # [2] flush: 버퍼 반영
+    def flush(self) -> int:
+        """버퍼의 이력을 DB 에 반영하고 반영한 건수를 반환합니다."""
+        with self._flush_lock:
+            with self._cond:
+                entries, self._pending = self._pending, []
+            if not entries:
+                return 0
+            try:
+                record_file_downloads(entries)
+            except Exception:
+                with self._cond:
+                    self._pending[:0] = entries
+                    overflow = len(self._pending) - DOWNLOAD_LOG_MAX_PENDING
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.stats["dropped"] += overflow
+                raise
+            with self._cond:
+                self.stats["written"] += len(entries)
+                self.stats["flushes"] += 1
+            return len(entries)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_sec
+                while not self._stopping and len(self._pending) < self.batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[DownloadLog] Flush failed: {e}", file=sys.stderr)
+            if stopping:
+                return
+
+    # [3] stop: 남은 이력 반영 후 종료
+    def stop(self, timeout: float = 5):
+        with self._cond:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout=timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[DownloadLog] Flush failed: {e}", file=sys.stderr)
+
+    def get_status(self) -> dict:
+        with self._cond:
+            return {"pending": len(self._pending), **self.stats}
+
+
+# [4] download_log: 프로세스 공용 인스턴스
+download_log = DownloadLog()
+
+
+def close_download_log():
+    download_log.stop()
+
+
+def _flush_at_exit():
+    try:
+        download_log.flush()
+    except Exception:
+        pass
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,148 @@
+import heapq
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from src.db.email_manager import get_scheduled_email_times
+
+"""
+    예약 메일 dispatcher (발송 시각 heap + 타이머 스레드)
+    - [1] parse_scheduled_dt: 예약 시각 문자열 -> datetime ('YYYY-MM-DD HH:MM[:SS]' 또는 ISO 포맷)
+    - [2] EmailDispatcher.start / stop: DB 에서 발송 대기 예약 메일을 읽어 heap 구성 후 타이머 스레드 시작 / 종료
+    - [3] EmailDispatcher.schedule: 예약 메일 추가 (다음 발송 시각이 앞당겨지면 바로 깨어남)
+    - [4] EmailDispatcher.reload: 오래된 선점 해제 후 DB 기준으로 heap 재구성
+    - [5] EmailDispatcher.get_status: 대기 건수 / 다음 발송 시각
+
+    * 매분 h_email_log 를 조회하지 않고, 가장 빠른 예약 시각까지 잠들었다가 정확히 그 시각에 dispatch 호출
+      (dispatch 는 발송 시각이 된 메일을 선점하여 발송 -> src/scheduler.py process_scheduled_emails)
+    * 취소된 메일은 heap 에 남아 있어도 선점 대상이 아니므로 발송되지 않음
+    * 다른 경로로 추가된 메일을 놓치지 않도록 EMAIL_DISPATCH_RESYNC_SEC 마다 DB 기준으로 다시 로드 (인덱스 조회)
+    * 발송 중 종료된 워커가 선점(SENDING)한 채 남긴 메일은 heap 에 없으므로, 로드 전에 release_stale 로 PENDING 으로 되돌림
+      (시작 = 리더 교체 시점, 이후 재로드마다)
+"""
+
+EMAIL_DISPATCH_RESYNC_SEC = float(os.getenv("EMAIL_DISPATCH_RESYNC_SEC", "600"))
+
+
+# [1] parse_scheduled_dt: 예약 시각 문자열 파싱
+def parse_scheduled_dt(value: str):
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    # ISO 포맷 (frontend에서 T가 포함된 문자열을 보낼 수 있음)
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class EmailDispatcher:
+    def __init__(self, dispatch: Callable[[], None], resync_sec: float = EMAIL_DISPATCH_RESYNC_SEC,
+                 release_stale: Optional[Callable[[], int]] = None):
+        self._dispatch = dispatch
+        self._release_stale = release_stale
+        self.resync_sec = resync_sec
+        self._heap = []             # [(발송 시각 epoch 초, log_id)]
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._next_resync = 0.0
+        self.dispatch_count = 0     # dispatch 호출 횟수 (테스트/모니터링용)
+
+    # [2] start / stop
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+        self.reload()
+        with self._cond:
+            self._thread = threading.Thread(target=self._run, name="email-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        with self._cond:
+            self._heap = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # [3] schedule: 예약 메일 추가
+    def schedule(self, log_id: int, run_at: datetime):
+        due_ts = run_at.timestamp()
+        with self._cond:
+            heapq.heappush(self._heap, (due_ts, log_id))
+            # 가장 빠른 시각이 바뀐 경우에만 깨워서 대기 시간 재계산
+            if self._heap[0] == (due_ts, log_id):
+                self._cond.notify_all()
+
+    # [4] reload: DB 기준으로 heap 재구성
+    def reload(self):
+        if self._release_stale is not None:
+            self._release_stale()
+        heap = []
+        for log_id, scheduled_dt in get_scheduled_email_times():
+            run_at = parse_scheduled_dt(scheduled_dt)
+            if run_at is not None:
+                heap.append((run_at.timestamp(), log_id))
+        heapq.heapify(heap)
+        with self._cond:
+            self._heap = heap
+            self._next_resync = time.time() + self.resync_sec
+            self._cond.notify_all()
+
+    # [5] get_status: 대기 건수 / 다음 발송 시각
+    def get_status(self) -> dict:
+        with self._cond:
+            next_ts = self._heap[0][0] if self._heap else None
+            return {
+                "running": self.running,
+                "queued": len(self._heap),
+                "next_run_time": datetime.fromtimestamp(next_ts).isoformat() if next_ts else None,
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    now = time.time()
+                    if (self._heap and self._heap[0][0] <= now) or now >= self._next_resync:
+                        break
+                    wait = self._next_resync - now
+                    if self._heap:
+                        wait = min(wait, self._heap[0][0] - now)
+                    self._cond.wait(wait)
+                if self._stopping:
+                    return
+                now = time.time()
+                due = 0
+                while self._heap and self._heap[0][0] <= now:
+                    heapq.heappop(self._heap)
+                    due += 1
+                resync = now >= self._next_resync
+
+            try:
+                if due:
+                    self.dispatch_count += 1
+                    self._dispatch()
+                if resync:
+                    self.reload()
+            except Exception as e:
+                print(f"[EmailDispatcher] Dispatch failed: {e}", file=sys.stderr)
+                # DB 오류 등으로 실패하면 잠시 후 DB 기준으로 다시 시도
+                with self._cond:
+                    self._next_resync = time.time() + 5
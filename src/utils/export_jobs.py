@@ -0,0 +1,188 @@
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from src.db.export_job import (
+    start_export_job,
+    update_export_job_progress,
+    complete_export_job,
+    fail_export_job,
+    fail_unfinished_export_jobs,
+    get_unfinished_export_job_owners
+)
+from src.db.file_manager import save_file_metadata
+from src.utils.export_writer import write_csv, write_xlsx, CSV_MEDIA_TYPE, XLSX_MEDIA_TYPE
+
+logger = logging.getLogger(__name__)
+
+"""
+    내보내기(Export) 백그라운드 작업 워커
+    - [1] submit_export_job: 작업을 워커 스레드 풀에 등록
+    - [2] run_export_job: 실제 파일 생성 (chunk 단위 기록 + 진행률 갱신 + h_file 등록)
+    - [3] shutdown_export_workers: 서버 종료 시 워커 정리
+    - [4] fail_orphaned_export_jobs: 종료된 워커의 미완료 작업 실패 처리 (리더 워커가 lease 갱신 주기마다 실행)
+
+    * 진행 상황은 h_export_job 에 기록되고(폴링), 알림 SSE 스트림으로도 'export_job' 이벤트를 전송
+    * 완성된 파일은 h_file 에 storage_tp = 'EXPORT' 로 등록 (파일 목록/일반 다운로드에서 제외)
+      -> 작업을 등록한 관리자만 /api/export/jobs/{job_id}/download (Range 지원) 로 다운로드
+    * 작업에는 실행 워커 id(owner)를 기록 -> 재시작/비정상 종료로 중단된 작업은 owner 가 더 이상 살아 있지 않을 때만 실패 처리
+      (워커마다 기동 시 전체 미완료 작업을 실패 처리하면 다른 워커에서 실행 중인 작업까지 실패로 바뀜)
+"""
+
+# 동시에 실행할 내보내기 작업 수
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+# 진행률 갱신 주기 (처리 건수 기준)
+PROGRESS_INTERVAL = int(os.getenv("EXPORT_JOB_PROGRESS_INTERVAL", "5000"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix="export-job")
+        return _executor
+
+
+# 내보내기 파일 저장 경로 (파일 업로드 경로 하위 exports/yyyy/mm/dd)
+def _get_export_dir() -> str:
+    from src.routers.files import BASE_UPLOAD_DIR
+    export_dir = os.path.join(BASE_UPLOAD_DIR, "exports", datetime.now().strftime("%Y/%m/%d"))
+    os.makedirs(export_dir, exist_ok=True)
+    return export_dir
+
+
+# 알림 SSE 스트림으로 작업 상태 전송 (워커 스레드에서 호출)
+def _notify(user_uid: int, job_id: str, status: str, total_cnt: int, processed_cnt: int, **extra):
+    if not user_uid:
+        return
+    try:
+        from src.routers.notification import notification_manager
+        notification_manager.notify_threadsafe(user_uid, {
+            "type": "export_job",
+            "job_id": job_id,
+            "status": status,
+            "total_cnt": total_cnt,
+            "processed_cnt": processed_cnt,
+            **extra
+        })
+    except Exception as e:
+        logger.warning(f"Export job notify failed ({job_id}): {e}")
+
+
+# [1] submit_export_job: 작업을 워커 스레드 풀에 등록
+def submit_export_job(
+    job_id: str,
+    user: dict,
+    count_rows: Callable[[], int],
+    iter_rows: Callable[[], Iterable[dict]],
+    column_map: dict,
+    format: str,
+    filename: str,
+    sheet_name: str
+):
+    """
+    count_rows / iter_rows 는 워커 스레드에서 호출되는 함수 (요청 스레드에서는 DB 조회를 하지 않음)
+    """
+    return _get_executor().submit(
+        run_export_job, job_id, user, count_rows, iter_rows, column_map, format, filename, sheet_name
+    )
+
+
+# [2] run_export_job: 실제 파일 생성
+def run_export_job(
+    job_id: str,
+    user: dict,
+    count_rows: Callable[[], int],
+    iter_rows: Callable[[], Iterable[dict]],
+    column_map: dict,
+    format: str,
+    filename: str,
+    sheet_name: str
+):
+    user_uid = user.get('uid')
+    total_cnt = 0
+    processed = {"cnt": 0}
+    part_path = None
+
+    def _tracked(rows: Iterable[dict]):
+        # 행을 흘려 보내면서 일정 건수마다 진행률 기록/전송
+        for row in rows:
+            yield row
+            processed["cnt"] += 1
+            if processed["cnt"] % PROGRESS_INTERVAL == 0:
+                update_export_job_progress(job_id, processed["cnt"])
+                _notify(user_uid, job_id, "RUNNING", total_cnt, processed["cnt"])
+
+    try:
+        total_cnt = count_rows()
+        start_export_job(job_id, total_cnt)
+        _notify(user_uid, job_id, "RUNNING", total_cnt, 0)
+
+        file_id = str(uuid.uuid4())
+        ext = "csv" if format == "csv" else "xlsx"
+        file_path = os.path.join(_get_export_dir(), f"{file_id}.{ext}")
+
+        # 작성 중인 파일은 .part 로 기록 후 완료 시점에 교체 (미완성 파일이 다운로드되지 않도록)
+        part_path = file_path + ".part"
+        if format == "csv":
+            write_csv(_tracked(iter_rows()), column_map, part_path)
+        else:
+            write_xlsx(_tracked(iter_rows()), column_map, part_path, sheet_name)
+        os.replace(part_path, file_path)
+        part_path = None
+
+        save_file_metadata({
+            'file_id': file_id,
+            'file_nm': f"{file_id}.{ext}",
+            'org_file_nm': f"{filename}.{ext}",
+            'file_path': file_path,
+            'file_url': f"/files/download/{file_id}",
+            'file_size': os.path.getsize(file_path),
+            'file_type': CSV_MEDIA_TYPE if format == "csv" else XLSX_MEDIA_TYPE,
+            'extension': ext,
+            'storage_tp': 'EXPORT',
+            'reg_uid': user.get('user_id'),
+            'batch_id': f"export:{job_id}"
+        })
+        complete_export_job(job_id, file_id, processed["cnt"])
+        _notify(user_uid, job_id, "DONE", total_cnt, processed["cnt"],
+                file_id=file_id, download_url=f"/api/export/jobs/{job_id}/download")
+        logger.info(f"Export job {job_id} completed ({processed['cnt']} rows)")
+    except Exception as e:
+        logger.error(f"Export job {job_id} failed: {e}")
+        fail_export_job(job_id, str(e))
+        _notify(user_uid, job_id, "FAIL", total_cnt, processed["cnt"], error_msg=str(e))
+        if part_path and os.path.exists(part_path):
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+
+
+# [3] shutdown_export_workers: 서버 종료 시 워커 정리 (대기 중인 작업은 취소)
+def shutdown_export_workers():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# [4] fail_orphaned_export_jobs: 종료된 워커의 미완료 작업 실패 처리 -> 실패 처리한 건수 반환
+def fail_orphaned_export_jobs(is_worker_alive: Callable[[str], bool]) -> int:
+    failed = 0
+    for owner in get_unfinished_export_job_owners():
+        # owner 가 없는 작업은 owner 기록 이전(v17 migration 이전)에 등록된 작업
+        if owner is not None and is_worker_alive(owner):
+            continue
+        failed += fail_unfinished_export_jobs(owner)
+    if failed:
+        logger.warning(f"Failed {failed} export jobs left by stopped workers.")
+    return failed
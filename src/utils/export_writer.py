@@ -0,0 +1,106 @@
+import csv
+import io
+import os
+import tempfile
+from typing import Iterable, Iterator
+
+"""
+    사용 이력 내보내기(CSV/Excel) 스트리밍 Writer
+    - [1] iter_csv: dict row iterator -> CSV bytes chunk (UTF-8 BOM 포함)
+    - [2] iter_xlsx: dict row iterator -> openpyxl write_only 통합문서 bytes chunk
+    - [3] sanitize_cell: Excel(XML)에 쓸 수 없는 제어문자 제거
+    - [4] write_csv: dict row iterator -> CSV 파일 저장 (백그라운드 내보내기용)
+    - [5] write_xlsx: dict row iterator -> xlsx 파일 저장 (백그라운드 내보내기용)
+
+    * iter_* 함수는 generator 이므로 DB 커서도 응답을 내려보내는 시점에 chunk 단위로 읽힌다.
+      (전체 행을 list/DataFrame 으로 만들지 않으므로 건수와 무관하게 메모리 사용량이 일정)
+"""
+
+# 한 번에 내려보낼 CSV 행 수
+CSV_FLUSH_ROWS = 500
+# xlsx 임시 파일을 읽어 내려보낼 chunk 크기
+XLSX_READ_CHUNK = 64 * 1024
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+# [1] iter_csv: CSV 스트리밍
+def iter_csv(rows: Iterable[dict], column_map: dict) -> Iterator[bytes]:
+    """
+    column_map: {row key: 헤더명} (dict 순서대로 컬럼 출력)
+    - Excel 에서 한글이 깨지지 않도록 첫 chunk 에 UTF-8 BOM 을 붙인다.
+    """
+    keys = list(column_map.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column_map.values())
+
+    count = 0
+    first = True
+    for row in rows:
+        writer.writerow(["" if row.get(k) is None else row.get(k) for k in keys])
+        count += 1
+        if count % CSV_FLUSH_ROWS == 0:
+            data = buffer.getvalue().encode("utf-8")
+            yield (b"\xef\xbb\xbf" + data) if first else data
+            first = False
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    data = buffer.getvalue().encode("utf-8")
+    yield (b"\xef\xbb\xbf" + data) if first else data
+
+
+# [2] iter_xlsx: Excel 스트리밍
+def iter_xlsx(rows: Iterable[dict], column_map: dict, sheet_name: str = "Sheet1") -> Iterator[bytes]:
+    """
+    openpyxl write_only 모드는 행을 임시 XML 로 바로 흘려 쓰므로 메모리에 시트 전체를 들고 있지 않는다.
+    - xlsx 는 zip 포맷이라 완성 전에는 내려보낼 수 없으므로, 임시 파일에 저장한 뒤 chunk 단위로 읽어 전송
+    - 전송이 끝나거나 클라이언트가 끊기면(GeneratorExit) 임시 파일 삭제
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix="export_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_xlsx(rows, column_map, tmp_path, sheet_name)
+
+        with open(tmp_path, "rb") as f:
+            while True:
+                chunk = f.read(XLSX_READ_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# [3] sanitize_cell: Excel 에 쓸 수 없는 제어문자 제거 (도구 결과에 섞여 들어오는 경우 저장 실패 방지)
+def sanitize_cell(value):
+    if isinstance(value, str):
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+# [4] write_csv: CSV 파일 저장
+def write_csv(rows: Iterable[dict], column_map: dict, path: str):
+    with open(path, "wb") as f:
+        for chunk in iter_csv(rows, column_map):
+            f.write(chunk)
+
+
+# [5] write_xlsx: xlsx 파일 저장 (openpyxl write_only)
+def write_xlsx(rows: Iterable[dict], column_map: dict, path: str, sheet_name: str = "Sheet1"):
+    from openpyxl import Workbook
+
+    keys = list(column_map.keys())
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name)
+    ws.append(list(column_map.values()))
+    for row in rows:
+        ws.append([sanitize_cell(row.get(k)) for k in keys])
+    wb.save(path)
+    wb.close()
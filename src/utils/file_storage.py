@@ -0,0 +1,112 @@
+import os
+import hashlib
+import tempfile
+from starlette.concurrency import run_in_threadpool
+
+"""
+    업로드 파일 저장 (스트리밍)
+    - [1] save_upload: UploadFile 을 chunk 단위로 임시 파일에 쓰면서 SHA-256 계산, 크기 제한 확인 후 최종 경로로 원자적 교체
+    - [2] remove_quietly: 저장한 파일 정리 (실패 시 무시)
+    - [3] hash_upload: 쓰지 않고 크기/SHA-256 만 계산 (내용 주소 저장소에서 중복 여부 확인용)
+    - [4] get_blob_path: 내용 주소 blob 경로 ({base_dir}/cas/ab/cd/<sha256>)
+    - [5] copy_with_hash: 파일 객체를 임시 파일로 복사하며 SHA-256 계산 후 교체 (save_upload / LocalStorage.put 공용)
+
+    * 기존 방식은 이벤트 루프에서 shutil.copyfileobj 로 파일 전체를 복사하여, 큰 파일 업로드 중에는 다른 요청(SSE 등)이 멈췄음
+    * 복사는 파일마다 threadpool 작업 1개로 실행 (chunk 마다 스레드 전환하지 않음), 이벤트 루프는 다른 요청 처리
+    * 임시 파일은 최종 경로와 같은 디렉터리에 만들고 os.replace 로 교체 -> 다운로드 경로에 미완성 파일이 보이지 않음
+    * 크기 제한을 넘으면 남은 데이터를 읽지 않고 중단, 임시 파일 삭제 후 FileTooLargeError
+    * 내용 주소(CAS) 모드는 hash_upload 로 먼저 해시만 계산 -> 이미 있는 blob 이면 디스크 쓰기 없이 참조만 추가
+"""
+
+FILE_UPLOAD_CHUNK_SIZE = int(os.getenv("FILE_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+
+class FileTooLargeError(Exception):
+    def __init__(self, filename: str, max_size: int):
+        super().__init__(f"{filename} exceeds the maximum upload size ({max_size} bytes)")
+        self.filename = filename
+        self.max_size = max_size
+
+
+def _hash_only(source, max_size: int, filename: str):
+    hasher = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(FILE_UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_size and size > max_size:
+            raise FileTooLargeError(filename, max_size)
+        hasher.update(chunk)
+    return size, hasher.hexdigest()
+
+
+# [1] save_upload: 스트리밍 저장 + SHA-256 + 크기 제한
+async def save_upload(upload, dest_path: str, max_size: int = 0):
+    """
+    UploadFile 을 dest_path 에 저장하고 (크기, sha256 hex) 를 반환합니다.
+    - max_size(bytes) 를 넘으면 FileTooLargeError (0 이면 제한 없음)
+    """
+    # multipart 파싱 시 크기를 이미 알고 있으면 복사 전에 거절
+    if max_size and upload.size is not None and upload.size > max_size:
+        raise FileTooLargeError(upload.filename, max_size)
+    await upload.seek(0)
+    return await run_in_threadpool(copy_with_hash, upload.file, dest_path, max_size, upload.filename)
+
+
+# [2] remove_quietly: 파일 삭제 (없거나 실패해도 무시)
+def remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# [3] hash_upload: 크기 / SHA-256 계산 (디스크 쓰기 없음)
+async def hash_upload(upload, max_size: int = 0):
+    """
+    UploadFile 을 끝까지 읽어 (크기, sha256 hex) 를 반환합니다. 이후 save_upload 를 위해 처음 위치로 되돌립니다.
+    - max_size(bytes) 를 넘으면 FileTooLargeError (0 이면 제한 없음)
+    """
+    if max_size and upload.size is not None and upload.size > max_size:
+        raise FileTooLargeError(upload.filename, max_size)
+    await upload.seek(0)
+    try:
+        return await run_in_threadpool(_hash_only, upload.file, max_size, upload.filename)
+    finally:
+        await upload.seek(0)
+
+
+# [4] get_blob_path: 내용 주소 blob 경로 (디렉터리 생성)
+def get_blob_path(base_dir: str, file_hash: str) -> str:
+    blob_dir = os.path.join(base_dir, "cas", file_hash[:2], file_hash[2:4])
+    os.makedirs(blob_dir, exist_ok=True)
+    return os.path.join(blob_dir, file_hash)
+
+
+# [5] copy_with_hash: 파일 객체를 스트리밍 복사 + SHA-256 + 크기 제한 (동기, threadpool / 저장소 backend 에서 사용)
+def copy_with_hash(source, dest_path: str, max_size: int, filename: str):
+    """
+    source 를 dest_path 옆 임시 파일에 복사하고 (크기, sha256 hex) 를 반환합니다. 성공 시 dest_path 로 교체
+    - max_size(bytes) 를 넘으면 임시 파일 삭제 후 FileTooLargeError (0 이면 제한 없음)
+    """
+    fd, part_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), prefix=".upload-", suffix=".part")
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = source.read(FILE_UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size and size > max_size:
+                    raise FileTooLargeError(filename, max_size)
+                hasher.update(chunk)
+                buffer.write(chunk)
+        os.replace(part_path, dest_path)
+    except BaseException:
+        remove_quietly(part_path)
+        raise
+    return size, hasher.hexdigest()
@@ -1,90 +1,305 @@
 import logging
+import os
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 try:
-    from src.db.system_config import get_config_value
+    from src.db.system_config import get_config_value, get_config_version
 except ImportError:
-    from db.system_config import get_config_value
+    from db.system_config import get_config_value, get_config_version
 
 logger = logging.getLogger(__name__)
 
 """
    이메일 발송 관련 py 파일
-   - [1] _get_config: DB에서 이메일 설정을 가져옵니다.
+   - [1] _get_config: DB에서 이메일 설정을 가져옵니다. (캐시, set_config/delete_config 시 무효화)
    - [2] send_immediate: 즉시 이메일 발송을 합니다.
    - [3] check_smtp_connection: SMTP 연결 상태를 확인합니다.
+   - [4] send_many: 여러 이메일을 동시에 발송합니다. (연결 풀 크기만큼 병렬)
+   - [5] SMTPPool: 로그인까지 마친 SMTP 연결을 재사용하는 연결 풀
+   - [6] close_smtp_pool: 풀의 유휴 연결을 모두 종료합니다. (서버 종료 시)
+
+   * 메일마다 연결 + STARTTLS + 로그인을 반복하지 않고, 풀의 연결로 이어서 발송
+     (유휴 SMTP_POOL_IDLE_SEC 초가 지나거나 SMTP_MAX_MESSAGES_PER_CONN 건을 보낸 연결은 종료)
+   * 발송 속도는 SMTP 서버(host)별로 제한 ('mail.rate_per_sec' 설정 또는 SMTP_RATE_PER_SEC, 0 이면 제한 없음)
+   * 일시적 오류(연결 끊김, 4xx 응답)는 SMTP_MAX_RETRIES 회까지 지수 백오프로 재시도, 5xx 응답은 바로 실패
+   * gmail_config 선택 설정: 'mail.starttls'(기본 true), 'mail.pool_size', 'mail.rate_per_sec'
 """
 
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_POOL_IDLE_SEC = float(os.getenv("SMTP_POOL_IDLE_SEC", "60"))
+SMTP_MAX_MESSAGES_PER_CONN = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONN", "100"))
+SMTP_RATE_PER_SEC = float(os.getenv("SMTP_RATE_PER_SEC", "10"))
+SMTP_MAX_RETRIES = int(os.getenv("SMTP_MAX_RETRIES", "2"))
+SMTP_RETRY_BASE_SEC = float(os.getenv("SMTP_RETRY_BASE_SEC", "0.5"))
+SMTP_TIMEOUT_SEC = float(os.getenv("SMTP_TIMEOUT_SEC", "30"))
+# 다른 프로세스에서 바뀐 설정을 반영하기까지의 최대 시간
+SMTP_CONFIG_TTL_SEC = float(os.getenv("SMTP_CONFIG_TTL_SEC", "30"))
+
+# 설정 캐시: name -> (config, config_version, loaded_at)
+_config_cache = {}
+_config_lock = threading.Lock()
+
+
+def _config_flag(config: dict, key: str, default: bool) -> bool:
+    value = config.get(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() not in ("false", "0", "no", "off")
+    return bool(value)
+
+
+def _connect(config: dict, timeout: float = SMTP_TIMEOUT_SEC) -> smtplib.SMTP:
+    """SMTP 연결 + STARTTLS + 로그인"""
+    server = smtplib.SMTP(config['mail.host'], int(config['mail.port']), timeout=timeout)
+    try:
+        if _config_flag(config, 'mail.starttls', True):
+            server.starttls()
+        server.login(config['mail.username'], config['mail.password'])
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _quit(server: smtplib.SMTP):
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+class _PooledConnection:
+    __slots__ = ("server", "key", "last_used", "sent")
+
+    def __init__(self, server: smtplib.SMTP, key: tuple):
+        self.server = server
+        self.key = key
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+# [5] SMTPPool: SMTP 연결 풀
+class SMTPPool:
+    def __init__(self, idle_sec: float = SMTP_POOL_IDLE_SEC, max_messages: int = SMTP_MAX_MESSAGES_PER_CONN):
+        self.idle_sec = idle_sec
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._idle = {}     # key -> [_PooledConnection]
+        self._slots = {}    # key -> BoundedSemaphore (서버/계정별 동시 연결 수 제한)
+
+    @staticmethod
+    def _key(config: dict) -> tuple:
+        return (config['mail.host'], int(config['mail.port']), config['mail.username'], config['mail.password'],
+                _config_flag(config, 'mail.starttls', True))
+
+    def acquire(self, config: dict) -> _PooledConnection:
+        """유휴 연결을 꺼내거나 새로 연결합니다. 동시 연결이 풀 크기만큼 사용 중이면 반납될 때까지 대기"""
+        key = self._key(config)
+        with self._lock:
+            slots = self._slots.get(key)
+            if slots is None:
+                slots = self._slots[key] = threading.BoundedSemaphore(int(config.get('mail.pool_size') or SMTP_POOL_SIZE))
+        slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    idle = self._idle.get(key)
+                    conn = idle.pop() if idle else None
+                if conn is None:
+                    return _PooledConnection(_connect(config), key)
+                if time.monotonic() - conn.last_used < self.idle_sec:
+                    return conn
+                # 오래 쉰 연결은 서버가 이미 끊었을 수 있으므로 종료
+                _quit(conn.server)
+        except Exception:
+            slots.release()
+            raise
+
+    def release(self, conn: _PooledConnection, broken: bool = False):
+        if broken or conn.sent >= self.max_messages:
+            _quit(conn.server)
+        else:
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self._idle.setdefault(conn.key, []).append(conn)
+        with self._lock:
+            slots = self._slots.get(conn.key)
+        if slots is not None:
+            slots.release()
+
+    def clear(self):
+        """유휴 연결 종료 (사용 중인 연결은 반납 시 그대로 풀에 돌아감)"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                _quit(conn.server)
+
+
+class _RateLimiter:
+    """초당 rate 건 이하로 발송 간격을 맞춥니다. (rate <= 0 이면 제한 없음)"""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._next - now, 0)
+            self._next = max(self._next, now) + 1 / self.rate
+        if wait:
+            time.sleep(wait)
+
+
+_smtp_pool = SMTPPool()
+_rate_limiters = {}     # host -> _RateLimiter
+_rate_lock = threading.Lock()
+
+
+def _rate_limiter(config: dict) -> _RateLimiter:
+    rate = float(config.get('mail.rate_per_sec', SMTP_RATE_PER_SEC))
+    host = config['mail.host']
+    with _rate_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None or limiter.rate != rate:
+            limiter = _rate_limiters[host] = _RateLimiter(rate)
+        return limiter
+
+
+def _is_transient(error: Exception) -> bool:
+    """재시도할 오류인지 (연결 오류, 4xx 응답)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+
+def _is_broken(error: Exception) -> bool:
+    """연결을 더 쓸 수 없는 오류인지 (421: 서버가 연결 종료 예정)"""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return not isinstance(error, smtplib.SMTPRecipientsRefused)
+
+
+# [6] close_smtp_pool: 풀의 유휴 연결 종료
+def close_smtp_pool():
+    _smtp_pool.clear()
+
+
 class EmailSender:
     def __init__(self):
         self.config_name = 'gmail_config'
-        
+
     # [1] _get_config: DB에서 이메일 설정을 가져옵니다.
     def _get_config(self):
-        """Fetch email configuration from DB."""
+        """Fetch email configuration from DB (cached until set_config/delete_config or SMTP_CONFIG_TTL_SEC)."""
+        version = get_config_version()
+        with _config_lock:
+            cached = _config_cache.get(self.config_name)
+        if cached and cached[1] == version and time.monotonic() - cached[2] < SMTP_CONFIG_TTL_SEC:
+            return cached[0]
+
         config = get_config_value(self.config_name)
         if not config:
             raise ValueError(f"System configuration '{self.config_name}' not found.")
-        
+
         required_keys = ['mail.host', 'mail.port', 'mail.username', 'mail.password']
         for key in required_keys:
             if key not in config:
                 raise ValueError(f"Missing required email config key: {key}")
-                
+
+        with _config_lock:
+            previous = _config_cache.get(self.config_name)
+            _config_cache[self.config_name] = (config, version, time.monotonic())
+        # 계정/서버가 바뀌었으면 이전 설정으로 로그인한 연결은 정리
+        if previous and previous[0] != config:
+            _smtp_pool.clear()
         return config
 
     # [2] send_immediate: 즉시 이메일 발송을 합니다.
     def send_immediate(self, recipient: str, subject: str, content: str) -> tuple[bool, str | None]:
         """
-        Send an email immediately using Gmail SMTP.
+        Send an email immediately using a pooled SMTP session.
         Returns: (success: bool, error_msg: str | None)
         """
-        logger.info("Sending email to {}".format(recipient))
         try:
             config = self._get_config()
-            
-            smtp_host = config['mail.host']
-            smtp_port = int(config['mail.port'])
-            username = config['mail.username']
-            password = config['mail.password']
-            
-            # 이메일 구성
-            msg = MIMEMultipart()
-            msg['From'] = username
-            msg['To'] = recipient
-            msg['Subject'] = subject
-            
-            # 이메일 본문 추가
-            msg.attach(MIMEText(content, 'plain'))
-            
-            # 이메일 서버를 통해 이메일 전송
-            server = smtplib.SMTP(smtp_host, smtp_port)
-            server.starttls()
-            server.login(username, password)
-            text = msg.as_string()
-            server.sendmail(username, recipient, text)
-            server.quit()
-                
-            return True, None
-            
         except Exception as e:
             return False, str(e)
+        return self._deliver(config, recipient, subject, content)
+
+    def _deliver(self, config: dict, recipient: str, subject: str, content: str) -> tuple[bool, str | None]:
+        logger.info("Sending email to {}".format(recipient))
+        username = config['mail.username']
+
+        # 이메일 구성
+        msg = MIMEMultipart()
+        msg['From'] = username
+        msg['To'] = recipient
+        msg['Subject'] = subject
+
+        # 이메일 본문 추가
+        msg.attach(MIMEText(content, 'plain'))
+        text = msg.as_string()
+
+        limiter = _rate_limiter(config)
+        attempt = 0
+        while True:
+            try:
+                limiter.acquire()
+                conn = _smtp_pool.acquire(config)
+            except Exception as e:
+                error = e
+            else:
+                try:
+                    # 풀의 연결로 이메일 전송
+                    conn.server.sendmail(username, recipient, text)
+                    conn.sent += 1
+                    _smtp_pool.release(conn)
+                    return True, None
+                except Exception as e:
+                    error = e
+                    _smtp_pool.release(conn, broken=_is_broken(e))
+
+            if attempt >= SMTP_MAX_RETRIES or not _is_transient(error):
+                return False, str(error)
+            attempt += 1
+            logger.warning(f"Retrying email to {recipient} ({attempt}/{SMTP_MAX_RETRIES}): {error}")
+            time.sleep(SMTP_RETRY_BASE_SEC * (2 ** (attempt - 1)))
 
     # [3] check_smtp_connection: SMTP 연결 상태를 확인합니다.
     def check_smtp_connection(self) -> tuple[bool, str | None]:
         """Check SMTP server connection and login."""
         try:
             config = self._get_config()
-            smtp_host = config['mail.host']
-            smtp_port = int(config['mail.port'])
-            username = config['mail.username']
-            password = config['mail.password']
-            
-            server = smtplib.SMTP(smtp_host, smtp_port, timeout=10)
-            server.starttls()
-            server.login(username, password)
+            server = _connect(config, timeout=10)
             server.quit()
             return True, None
         except Exception as e:
             return False, str(e)
+
+    # [4] send_many: 여러 이메일을 동시에 발송합니다.
+    def send_many(self, messages: list, max_workers: int = None) -> list:
+        """
+        messages: [(recipient, subject, content)]
+        Returns: 입력 순서대로 [(success, error_msg)]
+        """
+        if not messages:
+            return []
+        try:
+            config = self._get_config()
+        except Exception as e:
+            return [(False, str(e))] * len(messages)
+
+        workers = min(len(messages), max_workers or int(config.get('mail.pool_size') or SMTP_POOL_SIZE))
+        if workers <= 1:
+            return [self._deliver(config, *message) for message in messages]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp-send") as executor:
+            return list(executor.map(lambda message: self._deliver(config, *message), messages))
@@ -1,11 +1,10 @@
 import logging
-import asyncio
 try:
-    from src.db.notification import create_notification, get_unread_count
-    from src.utils.telegram_bot import send_telegram_message
+    from src.db.notification import create_notification, get_unread_count, get_notification_recipients, create_notifications_bulk
+    from src.utils.telegram_bot import get_telegram_dispatcher
 except ImportError:
-    from src.db.notification import create_notification, get_unread_count
-    from src.utils.telegram_bot import send_telegram_message
+    from src.db.notification import create_notification, get_unread_count, get_notification_recipients, create_notifications_bulk
+    from src.utils.telegram_bot import get_telegram_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +16,21 @@ logger = logging.getLogger(__name__)
 
     [2] send_system_notification: 시스템 알림을 전송합니다.
     (DB 저장 + SSE 브로드캐스팅 + Telegram 전송)
+
+    [3] send_topic_notification: 전체('all') 또는 역할 토픽('role:<ROLE>') 사용자에게 알림을 전송합니다.
+    (DB 일괄 저장 1회 + SSE 토픽 발행 1회(직렬화 1회) + Telegram 1회)
 """
 
 
+def _send_telegram(title: str, message: str):
+    # (중요) 메인 로직에 지장을 주지 않도록 전송 큐에만 추가 (전송/병합/재시도는 dispatcher 스레드)
+    telegram_text = f"🔔 {title}\n\n{message}"
+    try:
+        get_telegram_dispatcher().enqueue(telegram_text)
+    except Exception as te:
+        logger.error(f"Telegram enqueue error: {te}")
+
+
 # [1] send_dual_notification: 사용자에게 실시간 알림을 전송합니다.
 # (DB 저장 + SSE 브로드캐스팅 + Telegram 전송)
 def send_dual_notification(
@@ -56,21 +67,10 @@ def send_dual_notification(
             "title": title,
             "message": message,
             "unread_count": get_unread_count(receive_user_uid)
-        })
+        }, event_id=notify_id)
         
         # 3. Telegram 전송 (비동기 실행)
-        # (중요) 메인 로직에 지장을 주지 않도록 백그라운드 태스크로 실행하거나 별도 루프 활용
-        telegram_text = f"🔔 {title}\n\n{message}"
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 이미 루프가 실행 중인 경우 (FastAPI 환경), 백그라운드 태스크로 등록
-                asyncio.create_task(send_telegram_message(telegram_text))
-            else:
-                # 루프가 없는 경우 (스크립트 등) 직접 실행
-                asyncio.run(send_telegram_message(telegram_text))
-        except Exception as te:
-            logger.error(f"Telegram background task error: {te}")
+        _send_telegram(title, message)
 
         logger.info(f"Notification sent to UID {receive_user_uid} (Sender: {send_user_uid}): {title}")
         return notify_id
@@ -86,4 +86,55 @@ def send_system_notification(
     message: str
 ):
     """하위 호환성을 위해 유지 (시스템 발송용)"""
-    return send_dual_notification(receive_user_uid, title, message, send_user_uid=None)
\ No newline at end of file
+    return send_dual_notification(receive_user_uid, title, message, send_user_uid=None)
+
+# [3] send_topic_notification: 토픽(전체/역할) 사용자에게 알림을 전송합니다.
+def send_topic_notification(
+    topic: str,
+    title: str,
+    message: str,
+    send_user_uid: int = None
+):
+    """
+    토픽 사용자에게 알림을 전송합니다. -> 수신자 수 (실패 시 None)
+    - topic: 'all' (전체 활성 사용자) 또는 'role:<ROLE>' (해당 역할 사용자)
+    - 사용자마다 DB 저장/개수 조회/직렬화를 반복하지 않고 일괄 저장 후 이벤트 1건을 발행
+    """
+    try:
+        from src.routers.notification import notification_manager
+        from src.utils.notification_hub import BROADCAST_TOPIC
+    except ImportError:
+        from routers.notification import notification_manager
+        from utils.notification_hub import BROADCAST_TOPIC
+
+    if topic == BROADCAST_TOPIC:
+        role = None
+    elif topic.startswith("role:") and len(topic) > len("role:"):
+        role = topic[len("role:"):]
+    else:
+        raise ValueError(f"Unknown notification topic: {topic}")
+
+    try:
+        # 1. DB 일괄 저장
+        receive_user_uids = get_notification_recipients(role)
+        if not receive_user_uids:
+            return 0
+        notify_ids = create_notifications_bulk(receive_user_uids, title, message, send_user_uid)
+
+        # 2. 실시간 SSE 전송 (사용자별 id/개수 대신 수신 시 목록을 다시 조회)
+        # - SSE 이벤트 id 는 이번 일괄 INSERT 의 마지막 id (재연결 시 이 id 이후만 replay)
+        notification_manager.notify_topic(topic, {
+            "type": "new_notification",
+            "topic": topic,
+            "title": title,
+            "message": message
+        }, event_id=max(notify_ids.values()))
+
+        # 3. Telegram 전송 (토픽 알림 1건당 1번)
+        _send_telegram(title, message)
+
+        logger.info(f"Topic notification sent to {len(receive_user_uids)} users on '{topic}' (Sender: {send_user_uid}): {title}")
+        return len(receive_user_uids)
+    except Exception as e:
+        logger.error(f"Failed to send topic notification: {e}")
+        return None
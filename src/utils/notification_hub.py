@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+"""
+    실시간 알림 fan-out hub (구독자별 고정 크기 버퍼 + 역압)
+    - [1] Subscriber: SSE 연결 1개의 버퍼 (최대 NOTIFY_BUFFER_SIZE 건, 가득 차면 overflow 정책 적용)
+    - [2] NotificationHub.subscribe / unsubscribe: 연결 등록 / 해제 (사용자별 최대 NOTIFY_MAX_CONN_PER_USER, 초과 시 가장 오래된 연결 종료)
+    - [3] NotificationHub.publish / publish_threadsafe: 사용자의 모든 연결 버퍼에 전달 (루프 스레드 / 다른 스레드)
+    - [4] NotificationHub.metrics: 연결 수 / 전달 / 버림 / 병합 통계
+    - [5] NotificationHub.publish_topic / publish_topic_threadsafe: 토픽 구독 연결 전체에 전달 (BROADCAST_TOPIC 은 모든 연결)
+    - [6] NotificationEvent / serialize_event: 알림 1건을 한 번만 JSON 직렬화 (같은 이벤트를 받은 모든 연결이 공유)
+    - [7] NotificationHub.start_replay / record / replay: 재연결(Last-Event-ID) 시 놓친 알림을 최근 이벤트 ring 에서 찾기
+
+    * 기존 방식은 연결마다 크기 제한 없는 asyncio.Queue 를 두어, 읽지 않는(끊긴) 연결의 메모리가 계속 증가했음
+    * overflow 정책 (NOTIFY_OVERFLOW_POLICY)
+      - drop_oldest(기본): 가장 오래된 알림을 버리고 새 알림 추가
+      - drop_newest: 새 알림을 버림
+      버린 알림이 있으면 다음 전달 시 {"type": "overflow", "dropped": N} 를 먼저 보내 클라이언트가 목록을 다시 조회하도록 함
+    * 최신 값만 의미 있는 알림(COALESCE_TYPES, 예: unread_count_update)은 버퍼의 이전 알림을 대체 (병합)
+    * Subscriber.get(timeout) 은 NOTIFY_HEARTBEAT_SEC 마다 None 을 반환 -> SSE 스트림이 연결 상태를 확인하고 ping 전송
+      (ping 전송이 NOTIFY_SEND_TIMEOUT_SEC 이상 멈추는 클라이언트는 끊긴 것으로 보고 종료)
+    * 모든 버퍼 조작은 이벤트 루프 스레드에서만 실행 (다른 스레드는 publish_threadsafe 사용)
+    * 토픽: 연결 시 사용자 역할 토픽(role:<ROLE>)을 구독 -> 토픽 알림은 구독자 수와 무관하게 1번 직렬화하여 모든 버퍼가 같은 객체 참조
+    * 재연결 replay: h_notification.id 를 SSE 이벤트 id 로 사용 (토픽 알림은 일괄 INSERT 의 마지막 id)
+      - 이 프로세스가 발행/수신한 id 있는 알림을 최근 NOTIFY_REPLAY_SIZE 건까지 ring 에 보관
+      - ring 에서 밀려난(또는 기록 시작 전) 구간이면 None -> 호출한 쪽이 DB 에서 조회 (src/routers/notification.py)
+"""
+
+NOTIFY_BUFFER_SIZE = int(os.getenv("NOTIFY_BUFFER_SIZE", "100"))
+NOTIFY_HEARTBEAT_SEC = float(os.getenv("NOTIFY_HEARTBEAT_SEC", "15"))
+NOTIFY_OVERFLOW_POLICY = os.getenv("NOTIFY_OVERFLOW_POLICY", "drop_oldest").lower()
+NOTIFY_MAX_CONN_PER_USER = int(os.getenv("NOTIFY_MAX_CONN_PER_USER", "10"))
+# SSE 전송이 이 시간 이상 멈추면(클라이언트가 읽지 않음) 연결 종료
+NOTIFY_SEND_TIMEOUT_SEC = float(os.getenv("NOTIFY_SEND_TIMEOUT_SEC", "30"))
+# 재연결 replay 용 최근 이벤트 보관 건수 (프로세스 전체)
+NOTIFY_REPLAY_SIZE = int(os.getenv("NOTIFY_REPLAY_SIZE", "1000"))
+# 재연결 1번에 replay 하는 최대 건수 (초과하면 resync 이벤트로 목록 전체를 다시 조회하도록 함)
+NOTIFY_REPLAY_LIMIT = int(os.getenv("NOTIFY_REPLAY_LIMIT", "100"))
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+# 최신 값 하나만 남기는 알림 type
+COALESCE_TYPES = frozenset({"unread_count_update"})
+# 모든 연결에 전달하는 토픽
+BROADCAST_TOPIC = "all"
+
+
+# [6] NotificationEvent: 직렬화 결과를 캐시하는 알림 (dict 와 동일하게 비교/조회)
+class NotificationEvent(dict):
+    __slots__ = ("_serialized", "event_id")
+
+    def __init__(self, *args, event_id: int = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # SSE 이벤트 id (h_notification.id), 없으면 None
+        self.event_id = event_id
+
+    @property
+    def serialized(self) -> str:
+        try:
+            return self._serialized
+        except AttributeError:
+            self._serialized = json.dumps(self, ensure_ascii=False)
+            return self._serialized
+
+
+def serialize_event(data: dict) -> str:
+    """SSE data 문자열 (NotificationEvent 는 첫 직렬화 결과 재사용)"""
+    if isinstance(data, NotificationEvent):
+        return data.serialized
+    return json.dumps(data, ensure_ascii=False)
+
+
+# [1] Subscriber: SSE 연결 1개의 버퍼
+class Subscriber:
+    __slots__ = ("user_uid", "topics", "maxsize", "policy", "connected_at", "last_active", "closed",
+                 "delivered", "dropped", "coalesced", "_buffer", "_pending_dropped", "_ready")
+
+    def __init__(self, user_uid: int, maxsize: int = NOTIFY_BUFFER_SIZE, policy: str = NOTIFY_OVERFLOW_POLICY,
+                 topics: Iterable[str] = ()):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.user_uid = user_uid
+        self.topics = frozenset(topics)
+        self.maxsize = max(int(maxsize), 1)
+        self.policy = policy
+        self.connected_at = time.time()
+        self.last_active = time.monotonic()     # 마지막으로 버퍼를 읽은 시각 (heartbeat 포함)
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._buffer = deque()
+        self._pending_dropped = 0               # 아직 클라이언트에 알리지 않은 버린 건수
+        self._ready = asyncio.Event()
+
+    def push(self, data: dict) -> bool:
+        """버퍼에 추가합니다. 버려졌으면 False"""
+        if self.closed:
+            return False
+        if data.get("type") in COALESCE_TYPES:
+            for item in self._buffer:
+                if item.get("type") == data["type"]:
+                    self._buffer.remove(item)
+                    self.coalesced += 1
+                    break
+        if len(self._buffer) >= self.maxsize:
+            self.dropped += 1
+            self._pending_dropped += 1
+            if self.policy == "drop_newest":
+                self._ready.set()
+                return False
+            self._buffer.popleft()
+        self._buffer.append(data)
+        self._ready.set()
+        return True
+
+    def get_nowait(self) -> dict:
+        if self._pending_dropped:
+            dropped, self._pending_dropped = self._pending_dropped, 0
+            self.delivered += 1
+            return NotificationEvent(type="overflow", dropped=dropped)
+        if not self._buffer:
+            raise asyncio.QueueEmpty
+        self.delivered += 1
+        if len(self._buffer) == 1:
+            self._ready.clear()
+        return self._buffer.popleft()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """다음 알림 -> timeout 초 안에 없거나 연결이 종료되면 None"""
+        self.last_active = time.monotonic()
+        while not self.closed:
+            if not self.empty():
+                return self.get_nowait()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self.last_active = time.monotonic()
+            if self.empty():
+                self._ready.clear()
+        return None
+
+    def empty(self) -> bool:
+        return not self._buffer and not self._pending_dropped
+
+    def qsize(self) -> int:
+        return len(self._buffer)
+
+    def close(self):
+        """연결 종료 -> 대기 중인 get 이 None 을 반환하고 버퍼 해제"""
+        self.closed = True
+        self._buffer.clear()
+        self._pending_dropped = 0
+        self._ready.set()
+
+
+# 알림 fan-out hub
+class NotificationHub:
+    def __init__(self, buffer_size: int = NOTIFY_BUFFER_SIZE, policy: str = NOTIFY_OVERFLOW_POLICY,
+                 max_conn_per_user: int = NOTIFY_MAX_CONN_PER_USER, replay_size: int = NOTIFY_REPLAY_SIZE):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.max_conn_per_user = max_conn_per_user
+        # user_uid -> {Subscriber: None} (dict 로 연결 순서 유지 -> 초과 시 가장 오래된 연결부터 종료)
+        self.connections: Dict[int, Dict[Subscriber, None]] = {}
+        # topic -> {Subscriber: None}
+        self.topics: Dict[str, Dict[Subscriber, None]] = {}
+        # 구독이 일어난 이벤트 루프 (다른 스레드에서 publish_threadsafe 호출 시 사용)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # 누적 통계 (종료된 연결 포함)
+        self._stats = {"opened": 0, "closed": 0, "evicted": 0, "published": 0, "delivered": 0, "dropped": 0, "coalesced": 0}
+        # 재연결 replay ring: [(event, user_uid, topic)] / 이 id 이하는 ring 에 없을 수 있음 (None: 기록 시작 전)
+        self.replay_size = replay_size
+        self._replay = deque()
+        self._replay_floor: Optional[int] = None
+        self._replay_lock = threading.Lock()
+
+    # [2] subscribe / unsubscribe
+    def subscribe(self, user_uid: int, topics: Iterable[str] = ()) -> Subscriber:
+        """루프 스레드에서 호출 (async 함수 안)"""
+        self.loop = asyncio.get_running_loop()
+        subscribers = self.connections.setdefault(user_uid, {})
+        while self.max_conn_per_user and len(subscribers) >= self.max_conn_per_user:
+            # 탭을 계속 새로 여는 등으로 연결이 쌓이면 가장 오래된 연결 종료
+            oldest = next(iter(subscribers))
+            self.unsubscribe(oldest)
+            self._stats["evicted"] += 1
+            subscribers = self.connections.setdefault(user_uid, {})
+        subscriber = Subscriber(user_uid, self.buffer_size, self.policy, topics)
+        subscribers[subscriber] = None
+        for topic in subscriber.topics:
+            self.topics.setdefault(topic, {})[subscriber] = None
+        self._stats["opened"] += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self.connections.get(subscriber.user_uid)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        del subscribers[subscriber]
+        if not subscribers:
+            del self.connections[subscriber.user_uid]
+        for topic in subscriber.topics:
+            members = self.topics.get(topic)
+            if members is not None:
+                members.pop(subscriber, None)
+                if not members:
+                    del self.topics[topic]
+        self._collect(subscriber)
+        subscriber.close()
+        self._stats["closed"] += 1
+
+    def _collect(self, subscriber: Subscriber):
+        self._stats["delivered"] += subscriber.delivered
+        self._stats["dropped"] += subscriber.dropped
+        self._stats["coalesced"] += subscriber.coalesced
+
+    # [3] publish / publish_threadsafe
+    def publish(self, user_uid: int, data: dict) -> int:
+        """사용자의 모든 연결에 전달 (루프 스레드) -> 버퍼에 넣은 연결 수"""
+        subscribers = self.connections.get(user_uid)
+        if not subscribers:
+            return 0
+        self._stats["published"] += 1
+        event = data if isinstance(data, NotificationEvent) else NotificationEvent(data)
+        return sum(subscriber.push(event) for subscriber in subscribers)
+
+    def publish_threadsafe(self, user_uid: int, data: dict):
+        if user_uid not in self.connections or self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.publish, user_uid, data)
+
+    def has_subscribers(self, user_uid: int) -> bool:
+        return user_uid in self.connections
+
+    # [5] publish_topic / publish_topic_threadsafe
+    def publish_topic(self, topic: str, data: dict) -> int:
+        """토픽 구독 연결 전체에 같은 이벤트 객체를 전달 (루프 스레드) -> 버퍼에 넣은 연결 수"""
+        if topic == BROADCAST_TOPIC:
+            subscribers = [subscriber for members in self.connections.values() for subscriber in members]
+        else:
+            subscribers = list(self.topics.get(topic, ()))
+        if not subscribers:
+            return 0
+        self._stats["published"] += 1
+        event = data if isinstance(data, NotificationEvent) else NotificationEvent(data)
+        return sum(subscriber.push(event) for subscriber in subscribers)
+
+    def publish_topic_threadsafe(self, topic: str, data: dict):
+        if not self.connections or self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.publish_topic, topic, data)
+
+    # [7] start_replay / record / replay
+    def start_replay(self, floor: int):
+        """floor(기록 시작 시점의 마지막 알림 id) 이후의 알림부터 ring 에 기록"""
+        with self._replay_lock:
+            if self._replay_floor is None:
+                self._replay_floor = floor
+
+    def record(self, event: NotificationEvent, user_uid: int = None, topic: str = None):
+        """id 있는 알림을 ring 에 기록 (아무 스레드에서나 호출 가능)"""
+        if event.event_id is None:
+            return
+        with self._replay_lock:
+            if self._replay_floor is None:
+                return
+            self._replay.append((event, user_uid, topic))
+            while len(self._replay) > self.replay_size:
+                evicted = self._replay.popleft()[0]
+                self._replay_floor = max(self._replay_floor, evicted.event_id)
+
+    def replay(self, user_uid: int, topics: Iterable[str], last_event_id: int) -> Optional[List[NotificationEvent]]:
+        """last_event_id 이후 사용자에게 전달된 알림 (id 순) -> ring 에 없는 구간이 있으면 None"""
+        topics = set(topics) | {BROADCAST_TOPIC}
+        with self._replay_lock:
+            if self._replay_floor is None or last_event_id < self._replay_floor:
+                return None
+            events = [
+                event for event, uid, topic in self._replay
+                if event.event_id > last_event_id and (uid == user_uid or topic in topics)
+            ]
+        return sorted(events, key=lambda event: event.event_id)
+
+    # [4] metrics
+    def metrics(self) -> dict:
+        stats = dict(self._stats)
+        now = time.monotonic()
+        buffered = 0
+        connections = 0
+        max_idle = 0.0
+        for subscribers in self.connections.values():
+            for subscriber in subscribers:
+                connections += 1
+                buffered += subscriber.qsize()
+                max_idle = max(max_idle, now - subscriber.last_active)
+                stats["delivered"] += subscriber.delivered
+                stats["dropped"] += subscriber.dropped
+                stats["coalesced"] += subscriber.coalesced
+        return {
+            "connections": connections,
+            "users": len(self.connections),
+            "topics": len(self.topics),
+            "buffered": buffered,
+            "max_idle_sec": round(max_idle, 3),
+            "buffer_size": self.buffer_size,
+            "overflow_policy": self.policy,
+            "heartbeat_sec": NOTIFY_HEARTBEAT_SEC,
+            "replay_buffered": len(self._replay),
+            **stats,
+        }
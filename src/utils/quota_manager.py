@@ -0,0 +1,238 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from src.db.quota_counter import get_quota_counter, add_quota_usage, reserve_quota
+
+"""
+    일일 사용량 예약 관리 (메모리 카운터 + h_quota_counter 주기 반영)
+    - [1] QuotaReservation: reserve 결과 (확보한 건수, 확보 직전 사용량)
+    - [2] QuotaManager.reserve: 제한 확인 + 사용량 확보를 한 번에 (원자적, O(1))
+    - [3] QuotaManager.commit / release: 실제 사용한 건수만 확정, 나머지는 반환
+    - [4] QuotaManager.add_usage: 예약 없이 사용량 증가 (제한 확인 대상이 아닌 시스템 도구 등)
+    - [5] QuotaManager.get_usage: 현재 사용량 (확정 + 예약 중)
+    - [6] QuotaManager.flush: 확정된 증가분을 h_quota_counter 에 반영하고 다른 프로세스 반영분을 받아옴
+    - [7] quota_manager: 프로세스 공용 인스턴스
+
+    * 기존 방식(사용 이력 COUNT -> 비교 -> 실행 -> 기록)은 동시 호출이 모두 확인을 통과하여 제한을 넘었고,
+      호출마다 COUNT 쿼리를 실행했음 -> 예약(reserve) 시점에 카운터를 올려 동시 호출도 정확히 제한
+    * 카운터는 대상/일자별로 처음 사용할 때 h_quota_counter 에서 1회 로드 (없으면 사용 이력 COUNT 로 생성)
+    * 증가분은 QUOTA_FLUSH_SEC 마다(reserve 시점에 확인) 및 프로세스 종료 시 DB 에 반영
+    * 제한이 있는 대상의 예약은 QUOTA_COUNTER_MODE 에 따라 처리
+      (1) memory(기본): 메모리 카운터로만 확인 (DB 쓰기 없음) -> 다른 프로세스 사용분은 flush 주기만큼 늦게 보이므로 단일 프로세스 전용
+      (2) db: h_quota_counter 에서 원자적으로 확보 (reserve_quota) -> 여러 프로세스(워커, stdio 서버)가 함께 써도 제한을 넘지 않음
+          예약마다 BEGIN IMMEDIATE 쓰기 트랜잭션 1회가 추가되므로 여러 워커로 실행할 때만 설정
+          쓰지 않은 예약은 다음 반영(flush) 또는 같은 대상의 다음 예약 때 반환
+    * 제한이 없는 대상(limit = -1)은 모드와 관계없이 메모리 카운터만 사용
+"""
+
+QUOTA_FLUSH_SEC = float(os.getenv("QUOTA_FLUSH_SEC", "5"))
+QUOTA_COUNTER_MODE = os.getenv("QUOTA_COUNTER_MODE", "memory").lower()
+
+
+def _subject_key(user_uid: int = None, token_id: int = None):
+    # get_user_daily_usage 와 같은 기준 (사용자 우선, 둘 다 없으면 집계 대상 아님)
+    if user_uid:
+        return f"user:{user_uid}"
+    if token_id:
+        return f"token:{token_id}"
+    return None
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+# [1] QuotaReservation: reserve 결과
+class QuotaReservation:
+    __slots__ = ("key", "usage_dt", "count", "used_before", "limit", "settled", "shared")
+
+    def __init__(self, key, usage_dt: str, count: int, used_before: int, limit: int, shared: bool = False):
+        self.key = key
+        self.usage_dt = usage_dt
+        self.count = count              # 확보한 건수 (0 이면 제한 초과로 거절)
+        self.used_before = used_before  # 확보 직전 사용량 (확정 + 예약 중)
+        self.limit = limit
+        self.settled = False
+        self.shared = shared            # h_quota_counter 에 이미 반영된 예약 (db 모드)
+
+
+class _Counter:
+    __slots__ = ("base", "inflight", "pending", "reserved")
+
+    def __init__(self, base: int):
+        self.base = base        # 마지막으로 DB 와 맞춘 값
+        self.inflight = 0       # DB 반영 중인 증가분
+        self.pending = 0        # 아직 DB 에 반영하지 않은 확정 증가분
+        self.reserved = 0       # 예약 중(실행 중)인 건수
+
+    @property
+    def used(self) -> int:
+        return self.base + self.inflight + self.pending
+
+
+class QuotaManager:
+    def __init__(self, flush_sec: float = QUOTA_FLUSH_SEC, mode: str = QUOTA_COUNTER_MODE):
+        self.flush_sec = flush_sec
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counters = {}             # {(subject_key, usage_dt): _Counter}
+        self._last_flush = time.monotonic()
+
+    def _counter(self, key: str, usage_dt: str) -> _Counter:
+        """카운터 조회 (없으면 DB 에서 로드). lock 을 잡지 않은 상태에서 호출"""
+        with self._lock:
+            counter = self._counters.get((key, usage_dt))
+        if counter is None:
+            base = get_quota_counter(key, usage_dt)
+            with self._lock:
+                counter = self._counters.setdefault((key, usage_dt), _Counter(base))
+        return counter
+
+    # [2] reserve: 제한 확인 + 사용량 확보
+    def reserve(self, user_uid: int = None, token_id: int = None, limit: int = -1,
+                count: int = 1, partial: bool = False) -> QuotaReservation:
+        """
+        count 건의 사용량을 확보합니다. (limit = -1 이면 제한 없음)
+        - partial=False: 전부 확보할 수 없으면 0건 (거절)
+        - partial=True: 남은 만큼만 확보 (배치 실행용)
+        - 확보한 예약은 반드시 commit 또는 release 해야 함
+        """
+        self._maybe_flush()
+        key = _subject_key(user_uid, token_id)
+        usage_dt = _today()
+        if key is None:
+            return QuotaReservation(None, usage_dt, count, 0, limit)
+
+        counter = self._counter(key, usage_dt)
+        if limit != -1 and self.mode == "db":
+            return self._reserve_shared(counter, key, usage_dt, limit, count, partial)
+        with self._lock:
+            used_before = counter.used + counter.reserved
+            granted = count
+            if limit != -1:
+                remaining = max(limit - used_before, 0)
+                granted = min(count, remaining) if partial else (count if count <= remaining else 0)
+            counter.reserved += granted
+        return QuotaReservation(key, usage_dt, granted, used_before, limit)
+
+    def _reserve_shared(self, counter: _Counter, key: str, usage_dt: str, limit: int,
+                        count: int, partial: bool) -> QuotaReservation:
+        """db 모드: 아직 반영하지 않은 증가분과 함께 h_quota_counter 에서 원자적으로 확보"""
+        with self._lock:
+            carry, counter.pending = counter.pending, 0
+        try:
+            used_before, granted = reserve_quota(key, usage_dt, count, limit, partial, carry)
+        except Exception:
+            with self._lock:
+                counter.pending += carry
+            raise
+        with self._lock:
+            if not counter.inflight:
+                counter.base = used_before + granted
+        return QuotaReservation(key, usage_dt, granted, used_before, limit, shared=True)
+
+    # [3] commit: 실제 사용한 건수 확정 (used 미지정 시 확보한 건수 전부), 나머지는 반환
+    def commit(self, reservation: QuotaReservation, used: int = None):
+        if reservation.settled:
+            return
+        reservation.settled = True
+        if reservation.key is None:
+            return
+        used = reservation.count if used is None else used
+        with self._lock:
+            counter = self._counters.get((reservation.key, reservation.usage_dt))
+            if counter is None:
+                return
+            if reservation.shared:
+                # 확보한 건수는 이미 DB 에 반영됨 -> 쓰지 않은 만큼만 반환 (다음 반영 때 차감)
+                counter.pending -= reservation.count - used
+            else:
+                counter.reserved -= reservation.count
+                counter.pending += used
+
+    def release(self, reservation: QuotaReservation):
+        """예약 취소 (실행하지 않았거나 사용 이력이 남지 않은 경우)"""
+        self.commit(reservation, used=0)
+
+    # [4] add_usage: 예약 없이 사용량 증가
+    def add_usage(self, user_uid: int = None, token_id: int = None, count: int = 1):
+        key = _subject_key(user_uid, token_id)
+        if key is None or count <= 0:
+            return
+        counter = self._counter(key, _today())
+        with self._lock:
+            counter.pending += count
+
+    # [5] get_usage: 현재 사용량 (확정 + 예약 중)
+    def get_usage(self, user_uid: int = None, token_id: int = None) -> int:
+        key = _subject_key(user_uid, token_id)
+        if key is None:
+            return 0
+        counter = self._counter(key, _today())
+        with self._lock:
+            return counter.used + counter.reserved
+
+    # [6] flush: 확정 증가분 DB 반영
+    def flush(self):
+        """증가분을 h_quota_counter 에 반영하고, 반영 후 값(다른 프로세스 반영분 포함)으로 카운터를 맞춥니다."""
+        with self._flush_lock:
+            today = _today()
+            with self._lock:
+                self._last_flush = time.monotonic()
+                deltas = {}
+                for k, counter in self._counters.items():
+                    counter.inflight, counter.pending = counter.pending, 0
+                    # 증가분이 없어도 오늘 카운터는 다른 프로세스 반영분을 받아오기 위해 포함 (+0)
+                    if counter.inflight or k[1] == today:
+                        deltas[k] = counter.inflight
+            try:
+                totals = add_quota_usage(deltas)
+            except Exception:
+                with self._lock:
+                    for k in deltas:
+                        counter = self._counters.get(k)
+                        if counter is not None:
+                            counter.pending += counter.inflight
+                            counter.inflight = 0
+                raise
+            with self._lock:
+                for k, total in totals.items():
+                    counter = self._counters.get(k)
+                    if counter is not None:
+                        counter.base = total
+                        counter.inflight = 0
+                # 지난 일자 카운터는 반영이 끝나면 메모리에서 제거
+                for k in [k for k, c in self._counters.items()
+                          if k[1] != today and not c.pending and not c.reserved]:
+                    del self._counters[k]
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_sec:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[QuotaManager] Flush failed: {e}", file=sys.stderr)
+
+    def reset(self):
+        """메모리 카운터 초기화 (DB 복원 등으로 h_quota_counter 가 바뀐 경우). 반영하지 않은 증가분은 버려짐"""
+        with self._lock:
+            self._counters.clear()
+            self._last_flush = time.monotonic()
+
+
+# [7] quota_manager: 프로세스 공용 인스턴스
+quota_manager = QuotaManager()
+
+
+def _flush_at_exit():
+    try:
+        quota_manager.flush()
+    except Exception:
+        pass
+
+atexit.register(_flush_at_exit)
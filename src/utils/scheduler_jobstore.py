@@ -0,0 +1,76 @@
+import pickle
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+from src.db import scheduler_job as db_job
+
+"""
+    APScheduler 작업 저장소 (h_scheduler_job)
+    - SQLAlchemyJobStore 와 같은 방식(작업 상태 pickle + next_run_time 컬럼)을 sqlite3 로 구현 (SQLAlchemy 의존성 없이 사용)
+    - 리더 워커의 스케줄러만 이 저장소를 연결하므로 작업은 한 프로세스에서만 실행되고, 재시작/리더 교체 후에도 유지됨
+"""
+
+
+class SQLiteJobStore(BaseJobStore):
+    def __init__(self, pickle_protocol: int = pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.pickle_protocol = pickle_protocol
+
+    def lookup_job(self, job_id):
+        job_state = db_job.get_job_state(job_id)
+        return self._reconstitute_job(job_state) if job_state else None
+
+    def get_due_jobs(self, now):
+        return self._get_jobs(datetime_to_utc_timestamp(now))
+
+    def get_next_run_time(self):
+        return utc_timestamp_to_datetime(db_job.get_next_run_time())
+
+    def get_all_jobs(self):
+        return self._get_jobs()
+
+    def add_job(self, job):
+        if not db_job.insert_job(job.id, datetime_to_utc_timestamp(job.next_run_time), self._dump(job)):
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        if not db_job.update_job(job.id, datetime_to_utc_timestamp(job.next_run_time), self._dump(job)):
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        if not db_job.delete_jobs([job_id]):
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        db_job.delete_jobs()
+
+    def _dump(self, job) -> bytes:
+        return pickle.dumps(job.__getstate__(), self.pickle_protocol)
+
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job_state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, due_ts: float = None):
+        jobs = []
+        failed_job_ids = []
+        for job_id, job_state in db_job.get_job_states(due_ts):
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except BaseException:
+                self._logger.exception('Unable to restore job "%s" -- removing it', job_id)
+                failed_job_ids.append(job_id)
+        # 복원할 수 없는 작업(함수 경로 변경 등)은 삭제
+        if failed_job_ids:
+            db_job.delete_jobs(failed_job_ids)
+        return jobs
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} (table=h_scheduler_job)>"
@@ -0,0 +1,287 @@
+import atexit
+import os
+import queue
+import sys
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from src.db import shared_state as db_shared
+
+"""
+    워커(프로세스) 간 공유 상태 (uvicorn --workers N 대응)
+    - [1] SharedStateBackend: 공통 인터페이스 (pub/sub, lease, key-value)
+    - [2] MemoryBackend: 프로세스 내부 구현 (단일 워커/테스트용 로컬 브로커)
+    - [3] SQLiteBackend: 기본 구현 (같은 DB 파일을 쓰는 모든 프로세스가 공유, 이벤트는 polling 스레드로 수신)
+    - [4] get_shared_state: 프로세스 공용 backend (SHARED_STATE_BACKEND=sqlite|memory)
+    - [5] set_shared_state: backend 교체 (테스트용)
+
+    * publish 한 이벤트는 같은 프로세스의 구독자에게 즉시 전달되고, 다른 프로세스에는 backend 를 통해 전달됨
+      (SQLite backend 는 자기 프로세스가 발행한 이벤트를 polling 에서 제외 -> 중복 전달 없음)
+    * SQLite backend 의 다른 프로세스 전파는 발행 스레드가 모아서 저장 (publish 는 DB 쓰기를 기다리지 않음 -> 이벤트 루프에서 호출 가능)
+    * 기본은 sqlite (uvicorn --workers N 은 워커 수를 환경 변수로 알려주지 않으므로 워커 수로 추측하지 않음)
+      memory 는 단일 프로세스임이 확실할 때만 지정 (워커마다 별도 상태 -> 알림/세션 전달/리더 선출이 워커 간에 동작하지 않음)
+    * 구독 콜백은 polling 스레드(또는 publish 한 스레드)에서 실행되므로, asyncio 객체를 다룰 때는 loop.call_soon_threadsafe 사용
+    * 사용 채널
+      - notification: 사용자 알림 SSE 전송 (src/routers/notification.py)
+      - cache.invalidate: 도구 목록/사용량 캐시 무효화 (DB 복원 등)
+      - mcp.message: 다른 워커가 가진 MCP SSE 세션으로 /messages 요청 전달 (src/sse_server.py)
+"""
+
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "sqlite").lower()
+# SQLite backend 이벤트 polling 간격 / 이벤트 보관 시간
+SHARED_STATE_POLL_SEC = float(os.getenv("SHARED_STATE_POLL_SEC", "0.2"))
+SHARED_EVENT_TTL_SEC = float(os.getenv("SHARED_EVENT_TTL_SEC", "600"))
+
+# 이 프로세스의 식별자 (lease 소유자, 이벤트 발행자)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# [1] SharedStateBackend: 공통 인터페이스
+class SharedStateBackend:
+    def __init__(self, worker_id: str = WORKER_ID):
+        self.worker_id = worker_id
+        self._subscribers: Dict[str, List[Callable[[dict], Any]]] = {}
+        self._sub_lock = threading.Lock()
+
+    # ---- pub/sub ----
+    def publish(self, channel: str, payload: dict, local: bool = True):
+        """같은 프로세스 구독자에게 즉시 전달하고 다른 프로세스로 전파합니다. (local=False: 다른 프로세스에만 전파)"""
+        if local:
+            self._dispatch(channel, payload)
+        try:
+            self._broadcast(channel, payload)
+        except Exception as e:
+            # 다른 프로세스 전파 실패가 호출한 쪽 처리를 막지 않도록 로그만 남김
+            print(f"[SharedState] Broadcast failed on '{channel}': {e}", file=sys.stderr)
+
+    def subscribe(self, channel: str, callback: Callable[[dict], Any]) -> Callable[[], None]:
+        """채널 구독 -> 구독 해제 함수를 반환합니다."""
+        with self._sub_lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+        self._on_subscribe()
+
+        def unsubscribe():
+            with self._sub_lock:
+                callbacks = self._subscribers.get(channel, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def _dispatch(self, channel: str, payload: dict):
+        with self._sub_lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"[SharedState] Subscriber error on '{channel}': {e}", file=sys.stderr)
+
+    def _broadcast(self, channel: str, payload: dict):
+        pass
+
+    def _on_subscribe(self):
+        pass
+
+    # ---- lease (리더 선출) ----
+    def acquire_lease(self, name: str, ttl_sec: float) -> bool:
+        raise NotImplementedError
+
+    def release_lease(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def get_lease_owner(self, name: str):
+        raise NotImplementedError
+
+    def is_leader(self, name: str) -> bool:
+        return self.get_lease_owner(name) == self.worker_id
+
+    # ---- key-value ----
+    def set_value(self, key: str, value, ttl_sec: float = None):
+        raise NotImplementedError
+
+    def get_value(self, key: str, default=None):
+        raise NotImplementedError
+
+    def delete_value(self, key: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# [2] MemoryBackend: 프로세스 내부 구현
+class MemoryBackend(SharedStateBackend):
+    def __init__(self, worker_id: str = WORKER_ID):
+        super().__init__(worker_id)
+        self._lock = threading.Lock()
+        self._leases = {}   # name -> (owner, expires_ts)
+        self._values = {}   # key -> (value, expires_ts)
+
+    def acquire_lease(self, name: str, ttl_sec: float) -> bool:
+        now = time.time()
+        with self._lock:
+            current = self._leases.get(name)
+            if current and current[0] != self.worker_id and current[1] >= now:
+                return False
+            self._leases[name] = (self.worker_id, now + ttl_sec)
+            return True
+
+    def release_lease(self, name: str) -> bool:
+        with self._lock:
+            current = self._leases.get(name)
+            if current and current[0] == self.worker_id:
+                del self._leases[name]
+                return True
+            return False
+
+    def get_lease_owner(self, name: str):
+        with self._lock:
+            current = self._leases.get(name)
+            return current[0] if current and current[1] >= time.time() else None
+
+    def set_value(self, key: str, value, ttl_sec: float = None):
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl_sec if ttl_sec else None)
+
+    def get_value(self, key: str, default=None):
+        with self._lock:
+            item = self._values.get(key)
+            if item is None or (item[1] is not None and item[1] < time.time()):
+                return default
+            return item[0]
+
+    def delete_value(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+
+
+# [3] SQLiteBackend: 기본 구현 (h_shared_event / h_shared_lease / h_shared_kv)
+class SQLiteBackend(SharedStateBackend):
+    def __init__(self, worker_id: str = WORKER_ID, poll_sec: float = SHARED_STATE_POLL_SEC):
+        super().__init__(worker_id)
+        self.poll_sec = poll_sec
+        self._last_id = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._last_purge = time.monotonic()
+        self._outbox = queue.Queue()
+        self._publisher = None
+
+    def _broadcast(self, channel: str, payload: dict):
+        # 발행 스레드에 넘기고 바로 반환 (발행 순서 유지)
+        self._outbox.put((channel, payload))
+        if self._publisher is None:
+            with self._thread_lock:
+                if self._publisher is None:
+                    self._publisher = threading.Thread(target=self._publish_loop, name="shared-state-publisher", daemon=True)
+                    self._publisher.start()
+                    # 종료 시 남은 이벤트 저장 (stdio 서버처럼 close 를 호출하지 않는 프로세스)
+                    atexit.register(self.flush)
+
+    def _publish_loop(self):
+        while True:
+            events = [self._outbox.get()]
+            # 쌓여 있는 이벤트는 한 트랜잭션으로 저장
+            while len(events) < 500:
+                try:
+                    events.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                db_shared.insert_shared_events(events, self.worker_id)
+            except Exception as e:
+                print(f"[SharedState] Broadcast failed ({len(events)} events): {e}", file=sys.stderr)
+            finally:
+                for _ in events:
+                    self._outbox.task_done()
+
+    def flush(self):
+        """발행 대기 중인 이벤트가 모두 저장될 때까지 기다립니다."""
+        if self._publisher is not None:
+            self._outbox.join()
+
+    def _on_subscribe(self):
+        # 첫 구독 시점에 polling 스레드 시작 (구독하지 않는 프로세스(stdio 등)는 발행만 함)
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            try:
+                self._last_id = db_shared.get_last_shared_event_id()
+            except Exception as e:
+                print(f"[SharedState] Cannot read event position: {e}", file=sys.stderr)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll_loop, name="shared-state-poller", daemon=True)
+            self._thread.start()
+
+    def poll_once(self) -> int:
+        """새 이벤트를 읽어 구독자에게 전달하고 전달한 건수를 반환합니다."""
+        if self._last_id is None:
+            self._last_id = db_shared.get_last_shared_event_id()
+        events, self._last_id = db_shared.fetch_shared_events(self._last_id, exclude_origin=self.worker_id)
+        for event in events:
+            self._dispatch(event["channel"], event["payload"])
+
+        if time.monotonic() - self._last_purge >= 60:
+            self._last_purge = time.monotonic()
+            db_shared.purge_shared_events(time.time() - SHARED_EVENT_TTL_SEC)
+        return len(events)
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"[SharedState] Poll error: {e}", file=sys.stderr)
+            self._stop.wait(self.poll_sec)
+
+    def acquire_lease(self, name: str, ttl_sec: float) -> bool:
+        return db_shared.acquire_lease(name, self.worker_id, ttl_sec)
+
+    def release_lease(self, name: str) -> bool:
+        return db_shared.release_lease(name, self.worker_id)
+
+    def get_lease_owner(self, name: str):
+        lease = db_shared.get_lease(name)
+        return lease["owner"] if lease else None
+
+    def set_value(self, key: str, value, ttl_sec: float = None):
+        db_shared.set_shared_value(key, value, ttl_sec)
+
+    def get_value(self, key: str, default=None):
+        return db_shared.get_shared_value(key, default)
+
+    def delete_value(self, key: str):
+        db_shared.delete_shared_value(key)
+
+    def close(self):
+        self.flush()
+        with self._thread_lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=2)
+            self._thread = None
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+# [4] get_shared_state: 프로세스 공용 backend
+def get_shared_state() -> SharedStateBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = MemoryBackend() if SHARED_STATE_BACKEND == "memory" else SQLiteBackend()
+    return _backend
+
+
+# [5] set_shared_state: backend 교체 (테스트용) -> 이전 backend 반환
+def set_shared_state(backend: SharedStateBackend):
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
@@ -0,0 +1,165 @@
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from src.utils.file_storage import copy_with_hash, remove_quietly
+
+"""
+    파일 저장소 backend (로컬 디스크 / S3 호환 객체 저장소)
+    - [1] StorageBackend: 공통 인터페이스 (put / delete / exists / presigned_url)
+    - [2] LocalStorage: 로컬 디스크 (key = 파일 경로, 다운로드는 앱 서버가 직접 전송)
+    - [3] S3Storage: S3 / MinIO / SeaweedFS 등 S3 호환 저장소 (key = 객체 key, 다운로드는 presigned URL 로 redirect)
+    - [4] get_storage_backend: storage_tp 별 프로세스 공용 backend (인자가 없으면 FILE_STORAGE_BACKEND=local|s3)
+    - [5] set_storage_backend: backend 교체 (테스트용)
+
+    * 파일 행의 storage_tp('LOCAL' / 'CAS' / 'S3') 로 backend 를 고르므로, 저장 backend 를 바꿔도 이전 파일은 원래 저장소에서 제공
+    * S3 업로드는 FILE_S3_MULTIPART_THRESHOLD_MB 이상이면 multipart 로 전송
+      (FILE_S3_PART_SIZE_MB 단위로 읽어 part 를 FILE_S3_MAX_CONCURRENCY 개까지 동시에 전송, 파일 전체를 메모리에 올리지 않음)
+    * presigned URL 은 서명만 계산 (네트워크 요청 없음), 파일 바이트는 클라이언트가 저장소에서 직접 받음
+    * boto3 는 S3 backend 를 처음 쓸 때 import (서버 기동 시간 / local backend 에는 영향 없음)
+"""
+
+FILE_STORAGE_BACKEND = os.getenv("FILE_STORAGE_BACKEND", "local").lower()
+# S3 호환 저장소 설정 (endpoint 가 없으면 AWS S3, 접근 키가 없으면 boto3 기본 자격 증명 사용)
+FILE_S3_ENDPOINT_URL = os.getenv("FILE_S3_ENDPOINT_URL") or None
+FILE_S3_BUCKET = os.getenv("FILE_S3_BUCKET", "agent-mcp-files")
+FILE_S3_REGION = os.getenv("FILE_S3_REGION", "us-east-1")
+FILE_S3_ACCESS_KEY = os.getenv("FILE_S3_ACCESS_KEY") or None
+FILE_S3_SECRET_KEY = os.getenv("FILE_S3_SECRET_KEY") or None
+# multipart 업로드 기준 / part 크기 (MB, S3 최소 part 크기는 5MB) / 동시 전송 part 수
+FILE_S3_MULTIPART_THRESHOLD_MB = float(os.getenv("FILE_S3_MULTIPART_THRESHOLD_MB", "8"))
+FILE_S3_PART_SIZE_MB = float(os.getenv("FILE_S3_PART_SIZE_MB", "8"))
+FILE_S3_MAX_CONCURRENCY = int(os.getenv("FILE_S3_MAX_CONCURRENCY", "8"))
+# presigned 다운로드 URL 유효 시간 (초)
+FILE_S3_PRESIGN_EXPIRES_SEC = int(os.getenv("FILE_S3_PRESIGN_EXPIRES_SEC", "300"))
+
+
+# [1] StorageBackend: 공통 인터페이스
+class StorageBackend:
+    storage_tp = None
+
+    def put(self, fileobj, key: str, content_type: Optional[str] = None):
+        """fileobj 를 현재 위치부터 끝까지 key 에 저장합니다. (blocking -> threadpool 에서 호출)"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """key 를 삭제합니다. (없으면 무시)"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, filename: str, content_type: Optional[str] = None,
+                      expires_sec: int = FILE_S3_PRESIGN_EXPIRES_SEC) -> Optional[str]:
+        """클라이언트가 직접 받을 수 있는 다운로드 URL (None 이면 앱 서버가 직접 전송)"""
+        return None
+
+
+# [2] LocalStorage: 로컬 디스크
+class LocalStorage(StorageBackend):
+    storage_tp = 'LOCAL'
+
+    def put(self, fileobj, key: str, content_type: Optional[str] = None):
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        copy_with_hash(fileobj, key, 0, os.path.basename(key))
+
+    def delete(self, key: str):
+        remove_quietly(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(key)
+
+
+# [3] S3Storage: S3 호환 객체 저장소
+class S3Storage(StorageBackend):
+    storage_tp = 'S3'
+
+    def __init__(self, bucket: str = FILE_S3_BUCKET, endpoint_url: Optional[str] = FILE_S3_ENDPOINT_URL,
+                 region: str = FILE_S3_REGION, access_key: Optional[str] = FILE_S3_ACCESS_KEY,
+                 secret_key: Optional[str] = FILE_S3_SECRET_KEY,
+                 multipart_threshold_mb: float = FILE_S3_MULTIPART_THRESHOLD_MB,
+                 part_size_mb: float = FILE_S3_PART_SIZE_MB, max_concurrency: int = FILE_S3_MAX_CONCURRENCY):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        # 동시 전송 part 수만큼 연결을 재사용 (기본 pool 10개를 넘으면 연결을 새로 맺음)
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            config=Config(signature_version="s3v4", max_pool_connections=max(10, max_concurrency * 2),
+                          retries={"max_attempts": 3, "mode": "standard"})
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(multipart_threshold_mb * 1024 * 1024),
+            multipart_chunksize=int(part_size_mb * 1024 * 1024),
+            max_concurrency=max_concurrency,
+            use_threads=max_concurrency > 1
+        )
+
+    def put(self, fileobj, key: str, content_type: Optional[str] = None):
+        # upload_fileobj: 기준 이상이면 multipart (part 병렬 전송, 실패 시 multipart 업로드 중단/정리)
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs=extra_args, Config=self.transfer_config)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def presigned_url(self, key: str, filename: str, content_type: Optional[str] = None,
+                      expires_sec: int = FILE_S3_PRESIGN_EXPIRES_SEC) -> Optional[str]:
+        # 원본 파일명으로 받도록 응답 헤더를 서명에 포함
+        params = {
+            "Bucket": self.bucket,
+            "Key": key,
+            "ResponseContentDisposition": f"attachment; filename*=UTF-8''{quote(filename)}"
+        }
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_sec)
+
+
+# [4] get_storage_backend: storage_tp 별 프로세스 공용 backend
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_storage_backend(storage_tp: Optional[str] = None) -> StorageBackend:
+    """
+    파일 행의 storage_tp 에 맞는 backend 를 반환합니다. (CAS blob 은 로컬 디스크)
+    - storage_tp 가 없으면 새 업로드를 저장할 backend (FILE_STORAGE_BACKEND)
+    """
+    if storage_tp is None:
+        storage_tp = 'S3' if FILE_STORAGE_BACKEND == "s3" else 'LOCAL'
+    storage_tp = 'S3' if storage_tp == 'S3' else 'LOCAL'
+    backend = _backends.get(storage_tp)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(storage_tp)
+            if backend is None:
+                backend = _backends[storage_tp] = S3Storage() if storage_tp == 'S3' else LocalStorage()
+    return backend
+
+
+# [5] set_storage_backend: backend 교체 (테스트용) -> 이전 backend 반환
+def set_storage_backend(backend: Optional[StorageBackend], storage_tp: Optional[str] = None):
+    storage_tp = storage_tp or backend.storage_tp
+    with _backends_lock:
+        previous = _backends.pop(storage_tp, None)
+        if backend is not None:
+            _backends[storage_tp] = backend
+    return previous
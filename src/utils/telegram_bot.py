@@ -1,4 +1,8 @@
 import os
+import sys
+import threading
+import time
+from collections import deque
 import httpx
 import logging
 from dotenv import load_dotenv
@@ -8,34 +12,270 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+"""
+    텔레그램 메시지 발송 (큐 + 전송 스레드)
+    - [1] send_telegram_message: 텔레그램 봇을 통해 메시지를 전송합니다. (큐에 추가, 비동기 호환)
+    - [2] TelegramDispatcher.enqueue: 메시지를 큐에 추가 (바로 반환)
+    - [3] TelegramDispatcher.flush / stop: 큐가 빌 때까지 대기 / 전송 스레드 종료
+    - [4] TelegramDispatcher.get_status: 대기 / 전송 / 병합 / 실패 건수
+    - [5] get_telegram_dispatcher / close_telegram_dispatcher: 프로세스 공용 dispatcher (서버 종료 시 남은 메시지 전송)
+
+    * 기존 방식은 알림마다 asyncio task(또는 asyncio.run) + 새 httpx client 로 전송하여, 알림이 몰리면
+      동시 연결이 수십 개 생기고 텔레그램 rate limit(429)에 걸렸음
+    * 전송 스레드 1개가 keep-alive httpx.Client 로 순서대로 전송
+      - chat 별 전송 간격 TELEGRAM_CHAT_INTERVAL_SEC, 전체 초당 TELEGRAM_GLOBAL_RATE_PER_SEC 건 이하
+      - 같은 chat 에 TELEGRAM_COALESCE_SEC 안에 쌓인 메시지는 1건으로 병합 (텔레그램 최대 길이 이내)
+      - 429 는 응답의 retry_after 만큼 해당 chat 전송 보류, 5xx/네트워크 오류는 TELEGRAM_MAX_RETRIES 회까지 지수 백오프
+    * TELEGRAM_API_BASE 로 전송 주소 변경 가능 (테스트용 로컬 서버 등)
+"""
+
 # 환경 변수에서 텔레그램 설정 로드
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+TELEGRAM_CHAT_INTERVAL_SEC = float(os.getenv("TELEGRAM_CHAT_INTERVAL_SEC", "1"))
+TELEGRAM_GLOBAL_RATE_PER_SEC = float(os.getenv("TELEGRAM_GLOBAL_RATE_PER_SEC", "25"))
+TELEGRAM_COALESCE_SEC = float(os.getenv("TELEGRAM_COALESCE_SEC", "0.5"))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+TELEGRAM_RETRY_BASE_SEC = float(os.getenv("TELEGRAM_RETRY_BASE_SEC", "1"))
+TELEGRAM_QUEUE_SIZE = int(os.getenv("TELEGRAM_QUEUE_SIZE", "1000"))
+TELEGRAM_TIMEOUT_SEC = float(os.getenv("TELEGRAM_TIMEOUT_SEC", "10"))
+
+# 텔레그램 메시지 최대 길이
+TELEGRAM_MAX_TEXT = 4096
+COALESCE_SEPARATOR = "\n\n──────────\n\n"
+
+
+class _ChatQueue:
+    __slots__ = ("messages", "first_ts", "next_ts", "attempt")
+
+    def __init__(self):
+        self.messages = deque()
+        self.first_ts = 0.0     # 대기 중인 첫 메시지가 들어온 시각 (병합 대기 기준)
+        self.next_ts = 0.0      # 이 chat 에 다음으로 보낼 수 있는 시각
+        self.attempt = 0        # 현재 메시지 재시도 횟수
+
+
+class TelegramDispatcher:
+    def __init__(self, token: str = None, chat_id: str = None, api_base: str = None,
+                 chat_interval_sec: float = None, global_rate_per_sec: float = None, coalesce_sec: float = None,
+                 max_retries: int = None, retry_base_sec: float = None, queue_size: int = None):
+        self.token = token if token is not None else TELEGRAM_BOT_TOKEN
+        self.chat_id = chat_id if chat_id is not None else TELEGRAM_CHAT_ID
+        self.api_base = (api_base or TELEGRAM_API_BASE).rstrip("/")
+        self.chat_interval_sec = TELEGRAM_CHAT_INTERVAL_SEC if chat_interval_sec is None else chat_interval_sec
+        self.global_rate_per_sec = TELEGRAM_GLOBAL_RATE_PER_SEC if global_rate_per_sec is None else global_rate_per_sec
+        self.coalesce_sec = TELEGRAM_COALESCE_SEC if coalesce_sec is None else coalesce_sec
+        self.max_retries = TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_sec = TELEGRAM_RETRY_BASE_SEC if retry_base_sec is None else retry_base_sec
+        self.queue_size = TELEGRAM_QUEUE_SIZE if queue_size is None else queue_size
+
+        self._chats = {}            # chat_id -> _ChatQueue
+        self._queued = 0
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._client = None
+        self._stopping = False
+        self._next_global_ts = 0.0
+        self._warned = False
+        self.stats = {"queued": 0, "sent": 0, "requests": 0, "coalesced": 0, "dropped": 0, "failed": 0, "retried": 0}
+
+    # [2] enqueue: 메시지를 큐에 추가
+    def enqueue(self, text: str, chat_id: str = None) -> bool:
+        chat_id = str(chat_id or self.chat_id or "")
+        if not self.token or not chat_id:
+            if not self._warned:
+                logger.warning("Telegram Bot Token 또는 Chat ID가 설정되지 않았습니다.")
+                self._warned = True
+            return False
+
+        with self._cond:
+            if self._stopping:
+                return False
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _ChatQueue()
+            if not chat.messages:
+                chat.first_ts = time.monotonic()
+            chat.messages.append(text)
+            self._queued += 1
+            self.stats["queued"] += 1
+            if self._queued > self.queue_size:
+                self._drop_oldest()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="telegram-dispatcher", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return True
+
+    def _drop_oldest(self):
+        # 큐가 가득 차면 가장 오래 기다린 chat 의 가장 오래된 메시지를 버림
+        chat = min((c for c in self._chats.values() if c.messages), key=lambda c: c.first_ts)
+        chat.messages.popleft()
+        self._queued -= 1
+        self.stats["dropped"] += 1
+        logger.warning("Telegram queue full, dropping oldest message")
+
+    # [3] flush / stop
+    def flush(self, timeout: float = 10) -> bool:
+        """큐가 비고 전송 중인 메시지가 없을 때까지 대기 -> 시간 안에 비었으면 True"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queued or self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 5):
+        """남은 메시지를 timeout 초까지 전송하고 전송 스레드 종료"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    # [4] get_status
+    def get_status(self) -> dict:
+        with self._cond:
+            return {"pending": self._queued, "chats": sum(1 for c in self._chats.values() if c.messages), **self.stats}
+
+    def _take_batch(self, now: float):
+        """보낼 수 있는 chat 의 메시지를 병합하여 꺼냄 -> (chat_id, text, count) 또는 (None, 다음 확인까지 대기 초)"""
+        wait = None
+        for chat_id, chat in self._chats.items():
+            if not chat.messages:
+                continue
+            ready_ts = max(chat.next_ts, chat.first_ts + self.coalesce_sec, self._next_global_ts)
+            if ready_ts > now:
+                wait = ready_ts - now if wait is None else min(wait, ready_ts - now)
+                continue
+            parts = [chat.messages.popleft()]
+            length = len(parts[0])
+            while chat.messages and length + len(COALESCE_SEPARATOR) + len(chat.messages[0]) <= TELEGRAM_MAX_TEXT:
+                text = chat.messages.popleft()
+                length += len(COALESCE_SEPARATOR) + len(text)
+                parts.append(text)
+            if chat.messages:
+                # 길이 제한으로 남은 메시지는 다음 전송에서 (병합 대기 없이)
+                chat.first_ts = now - self.coalesce_sec
+            self._queued -= len(parts)
+            self._inflight += len(parts)
+            return chat_id, parts, None
+        return None, None, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping and not self._queued:
+                        self._cond.notify_all()
+                        return
+                    chat_id, parts, wait = self._take_batch(time.monotonic())
+                    if chat_id is not None:
+                        break
+                    if self._stopping:
+                        # 종료 중에는 병합/간격 대기 없이 남은 메시지 전송
+                        for chat in self._chats.values():
+                            chat.first_ts = chat.next_ts = 0.0
+                        self._next_global_ts = 0.0
+                        continue
+                    self._cond.wait(wait)
+                chat = self._chats[chat_id]
+
+            text = parts[0] if len(parts) == 1 else COALESCE_SEPARATOR.join(parts)
+            sent, retry_after = self._send(chat_id, text, chat.attempt)
+
+            with self._cond:
+                now = time.monotonic()
+                self._inflight -= len(parts)
+                if self.global_rate_per_sec > 0:
+                    self._next_global_ts = now + 1 / self.global_rate_per_sec
+                if sent:
+                    chat.attempt = 0
+                    chat.next_ts = now + self.chat_interval_sec
+                    self.stats["sent"] += len(parts)
+                    self.stats["coalesced"] += len(parts) - 1
+                elif retry_after is not None and chat.attempt < self.max_retries and not self._stopping:
+                    # 실패한 메시지를 다시 앞에 넣고 대기 후 재시도
+                    chat.attempt += 1
+                    self.stats["retried"] += 1
+                    chat.messages.extendleft(reversed(parts))
+                    self._queued += len(parts)
+                    chat.first_ts = now - self.coalesce_sec
+                    chat.next_ts = now + retry_after
+                else:
+                    chat.attempt = 0
+                    chat.next_ts = now + self.chat_interval_sec
+                    self.stats["failed"] += len(parts)
+                self._cond.notify_all()
+
+    def _send(self, chat_id: str, text: str, attempt: int):
+        """전송 -> (성공 여부, 재시도 대기 초 / 재시도하지 않을 오류는 None)"""
+        if self._client is None:
+            self._client = httpx.Client(timeout=TELEGRAM_TIMEOUT_SEC)
+        url = f"{self.api_base}/bot{self.token}/sendMessage"
+        backoff = self.retry_base_sec * (2 ** attempt)
+        self.stats["requests"] += 1
+        try:
+            response = self._client.post(url, json={"chat_id": chat_id, "text": text})
+        except httpx.HTTPError as e:
+            logger.error(f"Telegram 메시지 전송 중 예외 발생: {e}")
+            return False, backoff
+
+        if response.status_code == 200:
+            logger.info("Telegram 메시지 전송 성공")
+            return True, None
+        if response.status_code == 429:
+            # rate limit: 텔레그램이 알려준 시간만큼 대기
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after", 1))
+            except Exception:
+                retry_after = 1.0
+            logger.warning(f"Telegram rate limited, retry after {retry_after}s")
+            return False, max(retry_after, backoff)
+        logger.error(f"Telegram API 오류: {response.status_code} - {response.text}")
+        if response.status_code >= 500:
+            return False, backoff
+        # 4xx (잘못된 chat_id 등): 재시도해도 같은 결과
+        return False, None
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+# [5] get_telegram_dispatcher / close_telegram_dispatcher
+def get_telegram_dispatcher() -> TelegramDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = TelegramDispatcher()
+        return _dispatcher
+
+
+def close_telegram_dispatcher(timeout: float = 5):
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.stop(timeout)
+        status = dispatcher.get_status()
+        if status["pending"]:
+            print(f"[Telegram] {status['pending']} messages not sent before shutdown", file=sys.stderr)
+
 
 # [1] send_telegram_message: 텔레그램 봇을 통해 메시지를 전송합니다. (비동기)
-async def send_telegram_message(message: str):
+async def send_telegram_message(message: str, chat_id: str = None):
     """
     텔레그램 봇을 통해 메시지를 전송합니다. (비동기)
+    - 전송 큐에 추가하고 바로 반환 (실제 전송은 dispatcher 스레드)
     """
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        logger.warning("Telegram Bot Token 또는 Chat ID가 설정되지 않았습니다.")
-        return False
-
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=10.0)
-            if response.status_code == 200:
-                logger.info("Telegram 메시지 전송 성공")
-                return True
-            else:
-                logger.error(f"Telegram API 오류: {response.status_code} - {response.text}")
-                return False
-    except Exception as e:
-        logger.error(f"Telegram 메시지 전송 중 예외 발생: {e}")
-        return False
+    return get_telegram_dispatcher().enqueue(message, chat_id)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable
+
+from src.db.custom_tool import get_active_tools_with_params, get_tool_registry_version
+
+"""
+    도구 레지스트리 캐시 (h_tool_registry 버전 기반)
+    - [1] VersionedCache: 레지스트리 버전이 바뀐 경우에만 loader 를 다시 실행하는 캐시
+    - [2] tool_definition_hash: 커스텀 도구 정의(+파라미터) 해시 (도구별 변경 감지용)
+    - [3] diff_tool_definitions: 이전/현재 해시 비교 -> (추가, 변경, 삭제) 도구 이름 목록
+    - [4] custom_tool_snapshot: 활성 커스텀 도구 {name: tool} 캐시 (tool['params'], tool['hash'] 포함)
+    - [5] invalidate_tool_caches: 모든 캐시 무효화 (DB 복원처럼 버전 번호가 되돌아갈 수 있는 경우)
+
+    * 도구/파라미터가 바뀌면 DB 트리거가 h_tool_registry.version 을 올리므로(migration v6),
+      다른 프로세스(관리자 화면을 처리하는 SSE 서버 <-> stdio 서버)에서 변경해도 다음 조회 시 반영됨
+    * 버전이 그대로면 PK 조회 1회로 끝남 (기존: 도구 목록 + 도구별 파라미터 N회 조회)
+"""
+
+
+_caches = []
+
+# [1] VersionedCache: 레지스트리 버전이 바뀐 경우에만 다시 로드
+class VersionedCache:
+    def __init__(self, registry_nm: str, loader: Callable[[], Any]):
+        self.registry_nm = registry_nm
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+        _caches.append(self)
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self):
+        version = get_tool_registry_version(self.registry_nm)
+        with self._lock:
+            if version != self._version:
+                # 버전을 먼저 읽고 로드하므로, 로드 중 변경되면 다음 조회에서 다시 로드됨
+                self._value = self._loader()
+                self._version = version
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._value = None
+
+
+# [2] tool_definition_hash: 커스텀 도구 정의 해시
+def tool_definition_hash(tool: dict) -> str:
+    """도구 실행/스키마에 영향을 주는 필드만으로 해시를 만듭니다. (reg_dt 등은 제외)"""
+    payload = {
+        "name": tool["name"],
+        "tool_type": tool["tool_type"],
+        "definition": tool["definition"],
+        "description_agent": tool.get("description_agent") or "",
+        "params": [
+            [p["param_name"], p["param_type"], p["is_required"], p.get("description") or ""]
+            for p in tool.get("params", [])
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# [3] diff_tool_definitions: 이전/현재 {name: hash} 비교
+def diff_tool_definitions(previous: dict, current: dict) -> tuple[list, list, list]:
+    added = [name for name in current if name not in previous]
+    updated = [name for name in current if name in previous and previous[name] != current[name]]
+    removed = [name for name in previous if name not in current]
+    return added, updated, removed
+
+
+# [4] custom_tool_snapshot: 활성 커스텀 도구 캐시
+def _load_custom_tools() -> dict:
+    tools = {}
+    for tool in get_active_tools_with_params():
+        tool["hash"] = tool_definition_hash(tool)
+        tools[tool["name"]] = tool
+    return tools
+
+custom_tool_snapshot = VersionedCache("custom_tool", _load_custom_tools)
+
+
+# [5] invalidate_tool_caches: 모든 캐시 무효화
+def invalidate_tool_caches():
+    for cache in _caches:
+        cache.invalidate()
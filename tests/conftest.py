@@ -0,0 +1,31 @@
+## 파일 설명
+## >> 테스트 공용 fixture
+## >> (1) db_path: 테스트마다 임시 DB 경로로 교체 (스키마 생성 없음 -> migration / 업그레이드 테스트용)
+## >> (2) fresh_db: 임시 DB 경로로 교체 후 init_db() 로 최신 스키마 생성
+
+import pytest
+import sys
+import os
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+@pytest.fixture()
+def db_path(tmp_path, monkeypatch):
+    """테스트 전용 임시 DB 경로 (운영 DB 와 분리)"""
+    path = str(tmp_path / "test.db")
+    monkeypatch.setattr(connection, "DB_PATH", path)
+    return path
+
+
+@pytest.fixture()
+def fresh_db(db_path):
+    """테스트 전용 임시 DB + 최신 스키마"""
+    from src.db.init_manager import init_db
+    init_db()
+    return db_path
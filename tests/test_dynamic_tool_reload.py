@@ -0,0 +1,95 @@
+## 파일 설명
+## >> 동적 도구 hot-reload 체크 (src/dynamic_loader.py, src/utils/tool_registry_cache.py)
+## >> (1) 도구/파라미터 변경 시 레지스트리 버전 증가 (DB 트리거)
+## >> (2) FastMCP 에 바뀐 도구만 등록/교체/해제 (변경 없는 도구는 그대로), 대량 카탈로그 증분 반영 시간 측정
+## >> (3) mcp_server_impl list_tools 가 서버 재시작 없이 도구 추가/비활성화를 반영
+
+import pytest
+import sys
+import os
+import time
+import asyncio
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+CATALOG_SIZE = 300
+
+
+@pytest.fixture()
+def catalog(fresh_db):
+    from src.db import create_tool, add_tool_param
+    from src.utils.tool_registry_cache import invalidate_tool_caches
+    invalidate_tool_caches()
+
+    ids = {}
+    for i in range(CATALOG_SIZE):
+        name = f"tool_{i}"
+        ids[name] = create_tool(name, "SQL", f"SELECT {i} AS value", "", f"도구 {i}")
+        add_tool_param(ids[name], "limit", "NUMBER", "N", "조회 건수")
+    yield ids
+    invalidate_tool_caches()
+
+
+def test_registry_version_bumps_on_change(catalog):
+    from src.db import get_tool_registry_version, update_tool, add_tool_param
+
+    before = get_tool_registry_version("custom_tool")
+    update_tool(catalog["tool_0"], "tool_0", "SQL", "SELECT 100", "", "changed")
+    assert get_tool_registry_version("custom_tool") == before + 1
+    add_tool_param(catalog["tool_0"], "keyword", "STRING", "Y", "")
+    assert get_tool_registry_version("custom_tool") == before + 2
+    assert get_tool_registry_version("openapi") == 1
+
+
+def test_fastmcp_incremental_reload(catalog):
+    from mcp.server.fastmcp import FastMCP
+    from src.dynamic_loader import register_dynamic_tools
+    from src.db import update_tool, create_tool
+
+    mcp = FastMCP("reload-test")
+    started = time.perf_counter()
+    result = register_dynamic_tools(mcp)
+    full_ms = (time.perf_counter() - started) * 1000
+    assert len(result["added"]) == CATALOG_SIZE
+
+    tools = {t.name: t for t in asyncio.run(mcp.list_tools())}
+    assert "limit" in tools["tool_1"].inputSchema["properties"]
+    untouched = mcp._tool_manager.get_tool("tool_2")
+
+    # 변경 없음 -> 아무것도 하지 않음
+    assert register_dynamic_tools(mcp)["added"] == []
+
+    # 1개 수정, 1개 비활성화, 1개 추가 -> 해당 도구만 반영
+    update_tool(catalog["tool_1"], "tool_1", "SQL", "SELECT 'v2'", "", "수정된 도구")
+    update_tool(catalog["tool_3"], "tool_3", "SQL", "SELECT 3", "", "도구 3", is_active="N")
+    create_tool("tool_new", "SQL", "SELECT 'new'", "", "신규 도구")
+
+    started = time.perf_counter()
+    result = register_dynamic_tools(mcp)
+    incremental_ms = (time.perf_counter() - started) * 1000
+    assert (result["added"], result["updated"], result["removed"]) == (["tool_new"], ["tool_1"], ["tool_3"])
+
+    tools = {t.name: t for t in asyncio.run(mcp.list_tools())}
+    assert tools["tool_1"].description == "수정된 도구"
+    assert "tool_3" not in tools and "tool_new" in tools
+    assert mcp._tool_manager.get_tool("tool_2") is untouched
+
+    print(f"\n[Benchmark] {CATALOG_SIZE} tools: full load {full_ms:.0f} ms, incremental reload {incremental_ms:.1f} ms")
+    assert incremental_ms < full_ms
+
+
+def test_list_tools_reflects_changes_without_restart(catalog):
+    from src.mcp_server_impl import list_tools
+    from src.db import create_tool, update_tool
+
+    names = {t.name for t in asyncio.run(list_tools())}
+    assert {f"tool_{i}" for i in range(CATALOG_SIZE)} <= names
+
+    create_tool("tool_hot", "SQL", "SELECT 1", "", "hot")
+    update_tool(catalog["tool_5"], "tool_5", "SQL", "SELECT 5", "", "도구 5", is_active="N")
+
+    names = {t.name for t in asyncio.run(list_tools())}
+    assert "tool_hot" in names and "tool_5" not in names
@@ -0,0 +1,147 @@
+## 파일 설명
+## >> 예약 메일 dispatcher 체크 (src/utils/email_dispatcher.py)
+## >> (1) 예약 시각에 정확히 깨어나 발송 (1초 이내), 예약 시각 사이에는 DB 를 조회하지 않음
+## >> (2) 시작 시 DB 의 발송 대기 예약 메일 로드, 취소된 메일은 발송하지 않음
+## >>     이전 리더가 선점한 채 종료된 메일은 새 리더가 로드 시 되돌려 발송
+## >> (3) 선점/로드 쿼리가 (status, scheduled_dt) 인덱스 사용
+
+import pytest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+@pytest.fixture()
+def sent(monkeypatch):
+    from src import scheduler
+    sent = {}
+
+    class FakeSender:
+        def send_immediate(self, recipient, subject, content):
+            sent[recipient] = time.time()
+            return True, None
+
+        def send_many(self, messages):
+            return [self.send_immediate(*message) for message in messages]
+
+    monkeypatch.setattr(scheduler, "EmailSender", FakeSender)
+    return sent
+
+
+def _next_second(offset: int) -> datetime:
+    # 예약 시각은 초 단위로 저장됨
+    return datetime.fromtimestamp(int(time.time()) + offset)
+
+
+def _add_email(recipient: str, run_at: datetime) -> int:
+    from src.db import log_email
+    return log_email(None, recipient, "s", "c", True, run_at.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def test_dispatch_on_time_without_polling(fresh_db, sent, monkeypatch):
+    from src import scheduler
+    from src.db import email_manager, cancel_email_log
+    from src.utils.email_dispatcher import EmailDispatcher
+
+    claims = []
+    original_claim = email_manager.claim_scheduled_emails
+    monkeypatch.setattr(scheduler, "claim_scheduled_emails", lambda limit: claims.append(time.time()) or original_claim(limit))
+
+    past = datetime.now() - timedelta(hours=1)
+    first, second, cancelled = _next_second(1), _next_second(2), _next_second(2)
+    _add_email("past@example.com", past)
+    _add_email("first@example.com", first)
+    cancelled_id = _add_email("cancelled@example.com", cancelled)
+    cancel_email_log(cancelled_id, None, is_admin=True)
+
+    dispatcher = EmailDispatcher(scheduler.process_scheduled_emails)
+    dispatcher.start()
+    try:
+        # 시작 후 추가된 예약 메일
+        dispatcher.schedule(_add_email("second@example.com", second), second)
+        deadline = time.time() + 5
+        while len(sent) < 3 and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.2)
+    finally:
+        dispatcher.stop()
+
+    assert set(sent) == {"past@example.com", "first@example.com", "second@example.com"}
+    for recipient, run_at in (("first@example.com", first), ("second@example.com", second)):
+        delay = sent[recipient] - run_at.timestamp()
+        assert 0 <= delay < 0.5, f"{recipient} sent {delay:.3f}s after schedule"
+    # 지난 메일(시작 직후) + 예약 시각 2번만 조회 (사이에는 대기)
+    assert dispatcher.dispatch_count == 3
+    assert len(claims) == 3
+
+
+def test_leader_dispatcher_picks_up_forwarded_email(fresh_db, sent):
+    from src import scheduler
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+
+    previous = set_shared_state(MemoryBackend(worker_id="solo"))
+    try:
+        scheduler.start_scheduler()
+        assert scheduler.is_scheduler_leader()
+        run_at = _next_second(1)
+        log_id = _add_email("leader@example.com", run_at)
+        scheduler.add_scheduled_job(log_id, run_at.strftime("%Y-%m-%d %H:%M:%S"))
+        deadline = time.time() + 3
+        while "leader@example.com" not in sent and time.time() < deadline:
+            time.sleep(0.05)
+        assert "leader@example.com" in sent
+        assert sent["leader@example.com"] - run_at.timestamp() < 0.5
+    finally:
+        scheduler.shutdown_scheduler()
+        set_shared_state(previous)
+
+    conn = connection.get_db_connection()
+    assert conn.execute("SELECT status FROM h_email_log WHERE id = ?", (log_id,)).fetchone()[0] == "SENT"
+    conn.close()
+
+
+
+def test_new_leader_releases_stale_claims(fresh_db, sent):
+    from src import scheduler
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+
+    # 이전 리더가 선점(SENDING)한 뒤 발송 결과를 남기지 못하고 종료
+    log_id = _add_email("stale@example.com", _next_second(-60))
+    conn = connection.get_db_connection()
+    conn.execute("UPDATE h_email_log SET status = 'SENDING', claim_dt = '2000-01-01 00:00:00' WHERE id = ?", (log_id,))
+    conn.commit()
+    conn.close()
+
+    previous = set_shared_state(MemoryBackend(worker_id="solo"))
+    try:
+        scheduler.start_scheduler()
+        assert scheduler.is_scheduler_leader()
+        deadline = time.time() + 3
+        while "stale@example.com" not in sent and time.time() < deadline:
+            time.sleep(0.05)
+        assert "stale@example.com" in sent
+    finally:
+        scheduler.shutdown_scheduler()
+        set_shared_state(previous)
+
+def test_schedule_queries_use_index(fresh_db):
+    conn = connection.get_db_connection()
+    plans = [
+        " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall())
+        for sql, params in (
+            ("SELECT * FROM h_email_log WHERE status = 'PENDING' AND is_scheduled = 1 AND scheduled_dt <= ? "
+             "ORDER BY scheduled_dt, id LIMIT 10", ("2030-01-01 00:00:00",)),
+            ("SELECT id, scheduled_dt FROM h_email_log WHERE status = 'PENDING' AND is_scheduled = 1 "
+             "AND scheduled_dt IS NOT NULL ORDER BY scheduled_dt", ()),
+        )
+    ]
+    conn.close()
+    assert all("idx_email_log_status_scheduled" in plan for plan in plans), plans
@@ -0,0 +1,168 @@
+## 파일 설명
+## >> 내보내기 백그라운드 작업 체크 (작업 등록 -> 진행률 조회 -> 파일 Range 다운로드)
+## >> 내보내기 파일은 작업을 등록한 관리자만 다운로드 (파일 목록 / 일반 다운로드에서 제외)
+## >> 중단된 작업 정리는 생존 lease 가 없는 워커(owner)의 작업만 실패 처리 (다른 워커에서 실행 중인 작업은 유지)
+
+import pytest
+import sys
+import os
+import io
+import csv
+import time
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+
+ROW_COUNT = 12000
+ADMIN = {"uid": 1, "user_id": "export_admin", "role": "ROLE_ADMIN"}
+USER = {"uid": 2, "user_id": "export_user", "role": "ROLE_USER"}
+OTHER_ADMIN = {"uid": 3, "user_id": "other_admin", "role": "ROLE_ADMIN"}
+
+
+@pytest.fixture()
+def client(fresh_db, tmp_path, monkeypatch):
+    """임시 DB/업로드 경로 + export/files 라우터만 올린 앱 (관리자 인증 대체)"""
+    conn = connection.get_db_connection()
+    conn.executemany(
+        "INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_params, tool_success, tool_result, reg_dt) VALUES (?, ?, ?, ?, ?, ?)",
+        ((None, f"tool_{i % 4}", f"{{'no': {i}}}", 'SUCCESS', "ok", "2026-01-01 00:00:00") for i in range(ROW_COUNT))
+    )
+    conn.commit()
+    conn.close()
+
+    from src.routers import export, files
+    from src.utils import export_jobs
+    from src.utils.download_log import DownloadLog
+    from src.dependencies import get_current_user_jwt
+    monkeypatch.setattr(files, "BASE_UPLOAD_DIR", str(tmp_path / "files"))
+    monkeypatch.setattr(export_jobs, "PROGRESS_INTERVAL", 1000)
+    # 다운로드 이력은 임시 DB 에 반영 (테스트 종료 전에 반영 스레드 종료)
+    download_log = DownloadLog()
+    monkeypatch.setattr(files, "download_log", download_log)
+
+    app = FastAPI()
+    app.include_router(export.router)
+    app.include_router(files.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: ADMIN
+    yield TestClient(app)
+    download_log.stop()
+
+
+def _wait_done(client, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/export/jobs/{job_id}").json()
+        if job["status"] in ("DONE", "FAIL"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError("export job did not finish")
+
+
+def test_export_job_csv_and_range_download(client):
+    res = client.post("/api/export/jobs", json={"target": "mcp", "format": "csv", "tool_nm": "tool_1"})
+    assert res.status_code == 202
+    job_id = res.json()["job_id"]
+
+    job = _wait_done(client, job_id)
+    assert job["status"] == "DONE", job.get("error_msg")
+    assert job["total_cnt"] == ROW_COUNT // 4
+    assert job["processed_cnt"] == ROW_COUNT // 4
+    assert job["progress"] == 100
+
+    # 전체 다운로드 (files 라우터)
+    full = client.get(job["download_url"])
+    assert full.status_code == 200
+    rows = list(csv.reader(io.StringIO(full.content.decode("utf-8-sig"))))
+    assert len(rows) == ROW_COUNT // 4 + 1
+
+    # 이어받기 (Range)
+    part = client.get(job["download_url"], headers={"Range": "bytes=100-"})
+    assert part.status_code == 206
+    assert part.content == full.content[100:]
+
+    # 작업 목록에도 노출
+    jobs = client.get("/api/export/jobs").json()["jobs"]
+    assert any(j["job_id"] == job_id for j in jobs)
+
+
+def test_export_job_excel(client):
+    from openpyxl import load_workbook
+
+    res = client.post("/api/export/jobs", json={"target": "mcp", "format": "excel"})
+    job = _wait_done(client, res.json()["job_id"])
+    assert job["status"] == "DONE", job.get("error_msg")
+
+    content = client.get(job["download_url"]).content
+    ws = load_workbook(io.BytesIO(content), read_only=True)["MCP Usage"]
+    assert sum(1 for _ in ws.iter_rows(values_only=True)) == ROW_COUNT + 1
+
+
+def test_export_job_not_found(client):
+    assert client.get("/api/export/jobs/unknown-job").status_code == 404
+    assert client.post("/api/export/jobs", json={"target": "users"}).status_code == 400
+
+
+def test_export_file_only_for_owner_admin(client):
+    from src.dependencies import get_current_user_jwt
+    from src.db.file_manager import get_file_by_id
+    res = client.post("/api/export/jobs", json={"target": "mcp", "format": "csv"})
+    job = _wait_done(client, res.json()["job_id"])
+    file_id = job["file_id"]
+    assert job["download_url"] == f"/api/export/jobs/{job['job_id']}/download"
+    assert get_file_by_id(file_id)["storage_tp"] == "EXPORT"
+    assert client.get(f"/api/files/download/{file_id}").status_code == 200
+
+    # 일반 사용자 / 다른 관리자: 목록에 없고 다운로드/삭제 불가
+    for user in (USER, OTHER_ADMIN):
+        client.app.dependency_overrides[get_current_user_jwt] = lambda user=user: user
+        assert all(f["file_id"] != file_id for f in client.get("/api/files/list").json()["files"])
+        assert client.get(f"/api/files/batch/export:{job['job_id']}").json()["files"] == []
+        assert client.get(f"/api/files/download/{file_id}").status_code == 404
+        assert client.get(job["download_url"]).status_code in (403, 404)
+        assert client.delete(f"/api/files/{file_id}").status_code == 404
+    assert get_file_by_id(file_id) is not None
+
+
+def test_fail_only_orphaned_export_jobs(client):
+    from src import scheduler
+    from src.db.export_job import create_export_job, get_export_job
+    from src.utils.export_jobs import fail_orphaned_export_jobs
+    from src.utils.shared_state import SQLiteBackend, set_shared_state
+
+    this_worker = SQLiteBackend(worker_id="worker-a")
+    other_worker = SQLiteBackend(worker_id="worker-b")
+    previous = set_shared_state(this_worker)
+    try:
+        # API 로 등록한 작업에는 이 워커 id 가 기록됨
+        res = client.post("/api/export/jobs", json={"target": "mcp", "format": "csv"})
+        assert _wait_done(client, res.json()["job_id"])["status"] == "DONE"
+        conn = connection.get_db_connection()
+        assert conn.execute("SELECT owner FROM h_export_job WHERE job_id = ?", (res.json()["job_id"],)).fetchone()[0] == "worker-a"
+        conn.close()
+
+        owners = {"job-a": "worker-a", "job-b": "worker-b", "job-c": "worker-c", "job-legacy": None}
+        for job_id, owner in owners.items():
+            create_export_job(job_id, "MCP_USAGE", "csv", {}, ADMIN["uid"], ADMIN["user_id"], owner=owner)
+        # worker-a / worker-b 는 생존 lease 보유, worker-c 는 종료(lease 없음)
+        assert this_worker.acquire_lease(scheduler._worker_lease_name("worker-a"), 30)
+        assert other_worker.acquire_lease(scheduler._worker_lease_name("worker-b"), 30)
+
+        assert fail_orphaned_export_jobs(scheduler.is_worker_alive) == 2
+        statuses = {job_id: get_export_job(job_id)["status"] for job_id in owners}
+        assert statuses == {"job-a": "PENDING", "job-b": "PENDING", "job-c": "FAIL", "job-legacy": "FAIL"}
+
+        # worker-b 가 종료되면(lease 반납) 다음 정리에서 실패 처리
+        assert other_worker.release_lease(scheduler._worker_lease_name("worker-b"))
+        assert fail_orphaned_export_jobs(scheduler.is_worker_alive) == 1
+        assert get_export_job("job-b")["status"] == "FAIL"
+        assert get_export_job("job-a")["status"] == "PENDING"
+    finally:
+        set_shared_state(previous)
+        this_worker.close()
+        other_worker.close()
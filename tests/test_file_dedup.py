@@ -0,0 +1,170 @@
+## 파일 설명
+## >> 내용 주소(SHA-256) 파일 저장소 체크 (src/routers/files.py FILE_STORAGE_MODE=cas, migration v13 h_file_blob)
+## >> (1) 같은 내용을 다시 업로드하면 디스크 쓰기 없이 blob 공유, file_id / 다운로드는 업로드마다 그대로
+## >> (2) 삭제 시 참조 수만 감소, GC 는 유예 시간이 지난 참조 없는 blob 만 삭제
+## >> (3) blob 확인 후 참조 등록 전에 GC 가 정리해도 업로드가 blob 을 다시 저장
+## >> (4) 메타데이터 저장에 실패하면 새로 저장한 blob 은 참조 0 으로 등록되어 GC 가 정리
+
+import pytest
+import sys
+import os
+import hashlib
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+
+USER = {"uid": 1, "user_id": "dedup_user", "role": "ROLE_USER"}
+CONTENT = b"same document " * 4096
+
+
+@pytest.fixture()
+def client(fresh_db, tmp_path, monkeypatch):
+    from src.routers import files
+    from src.utils import file_storage
+    from src.utils.download_log import DownloadLog
+    from src.dependencies import get_current_user_jwt
+    monkeypatch.setattr(files, "BASE_UPLOAD_DIR", str(tmp_path / "files"))
+    monkeypatch.setattr(files, "FILE_STORAGE_MODE", "cas")
+
+    # 디스크 쓰기(임시 파일 복사) 횟수 기록
+    writes = []
+    copy_with_hash = file_storage.copy_with_hash
+    monkeypatch.setattr(file_storage, "copy_with_hash", lambda *args: writes.append(args[1]) or copy_with_hash(*args))
+
+    # 다운로드 이력은 임시 DB 에 반영 (테스트 종료 전에 반영 스레드 종료)
+    download_log = DownloadLog()
+    monkeypatch.setattr(files, "download_log", download_log)
+
+    app = FastAPI()
+    app.include_router(files.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: USER
+    test_client = TestClient(app)
+    test_client.writes = writes
+    yield test_client
+    download_log.stop()
+
+
+def _upload(client, name: str, data: bytes = CONTENT) -> dict:
+    res = client.post("/api/files/upload", files={"files": (name, data, "text/plain")})
+    assert res.status_code == 200
+    return res.json()["uploaded"][0]
+
+
+def _blob(file_hash: str) -> dict:
+    conn = connection.get_db_connection()
+    row = conn.execute("SELECT * FROM h_file_blob WHERE file_hash = ?", (file_hash,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def _age_blobs():
+    conn = connection.get_db_connection()
+    conn.execute("UPDATE h_file_blob SET upd_dt = datetime('now', 'localtime', '-2 hours')")
+    conn.commit()
+    conn.close()
+
+
+def test_duplicate_upload_shares_blob(client, tmp_path):
+    from src.db.file_manager import get_file_by_id
+    first = _upload(client, "report.txt")
+    second = _upload(client, "report-copy.txt")
+    same_request = client.post("/api/files/upload", files=[
+        ("files", ("a.txt", b"new content", "text/plain")), ("files", ("b.txt", b"new content", "text/plain"))
+    ]).json()["uploaded"]
+
+    assert len(client.writes) == 2                              # report 1번 + new content 1번
+    assert first["file_hash"] == second["file_hash"] and first["file_id"] != second["file_id"]
+    rows = [get_file_by_id(item["file_id"]) for item in (first, second)]
+    assert rows[0]["file_path"] == rows[1]["file_path"] and rows[0]["storage_tp"] == "CAS"
+    assert _blob(first["file_hash"])["ref_cnt"] == 2
+    assert _blob(same_request[0]["file_hash"])["ref_cnt"] == 2
+    blobs = [name for _, _, names in os.walk(tmp_path / "files") for name in names]
+    assert sorted(blobs) == sorted({first["file_hash"], same_request[0]["file_hash"]})
+
+    # 다운로드는 업로드마다 원본 파일명으로
+    for item in (first, second):
+        res = client.get(f"/api/files/download/{item['file_id']}")
+        assert res.status_code == 200 and res.content == CONTENT
+        assert item["org_file_nm"] in res.headers["content-disposition"]
+
+
+def test_delete_and_gc(client):
+    from src.db.file_manager import collect_unreferenced_blobs
+    first = _upload(client, "report.txt")
+    second = _upload(client, "report-copy.txt")
+    blob_path = _blob(first["file_hash"])["blob_path"]
+
+    assert client.delete(f"/api/files/{first['file_id']}").status_code == 200
+    assert os.path.exists(blob_path) and _blob(first["file_hash"])["ref_cnt"] == 1
+    assert client.get(f"/api/files/download/{second['file_id']}").content == CONTENT
+
+    assert client.delete(f"/api/files/{second['file_id']}").status_code == 200
+    assert _blob(first["file_hash"])["ref_cnt"] == 0
+    assert collect_unreferenced_blobs(grace_sec=3600) == {"deleted": 0, "reclaimed_bytes": 0}     # 유예 시간 전
+    assert os.path.exists(blob_path)
+
+    _age_blobs()
+    assert collect_unreferenced_blobs(grace_sec=3600) == {"deleted": 1, "reclaimed_bytes": len(CONTENT)}
+    assert not os.path.exists(blob_path) and _blob(first["file_hash"]) is None
+    assert not os.path.exists(blob_path + ".gc")
+
+    # 정리된 내용을 다시 업로드하면 새로 저장
+    third = _upload(client, "report.txt")
+    assert client.get(f"/api/files/download/{third['file_id']}").content == CONTENT
+    assert _blob(first["file_hash"])["ref_cnt"] == 1
+
+
+def test_gc_between_check_and_reference(client, monkeypatch):
+    from src.db.file_manager import collect_unreferenced_blobs
+    from src.routers import files
+    first = _upload(client, "report.txt")
+    client.delete(f"/api/files/{first['file_id']}")
+    _age_blobs()
+
+    # 업로드가 기존 blob 을 확인한 뒤, 참조를 등록하기 직전에 GC 실행
+    save_file_metadata_bulk = files.save_file_metadata_bulk
+    collected = []
+    monkeypatch.setattr(files, "save_file_metadata_bulk",
+                        lambda infos: collected.append(collect_unreferenced_blobs(grace_sec=3600)) or save_file_metadata_bulk(infos))
+    second = _upload(client, "report-again.txt")
+
+    assert collected == [{"deleted": 1, "reclaimed_bytes": len(CONTENT)}]
+    assert client.get(f"/api/files/download/{second['file_id']}").content == CONTENT
+    assert _blob(first["file_hash"])["ref_cnt"] == 1
+
+
+def test_metadata_failure_releases_new_blob(client, monkeypatch):
+    from src.db.file_manager import collect_unreferenced_blobs
+    from src.routers import files
+
+    def fail(infos):
+        raise RuntimeError("disk I/O error")
+    monkeypatch.setattr(files, "save_file_metadata_bulk", fail)
+    res = client.post("/api/files/upload", files={"files": ("report.txt", CONTENT, "text/plain")})
+    assert res.status_code == 500
+
+    # 새로 저장한 blob 은 참조 0 으로 등록되어 유예 시간 후 GC 가 삭제
+    file_hash = hashlib.sha256(CONTENT).hexdigest()
+    blob = _blob(file_hash)
+    assert blob["ref_cnt"] == 0 and os.path.exists(blob["blob_path"])
+    _age_blobs()
+    assert collect_unreferenced_blobs(grace_sec=3600) == {"deleted": 1, "reclaimed_bytes": len(CONTENT)}
+    assert not os.path.exists(blob["blob_path"])
+
+
+def test_date_mode_keeps_copy_per_upload(client, monkeypatch):
+    from src.routers import files
+    monkeypatch.setattr(files, "FILE_STORAGE_MODE", "date")
+    first = _upload(client, "report.txt")
+    second = _upload(client, "report.txt")
+    assert len(client.writes) == 2
+    assert first["file_hash"] == second["file_hash"] and _blob(first["file_hash"]) is None
+
+    assert client.delete(f"/api/files/{first['file_id']}").status_code == 200
+    assert client.get(f"/api/files/download/{second['file_id']}").content == CONTENT
@@ -0,0 +1,139 @@
+## 파일 설명
+## >> 파일 다운로드 Range / ETag / 조건부 GET 체크 (src/routers/files.py download_file, src/utils/download_log.py)
+## >> (1) 강한 ETag(SHA-256) + If-None-Match 304, If-Range 가 다르면 전체 전송
+## >> (2) Range 분할 다운로드 결과 = 원본, 다운로드 횟수는 0 바이트부터 시작하는 요청만 1회
+## >> (3) 다운로드 경로에서 DB 쓰기 없음, 이력/횟수는 반영 시 연결 1번으로 일괄 기록
+
+import pytest
+import sys
+import os
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+
+USER = {"uid": 1, "user_id": "download_user", "role": "ROLE_USER"}
+CONTENT = os.urandom(256 * 1024)
+
+
+@pytest.fixture()
+def client(fresh_db, tmp_path, monkeypatch):
+    from src.routers import files
+    from src.utils.download_log import DownloadLog
+    from src.dependencies import get_current_user_jwt
+    monkeypatch.setattr(files, "BASE_UPLOAD_DIR", str(tmp_path / "files"))
+    # 반영 스레드가 테스트 도중 반영하지 않도록 주기를 길게
+    download_log = DownloadLog(flush_sec=3600)
+    monkeypatch.setattr(files, "download_log", download_log)
+
+    app = FastAPI()
+    app.include_router(files.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: USER
+    test_client = TestClient(app)
+    test_client.download_log = download_log
+    res = test_client.post("/api/files/upload", files={"files": ("data.bin", CONTENT, "application/octet-stream")})
+    test_client.uploaded = res.json()["uploaded"][0]
+    yield test_client
+    download_log.stop()
+
+
+def _download_stats(file_uid: int):
+    conn = connection.get_db_connection()
+    down_cnt = conn.execute("SELECT down_cnt FROM h_file WHERE file_uid = ?", (file_uid,)).fetchone()[0]
+    logs = conn.execute("SELECT COUNT(*) FROM h_file_log WHERE file_uid = ?", (file_uid,)).fetchone()[0]
+    conn.close()
+    return down_cnt, logs
+
+
+def test_etag_and_conditional_get(client):
+    url = f"/api/files/download/{client.uploaded['file_id']}"
+    etag = f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+    res = client.get(url)
+    assert res.status_code == 200 and res.content == CONTENT
+    assert res.headers["etag"] == etag
+    assert res.headers["accept-ranges"] == "bytes"
+    assert res.headers["cache-control"] == "private, no-cache"
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        res = client.get(url, headers={"If-None-Match": if_none_match})
+        assert res.status_code == 304 and res.content == b""
+        assert res.headers["etag"] == etag
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+    # If-Range: ETag 가 같으면 범위만, 다르면 전체
+    res = client.get(url, headers={"Range": "bytes=100-199", "If-Range": etag})
+    assert res.status_code == 206 and res.content == CONTENT[100:200]
+    res = client.get(url, headers={"Range": "bytes=100-199", "If-Range": '"stale"'})
+    assert res.status_code == 200 and res.content == CONTENT
+    assert client.get(url, headers={"Range": f"bytes={len(CONTENT)}-"}).status_code == 416
+
+    # 전체 전송만 다운로드로 기록 (304 / 중간 구간 / 416 제외)
+    assert client.download_log.get_status()["pending"] == 3
+
+
+def test_parallel_range_download(client):
+    url = f"/api/files/download/{client.uploaded['file_id']}"
+    part = len(CONTENT) // 4
+
+    def fetch(i):
+        end = len(CONTENT) - 1 if i == 3 else (i + 1) * part - 1
+        res = client.get(url, headers={"Range": f"bytes={i * part}-{end}"})
+        assert res.status_code == 206
+        return res.content
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        parts = list(pool.map(fetch, range(4)))
+    assert b"".join(parts) == CONTENT
+
+    client.download_log.flush()
+    assert _download_stats(client.uploaded["file_uid"]) == (1, 1)   # 첫 구간 요청만 다운로드 1회
+
+
+def test_download_logging_is_batched(client, monkeypatch):
+    from src.db import file_manager
+    url = f"/api/files/download/{client.uploaded['file_id']}"
+    opened = []
+    get_db_connection = file_manager.get_db_connection
+    monkeypatch.setattr(file_manager, "get_db_connection", lambda: opened.append(1) or get_db_connection())
+
+    for _ in range(20):
+        assert client.get(url).status_code == 200
+    assert len(opened) == 20                                    # 파일 정보 조회만 (이력/횟수 쓰기 없음)
+    assert _download_stats(client.uploaded["file_uid"]) == (0, 0)
+
+    opened.clear()
+    assert client.download_log.flush() == 20
+    assert len(opened) == 1
+    assert _download_stats(client.uploaded["file_uid"]) == (20, 20)
+
+    # 이력 조회 시 반영하지 않은 이력 먼저 기록
+    client.get(url)
+    logs = client.get(f"/api/files/{client.uploaded['file_uid']}/logs").json()["logs"]
+    assert len(logs) == 21 and logs[0]["reg_uid"] == "download_user"
+
+
+def test_background_flush(client, monkeypatch):
+    from src.utils.download_log import DownloadLog
+    from src.routers import files
+    download_log = DownloadLog(flush_sec=3600, batch=5)
+    monkeypatch.setattr(files, "download_log", download_log)
+    try:
+        for _ in range(5):
+            client.get(f"/api/files/download/{client.uploaded['file_id']}")
+        # 배치가 차면 반영 주기와 관계없이 반영 스레드가 기록
+        deadline = time.monotonic() + 5
+        while download_log.get_status()["written"] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert download_log.get_status()["written"] == 5
+        assert _download_stats(client.uploaded["file_uid"]) == (5, 5)
+    finally:
+        download_log.stop()
@@ -0,0 +1,142 @@
+## 파일 설명
+## >> 파일 업로드 스트리밍 저장 체크 (src/routers/files.py, src/utils/file_storage.py)
+## >> (1) 다중 업로드: SHA-256/크기 기록, 메타데이터 일괄 저장 (DB 연결 1회), 임시 파일 남지 않음
+## >> (2) FILE_MAX_SIZE_MB 초과 시 413, 같은 요청에서 저장한 파일도 삭제
+## >> (3) 부하 테스트: 큰 파일 동시 업로드 처리량 / 이벤트 루프 최대 지연 출력
+
+import pytest
+import sys
+import os
+import asyncio
+import hashlib
+import time
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+
+USER = {"uid": 1, "user_id": "upload_user", "role": "ROLE_USER"}
+
+
+@pytest.fixture()
+def app(fresh_db, tmp_path, monkeypatch):
+    from src.routers import files
+    from src.dependencies import get_current_user_jwt
+    monkeypatch.setattr(files, "BASE_UPLOAD_DIR", str(tmp_path / "files"))
+
+    app = FastAPI()
+    app.include_router(files.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: USER
+    return app
+
+
+def _stored_files(tmp_path) -> list:
+    return [os.path.join(root, name) for root, _, names in os.walk(tmp_path / "files") for name in names]
+
+
+def test_multi_upload_hash_and_bulk_insert(app, tmp_path, monkeypatch):
+    from src.db import file_manager
+    opened = []
+    get_db_connection = file_manager.get_db_connection
+    monkeypatch.setattr(file_manager, "get_db_connection", lambda: opened.append(1) or get_db_connection())
+
+    payloads = {f"doc{i}.txt": os.urandom(300 * 1024 * (i + 1)) for i in range(3)}
+    client = TestClient(app)
+    res = client.post("/api/files/upload", files=[("files", (name, data, "text/plain")) for name, data in payloads.items()],
+                      data={"batch_id": "batch-1"})
+    assert res.status_code == 200
+    uploaded = res.json()["uploaded"]
+    assert len(opened) == 1                                     # 메타데이터 일괄 저장
+    assert [item["org_file_nm"] for item in uploaded] == list(payloads)
+
+    for item in uploaded:
+        data = payloads[item["org_file_nm"]]
+        assert (item["file_size"], item["file_hash"]) == (len(data), hashlib.sha256(data).hexdigest())
+        row = file_manager.get_file_by_id(item["file_id"])
+        assert (row["file_uid"], row["file_hash"], row["batch_id"]) == (item["file_uid"], item["file_hash"], "batch-1")
+        with open(row["file_path"], "rb") as f:
+            assert f.read() == data
+
+    assert not any(path.endswith(".part") for path in _stored_files(tmp_path))
+
+
+def test_oversize_upload_rejected(app, tmp_path, monkeypatch):
+    from src.routers import files
+    monkeypatch.setattr(files, "FILE_MAX_SIZE_MB", 1)
+    client = TestClient(app)
+    res = client.post("/api/files/upload", files=[
+        ("files", ("small.bin", b"x" * 1024, "application/octet-stream")),
+        ("files", ("big.bin", b"x" * (1024 * 1024 + 1), "application/octet-stream")),
+    ])
+    assert res.status_code == 413
+    assert "big.bin" in res.json()["detail"]
+    assert _stored_files(tmp_path) == []                        # 작은 파일과 임시 파일도 삭제
+
+    conn = connection.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) FROM h_file").fetchone()[0] == 0
+    conn.close()
+
+
+def test_oversize_stream_stops_early(tmp_path, monkeypatch):
+    from src.utils import file_storage
+
+    class Source:
+        """크기를 모르는 업로드 (multipart 가 size 를 채우지 않은 경우)"""
+        def __init__(self):
+            self.reads = 0
+
+        def read(self, size):
+            self.reads += 1
+            return b"x" * size
+
+    monkeypatch.setattr(file_storage, "FILE_UPLOAD_CHUNK_SIZE", 1024)
+    source = Source()
+    with pytest.raises(file_storage.FileTooLargeError):
+        file_storage.copy_with_hash(source, str(tmp_path / "out.bin"), 10 * 1024, "stream.bin")
+    assert source.reads == 11                                   # 제한을 넘는 chunk 에서 중단
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_large_uploads_benchmark(app, tmp_path):
+    uploads = 8
+    size = 8 * 1024 * 1024
+    payloads = [os.urandom(size) for _ in range(uploads)]        # 내용이 모두 달라 전부 디스크에 기록
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            # 업로드 복사가 이벤트 루프를 막으면 tick 간격이 크게 벌어짐
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def upload(i):
+                res = await client.post("/api/files/upload", files={"files": (f"large{i}.bin", payloads[i], "application/octet-stream")})
+                assert res.status_code == 200
+                return res.json()["uploaded"][0]
+
+            tick = asyncio.ensure_future(ticker())
+            started = time.perf_counter()
+            results = await asyncio.gather(*(upload(i) for i in range(uploads)))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await tick
+        return results, elapsed, gaps
+
+    results, elapsed, gaps = asyncio.run(run())
+    assert [item["file_hash"] for item in results] == [hashlib.sha256(data).hexdigest() for data in payloads]
+    print(f"\n[load] {uploads} x {size // (1024 * 1024)} MiB uploads: {elapsed:.2f}s, "
+          f"{uploads * size / (1024 * 1024) / elapsed:.0f} MiB/s, max loop gap {max(gaps) * 1000:.0f} ms")
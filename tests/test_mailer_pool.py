@@ -0,0 +1,209 @@
+## 파일 설명
+## >> SMTP 연결 풀 / 동시 발송 체크 (src/utils/mailer.py)
+## >> 로컬 SMTP 서버(socketserver, AUTH PLAIN 지원)로 실제 SMTP 대화를 수행
+## >> (1) 로그인한 연결 재사용, 설정은 캐시 (set_config 시 무효화)
+## >> (2) 예약 메일 일괄 발송이 메일마다 연결/로그인하던 기존 방식보다 빠름 (벤치마크)
+## >> (3) 일시적 오류(4xx)는 재시도, 영구 오류(5xx)는 바로 실패 / 서버별 발송 속도 제한
+
+import pytest
+import sys
+import os
+import json
+import time
+import smtplib
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+# 로컬 서버 지연 (실제 SMTP 서버의 연결/TLS/로그인, 메시지 수신 비용 흉내)
+CONNECT_DELAY = 0.03
+AUTH_DELAY = 0.03
+DATA_DELAY = 0.02
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        time.sleep(CONNECT_DELAY)
+        self._reply("220 localhost stand-in SMTP")
+        rcpt = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ")[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                time.sleep(AUTH_DELAY)
+                with server.lock:
+                    server.logins += 1
+                self._reply("235 Authentication successful")
+            elif verb == "MAIL":
+                rcpt = None
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt = command.split(":", 1)[1].strip("<> ")
+                if rcpt.startswith("reject"):
+                    self._reply("550 No such user")
+                else:
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                time.sleep(DATA_DELAY)
+                with server.lock:
+                    # busy 로 시작하는 수신자는 처음 한 번 일시적 오류
+                    if rcpt.startswith("busy") and rcpt not in server.busy_seen:
+                        server.busy_seen.add(rcpt)
+                        self._reply("451 Try again later")
+                        continue
+                    server.messages.append(rcpt)
+                self._reply("250 Queued")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.busy_seen = set()
+
+
+@pytest.fixture()
+def smtp_server(fresh_db, monkeypatch):
+    from src.db.system_config import set_config
+    from src.utils import mailer
+
+    server = _SMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    set_config("gmail_config", json.dumps({
+        "mail.host": "127.0.0.1", "mail.port": server.server_address[1],
+        "mail.username": "sender@example.com", "mail.password": "secret",
+        "mail.starttls": False, "mail.pool_size": 4, "mail.rate_per_sec": 0,
+    }))
+    monkeypatch.setattr(mailer, "SMTP_RETRY_BASE_SEC", 0.01)
+    mailer.close_smtp_pool()
+    yield server
+    mailer.close_smtp_pool()
+    server.shutdown()
+    server.server_close()
+
+
+def _send_unpooled(config: dict, recipient: str):
+    # 기존 방식: 메일마다 연결 + 로그인
+    server = smtplib.SMTP(config["mail.host"], int(config["mail.port"]))
+    server.login(config["mail.username"], config["mail.password"])
+    server.sendmail(config["mail.username"], recipient, "Subject: s\r\n\r\nbody")
+    server.quit()
+
+
+def test_connection_reuse_and_config_cache(smtp_server, monkeypatch):
+    from src.utils import mailer
+    from src.db.system_config import set_config, get_config_value
+
+    reads = []
+    monkeypatch.setattr(mailer, "get_config_value", lambda name: reads.append(name) or get_config_value(name))
+
+    sender = mailer.EmailSender()
+    for i in range(5):
+        assert sender.send_immediate(f"user{i}@example.com", "s", "c") == (True, None)
+    assert (smtp_server.connections, smtp_server.logins) == (1, 1)
+    assert len(smtp_server.messages) == 5
+    assert len(reads) == 1
+
+    # 설정을 바꾸면 다시 읽고, 바뀐 설정으로 새로 로그인
+    config = get_config_value("gmail_config")
+    config["mail.username"] = "other@example.com"
+    set_config("gmail_config", json.dumps(config))
+    assert sender.send_immediate("user5@example.com", "s", "c") == (True, None)
+    assert len(reads) == 2
+    assert smtp_server.logins == 2
+
+
+def test_bulk_scheduled_send_benchmark(smtp_server, monkeypatch):
+    from src import scheduler
+    from src.db import log_email
+    from src.db.system_config import get_config_value
+    monkeypatch.setattr(scheduler, "send_system_notification", lambda **kwargs: None)
+    count = 20
+
+    config = get_config_value("gmail_config")
+    started = time.perf_counter()
+    for i in range(count):
+        _send_unpooled(config, f"old{i}@example.com")
+    unpooled_sec = time.perf_counter() - started
+
+    due = (datetime.now() - timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M:%S")
+    for i in range(count):
+        log_email(None, f"new{i}@example.com", "s", "c", True, due)
+    logins_before = smtp_server.logins
+    started = time.perf_counter()
+    scheduler.process_scheduled_emails()
+    pooled_sec = time.perf_counter() - started
+
+    print(f"\n[benchmark] {count} emails: per-message connection {unpooled_sec * 1000:.0f} ms, "
+          f"pooled + concurrent {pooled_sec * 1000:.0f} ms")
+    assert sorted(m for m in smtp_server.messages if m.startswith("new")) == sorted(f"new{i}@example.com" for i in range(count))
+    assert smtp_server.logins - logins_before <= 4          # 풀 크기 이하로만 로그인
+    assert pooled_sec < unpooled_sec / 3
+
+    conn = connection.get_db_connection()
+    assert {row[0] for row in conn.execute("SELECT status FROM h_email_log").fetchall()} == {"SENT"}
+    conn.close()
+
+
+def test_retry_and_permanent_failure(smtp_server):
+    from src.utils.mailer import EmailSender
+    results = EmailSender().send_many([
+        ("busy@example.com", "s", "c"),
+        ("reject@example.com", "s", "c"),
+        ("ok@example.com", "s", "c"),
+    ])
+    assert results[0] == (True, None)                       # 451 -> 재시도 후 성공
+    assert results[1][0] is False and "550" in results[1][1]
+    assert results[2] == (True, None)
+    assert sorted(smtp_server.messages) == ["busy@example.com", "ok@example.com"]
+
+
+def test_rate_limit_per_server(smtp_server):
+    from src.db.system_config import set_config, get_config_value
+    from src.utils.mailer import EmailSender
+    config = get_config_value("gmail_config")
+    config["mail.rate_per_sec"] = 20
+    set_config("gmail_config", json.dumps(config))
+
+    started = time.perf_counter()
+    results = EmailSender().send_many([(f"user{i}@example.com", "s", "c") for i in range(8)])
+    elapsed = time.perf_counter() - started
+    assert all(success for success, _ in results)
+    # 동시 발송이어도 서버별로 초당 20건 (8건 -> 첫 건 이후 7 x 50ms)
+    assert elapsed >= 7 / 20 - 0.02
@@ -0,0 +1,145 @@
+## 파일 설명
+## >> MCP REST Proxy 일괄 실행 체크 (POST /api/mcp/proxy/batch, src/mcp_server_impl.py call_tools_batch)
+## >> (1) 호출별 결과/소요 시간을 요청 순서대로 반환, 동시 실행 수 제한 준수 (요청값은 MCP_PROXY_BATCH_CONCURRENCY 이하로 제한)
+## >> (2) 사용 이력은 배치 종료 후 한 번에 기록 (배치 중에는 DB INSERT 없음)
+## >> (3) 일일 사용량은 배치당 1회 확인 -> 남은 사용량을 넘는 호출은 실행하지 않고 에러로 반환
+## >> (4) 예약하지 않은 시스템 도구(refresh_tools) 이력은 사용량 확정 건수에서 제외
+
+import pytest
+import sys
+import os
+import asyncio
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+
+USER = {"uid": 1, "user_id": "admin", "role": "ROLE_ADMIN"}
+
+
+@pytest.fixture()
+def client(fresh_db):
+    from src.db import create_tool
+    from src.utils.tool_registry_cache import invalidate_tool_caches
+    from src.utils.quota_manager import quota_manager
+    from src.routers import mcp_execution
+    from src.dependencies import get_current_active_user
+    invalidate_tool_caches()
+    quota_manager.reset()
+    create_tool("slow_sql", "SQL", "SELECT 1", "", "느린 도구")
+
+    app = FastAPI()
+    app.include_router(mcp_execution.router)
+    app.dependency_overrides[get_current_active_user] = lambda: USER
+    yield TestClient(app)
+    invalidate_tool_caches()
+    quota_manager.reset()
+
+
+def _usage_count() -> int:
+    conn = connection.get_db_connection()
+    count = conn.execute("SELECT COUNT(*) FROM h_mcp_tool_usage").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_batch_runs_concurrently_and_logs_once(client, monkeypatch):
+    from src import mcp_server_impl
+
+    running = {"now": 0, "peak": 0}
+
+    async def fake_sql_tool(definition, params):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.05)
+        running["now"] -= 1
+        # 실행 도중에는 이력이 기록되지 않아야 함
+        assert _usage_count() == 0
+        return f"rows={params.get('n')}"
+
+    monkeypatch.setattr(mcp_server_impl, "execute_sql_tool", fake_sql_tool)
+
+    calls = [{"tool": "slow_sql", "arguments": {"n": i}} for i in range(8)]
+    calls.append({"tool": "add", "arguments": {"a": 1, "b": 2}})
+    calls.append({"tool": "no_such_tool"})
+    res = client.post("/api/mcp/proxy/batch", json={"calls": calls, "max_concurrency": 3})
+    assert res.status_code == 200
+    body = res.json()
+
+    assert [r["index"] for r in body["results"]] == list(range(10))
+    assert body["results"][2]["result"] == "rows=2"
+    assert body["results"][8]["result"] == "3"
+    assert body["results"][9]["success"] is False
+    assert (body["succeeded"], body["failed"]) == (9, 1)
+    assert all(r["elapsed_ms"] >= 0 for r in body["results"])
+
+    # 동시 실행 수 제한 (3) 준수 + 실제 병렬 실행 (8 x 50ms 직렬보다 빠름)
+    assert running["peak"] == 3
+    assert body["elapsed_ms"] < 8 * 50
+
+    # 존재하지 않는 도구는 기존 단건 호출과 같이 이력 없음
+    assert _usage_count() == 9
+
+
+
+def test_batch_concurrency_is_capped(client, monkeypatch):
+    from src import mcp_server_impl
+
+    running = {"now": 0, "peak": 0}
+
+    async def fake_sql_tool(definition, params):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.02)
+        running["now"] -= 1
+        return "ok"
+
+    monkeypatch.setattr(mcp_server_impl, "execute_sql_tool", fake_sql_tool)
+    monkeypatch.setattr(mcp_server_impl, "BATCH_CONCURRENCY", 2)
+
+    calls = [{"tool": "slow_sql", "arguments": {"n": i}} for i in range(6)]
+    res = client.post("/api/mcp/proxy/batch", json={"calls": calls, "max_concurrency": 100})
+    assert res.status_code == 200 and res.json()["succeeded"] == 6
+    # 서버 설정(2)보다 큰 요청값은 설정값으로 제한
+    assert running["peak"] == 2
+
+def test_batch_quota_reserved_once(client):
+    from src.db import upsert_limit, log_tool_usage
+    upsert_limit("USER", "1", 5)
+    log_tool_usage(1, "add", "{}", True, "0")
+    log_tool_usage(1, "add", "{}", True, "0")
+
+    calls = [{"tool": "add", "arguments": {"a": i, "b": 0}} for i in range(5)]
+    body = client.post("/api/mcp/proxy/batch", json={"calls": calls}).json()
+
+    # 남은 3건만 실행, 나머지 2건은 실행하지 않음
+    assert [r["success"] for r in body["results"]] == [True, True, True, False, False]
+    assert "Daily usage limit exceeded" in body["results"][4]["result"]
+    assert _usage_count() == 5
+
+
+def test_batch_system_tools_not_committed(client):
+    from src.db import upsert_limit
+    from src.utils.quota_manager import quota_manager
+    upsert_limit("USER", "1", 5)
+
+    calls = [{"tool": "add", "arguments": {"a": 1, "b": 0}}, {"tool": "refresh_tools", "arguments": {}}] * 2
+    client.post("/api/mcp/proxy/batch", json={"calls": calls})
+
+    # 이력은 4건 모두 기록되지만 사용량은 예약한 add 2건만 확정
+    assert _usage_count() == 4
+    assert quota_manager.get_usage(1) == 2
+
+
+def test_batch_validation(client):
+    from src import mcp_server_impl
+    assert client.post("/api/mcp/proxy/batch", json={"calls": []}).status_code == 400
+    too_many = [{"tool": "add"}] * (mcp_server_impl.BATCH_MAX_CALLS + 1)
+    assert client.post("/api/mcp/proxy/batch", json={"calls": too_many}).status_code == 400
+    # 단건 프록시 경로는 그대로 동작
+    assert client.post("/api/mcp/proxy/add", json={"arguments": {"a": 2, "b": 3}}).json()["result"] == "5"
@@ -0,0 +1,105 @@
+## 파일 설명
+## >> MCP 세션 내 도구 동시 실행 체크 (src/mcp_server_impl.py, src/tool_executor.py)
+## >> (1) 한 세션에서 동시에 보낸 도구 호출이 병렬 실행됨 (블로킹 작업은 스레드에서 실행)
+## >> (2) 세션별 동시 실행 수 제한 (MCP_SESSION_CONCURRENCY) 준수
+## >> (3) N개 동시 호출 처리량 측정 (직렬 실행 대비)
+## >> (4) 사용량 임계치 알림(DB 기록)도 이벤트 루프가 아닌 스레드에서 실행
+
+import pytest
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+CALLS = 8
+BLOCKING_SEC = 0.1
+# asyncio.to_thread 기본 스레드 풀 크기 (동시에 실행되는 블로킹 작업 수의 상한)
+THREAD_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
+
+@pytest.fixture()
+def slow_tool(fresh_db, monkeypatch):
+    from src.db import create_tool
+    from src.utils.tool_registry_cache import invalidate_tool_caches
+    from src.utils.quota_manager import quota_manager
+    from src import tool_executor
+    invalidate_tool_caches()
+    quota_manager.reset()
+    create_tool("slow_sql", "SQL", "SELECT 1", "", "느린 도구")
+
+    # 느린 쿼리(블로킹 I/O) 흉내: 실제 실행부를 time.sleep 으로 대체
+    original = tool_executor._run_sql_tool
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def blocking_sql(query_template, params):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(BLOCKING_SEC)
+        with lock:
+            running["now"] -= 1
+        return original(query_template, params)
+
+    monkeypatch.setattr(tool_executor, "_run_sql_tool", blocking_sql)
+    yield running
+    invalidate_tool_caches()
+    quota_manager.reset()
+
+
+async def _run_session(concurrent: bool, calls: int = CALLS) -> float:
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from src.mcp_server_impl import mcp
+    from src.utils.context import set_current_user
+
+    set_current_user({"uid": 1, "user_id": "admin", "role": "ROLE_ADMIN"})
+    async with create_connected_server_and_client_session(mcp) as session:
+        started = time.perf_counter()
+        if concurrent:
+            results = await asyncio.gather(*(session.call_tool("slow_sql", {}) for _ in range(calls)))
+        else:
+            results = [await session.call_tool("slow_sql", {}) for _ in range(calls)]
+        elapsed = time.perf_counter() - started
+    assert all(r.content[0].text == '[{"1": 1}]' for r in results)
+    return elapsed
+
+
+def test_concurrent_calls_run_in_parallel(slow_tool, monkeypatch):
+    from src import mcp_server_impl
+    monkeypatch.setattr(mcp_server_impl, "SESSION_CONCURRENCY", CALLS)
+
+    serial = asyncio.run(_run_session(concurrent=False))
+    assert slow_tool["peak"] == 1
+    concurrent = asyncio.run(_run_session(concurrent=True))
+    assert slow_tool["peak"] == min(CALLS, THREAD_POOL_SIZE)
+
+    print(f"\n[Benchmark] {CALLS} calls on one session: serial {serial * 1000:.0f} ms "
+          f"({CALLS / serial:.1f} calls/s), concurrent {concurrent * 1000:.0f} ms ({CALLS / concurrent:.1f} calls/s)")
+    assert concurrent < serial / 2
+
+
+def test_session_concurrency_limit(slow_tool, monkeypatch):
+    from src import mcp_server_impl
+    monkeypatch.setattr(mcp_server_impl, "SESSION_CONCURRENCY", 2)
+
+    asyncio.run(_run_session(concurrent=True))
+    assert slow_tool["peak"] == 2
+
+
+def test_threshold_notification_off_event_loop(slow_tool, monkeypatch):
+    from src import mcp_server_impl
+    notified = []
+    monkeypatch.setattr(mcp_server_impl, "get_user_limit", lambda **kwargs: 5)
+    monkeypatch.setattr(mcp_server_impl, "send_system_notification",
+                        lambda **kwargs: notified.append(threading.current_thread()))
+
+    asyncio.run(_run_session(concurrent=False, calls=5))
+    # 80%/90%(4회), 100%(5회) 임계치 통과 시 알림 -> 모두 이벤트 루프(메인 스레드) 밖에서 실행
+    assert len(notified) == 3
+    assert threading.main_thread() not in notified
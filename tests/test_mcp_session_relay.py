@@ -0,0 +1,70 @@
+## 파일 설명
+## >> 워커 간 MCP SSE 세션 등록/전달 체크 (src/sse_server.py)
+## >> (1) 세션 id 는 endpoint 이벤트에서 읽어 등록 (클라이언트가 받기 전), 연결 종료 시 해당 세션만 등록 해제
+## >> (2) 다른 워커가 전달한 /messages 요청은 transport 공개 API 로 이 워커의 세션에 전달
+
+import pytest
+import sys
+import os
+import json
+import asyncio
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+@pytest.fixture()
+def shared_state():
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+    backend = MemoryBackend(worker_id="worker-a")
+    previous = set_shared_state(backend)
+    yield backend
+    set_shared_state(previous)
+
+
+def test_session_registered_relayed_and_unregistered(shared_state):
+    from src import sse_server
+
+    async def run():
+        disconnected = asyncio.Event()
+        client_saw = []
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # 클라이언트가 endpoint 이벤트를 받는 시점에는 이미 세션이 등록되어 있어야 함
+            if message.get("type") == "http.response.body" and b"session_id=" in message.get("body", b""):
+                client_saw.append(shared_state.get_value(f"{sse_server.MCP_SESSION_KEY_PREFIX}{session.get('id')}"))
+
+        scope = {"type": "http", "method": "GET", "path": "/sse", "root_path": "", "query_string": b"", "headers": []}
+        session = {}
+        try:
+            async with sse_server.sse.connect_sse(scope, receive, sse_server._capture_session_id(send, session)) as (read_stream, _):
+                for _ in range(100):
+                    if client_saw:
+                        break
+                    await asyncio.sleep(0.01)
+                assert client_saw == ["worker-a"]
+                assert sse_server._is_local_session(session["id"])
+
+                # 다른 워커가 받은 요청 전달
+                body = json.dumps({"jsonrpc": "2.0", "id": 7, "method": "ping"}).encode()
+                # (세션 스트림은 버퍼가 없으므로 mcp.run 처럼 읽는 쪽과 동시에 실행)
+                deliver = asyncio.create_task(
+                    sse_server._deliver_relayed_message(session["id"], body, {"content-type": "application/json"})
+                )
+                received = await asyncio.wait_for(read_stream.receive(), timeout=2)
+                await deliver
+                assert received.message.root.id == 7
+                disconnected.set()
+        finally:
+            await sse_server._unregister_session(session["id"])
+        return session["id"]
+
+    session_id = asyncio.run(run())
+    assert not sse_server._is_local_session(session_id)
+    assert shared_state.get_value(f"{sse_server.MCP_SESSION_KEY_PREFIX}{session_id}") is None
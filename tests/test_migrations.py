@@ -0,0 +1,106 @@
+## 파일 설명
+## >> 스키마 Migration 엔진 체크 (src/db/migrations.py)
+## >> (1) 새 DB -> 최신 버전 + 성능 인덱스/집계 테이블 생성
+## >> (2) 이전 버전(v1) DB -> 미적용 migration 만 적용 + 집계 테이블 backfill
+## >> (3) plan(dry-run) 은 DB 를 변경하지 않음
+## >> (4) transactional migration 실패 시 롤백되고 버전이 그대로인지
+
+import pytest
+import sys
+import os
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+from src.db import migrations
+
+
+def _names(kind: str) -> set:
+    conn = connection.get_db_connection()
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type=?", (kind,)).fetchall()
+    conn.close()
+    return {row[0] for row in rows}
+
+
+def _version() -> int:
+    conn = connection.get_db_connection()
+    version = migrations.get_schema_version(conn)
+    conn.close()
+    return version
+
+
+def test_fresh_db_reaches_latest_version(db_path):
+    from src.db.init_manager import init_db
+
+    init_db()
+    assert _version() == migrations.LATEST_VERSION
+    assert {"idx_mcp_usage_user_dt", "idx_mcp_usage_token_dt", "idx_openapi_usage_token_dt"} <= _names("index")
+    assert "h_mcp_tool_usage_daily" in _names("table")
+
+    history = migrations.get_migration_history()
+    assert [row["version"] for row in history] == [m["version"] for m in migrations.MIGRATIONS]
+    assert migrations.plan_migrations()["pending"] == []
+
+
+def test_upgrade_from_v1_backfills_rollup(db_path):
+    from src.db.mcp_tool_usage import get_tool_stats
+
+    migrations.apply_migrations(target=1)
+    assert _version() == 1
+    assert "h_mcp_tool_usage_daily" not in _names("table")
+
+    conn = connection.get_db_connection()
+    conn.executemany(
+        "INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_success, reg_dt) VALUES (?, ?, ?, ?)",
+        [(1, "add", "SUCCESS", "2026-01-01 10:00:00"),
+         (1, "add", "FAIL", "2026-01-01 11:00:00"),
+         (2, "add", "SUCCESS", "2026-01-02 09:00:00")]
+    )
+    conn.commit()
+    conn.close()
+
+    # dry-run 은 변경 없음
+    plan = migrations.plan_migrations(target=3)
+    assert [m["version"] for m in plan["pending"]] == [2, 3]
+    assert _version() == 1
+
+    applied = migrations.apply_migrations(target=3)
+    assert [m["version"] for m in applied] == [2, 3]
+    assert get_tool_stats() == {"add": {"count": 3, "success": 2, "failure": 1}}
+
+    # 나머지 적용 후 다시 실행해도 적용할 것이 없음
+    migrations.apply_migrations()
+    assert migrations.apply_migrations() == []
+
+    # 적용 이후 INSERT 는 트리거로 누적
+    from src.db.mcp_tool_usage import log_tool_usage
+    log_tool_usage(1, "add", "{}", True, "ok")
+    assert get_tool_stats()["add"]["count"] == 4
+
+
+def test_failed_migration_rolls_back(db_path, monkeypatch):
+    migrations.apply_migrations()
+    latest = migrations.LATEST_VERSION
+
+    broken = {
+        "version": latest + 1,
+        "name": "broken",
+        "transactional": True,
+        "sql": [
+            "CREATE TABLE h_migration_probe (id INTEGER)",
+            "INSERT INTO h_not_exists VALUES (1)",
+        ],
+    }
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", latest + 1)
+
+    with pytest.raises(Exception):
+        migrations.apply_migrations()
+
+    # 같은 트랜잭션의 CREATE TABLE 까지 롤백, 버전 유지
+    assert _version() == latest
+    assert "h_migration_probe" not in _names("table")
+    assert [m["version"] for m in migrations.plan_migrations()["pending"]] == [latest + 1]
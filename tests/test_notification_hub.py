@@ -0,0 +1,157 @@
+## 파일 설명
+## >> 실시간 알림 fan-out hub 체크 (src/utils/notification_hub.py, src/routers/notification.py)
+## >> (1) 구독자별 고정 크기 버퍼: 병합(unread_count_update) / 버림 정책 + overflow 알림
+## >> (2) heartbeat: 알림이 없어도 주기적으로 깨어나 ping, 끊긴 연결은 바로 정리 / 사용자별 연결 수 제한
+## >> (3) 부하 테스트: 구독자 수천 명이 읽지 않아도 발행 건수와 무관하게 메모리 일정
+
+import pytest
+import sys
+import os
+import asyncio
+import gc
+import tracemalloc
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.utils.notification_hub import NotificationHub, Subscriber
+
+
+def test_buffer_policies():
+    async def run():
+        # drop_oldest: 오래된 알림을 버리고, 다음 전달 시 overflow 를 먼저 알림
+        sub = Subscriber(1, maxsize=3, policy="drop_oldest")
+        for i in range(5):
+            sub.push({"type": "new_notification", "n": i})
+        assert sub.qsize() == 3
+        assert sub.get_nowait() == {"type": "overflow", "dropped": 2}
+        assert [sub.get_nowait()["n"] for _ in range(3)] == [2, 3, 4]
+        assert sub.empty()
+
+        # drop_newest: 새 알림을 버림
+        sub = Subscriber(1, maxsize=2, policy="drop_newest")
+        assert [sub.push({"n": i}) for i in range(3)] == [True, True, False]
+        assert await sub.get() == {"type": "overflow", "dropped": 1}
+        assert [(await sub.get())["n"] for _ in range(2)] == [0, 1]
+
+        # unread_count_update 는 최신 값 하나만 유지
+        sub = Subscriber(1, maxsize=10)
+        sub.push({"type": "unread_count_update", "unread_count": 1})
+        sub.push({"type": "new_notification"})
+        sub.push({"type": "unread_count_update", "unread_count": 2})
+        sub.push({"type": "unread_count_update", "unread_count": 3})
+        assert [sub.get_nowait() for _ in range(sub.qsize())] == [
+            {"type": "new_notification"}, {"type": "unread_count_update", "unread_count": 3}]
+        assert sub.coalesced == 2
+
+        with pytest.raises(asyncio.QueueEmpty):
+            sub.get_nowait()
+
+    asyncio.run(run())
+
+
+def test_heartbeat_and_connection_limit():
+    async def run():
+        hub = NotificationHub(buffer_size=10, max_conn_per_user=2)
+        first = hub.subscribe(1)
+        assert await first.get(timeout=0.05) is None            # 알림 없음 -> heartbeat
+
+        waiter = asyncio.ensure_future(first.get(timeout=5))
+        await asyncio.sleep(0)
+        hub.publish(1, {"type": "new_notification"})
+        assert await asyncio.wait_for(waiter, 1) == {"type": "new_notification"}
+
+        # 연결 수 초과 -> 가장 오래된 연결 종료 (대기 중인 get 은 바로 None)
+        waiter = asyncio.ensure_future(first.get(timeout=5))
+        await asyncio.sleep(0)
+        second, third = hub.subscribe(1), hub.subscribe(1)
+        assert await asyncio.wait_for(waiter, 1) is None
+        assert first.closed and not second.closed
+        assert hub.publish(1, {"type": "new_notification"}) == 2
+
+        metrics = hub.metrics()
+        assert (metrics["connections"], metrics["users"], metrics["evicted"], metrics["buffered"]) == (2, 1, 1, 2)
+        hub.unsubscribe(second)
+        hub.unsubscribe(third)
+        assert hub.connections == {}
+        assert hub.metrics()["delivered"] == 1
+
+    asyncio.run(run())
+
+
+def test_stream_closes_dead_client(fresh_db, monkeypatch):
+    from src.routers import notification
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+    monkeypatch.setattr(notification, "NOTIFY_HEARTBEAT_SEC", 0.05)
+    monkeypatch.setattr(notification, "notification_manager", notification.NotificationManager())
+    previous = set_shared_state(MemoryBackend(worker_id="solo"))
+
+    class FakeRequest:
+        headers = {}
+        disconnected = False
+
+        async def is_disconnected(self):
+            return self.disconnected
+
+    async def run():
+        request = FakeRequest()
+        response = await notification.notification_stream(request, {"uid": 7})
+        events = response.body_iterator.__aiter__()
+        manager = notification.notification_manager
+
+        # 연결 시 현재 읽지 않은 개수
+        assert '"unread_count": 0' in (await asyncio.wait_for(events.__anext__(), 1))["data"]
+        first = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0.01)
+        manager.notify(7, {"type": "new_notification", "title": "hi"})
+        assert (await asyncio.wait_for(first, 1))["event"] == "notification"
+        # 알림이 없으면 heartbeat 간격으로 ping
+        assert await asyncio.wait_for(events.__anext__(), 1) == {"comment": "ping"}
+        assert manager.hub.metrics()["connections"] == 1
+
+        # 클라이언트가 끊기면 다음 heartbeat 에서 알림 없이도 연결 정리
+        request.disconnected = True
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(events.__anext__(), 1)
+        assert manager.hub.metrics()["connections"] == 0
+
+    try:
+        asyncio.run(run())
+    finally:
+        set_shared_state(previous)
+
+
+def test_memory_flat_with_many_idle_subscribers():
+    subscribers_count = 3000
+    buffer_size = 20
+
+    async def run():
+        hub = NotificationHub(buffer_size=buffer_size, max_conn_per_user=0)
+        for uid in range(subscribers_count):
+            hub.subscribe(uid % 1000)   # 사용자당 연결 3개, 아무도 읽지 않음
+
+        def publish(rounds):
+            for n in range(rounds):
+                for uid in range(1000):
+                    hub.publish(uid, {"type": "new_notification", "title": f"title {n}", "message": "x" * 100})
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            after_fill = publish(buffer_size * 4) - base        # 버퍼가 가득 차고 순환한 상태
+            after_many = publish(buffer_size * 16) - base       # 누적 5배 발행
+        finally:
+            tracemalloc.stop()
+
+        metrics = hub.metrics()
+        assert metrics["buffered"] == subscribers_count * buffer_size
+        assert metrics["dropped"] == subscribers_count * buffer_size * 19
+        print(f"\n[load] {subscribers_count} subscribers: {after_fill / 1024:.0f} KiB after {buffer_size * 4} events, "
+              f"{after_many / 1024:.0f} KiB after {buffer_size * 20} events")
+        assert after_many < after_fill * 1.1
+
+    asyncio.run(run())
@@ -0,0 +1,130 @@
+## 파일 설명
+## >> SSE 재연결 replay 체크 (Last-Event-ID, src/routers/notification.py, src/utils/notification_hub.py)
+## >> (1) 알림 이벤트 id = h_notification.id, 재연결 시 Last-Event-ID 이후 알림만 최근 이벤트 ring 에서 전송 (DB 조회 없음)
+## >> (2) ring 에서 밀려난 구간은 DB 범위 조회 (인덱스 사용), 너무 많으면 resync
+## >> (3) 토픽 알림 id 는 일괄 INSERT 의 마지막 id, 재연결 시 그 이후 토픽 알림만 replay
+
+import pytest
+import sys
+import os
+import asyncio
+import json
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+class FakeRequest:
+    def __init__(self, last_event_id=None):
+        self.headers = {"last-event-id": str(last_event_id)} if last_event_id is not None else {}
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+@pytest.fixture()
+def manager(fresh_db, monkeypatch):
+    from src.routers import notification
+    from src.utils import notification_helper
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+    monkeypatch.setattr(notification, "NOTIFY_HEARTBEAT_SEC", 0.05)
+    monkeypatch.setattr(notification, "notification_manager", notification.NotificationManager())
+    monkeypatch.setattr(notification_helper, "_send_telegram", lambda title, message: None)
+    previous = set_shared_state(MemoryBackend(worker_id="solo"))
+    yield notification.notification_manager
+    set_shared_state(previous)
+
+
+async def _connect(user: dict, last_event_id=None) -> list:
+    """스트림에 연결하여 첫 ping 전까지 받은 이벤트 (ping 후 연결 종료)"""
+    from src.routers import notification
+    request = FakeRequest(last_event_id)
+    response = await notification.notification_stream(request, user)
+    received = []
+    async for event in response.body_iterator:
+        if event.get("comment") == "ping":
+            request.disconnected = True
+            continue
+        received.append((event.get("id"), json.loads(event["data"])))
+    return received
+
+
+def _replayed(received: list) -> list:
+    return [(event_id, data["title"]) for event_id, data in received if data.get("replay")]
+
+
+def test_replay_from_ring(manager, monkeypatch):
+    from src.routers import notification
+    from src.utils.notification_helper import send_dual_notification
+    user = {"uid": 1, "role": "ROLE_USER"}
+    queries = []
+    monkeypatch.setattr(notification, "get_notifications_since", lambda *args: queries.append(args) or [])
+
+    async def run():
+        first = await _connect(user)                            # 연결 -> replay 기록 시작
+        ids = [send_dual_notification(1, f"t{i}", "m") for i in range(3)]
+        send_dual_notification(2, "other user", "m")
+        received = await _connect(user, last_event_id=ids[0])
+        return first, ids, received
+
+    first, ids, received = asyncio.run(run())
+    assert first == [(None, {"type": "unread_count_update", "unread_count": 0})]
+    assert _replayed(received) == [(str(ids[1]), "t1"), (str(ids[2]), "t2")]
+    assert all("unread_count" not in data for _, data in received if data.get("replay"))
+    assert (None, {"type": "unread_count_update", "unread_count": 3}) in received
+    assert queries == []
+
+
+def test_replay_falls_back_to_db(manager, monkeypatch):
+    from src.routers import notification
+    from src.utils.notification_helper import send_dual_notification
+    manager.hub.replay_size = 2
+    monkeypatch.setattr(notification, "NOTIFY_REPLAY_LIMIT", 3)
+    user = {"uid": 1, "role": "ROLE_USER"}
+
+    async def run():
+        await _connect(user)
+        ids = [send_dual_notification(1, f"t{i}", "m") for i in range(5)]
+        recent = await _connect(user, last_event_id=ids[1])     # ring 에서 밀려난 구간 -> DB
+        many = await _connect(user, last_event_id=0)            # LIMIT 초과 -> resync
+        return ids, recent, many
+
+    ids, recent, many = asyncio.run(run())
+    assert _replayed(recent) == [(str(ids[2]), "t2"), (str(ids[3]), "t3"), (str(ids[4]), "t4")]
+    assert _replayed(many) == [(str(ids[0]), "t0"), (str(ids[1]), "t1"), (str(ids[2]), "t2")]
+    assert (None, {"type": "resync"}) in many
+
+    conn = connection.get_db_connection()
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM h_notification WHERE receive_user_uid = ? AND id > ? AND delete_at IS NULL ORDER BY id LIMIT 10",
+        (1, 0)).fetchall())
+    conn.close()
+    assert "idx_notify_receive_user" in plan and "TEMP B-TREE" not in plan
+
+
+def test_topic_event_id(manager):
+    from src.utils.notification_helper import send_topic_notification
+
+    conn = connection.get_db_connection()
+    conn.execute("DELETE FROM h_user")
+    conn.executemany("INSERT INTO h_user (uid, user_id, password, user_nm, user_email, role) VALUES (?, ?, 'x', 'n', 'e', 'ROLE_USER')",
+                     [(uid, f"user{uid}") for uid in (1, 2, 3)])
+    conn.commit()
+    conn.close()
+    user = {"uid": 2, "role": "ROLE_USER"}
+
+    async def run():
+        await _connect(user)
+        send_topic_notification("all", "first", "m")
+        last_id = manager.hub.replay(2, [], 0)[0].event_id
+        send_topic_notification("role:ROLE_USER", "second", "m")
+        return last_id, await _connect(user, last_event_id=last_id)
+
+    last_id, received = asyncio.run(run())
+    assert last_id == 3                                         # 일괄 INSERT 3건 중 마지막 id
+    assert _replayed(received) == [("6", "second")]
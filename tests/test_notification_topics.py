@@ -0,0 +1,126 @@
+## 파일 설명
+## >> 토픽/전체 알림 체크 (src/utils/notification_helper.py send_topic_notification, src/utils/notification_hub.py)
+## >> (1) 전체/역할 토픽 알림: h_notification 일괄 저장 (DB 연결 2회 - 수신자 조회 + INSERT), 삭제/비활성 사용자 제외
+## >> (2) SSE: 토픽 구독 연결에만 전달, 구독자 수와 무관하게 이벤트 1건당 JSON 직렬화 1번
+## >> (3) POST /api/notifications/broadcast (관리자 전용, 알 수 없는 토픽은 400)
+
+import pytest
+import sys
+import os
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+USER_COUNT = 200
+
+
+@pytest.fixture()
+def users(fresh_db, monkeypatch):
+    from src.utils import notification_helper
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+    telegram = []
+    monkeypatch.setattr(notification_helper, "_send_telegram", lambda title, message: telegram.append(title))
+
+    conn = connection.get_db_connection()
+    conn.execute("DELETE FROM h_user")
+    conn.executemany(
+        "INSERT INTO h_user (uid, user_id, password, user_nm, user_email, role, is_delete) VALUES (?, ?, 'x', ?, 'u@example.com', ?, ?)",
+        [(uid, f"user{uid}", f"사용자{uid}", "ROLE_ADMIN" if uid <= 5 else "ROLE_USER", "Y" if uid == USER_COUNT else "N")
+         for uid in range(1, USER_COUNT + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+    previous = set_shared_state(MemoryBackend(worker_id="solo"))
+    yield telegram
+    set_shared_state(previous)
+
+
+def _notification_counts() -> dict:
+    conn = connection.get_db_connection()
+    rows = conn.execute("SELECT receive_user_uid, COUNT(*) FROM h_notification GROUP BY receive_user_uid").fetchall()
+    conn.close()
+    return {row[0]: row[1] for row in rows}
+
+
+def test_broadcast_bulk_insert_and_single_serialization(users, monkeypatch):
+    from src.db import notification as db_notification
+    from src.routers import notification
+    from src.utils import notification_hub
+    from src.utils.notification_helper import send_topic_notification
+    monkeypatch.setattr(notification, "notification_manager", notification.NotificationManager())
+    manager = notification.notification_manager
+
+    opened = []
+    get_db_connection = db_notification.get_db_connection
+    monkeypatch.setattr(db_notification, "get_db_connection", lambda: opened.append(1) or get_db_connection())
+    dumps = []
+    json_dumps = notification_hub.json.dumps
+    monkeypatch.setattr(notification_hub.json, "dumps", lambda *args, **kwargs: dumps.append(1) or json_dumps(*args, **kwargs))
+
+    async def run():
+        admins = [await manager.subscribe(uid, ["role:ROLE_ADMIN"]) for uid in range(1, 6)]
+        members = [await manager.subscribe(uid, ["role:ROLE_USER"]) for uid in range(6, 106)]
+        opened.clear()
+
+        assert send_topic_notification("all", "공지", "전체 공지", send_user_uid=1) == USER_COUNT - 1
+        assert len(opened) == 2
+        payloads = {notification_hub.serialize_event(sub.get_nowait()) for sub in admins + members}
+        assert len(payloads) == 1 and len(dumps) == 1
+        assert '"전체 공지"' in payloads.pop()
+
+        # 역할 토픽: 해당 역할 연결에만 전달
+        assert send_topic_notification("role:ROLE_ADMIN", "점검", "관리자 공지") == 5
+        assert all(sub.get_nowait()["message"] == "관리자 공지" for sub in admins)
+        assert all(sub.empty() for sub in members)
+        assert manager.hub.metrics()["topics"] == 2
+
+        for sub in admins + members:
+            manager.unsubscribe(sub.user_uid, sub)
+        assert manager.hub.topics == {}
+
+    asyncio.run(run())
+
+    counts = _notification_counts()
+    assert len(counts) == USER_COUNT - 1 and USER_COUNT not in counts     # 삭제된 사용자 제외
+    assert counts[1] == 2 and counts[6] == 1
+    assert users == ["공지", "점검"]                                      # Telegram 은 알림 1건당 1번
+
+
+def test_topic_event_from_other_worker(users):
+    from src.routers.notification import NotificationManager
+
+    manager = NotificationManager()
+
+    async def run():
+        sub = await manager.subscribe(7, ["role:ROLE_USER"])
+        manager._on_shared_event({"topic": "role:ROLE_USER", "data": {"type": "new_notification", "title": "원격"}})
+        return await asyncio.wait_for(sub.get(), timeout=1)
+
+    assert asyncio.run(run())["title"] == "원격"
+
+
+def test_broadcast_endpoint(users):
+    from src.routers import notification
+    from src.dependencies import get_current_user_jwt
+
+    app = FastAPI()
+    app.include_router(notification.router)
+    current = {"uid": 1, "role": "ROLE_ADMIN"}
+    app.dependency_overrides[get_current_user_jwt] = lambda: current
+    client = TestClient(app)
+
+    res = client.post("/api/notifications/broadcast", json={"title": "t", "message": "m", "topic": "role:ROLE_USER"})
+    assert res.status_code == 201
+    assert res.json() == {"status": "success", "count": USER_COUNT - 6}
+    assert client.post("/api/notifications/broadcast", json={"title": "t", "message": "m", "topic": "team:a"}).status_code == 400
+
+    current["role"] = "ROLE_USER"
+    assert client.post("/api/notifications/broadcast", json={"title": "t", "message": "m"}).status_code == 403
@@ -0,0 +1,129 @@
+## 파일 설명
+## >> 읽지 않은 알림 개수 카운터 체크 (src/db/notification.py, migration v11 h_notification_unread)
+## >> (1) 생성/일괄 생성/읽음/모두 읽음/삭제/보관 정책 삭제 후에도 카운터 = 기존 COUNT(*) 결과
+## >> (2) 조회는 메모리 캐시 또는 카운터 PK 조회 (COUNT 없음), 이전 버전 DB 는 migration 시 backfill
+## >> (3) 읽음 처리 API 가 SSE 로 개수 전송
+
+import pytest
+import sys
+import os
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+from src.db import migrations
+
+
+@pytest.fixture()
+def db_path(db_path):
+    from src.db import notification
+    notification.clear_unread_cache()
+    yield db_path
+    notification.clear_unread_cache()
+
+
+def _count_unread(user_uid: int) -> int:
+    # 기존 get_unread_count 쿼리
+    conn = connection.get_db_connection()
+    count = conn.execute(
+        "SELECT COUNT(*) FROM h_notification WHERE receive_user_uid = ? AND is_read = 'N' AND delete_at IS NULL", (user_uid,)
+    ).fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_counter_matches_count(db_path, monkeypatch):
+    from src.db.init_manager import init_db
+    from src.db import notification as db
+    init_db()
+
+    ids = [db.create_notification(1, f"t{i}", "m") for i in range(5)]
+    db.create_notification(2, "other", "m")
+    db.create_notifications_bulk([1, 2, 3], "bulk", "m")
+    assert [db.get_unread_count(uid) for uid in (1, 2, 3, 4)] == [6, 2, 1, 0]
+
+    assert db.mark_notification_as_read(ids[0]) == 5
+    assert db.mark_notification_as_read(ids[0]) == 5            # 이미 읽은 알림
+    assert db.delete_notification(ids[0]) == 5                  # 읽은 알림 삭제는 개수 변화 없음
+    assert db.delete_notification(ids[1]) == 4
+    assert db.mark_notification_as_read(999) is None
+    db.mark_all_notifications_as_read(2)
+
+    # 보관 정책 등 다른 경로의 삭제도 트리거로 반영 (캐시는 TTL 후 반영)
+    conn = connection.get_db_connection()
+    conn.execute("DELETE FROM h_notification WHERE id = ?", (ids[2],))
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(db, "NOTIFY_UNREAD_CACHE_TTL_SEC", 0)
+    for uid in (1, 2, 3, 4):
+        assert db.get_unread_count(uid) == _count_unread(uid)
+    assert db.get_unread_count(1) == 3
+
+
+def test_unread_count_is_constant_time(db_path, monkeypatch):
+    from src.db.init_manager import init_db
+    from src.db import notification as db
+    init_db()
+    db.create_notifications_bulk([1] * 2000, "t", "m")
+
+    opened = []
+    get_db_connection = db.get_db_connection
+    monkeypatch.setattr(db, "get_db_connection", lambda: opened.append(1) or get_db_connection())
+    assert db.get_unread_count(1) == 2000
+    assert db.get_unread_count(1) == 2000
+    assert len(opened) == 1                                     # 두 번째는 메모리 캐시
+
+    conn = connection.get_db_connection()
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT unread_cnt FROM h_notification_unread WHERE user_uid = ?", (1,)).fetchall()
+    conn.close()
+    assert "PRIMARY KEY" in " ".join(row[3] for row in plan)
+
+
+def test_upgrade_backfills_counter(db_path):
+    migrations.apply_migrations(target=10)
+    conn = connection.get_db_connection()
+    conn.executemany(
+        "INSERT INTO h_notification (receive_user_uid, title, message, is_read, delete_at) VALUES (?, 't', 'm', ?, ?)",
+        [(1, "N", None), (1, "N", None), (1, "Y", None), (1, "N", "2026-01-01 00:00:00"), (2, "N", None)]
+    )
+    conn.commit()
+    conn.close()
+
+    migrations.apply_migrations()
+    from src.db.notification import get_unread_count
+    assert (get_unread_count(1), get_unread_count(2)) == (2, 1)
+
+
+def test_read_pushes_unread_count(db_path, monkeypatch):
+    from src.db.init_manager import init_db
+    from src.db import notification as db
+    from src.routers import notification
+    from src.dependencies import get_current_user_jwt
+    from src.utils.shared_state import MemoryBackend, set_shared_state
+    init_db()
+    monkeypatch.setattr(notification, "notification_manager", notification.NotificationManager())
+    notify_id = db.create_notification(1, "t", "m")
+    db.create_notification(1, "t", "m")
+
+    app = FastAPI()
+    app.include_router(notification.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: {"uid": 1, "role": "ROLE_USER"}
+    client = TestClient(app)
+    previous = set_shared_state(MemoryBackend(worker_id="solo"))
+
+    async def subscribe():
+        return await notification.notification_manager.subscribe(1)
+
+    try:
+        subscriber = asyncio.run(subscribe())
+        assert client.patch(f"/api/notifications/{notify_id}/read").status_code == 200
+        assert subscriber.get_nowait() == {"type": "unread_count_update", "unread_count": 1}
+        assert client.get("/api/notifications/unread-count").json() == {"count": 1}
+    finally:
+        set_shared_state(previous)
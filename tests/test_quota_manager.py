@@ -0,0 +1,159 @@
+## 파일 설명
+## >> 일일 사용량 예약 체크 (src/utils/quota_manager.py, src/db/quota_counter.py)
+## >> (1) 동시 예약도 제한을 정확히 지킴 (reserve -> commit/release)
+## >> (2) 카운터는 처음 1회만 사용 이력 COUNT 로 생성, 이후 h_quota_counter 에 증가분 반영 (다른 프로세스 반영분 합산)
+## >> (3) call_tool 동시 호출 시 제한 초과 없음, 이력이 남지 않은 호출은 사용량 반환
+## >> (4) 여러 프로세스(인스턴스)가 같은 대상을 동시에 예약해도 제한을 넘지 않음 (QUOTA_COUNTER_MODE=db)
+
+import pytest
+import sys
+import os
+import asyncio
+import threading
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+@pytest.fixture()
+def fresh_db(fresh_db):
+    from src.utils.tool_registry_cache import invalidate_tool_caches
+    from src.utils.quota_manager import quota_manager
+    invalidate_tool_caches()
+    quota_manager.reset()
+    yield fresh_db
+    invalidate_tool_caches()
+    quota_manager.reset()
+
+
+def _counter_row(key: str):
+    conn = connection.get_db_connection()
+    row = conn.execute("SELECT used FROM h_quota_counter WHERE subject_key = ?", (key,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def test_concurrent_reserve_is_exact(fresh_db):
+    from src.utils.quota_manager import QuotaManager
+    manager = QuotaManager(flush_sec=3600)
+    granted = []
+    barrier = threading.Barrier(20)
+
+    def worker():
+        barrier.wait()
+        reservation = manager.reserve(user_uid=1, limit=5)
+        granted.append(reservation.count)
+        if reservation.count:
+            manager.commit(reservation)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(granted) == 5
+    assert manager.get_usage(user_uid=1) == 5
+    assert manager.reserve(user_uid=1, limit=5).count == 0
+
+    # 반환(release)한 예약은 다시 사용 가능
+    manager = QuotaManager(flush_sec=3600)
+    reservation = manager.reserve(token_id=7, limit=1)
+    assert manager.reserve(token_id=7, limit=1).count == 0
+    manager.release(reservation)
+    assert manager.reserve(token_id=7, limit=1).count == 1
+
+
+def test_counter_seed_and_flush(fresh_db):
+    from src.db import log_tool_usage
+    from src.utils.quota_manager import QuotaManager
+
+    log_tool_usage(1, "add", "{}", True, "1")
+    log_tool_usage(1, "add", "{}", True, "2")
+
+    first = QuotaManager(flush_sec=3600)
+    assert first.get_usage(user_uid=1) == 2          # 사용 이력 COUNT 로 생성
+    assert _counter_row("user:1") == 2
+
+    # 이후에는 사용 이력이 아니라 카운터를 기준으로 함
+    first.commit(first.reserve(user_uid=1, count=3))
+    assert _counter_row("user:1") == 2
+    first.flush()
+    assert _counter_row("user:1") == 5
+
+    # 다른 프로세스(인스턴스)의 증가분도 flush 시 합산
+    second = QuotaManager(flush_sec=3600)
+    assert second.get_usage(user_uid=1) == 5
+    second.add_usage(user_uid=1, count=2)
+    first.add_usage(user_uid=1, count=1)
+    second.flush()
+    first.flush()
+    assert _counter_row("user:1") == 8
+    assert first.get_usage(user_uid=1) == 8
+
+
+def test_reserve_is_exact_across_processes(fresh_db):
+    from src.utils.quota_manager import QuotaManager
+    # 인스턴스 = 프로세스 (메모리 카운터를 공유하지 않음)
+    managers = [QuotaManager(flush_sec=3600, mode="db") for _ in range(4)]
+    granted = []
+    barrier = threading.Barrier(20)
+
+    def worker(manager):
+        barrier.wait()
+        reservation = manager.reserve(user_uid=1, limit=5)
+        granted.append(reservation.count)
+        if reservation.count:
+            manager.commit(reservation)
+
+    threads = [threading.Thread(target=worker, args=(managers[i % 4],)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(granted) == 5
+    assert _counter_row("user:1") == 5
+    assert all(m.reserve(user_uid=1, limit=5).count == 0 for m in managers)
+
+    # 쓰지 않은 예약은 반영(flush) 후 다른 프로세스가 사용 가능
+    reservation = managers[0].reserve(token_id=7, limit=1)
+    assert managers[1].reserve(token_id=7, limit=1).count == 0
+    managers[0].release(reservation)
+    managers[0].flush()
+    assert managers[1].reserve(token_id=7, limit=1).count == 1
+
+
+def test_call_tool_concurrent_calls_respect_limit(fresh_db, monkeypatch):
+    from src import mcp_server_impl
+    from src.db import upsert_limit, create_tool
+    from src.utils.context import set_current_user
+
+    create_tool("slow_sql", "SQL", "SELECT 1", "", "느린 도구")
+    upsert_limit("USER", "1", 3)
+
+    async def fake_sql_tool(definition, params):
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    monkeypatch.setattr(mcp_server_impl, "execute_sql_tool", fake_sql_tool)
+
+    async def run():
+        set_current_user({"uid": 1, "user_id": "admin", "role": "ROLE_ADMIN"})
+        # 존재하지 않는 도구는 이력이 남지 않으므로 사용량 반환
+        missing = await mcp_server_impl.call_tool("no_such_tool", {})
+        assert "not found" in missing[0].text
+        return await asyncio.gather(*(mcp_server_impl.call_tool("slow_sql", {}) for _ in range(10)))
+
+    results = asyncio.run(run())
+    texts = [r[0].text for r in results]
+    assert texts.count("ok") == 3
+    assert all("Daily usage limit exceeded" in t for t in texts if t != "ok")
+
+    conn = connection.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) FROM h_mcp_tool_usage").fetchone()[0] == 3
+    conn.close()
@@ -0,0 +1,126 @@
+## 파일 설명
+## >> 이력/로그 보관 정책 체크 (src/db/retention.py)
+## >> (1) dry-run 리포트: 삭제 대상 건수/용량 추정, DB 변경 없음
+## >> (2) 실행: 보관 기간이 지난 행만 배치 삭제 + 월별 아카이브(gzip NDJSON / SQLite) 생성
+## >> (3) 원본 삭제 후에도 일별 집계 통계 유지, incremental_vacuum 으로 파일 크기 감소
+## >> (4) 삭제는 opt-in ('retention_policy' 에 enabled 저장 전에는 아무것도 삭제하지 않음)
+## >> (5) auto_vacuum=INCREMENTAL 전환(VACUUM)은 init_db 가 아니라 enable_incremental_vacuum 으로만 실행
+
+import pytest
+import sys
+import os
+import json
+import gzip
+import sqlite3
+from datetime import datetime, timedelta
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+from src.db import retention
+
+OLD_COUNT = 1200
+NEW_COUNT = 30
+
+
+@pytest.fixture()
+def seeded_db(fresh_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "ARCHIVE_DIR", str(tmp_path / "archives"))
+    from src.db.system_config import set_config
+    retention.enable_incremental_vacuum()
+
+    old_dt = (datetime.now() - timedelta(days=200)).strftime("%Y-%m-%d %H:%M:%S")
+    new_dt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = connection.get_db_connection()
+    conn.executemany(
+        "INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_params, tool_success, tool_result, reg_dt) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1, "add", "{}", "SUCCESS", "x" * 2000, old_dt)] * OLD_COUNT + [(1, "add", "{}", "SUCCESS", "ok", new_dt)] * NEW_COUNT
+    )
+    conn.executemany(
+        "INSERT INTO h_login_hist (user_uid, login_dt, login_ip, login_success) VALUES (?, ?, ?, ?)",
+        [(1, old_dt, "127.0.0.1", "SUCCESS")] * 5 + [(1, new_dt, "127.0.0.1", "SUCCESS")] * 2
+    )
+    conn.commit()
+    conn.close()
+
+    set_config("retention_policy", json.dumps({
+        "enabled": True,
+        "batch_size": 100,
+        "tables": {"h_login_hist": {"archive": "sqlite"}}
+    }))
+    return old_dt
+
+
+def _count(table: str) -> int:
+    conn = connection.get_db_connection()
+    count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_report_is_dry_run(seeded_db):
+    report = retention.get_retention_report()
+    usage = next(t for t in report["tables"] if t["table"] == "h_mcp_tool_usage")
+
+    assert usage["rows"] == OLD_COUNT
+    assert usage["estimated_bytes"] >= OLD_COUNT * 2000
+    assert report["auto_vacuum"] == "INCREMENTAL"
+    assert _count("h_mcp_tool_usage") == OLD_COUNT + NEW_COUNT
+
+
+def test_run_archives_deletes_and_vacuums(seeded_db):
+    from src.db.mcp_tool_usage import get_tool_stats
+
+    result = retention.run_retention()
+    usage = next(t for t in result["tables"] if t["table"] == "h_mcp_tool_usage")
+    login = next(t for t in result["tables"] if t["table"] == "h_login_hist")
+
+    assert usage["deleted"] == OLD_COUNT
+    assert _count("h_mcp_tool_usage") == NEW_COUNT
+    assert _count("h_login_hist") == 2
+    assert result["reclaimed_bytes"] > 0
+
+    # gzip NDJSON 아카이브 (월별 1개 파일)
+    assert len(usage["archive_files"]) == 1
+    with gzip.open(usage["archive_files"][0], "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == OLD_COUNT
+    assert lines[0]["reg_dt"] == seeded_db
+
+    # SQLite 아카이브
+    archive_conn = sqlite3.connect(login["archive_files"][0])
+    assert archive_conn.execute("SELECT COUNT(*) FROM h_login_hist").fetchone()[0] == 5
+    archive_conn.close()
+
+    # 집계 통계는 원본 삭제와 무관하게 유지
+    assert get_tool_stats()["add"]["count"] == OLD_COUNT + NEW_COUNT
+
+    # 다시 실행하면 삭제 대상 없음
+    assert retention.run_retention()["total_deleted"] == 0
+
+
+def test_incremental_vacuum_is_explicit(fresh_db):
+    # init_db (migration) 는 VACUUM 하지 않음
+    assert retention.get_retention_report()["auto_vacuum"] == "NONE"
+
+    result = retention.enable_incremental_vacuum()
+    assert result["vacuumed"] and result["auto_vacuum"] == "INCREMENTAL"
+    assert retention.get_retention_report()["auto_vacuum"] == "INCREMENTAL"
+    assert retention.enable_incremental_vacuum()["vacuumed"] is False
+
+
+def test_retention_is_opt_in(seeded_db):
+    from src.db.system_config import set_config
+    # 설정 전(또는 enabled 없음)에는 모든 테이블 비활성
+    set_config("retention_policy", json.dumps({"batch_size": 100}))
+    assert not any(t["enabled"] for t in retention.get_retention_policies()["tables"].values())
+    assert retention.run_retention()["total_deleted"] == 0
+    assert _count("h_mcp_tool_usage") == OLD_COUNT + NEW_COUNT
+
+    # 테이블별 opt-in
+    set_config("retention_policy", json.dumps({"tables": {"h_login_hist": {"enabled": True}}}))
+    result = retention.run_retention()
+    assert result["total_deleted"] == 5 and _count("h_mcp_tool_usage") == OLD_COUNT + NEW_COUNT
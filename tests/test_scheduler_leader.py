@@ -0,0 +1,178 @@
+## 파일 설명
+## >> 스케줄러 리더 선출 / 예약 메일 중복 발송 방지 체크 (src/scheduler.py, src/utils/scheduler_jobstore.py)
+## >> (1) 예약 메일 선점(PENDING -> SENDING): 여러 워커가 동시에 polling 해도 메일당 1번만 발송
+## >>     'T' 구분자 / 초 생략 형식의 예약 시각도 저장(또는 v16 migration) 시 보정되어 선점됨
+## >> (2) lease 를 가진 워커만 리더 -> 보관 정책 작업은 영구 작업 저장소(h_scheduler_job), 예약 메일은 리더의 dispatcher
+## >> (3) 리더가 아닌 워커가 등록한 예약 메일은 리더에게 전달, 재시작/리더 교체 후에도 작업 유지
+
+import pytest
+import sys
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+def _add_email(scheduled_dt: datetime) -> int:
+    from src.db import log_email
+    return log_email(None, "to@example.com", "subject", "content", True, scheduled_dt.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _statuses() -> dict:
+    conn = connection.get_db_connection()
+    rows = conn.execute("SELECT id, status FROM h_email_log").fetchall()
+    conn.close()
+    return {row["id"]: row["status"] for row in rows}
+
+
+def test_claim_is_exclusive(fresh_db):
+    from src.db.email_manager import claim_scheduled_emails, claim_email, release_stale_email_claims
+    past = datetime.now() - timedelta(minutes=1)
+    due_ids = [_add_email(past) for _ in range(20)]
+    future_id = _add_email(datetime.now() + timedelta(hours=1))
+
+    claimed = []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        while True:
+            rows = claim_scheduled_emails(limit=3)
+            if not rows:
+                return
+            claimed.extend(row["id"] for row in rows)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(claimed) == due_ids               # 모든 건을 정확히 1번씩 선점
+    assert _statuses()[future_id] == "PENDING"      # 발송 시각 전은 제외
+    assert claim_email(due_ids[0]) is None          # 이미 선점한 건은 다시 선점 불가
+    assert claim_email(future_id)["status"] == "SENDING"
+
+    # 발송 중 종료된 워커의 선점은 timeout 후 PENDING 으로
+    conn = connection.get_db_connection()
+    conn.execute("UPDATE h_email_log SET claim_dt = '2000-01-01 00:00:00' WHERE id = ?", (due_ids[0],))
+    conn.commit()
+    conn.close()
+    assert release_stale_email_claims(600) == 1
+    assert _statuses()[due_ids[0]] == "PENDING"
+
+
+
+def test_iso_scheduled_dt_is_claimed(fresh_db):
+    from src.db import log_email
+    from src.db.email_manager import claim_scheduled_emails
+    from src.db.migrations import _normalize_email_scheduled_dt
+    # 오늘 0시 ('T' 는 ' ' 보다 커서 문자열 비교로는 같은 날 예약이 선점되지 않았음)
+    past = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    iso_id = log_email(None, "to@example.com", "subject", "content", True, past.strftime("%Y-%m-%dT%H:%M"))
+
+    # 보정 이전에 저장된 행
+    conn = connection.get_db_connection()
+    legacy_id = conn.execute(
+        "INSERT INTO h_email_log (recipient, subject, content, is_scheduled, scheduled_dt, status, reg_dt) "
+        "VALUES ('to@example.com', 's', 'c', 1, ?, 'PENDING', ?)",
+        (past.strftime("%Y-%m-%dT%H:%M"), past.strftime("%Y-%m-%d %H:%M:%S"))
+    ).lastrowid
+    conn.commit()
+    assert [row["id"] for row in claim_scheduled_emails()] == [iso_id]     # 저장 시 보정된 행만 선점
+
+    _normalize_email_scheduled_dt(conn.cursor())
+    conn.commit()
+    rows = conn.execute("SELECT id, scheduled_dt FROM h_email_log ORDER BY id").fetchall()
+    conn.close()
+    expected = past.strftime("%Y-%m-%d %H:%M:%S")
+    assert [(row["id"], row["scheduled_dt"]) for row in rows] == [(iso_id, expected), (legacy_id, expected)]
+    assert [row["id"] for row in claim_scheduled_emails()] == [legacy_id]
+
+def test_concurrent_polling_sends_once(fresh_db, monkeypatch):
+    from src import scheduler
+
+    sent = []
+
+    class FakeSender:
+        def send_immediate(self, recipient, subject, content):
+            time.sleep(0.01)
+            sent.append(recipient)
+            return True, None
+
+        def send_many(self, messages):
+            return [self.send_immediate(*message) for message in messages]
+
+    monkeypatch.setattr(scheduler, "EmailSender", FakeSender)
+    monkeypatch.setattr(scheduler, "EMAIL_CLAIM_BATCH", 4)
+
+    ids = [_add_email(datetime.now() - timedelta(minutes=1)) for _ in range(15)]
+    # 정시 발송 작업이 polling 과 같은 건을 실행해도 중복 없음
+    threads = [threading.Thread(target=scheduler.process_scheduled_emails) for _ in range(3)]
+    threads.append(threading.Thread(target=scheduler.send_one_email, args=(ids[0],)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(sent) == 15
+    assert set(_statuses().values()) == {"SENT"}
+
+
+def test_leader_election_and_persistent_jobs(fresh_db):
+    from src import scheduler
+    from src.utils.shared_state import SQLiteBackend, set_shared_state
+
+    this_worker = SQLiteBackend(worker_id="worker-a")
+    other_worker = SQLiteBackend(worker_id="worker-b")
+    previous = set_shared_state(this_worker)
+    forwarded = []
+    other_worker.subscribe(scheduler.SCHEDULE_CHANNEL, forwarded.append)
+    other_worker.close()  # polling 스레드 대신 poll_once 로 직접 확인
+    run_date = (datetime.now() + timedelta(days=1)).replace(microsecond=0)
+
+    try:
+        # 1. 다른 워커가 리더 -> 이 워커는 작업을 실행하지 않고 리더에게 전달
+        assert other_worker.acquire_lease(scheduler.SCHEDULER_LEASE_NAME, 30)
+        scheduler.start_scheduler()
+        this_worker.close()
+        assert not scheduler.is_scheduler_leader()
+        scheduler.add_scheduled_job(101, run_date.strftime("%Y-%m-%d %H:%M:%S"))
+        assert "email_101" not in [job["id"] for job in scheduler.get_scheduler_jobs()]
+        this_worker.flush()
+        other_worker.poll_once()
+        assert forwarded == [{"log_id": 101, "run_date": run_date.isoformat()}]
+
+        # 2. 리더가 lease 를 반납하면 다음 갱신에서 이 워커가 리더
+        assert other_worker.release_lease(scheduler.SCHEDULER_LEASE_NAME)
+        assert scheduler.renew_scheduler_lease()
+        scheduler.add_scheduled_job(102, run_date.strftime("%Y-%m-%d %H:%M:%S"))
+        jobs = {job["id"]: job for job in scheduler.get_scheduler_jobs()}
+        assert jobs["retention_job"]["jobstore"] == scheduler.PERSISTENT_JOBSTORE
+        assert jobs["email_dispatcher"]["next_run_time"] == run_date.isoformat()
+        assert jobs["email_dispatcher"]["args"] == "queued=1"
+
+        # 3. 종료 시 lease 반납, 작업은 DB 에 남아 재시작 후 이어서 실행 (예약 메일은 h_email_log 에서 다시 로드)
+        scheduler.shutdown_scheduler()
+        assert other_worker.get_lease_owner(scheduler.SCHEDULER_LEASE_NAME) is None
+        assert not scheduler.get_email_dispatcher().running
+        conn = connection.get_db_connection()
+        stored = {row[0] for row in conn.execute("SELECT id FROM h_scheduler_job").fetchall()}
+        conn.close()
+        assert stored == {"retention_job", "file_gc_job"}
+
+        _add_email(run_date)
+        scheduler.start_scheduler()
+        assert scheduler.is_scheduler_leader()
+        assert scheduler.get_scheduler().get_job("retention_job") is not None
+        assert scheduler.get_email_dispatcher().get_status()["next_run_time"] == run_date.isoformat()
+    finally:
+        scheduler.shutdown_scheduler()
+        set_shared_state(previous)
@@ -0,0 +1,160 @@
+## 파일 설명
+## >> 워커 간 공유 상태 체크 (src/utils/shared_state.py, src/db/shared_state.py)
+## >> (1) SQLite backend: 다른 워커가 발행한 이벤트만 수신 (자기 이벤트는 로컬 즉시 전달, 중복 없음)
+## >>     다른 워커 전파는 발행 스레드가 저장 (publish 는 DB 쓰기를 기다리지 않음)
+## >> (2) lease: 한 워커만 획득, 소유자는 갱신 가능, 만료되면 다른 워커가 획득 / key-value 만료
+## >> (3) 알림: 다른 워커가 발행한 알림이 이 워커의 SSE 연결(Queue)로 전달
+
+import pytest
+import sys
+import os
+import time
+import asyncio
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def test_sqlite_pubsub_between_workers(fresh_db):
+    from src.utils.shared_state import SQLiteBackend
+    worker_a = SQLiteBackend(worker_id="worker-a")
+    worker_b = SQLiteBackend(worker_id="worker-b")
+    received_a, received_b = [], []
+    worker_a.subscribe("cache.invalidate", received_a.append)
+    worker_b.subscribe("cache.invalidate", received_b.append)
+    worker_a.close()
+    worker_b.close()  # polling 스레드 대신 poll_once 로 직접 확인
+
+    worker_a.publish("cache.invalidate", {"reason": "db_restore"})
+    worker_a.publish("other", {"x": 1})
+    worker_a.flush()
+
+    assert received_a == [{"reason": "db_restore"}]     # 발행한 워커는 즉시 전달
+    assert worker_b.poll_once() == 2
+    assert received_b == [{"reason": "db_restore"}]
+    assert worker_a.poll_once() == 0                    # 자기 이벤트는 다시 받지 않음
+    assert received_a == [{"reason": "db_restore"}]
+    assert worker_b.poll_once() == 0
+
+    # local=False 는 다른 워커에만 전달
+    worker_b.publish("cache.invalidate", {"reason": "remote_only"}, local=False)
+    worker_b.flush()
+    assert received_b == [{"reason": "db_restore"}]
+    worker_a.poll_once()
+    assert received_a[-1] == {"reason": "remote_only"}
+
+
+def test_sqlite_polling_thread(fresh_db):
+    from src.utils.shared_state import SQLiteBackend
+    worker_a = SQLiteBackend(worker_id="worker-a", poll_sec=0.02)
+    worker_b = SQLiteBackend(worker_id="worker-b", poll_sec=0.02)
+    received = []
+    worker_b.subscribe("notification", received.append)
+    try:
+        worker_a.publish("notification", {"user_uid": 1})
+        deadline = time.time() + 3
+        while not received and time.time() < deadline:
+            time.sleep(0.02)
+        assert received == [{"user_uid": 1}]
+    finally:
+        worker_b.close()
+
+
+
+def test_publish_does_not_wait_for_db(fresh_db, monkeypatch):
+    from src.db import shared_state as db_shared
+    from src.utils.shared_state import SQLiteBackend
+    worker_a = SQLiteBackend(worker_id="worker-a")
+    worker_b = SQLiteBackend(worker_id="worker-b")
+    original = db_shared.insert_shared_events
+
+    def slow_insert(events, origin):
+        time.sleep(0.2)
+        return original(events, origin)
+
+    monkeypatch.setattr(db_shared, "insert_shared_events", slow_insert)
+    started = time.perf_counter()
+    for i in range(5):
+        worker_a.publish("notification", {"n": i}, local=False)
+    assert time.perf_counter() - started < 0.1
+
+    worker_a.flush()
+    received = []
+    worker_b.subscribe("notification", received.append)
+    worker_b.close()
+    worker_b._last_id = 0
+    assert worker_b.poll_once() == 5
+    assert received == [{"n": i} for i in range(5)]    # 발행 순서 유지
+
+
+@pytest.mark.parametrize("backend_name", ["sqlite", "memory"])
+def test_lease_and_values(fresh_db, backend_name):
+    from src.utils.shared_state import SQLiteBackend, MemoryBackend
+    if backend_name == "sqlite":
+        worker_a, worker_b = SQLiteBackend(worker_id="worker-a"), SQLiteBackend(worker_id="worker-b")
+    else:
+        worker_a = MemoryBackend(worker_id="worker-a")
+        worker_b = worker_a  # 단일 프로세스 구현은 자기 자신만 확인
+
+    assert worker_a.acquire_lease("scheduler", ttl_sec=0.3)
+    assert worker_a.acquire_lease("scheduler", ttl_sec=0.3)     # 소유자는 갱신 가능
+    assert worker_a.is_leader("scheduler")
+    if worker_b is not worker_a:
+        assert not worker_b.acquire_lease("scheduler", ttl_sec=0.3)
+        assert not worker_b.is_leader("scheduler")
+        assert not worker_b.release_lease("scheduler")          # 남의 lease 는 반납 불가
+        time.sleep(0.35)
+        assert worker_a.get_lease_owner("scheduler") is None   # 만료
+        assert worker_b.acquire_lease("scheduler", ttl_sec=5)
+        assert worker_b.get_lease_owner("scheduler") == "worker-b"
+        assert worker_b.release_lease("scheduler")
+    else:
+        assert worker_a.release_lease("scheduler")
+    assert worker_a.get_lease_owner("scheduler") is None
+
+    worker_a.set_value("mcp.session:abc", "worker-a")
+    worker_a.set_value("short", {"n": 1}, ttl_sec=0.1)
+    assert worker_b.get_value("mcp.session:abc") == "worker-a"
+    assert worker_b.get_value("short") == {"n": 1}
+    time.sleep(0.15)
+    assert worker_b.get_value("short", "gone") == "gone"
+    worker_b.delete_value("mcp.session:abc")
+    assert worker_a.get_value("mcp.session:abc") is None
+
+
+def test_notification_from_other_worker(fresh_db):
+    from src.utils.shared_state import SQLiteBackend, set_shared_state
+    from src.routers.notification import NotificationManager
+
+    this_worker = SQLiteBackend(worker_id="worker-a")
+    other_worker = SQLiteBackend(worker_id="worker-b")
+    previous = set_shared_state(this_worker)
+    manager = NotificationManager()
+
+    async def run():
+        queue = await manager.subscribe(1)
+        this_worker.close()  # polling 스레드 대신 poll_once 로 직접 확인
+
+        # 같은 워커의 알림은 한 번만 전달
+        manager.notify(1, {"title": "local"})
+        assert queue.get_nowait() == {"title": "local"}
+        this_worker.flush()
+        assert this_worker.poll_once() == 0
+        await asyncio.sleep(0)
+        assert queue.empty()
+
+        # 다른 워커가 발행한 알림 (그 워커에는 연결 없음)
+        other_worker.publish(NotificationManager.CHANNEL, {"user_uid": 1, "data": {"title": "remote"}})
+        other_worker.publish(NotificationManager.CHANNEL, {"user_uid": 2, "data": {"title": "other user"}})
+        other_worker.flush()
+        assert this_worker.poll_once() == 2
+        return await asyncio.wait_for(queue.get(), timeout=1), queue.empty()
+
+    try:
+        remote, empty_after = asyncio.run(run())
+        assert remote == {"title": "remote"}
+        assert empty_after
+    finally:
+        set_shared_state(previous)
@@ -0,0 +1,81 @@
+## 파일 설명
+## >> 서버 기동 시간 벤치마크 (python -X importtime 리포트 + 첫 요청 응답까지의 시간)
+## >> 무거운 선택 의존성(apscheduler, passlib, openpyxl 등)이 기동 시점에 로드되지 않는지 체크
+## >> 서브 프로세스는 임시 DB(AGENT_MCP_DB_PATH)를 사용 (프로젝트 agent_mcp.db 를 만들거나 migration 하지 않음)
+
+import pytest
+import sys
+import os
+import subprocess
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 기동 시점에 로드되면 안 되는 모듈 (최초 사용 시점에 로드)
+LAZY_MODULES = ["apscheduler", "passlib", "openpyxl", "fpdf", "pandas", "xmltodict", "boto3"]
+
+
+def _run_python(code: str, *flags, db_path: str):
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "dummy")
+    env["AGENT_MCP_DB_PATH"] = db_path
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=project_root, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def _importtime_report(module: str, db_path: str):
+    """-X importtime 결과를 (모듈명, 누적 us) 목록으로 반환"""
+    proc = _run_python(f"import {module}", "-X", "importtime", db_path=db_path)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(cumulative)))
+    return entries
+
+
+def _print_report(title: str, entries):
+    total = entries[-1][1] if entries else 0
+    print(f"\n[Benchmark] {title}: import {total / 1000:.0f} ms")
+    for name, cumulative in sorted(entries, key=lambda e: e[1], reverse=True)[:10]:
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+
+@pytest.mark.parametrize("module", ["src.sse_server", "src.mcp_server_impl"])
+def test_heavy_modules_are_lazy(module, tmp_path):
+    entries = _importtime_report(module, str(tmp_path / "startup_test.db"))
+    _print_report(module, entries)
+
+    loaded = {name.split(".")[0] for name, _ in entries}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    assert not eager, f"{module} 임포트 시 지연 로드 대상 모듈이 로드됨: {eager}"
+
+
+def test_time_to_first_request(tmp_path):
+    """프로세스 시작 ~ 첫 HTTP 요청 응답까지의 시간 측정 (lifespan 포함)"""
+    code = (
+        "import time; t0 = time.perf_counter()\n"
+        "from fastapi.testclient import TestClient\n"
+        "from src.sse_server import app\n"
+        "t1 = time.perf_counter()\n"
+        "with TestClient(app) as client:\n"
+        "    res = client.get('/docs')\n"
+        "    t2 = time.perf_counter()\n"
+        "print(res.status_code, round((t1 - t0) * 1000), round((t2 - t0) * 1000))\n"
+    )
+    db_path = str(tmp_path / "startup_test.db")
+    proc = _run_python(code, db_path=db_path)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    status, import_ms, first_request_ms = proc.stdout.strip().splitlines()[-1].split()
+    print(f"\n[Benchmark] import {import_ms} ms, time-to-first-request {first_request_ms} ms")
+    assert status == "200"
+    assert os.path.exists(db_path)
+    assert int(first_request_ms) < 15000
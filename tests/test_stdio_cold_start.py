@@ -0,0 +1,80 @@
+## 파일 설명
+## >> stdio 모드(server.py) 기동 체크
+## >> (1) 스키마 버전(PRAGMA user_version)이 최신이면 init_db 가 DDL 을 건너뛰는지
+## >> (2) 프로세스 시작 ~ initialize 응답까지의 시간 측정 (stdout 에 JSON-RPC 외 출력이 섞이지 않는지)
+## >>     서브 프로세스는 임시 DB(AGENT_MCP_DB_PATH)를 사용
+
+import pytest
+import sys
+import os
+import json
+import time
+import subprocess
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+def _table_exists(name: str) -> bool:
+    conn = connection.get_db_connection()
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+    conn.close()
+    return row is not None
+
+
+def test_init_db_skips_ddl_when_schema_is_current(db_path):
+    from src.db.init_manager import init_db, get_schema_version, SCHEMA_VERSION
+
+    init_db()
+    conn = connection.get_db_connection()
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    conn.execute("DROP TABLE h_export_job")
+    conn.commit()
+    conn.close()
+
+    # 버전이 최신이면 DDL 을 실행하지 않음 (삭제한 테이블이 다시 생기지 않음)
+    init_db()
+    assert not _table_exists("h_export_job")
+
+    # 버전이 낮으면 다시 DDL 실행
+    conn = connection.get_db_connection()
+    conn.execute("PRAGMA user_version = 0")
+    conn.close()
+    init_db()
+    assert _table_exists("h_export_job")
+
+
+def test_stdio_time_to_initialize(tmp_path):
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "dummy")
+    env["AGENT_MCP_DB_PATH"] = str(tmp_path / "stdio_cold_start.db")
+    request = {
+        "jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "pytest", "version": "1.0"}}
+    }
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(project_root, "src", "server.py")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env
+    )
+    try:
+        proc.stdin.write((json.dumps(request) + "\n").encode())
+        proc.stdin.flush()
+        line = proc.stdout.readline()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        proc.kill()
+        proc.wait()
+
+    # stdout 첫 줄은 반드시 initialize 응답(JSON-RPC)이어야 함
+    response = json.loads(line)
+    assert response["id"] == 1
+    assert response["result"]["serverInfo"]["name"] == "agent-mcp-sse"
+
+    print(f"\n[Benchmark] stdio time-to-initialize: {elapsed_ms:.0f} ms")
+    assert elapsed_ms < 10000
@@ -0,0 +1,139 @@
+## 파일 설명
+## >> S3 호환 저장소 backend 체크 (src/utils/storage_backend.py, src/routers/files.py FILE_STORAGE_BACKEND=s3)
+## >> (1) 큰 파일은 multipart 로 part 병렬 전송, 다운로드는 presigned URL 로 307 redirect (앱 서버는 바이트 전송 안 함)
+## >> (2) 크기 초과는 아무것도 전송하기 전에 413, 삭제 시 객체도 삭제
+## >> (3) 저장 backend 를 바꿔도 이전 로컬 파일은 그대로 다운로드
+## >> 로컬 S3 대역: moto (MinIO 등 실제 저장소 없이 실행)
+
+import pytest
+import sys
+import os
+import hashlib
+import threading
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+moto = pytest.importorskip("moto")
+requests = pytest.importorskip("requests")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+USER = {"uid": 1, "user_id": "s3_user", "role": "ROLE_USER"}
+BUCKET = "agent-mcp-test-files"
+PART_SIZE_MB = 5                                       # S3 최소 part 크기
+CONTENT = os.urandom(12 * 1024 * 1024)                 # 5MB + 5MB + 2MB -> part 3개
+
+
+@pytest.fixture()
+def client(fresh_db, tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    from src.routers import files
+    from src.utils import storage_backend
+    from src.utils.download_log import DownloadLog
+    from src.dependencies import get_current_user_jwt
+    monkeypatch.setattr(files, "BASE_UPLOAD_DIR", str(tmp_path / "files"))
+    monkeypatch.setattr(storage_backend, "FILE_STORAGE_BACKEND", "s3")
+    download_log = DownloadLog(flush_sec=3600)
+    monkeypatch.setattr(files, "download_log", download_log)
+
+    with moto.mock_aws():
+        storage = storage_backend.S3Storage(bucket=BUCKET, region="us-east-1", multipart_threshold_mb=PART_SIZE_MB,
+                                            part_size_mb=PART_SIZE_MB, max_concurrency=4)
+        storage.client.create_bucket(Bucket=BUCKET)
+        previous = storage_backend.set_storage_backend(storage)
+
+        app = FastAPI()
+        app.include_router(files.router)
+        app.dependency_overrides[get_current_user_jwt] = lambda: USER
+        test_client = TestClient(app)
+        test_client.storage = storage
+        test_client.download_log = download_log
+        try:
+            yield test_client
+        finally:
+            storage_backend.set_storage_backend(previous, 'S3')
+            download_log.stop()
+
+
+def _upload(client, name: str, data: bytes = CONTENT) -> dict:
+    res = client.post("/api/files/upload", files={"files": (name, data, "application/octet-stream")})
+    assert res.status_code == 200
+    return res.json()["uploaded"][0]
+
+
+def _object_keys(client) -> list:
+    return [obj["Key"] for obj in client.storage.client.list_objects_v2(Bucket=BUCKET).get("Contents", [])]
+
+
+def test_multipart_upload_and_presigned_download(client, tmp_path):
+    from src.db.file_manager import get_file_by_id
+    # part 전송 스레드 기록
+    part_threads = set()
+    upload_part = client.storage.client.upload_part
+
+    def record_part(**kwargs):
+        part_threads.add(threading.current_thread().name)
+        return upload_part(**kwargs)
+    client.storage.client.upload_part = record_part
+
+    uploaded = _upload(client, "보고서.bin")
+    row = get_file_by_id(uploaded["file_id"])
+    assert row["storage_tp"] == "S3" and _object_keys(client) == [row["file_path"]]
+    assert uploaded["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+    assert not os.path.exists(tmp_path / "files")                  # 로컬 디스크에 쓰지 않음
+
+    head = client.storage.client.head_object(Bucket=BUCKET, Key=row["file_path"])
+    assert head["ContentLength"] == len(CONTENT) and head["ETag"].endswith('-3"')   # multipart (part 3개)
+    assert len(part_threads) > 1                                   # part 병렬 전송
+
+    # 다운로드: presigned URL 로 redirect, 바이트는 저장소에서 직접
+    url = f"/api/files/download/{uploaded['file_id']}"
+    etag = f'"{uploaded["file_hash"]}"'
+    res = client.get(url, follow_redirects=False)
+    assert res.status_code == 307 and res.content == b""
+    assert res.headers["etag"] == etag and res.headers["cache-control"] == "private, no-cache"
+    direct = requests.get(res.headers["location"])
+    assert direct.status_code == 200 and direct.content == CONTENT
+    assert "%EB%B3%B4%EA%B3%A0%EC%84%9C.bin" in direct.headers["content-disposition"]
+
+    assert client.get(url, headers={"If-None-Match": etag}, follow_redirects=False).status_code == 304
+    assert client.download_log.get_status()["pending"] == 1
+
+
+def test_too_large_uploads_nothing(client, monkeypatch):
+    from src.routers import files
+    monkeypatch.setattr(files, "FILE_MAX_SIZE_MB", 1)
+    res = client.post("/api/files/upload", files=[
+        ("files", ("small.txt", b"small", "text/plain")),
+        ("files", ("large.bin", CONTENT[:2 * 1024 * 1024], "application/octet-stream")),
+    ])
+    assert res.status_code == 413
+    assert _object_keys(client) == []
+
+
+def test_delete_removes_object(client):
+    from src.db.file_manager import get_file_by_id
+    uploaded = _upload(client, "small.txt", b"small content")
+    key = get_file_by_id(uploaded["file_id"])["file_path"]
+    assert client.storage.exists(key)
+
+    assert client.delete(f"/api/files/{uploaded['file_id']}").status_code == 200
+    assert not client.storage.exists(key) and get_file_by_id(uploaded["file_id"]) is None
+
+
+def test_local_files_served_after_switch(client, monkeypatch):
+    from src.utils import storage_backend
+    monkeypatch.setattr(storage_backend, "FILE_STORAGE_BACKEND", "local")
+    local = _upload(client, "local.txt", b"local content")
+    monkeypatch.setattr(storage_backend, "FILE_STORAGE_BACKEND", "s3")
+    remote = _upload(client, "remote.txt", b"remote content")
+
+    res = client.get(f"/api/files/download/{local['file_id']}", follow_redirects=False)
+    assert res.status_code == 200 and res.content == b"local content"
+    res = client.get(f"/api/files/download/{remote['file_id']}", follow_redirects=False)
+    assert res.status_code == 307 and requests.get(res.headers["location"]).content == b"remote content"
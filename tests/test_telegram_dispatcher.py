@@ -0,0 +1,139 @@
+## 파일 설명
+## >> 텔레그램 전송 큐 체크 (src/utils/telegram_bot.py TelegramDispatcher, 로컬 HTTP 서버로 Bot API 대체)
+## >> (1) 알림이 몰려도 chat 별로 병합하여 전송, keep-alive 연결 1개 재사용
+## >> (2) chat 별 전송 간격 유지
+## >> (3) 429 는 retry_after 후 재시도, 5xx 는 백오프 재시도, 4xx 는 재시도 없이 실패 처리
+
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.utils.telegram_bot import TelegramDispatcher, COALESCE_SEPARATOR
+
+
+class FakeTelegram:
+    """sendMessage 요청을 기록하고, responses 에 넣어둔 상태 코드를 순서대로 응답"""
+
+    def __init__(self):
+        self.requests = []          # (chat_id, text, 수신 시각)
+        self.clients = set()        # 클라이언트 (host, port) -> 연결 수
+        self.responses = []
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake.lock:
+                    fake.clients.add(self.client_address)
+                    fake.requests.append((body["chat_id"], body["text"], time.monotonic()))
+                    status = fake.responses.pop(0) if fake.responses else 200
+                if status == 429:
+                    payload = {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}}
+                else:
+                    payload = {"ok": status == 200}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def telegram():
+    fake = FakeTelegram()
+    yield fake
+    fake.close()
+
+
+def _dispatcher(telegram, **kwargs) -> TelegramDispatcher:
+    options = {"token": "TEST", "chat_id": "100", "api_base": telegram.base, "chat_interval_sec": 0.3,
+               "global_rate_per_sec": 0, "coalesce_sec": 0.1, "max_retries": 3, "retry_base_sec": 0.05}
+    options.update(kwargs)
+    return TelegramDispatcher(**options)
+
+
+def test_burst_is_coalesced_per_chat(telegram):
+    dispatcher = _dispatcher(telegram)
+    try:
+        for i in range(50):
+            assert dispatcher.enqueue(f"msg {i}")
+        for i in range(5):
+            dispatcher.enqueue(f"other {i}", chat_id="200")
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    by_chat = {}
+    for chat_id, text, _ in telegram.requests:
+        by_chat.setdefault(chat_id, []).extend(text.split(COALESCE_SEPARATOR))
+    assert by_chat == {"100": [f"msg {i}" for i in range(50)], "200": [f"other {i}" for i in range(5)]}
+    assert len(telegram.requests) == 2                          # chat 별 1건
+    assert len(telegram.clients) == 1                           # keep-alive 연결 재사용
+
+    status = dispatcher.get_status()
+    assert (status["pending"], status["sent"], status["coalesced"], status["requests"]) == (0, 55, 53, 2)
+
+
+def test_per_chat_interval(telegram):
+    dispatcher = _dispatcher(telegram, coalesce_sec=0)
+    try:
+        for i in range(3):
+            dispatcher.enqueue(f"msg {i}")
+            time.sleep(0.05)                                    # 이전 메시지 전송 후 도착
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    times = [ts for _, _, ts in telegram.requests]
+    assert len(times) >= 2
+    assert all(b - a >= 0.28 for a, b in zip(times, times[1:]))
+    assert [t for _, text, _ in telegram.requests for t in text.split(COALESCE_SEPARATOR)] == ["msg 0", "msg 1", "msg 2"]
+
+
+def test_retry_and_failure(telegram):
+    telegram.responses = [429, 500, 200, 400]
+    dispatcher = _dispatcher(telegram)
+    try:
+        start = time.monotonic()
+        dispatcher.enqueue("hello")
+        assert dispatcher.flush(5)
+        assert time.monotonic() - start >= 0.2                  # retry_after 만큼 대기
+        dispatcher.enqueue("bad request")
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    assert [text for _, text, _ in telegram.requests] == ["hello", "hello", "hello", "bad request"]
+    status = dispatcher.get_status()
+    assert (status["sent"], status["retried"], status["failed"]) == (1, 2, 1)
+
+
+def test_not_configured():
+    dispatcher = TelegramDispatcher(token="", chat_id="")
+    assert dispatcher.enqueue("hello") is False
+    assert dispatcher.get_status()["queued"] == 0
@@ -0,0 +1,101 @@
+## 파일 설명
+## >> 큰 도구 실행 결과 분리 저장 체크 (src/db/tool_result.py)
+## >> (1) 큰 결과: 이력에는 미리보기만, 전체 본문은 h_mcp_tool_result 에 압축 저장 -> 상세 조회 시 원문 복원
+## >> (2) 작은 결과: 기존처럼 inline 저장
+## >> (3) 이력 삭제 시 본문도 삭제, 기존(v4) DB 의 큰 결과는 migration 으로 변환 (전체 결과 검색 색인 포함)
+
+import pytest
+import sys
+import os
+import json
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+from src.db import tool_result
+
+BIG_RESULT = json.dumps([{"row": i, "name": f"item-{i}", "desc": "lorem ipsum " * 5} for i in range(5000)])
+
+
+def _scalar(sql: str, params=()):
+    conn = connection.get_db_connection()
+    value = conn.execute(sql, params).fetchone()[0]
+    conn.close()
+    return value
+
+
+def test_large_result_is_compressed_and_restored(db_path):
+    from src.db.init_manager import init_db
+    from src.db.mcp_tool_usage import log_tool_usage, get_tool_usage_logs, get_tool_usage_detail
+    init_db()
+
+    log_tool_usage(1, "sql_dump", "{}", True, BIG_RESULT)
+    log_tool_usage(1, "add", "{}", True, "3")
+
+    items = {item["tool_nm"]: item for item in get_tool_usage_logs()["items"]}
+    big, small = items["sql_dump"], items["add"]
+
+    assert big["result_truncated"] is True
+    assert len(big["tool_result"]) < tool_result.RESULT_INLINE_MAX
+    assert big["result_size"] == len(BIG_RESULT.encode("utf-8"))
+    assert small["result_truncated"] is False and small["tool_result"] == "3"
+
+    # 압축 저장 (원본보다 훨씬 작음)
+    comp_size = _scalar("SELECT comp_size FROM h_mcp_tool_result WHERE usage_id = ?", (big["id"],))
+    assert comp_size < big["result_size"] / 5
+
+    assert get_tool_usage_detail(big["id"])["tool_result"] == BIG_RESULT
+    assert get_tool_usage_detail(small["id"])["tool_result"] == "3"
+
+    # 이력 삭제 시 본문도 삭제
+    conn = connection.get_db_connection()
+    conn.execute("DELETE FROM h_mcp_tool_usage WHERE id = ?", (big["id"],))
+    conn.commit()
+    conn.close()
+    assert _scalar("SELECT COUNT(*) FROM h_mcp_tool_result") == 0
+
+
+def test_migration_compacts_existing_results(db_path):
+    from src.db import migrations
+
+    migrations.apply_migrations(target=4)
+    conn = connection.get_db_connection()
+    usage_id = conn.execute(
+        "INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_success, tool_result, reg_dt) VALUES (1, 'legacy', 'SUCCESS', ?, '2026-01-01 00:00:00')",
+        (BIG_RESULT,)
+    ).lastrowid
+    conn.commit()
+    conn.close()
+
+    migrations.apply_migrations()
+    assert _scalar("SELECT length(tool_result) FROM h_mcp_tool_usage WHERE id = ?", (usage_id,)) < tool_result.RESULT_INLINE_MAX
+    assert tool_result.get_tool_result(usage_id) == BIG_RESULT
+
+    # 미리보기에서 잘린 뒷부분도 검색됨 (v15 가 기존 결과를 색인)
+    from src.db.mcp_tool_usage import get_tool_usage_logs
+    assert "item-4321" not in _scalar("SELECT tool_result FROM h_mcp_tool_usage WHERE id = ?", (usage_id,))
+    assert [item['id'] for item in get_tool_usage_logs(search="item-4321")['items']] == [usage_id]
+
+
+def test_detail_api(db_path):
+    from src.db.init_manager import init_db
+    from src.db.mcp_tool_usage import log_tool_usage
+    from src.routers import mcp
+    from src.dependencies import get_current_user_jwt
+    init_db()
+    log_tool_usage(1, "sql_dump", "{}", True, BIG_RESULT)
+
+    app = FastAPI()
+    app.include_router(mcp.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: {"uid": 1, "user_id": "admin", "role": "ROLE_ADMIN"}
+    client = TestClient(app)
+
+    item = client.get("/api/mcp/usage-history").json()["items"][0]
+    assert item["result_truncated"] is True
+    assert client.get(f"/api/mcp/usage-history/{item['id']}").json()["tool_result"] == BIG_RESULT
+    assert client.get("/api/mcp/usage-history/999999").status_code == 404
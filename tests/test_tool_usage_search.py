@@ -0,0 +1,118 @@
+## 파일 설명
+## >> MCP Tool 사용 이력 전문 검색(FTS5) 체크 (파라미터/결과 내용 검색, 트리거 동기화)
+## >> 분리 저장된 큰 결과는 미리보기(1000자) 이후 내용도 검색, 보관 정책 삭제 시 색인 제거
+
+import pytest
+import sys
+import os
+import time
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.db import connection
+
+
+def test_search_params_and_result(fresh_db):
+    from src.db.mcp_tool_usage import log_tool_usage, get_tool_usage_logs
+
+    log_tool_usage(user_uid=1, tool_nm="get_weather", tool_params="{'city': 'Seoul'}", success=True, result='{"temp": 21, "sky": "맑음"}')
+    log_tool_usage(user_uid=1, tool_nm="get_weather", tool_params="{'city': 'Busan'}", success=True, result='{"temp": 25, "sky": "흐림"}')
+    log_tool_usage(user_uid=1, tool_nm="send_email", tool_params="{'recipient': 'a@example.com'}", success=False, result="Error: SMTP timeout")
+
+    # 파라미터 검색
+    res = get_tool_usage_logs(search="Seoul")
+    assert res['total'] == 1
+    assert "Seoul" in res['items'][0]['tool_params']
+
+    # 결과 검색 (특수문자 포함 검색어)
+    res = get_tool_usage_logs(search="SMTP timeout")
+    assert res['total'] == 1
+    assert res['items'][0]['tool_nm'] == "send_email"
+
+    # 3글자 미만 검색어는 LIKE로 대체 검색
+    res = get_tool_usage_logs(search="흐림")
+    assert res['total'] == 1
+
+    # 다른 필터와 함께 사용
+    res = get_tool_usage_logs(search="temp", search_tool_nm="weather", search_success="SUCCESS")
+    assert res['total'] == 2
+
+
+def test_search_index_follows_delete(fresh_db):
+    from src.db.mcp_tool_usage import log_tool_usage, get_tool_usage_logs
+
+    log_tool_usage(user_uid=1, tool_nm="lookup", tool_params="{'q': 'unique_marker_zz'}", success=True, result="ok")
+    assert get_tool_usage_logs(search="unique_marker_zz")['total'] == 1
+
+    # 원본 삭제 시 트리거로 인덱스도 함께 정리되어야 함
+    conn = connection.get_db_connection()
+    conn.execute("DELETE FROM h_mcp_tool_usage WHERE tool_nm = 'lookup'")
+    conn.commit()
+    conn.close()
+
+    assert get_tool_usage_logs(search="unique_marker_zz")['total'] == 0
+
+
+def test_search_speed_on_large_history(fresh_db):
+    """대량 이력(5만건)에서도 전문 검색이 빠르게 응답하는지 확인"""
+    from src.db.mcp_tool_usage import get_tool_usage_logs
+
+    conn = connection.get_db_connection()
+    conn.executemany(
+        "INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_params, tool_success, tool_result, reg_dt) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (1, f"tool_{i % 20}", f"{{'order_no': 'ORD{i:06d}'}}", 'SUCCESS', f'{{"rows": {i}, "status": "done"}}', "2026-01-01 00:00:00")
+            for i in range(50000)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+    started = time.perf_counter()
+    res = get_tool_usage_logs(search="ORD012345")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert res['total'] == 1
+    print(f"\n[Benchmark] FTS search on 50,000 rows: {elapsed_ms:.1f} ms")
+    assert elapsed_ms < 500
+
+
+def test_search_beyond_result_preview(fresh_db, tmp_path, monkeypatch):
+    import json
+    from datetime import datetime, timedelta
+    from src.db import retention
+    from src.db.mcp_tool_usage import log_tool_usage, log_tool_usage_batch, get_tool_usage_logs
+    from src.db.system_config import set_config
+    from src.db.tool_result import RESULT_FTS_TABLE
+
+    filler = "x" * 5000
+    log_tool_usage(user_uid=1, tool_nm="sql_dump", tool_params="{'db': 'orders'}", success=True,
+                   result=filler + " deep_marker_qq " + filler)
+    log_tool_usage_batch([{"user_uid": 1, "tool_nm": "sql_dump", "tool_params": "{'db': 'users'}",
+                           "result": filler + " batch_marker_qq"}])
+    # 이력 테이블에는 미리보기만 남음
+    assert all("marker_qq" not in item['tool_result'] for item in get_tool_usage_logs()['items'])
+
+    # 미리보기 이후 내용 검색, 파라미터/미리보기 검색과 함께 동작
+    assert get_tool_usage_logs(search="deep_marker_qq")['total'] == 1
+    assert get_tool_usage_logs(search="batch_marker_qq")['items'][0]['tool_params'] == "{'db': 'users'}"
+    assert get_tool_usage_logs(search="deep_marker_qq", search_tool_nm="sql_dump")['total'] == 1
+    assert get_tool_usage_logs(search="orders")['total'] == 1
+
+    # 보관 정책으로 삭제하면 전체 결과 색인도 제거
+    monkeypatch.setattr(retention, "ARCHIVE_DIR", str(tmp_path / "archives"))
+    conn = connection.get_db_connection()
+    conn.execute("UPDATE h_mcp_tool_usage SET reg_dt = ?",
+                 ((datetime.now() - timedelta(days=200)).strftime("%Y-%m-%d %H:%M:%S"),))
+    conn.commit()
+    conn.close()
+    set_config("retention_policy", json.dumps({"tables": {"h_mcp_tool_usage": {"enabled": True, "archive": None}}}))
+    assert retention.run_retention()["total_deleted"] == 2
+
+    assert get_tool_usage_logs(search="deep_marker_qq")['total'] == 0
+    conn = connection.get_db_connection()
+    assert conn.execute(f"SELECT COUNT(*) FROM {RESULT_FTS_TABLE} WHERE {RESULT_FTS_TABLE} MATCH 'marker_qq'").fetchone()[0] == 0
+    conn.close()
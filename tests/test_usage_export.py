@@ -0,0 +1,118 @@
+## 파일 설명
+## >> 사용 이력 스트리밍 내보내기(CSV/Excel) 체크 (행 수, 헤더, 메모리 사용량)
+## >> 분리 저장된 긴 실행 결과는 미리보기가 아닌 전체 본문으로 내보냄
+
+import pytest
+import sys
+import os
+import io
+import csv
+import tracemalloc
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.db import connection
+
+ROW_COUNT = 20000
+
+
+@pytest.fixture()
+def client(fresh_db):
+    """테스트 전용 임시 DB + export 라우터만 올린 앱 (관리자 인증 대체)"""
+    conn = connection.get_db_connection()
+    conn.executemany(
+        "INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_params, tool_success, tool_result, reg_dt) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (None, f"tool_{i % 10}", f"{{'no': {i}}}", 'SUCCESS', "결과 " + "x" * 200, "2026-01-01 00:00:00")
+            for i in range(ROW_COUNT)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+    from src.routers import export
+    from src.dependencies import get_current_user_jwt
+    app = FastAPI()
+    app.include_router(export.router)
+    app.dependency_overrides[get_current_user_jwt] = lambda: {"uid": 1, "role": "ROLE_ADMIN"}
+    return TestClient(app)
+
+
+def test_export_csv(client):
+    res = client.get("/api/export/mcp/usage", params={"format": "csv"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert ".csv" in res.headers["content-disposition"]
+
+    # UTF-8 BOM + 한글 헤더
+    assert res.content.startswith(b"\xef\xbb\xbf")
+    rows = list(csv.reader(io.StringIO(res.content.decode("utf-8-sig"))))
+    assert rows[0][:4] == ["시간", "사용자명", "사용자ID", "도구명"]
+    assert len(rows) == ROW_COUNT + 1
+
+
+def test_export_excel(client):
+    from openpyxl import load_workbook
+
+    res = client.get("/api/export/mcp/usage", params={"format": "excel", "tool_nm": "tool_1"})
+    assert res.status_code == 200
+    assert ".xlsx" in res.headers["content-disposition"]
+
+    wb = load_workbook(io.BytesIO(res.content), read_only=True)
+    ws = wb["MCP Usage"]
+    assert sum(1 for _ in ws.iter_rows(values_only=True)) == ROW_COUNT // 10 + 1
+
+
+
+def test_export_full_tool_result(client):
+    from openpyxl import load_workbook
+    from src.db import log_tool_usage
+    long_result = "".join(f"line-{i:05d};" for i in range(1000))      # 11000 byte (분리 저장 기준 4096 초과)
+    log_tool_usage(None, "long_tool", "{}", True, long_result)
+
+    res = client.get("/api/export/mcp/usage", params={"format": "csv", "tool_nm": "long_tool"})
+    rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+    assert len(rows) == 1 and long_result in rows[0].values()
+
+    res = client.get("/api/export/mcp/usage", params={"format": "excel", "tool_nm": "long_tool"})
+    ws = load_workbook(io.BytesIO(res.content), read_only=True)["MCP Usage"]
+    assert long_result in list(ws.iter_rows(values_only=True))[1]
+
+def _measure_csv_export():
+    from src.db import iter_tool_usage_logs
+    from src.routers.export import MCP_USAGE_COLUMNS
+    from src.utils.export_writer import iter_csv
+
+    # TestClient 는 응답 본문을 모아서 돌려주므로, 응답 generator 를 직접 소비하며 측정
+    tracemalloc.start()
+    total_bytes = 0
+    for chunk in iter_csv(iter_tool_usage_logs(), MCP_USAGE_COLUMNS):
+        total_bytes += len(chunk)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total_bytes, peak
+
+
+def test_export_memory_is_bounded(client):
+    """이력 건수가 늘어나도 내보내기 최대 메모리 사용량은 일정해야 함 (전체 행을 메모리에 올리지 않음)"""
+    size_1, peak_1 = _measure_csv_export()
+
+    # 이력을 4배로 늘려서 다시 측정
+    conn = connection.get_db_connection()
+    for _ in range(3):
+        conn.execute("INSERT INTO h_mcp_tool_usage (user_uid, tool_nm, tool_params, tool_success, tool_result, reg_dt) "
+                     "SELECT user_uid, tool_nm, tool_params, tool_success, tool_result, reg_dt FROM h_mcp_tool_usage LIMIT ?", (ROW_COUNT,))
+    conn.commit()
+    conn.close()
+    size_4, peak_4 = _measure_csv_export()
+
+    print(f"\n[Benchmark] CSV export {size_1 / 1024 / 1024:.1f} MB -> peak {peak_1 / 1024 / 1024:.2f} MB, "
+          f"{size_4 / 1024 / 1024:.1f} MB -> peak {peak_4 / 1024 / 1024:.2f} MB")
+    assert size_4 > size_1 * 3
+    assert peak_4 < peak_1 * 1.5
+    assert peak_4 < size_4 / 4